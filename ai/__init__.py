@@ -1,5 +1,6 @@
 """AI/LLM Integration Package"""
 
 from .llm_service import LLMService, get_llm_service
+from .response_cache import ResponseCache, get_response_cache, bypass_cache
 
-__all__ = ["LLMService", "get_llm_service"]
+__all__ = ["LLMService", "get_llm_service", "ResponseCache", "get_response_cache", "bypass_cache"]
@@ -0,0 +1,224 @@
+"""
+Model Call Concurrency
+Singleflight coalescing and per-endpoint priority semaphores for model serving.
+Identical in-flight calls share one result, each endpoint has a cap on concurrent
+calls, and waiting callers are admitted in priority order so interactive
+Ask Thom requests go ahead of background enrichment.
+"""
+
+import os
+import time
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Dict, Any, Optional, Callable, List, Tuple, TypeVar
+
+from .telemetry import note_queue_wait
+from .resilience import remaining_time
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """Lower value is admitted first"""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+_priority: ContextVar[Optional[Priority]] = ContextVar("model_call_priority", default=None)
+
+
+@contextmanager
+def call_priority(priority: Priority):
+    """Run model calls made inside this block at the given priority"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority(default: Priority = Priority.NORMAL) -> Priority:
+    priority = _priority.get()
+    return default if priority is None else priority
+
+
+class PrioritySemaphore:
+    """Counting semaphore whose waiters are woken highest-priority first (FIFO within a priority)"""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self._active = 0
+        self._waiters: List[Tuple[int, int, threading.Event]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def acquire(self, priority: Priority = Priority.NORMAL, timeout: Optional[float] = None) -> bool:
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return True
+            entry = (int(priority), next(self._sequence), threading.Event())
+            heapq.heappush(self._waiters, entry)
+
+        if entry[2].wait(timeout):
+            return True
+
+        with self._lock:
+            if entry[2].is_set():
+                return True  # Granted between the timeout and taking the lock
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+            return False
+
+    def release(self) -> None:
+        with self._lock:
+            if self._waiters:
+                # Hand the slot straight to the next waiter; _active is unchanged
+                heapq.heappop(self._waiters)[2].set()
+            else:
+                self._active -= 1
+
+    @contextmanager
+    def slot(self, priority: Priority = Priority.NORMAL, timeout: Optional[float] = None):
+        if not self.acquire(priority, timeout):
+            raise TimeoutError("Timed out waiting for a model serving slot")
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waiting = {p.name.lower(): 0 for p in Priority}
+            for priority, _, _ in self._waiters:
+                waiting[Priority(priority).name.lower()] += 1
+            return {"limit": self.limit, "active": self._active, "waiting": waiting}
+
+
+class SingleFlight:
+    """Identical concurrent calls (same key) run once; the others wait for and share its result"""
+
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = Future()
+                self._calls[key] = future
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        return future.result()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class ModelCallGate:
+    """Singleflight plus a priority semaphore per serving endpoint"""
+
+    def __init__(
+        self,
+        default_limit: int = 4,
+        limits: Optional[Dict[str, int]] = None,
+        queue_timeout: Optional[float] = None,
+    ):
+        self.default_limit = default_limit
+        self.limits = dict(limits or {})
+        self.queue_timeout = queue_timeout
+        self._semaphores: Dict[str, PrioritySemaphore] = {}
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+
+    def semaphore(self, endpoint: str) -> PrioritySemaphore:
+        with self._lock:
+            if endpoint not in self._semaphores:
+                self._semaphores[endpoint] = PrioritySemaphore(self.limits.get(endpoint, self.default_limit))
+            return self._semaphores[endpoint]
+
+    @contextmanager
+    def slot(self, endpoint: str, priority: Optional[Priority] = None, timeout: Optional[float] = None):
+        """
+        Hold one of the endpoint's concurrent call slots. The wait is bounded by the
+        queue timeout, `timeout` and the current deadline, whichever is shortest.
+        """
+        limits = [t for t in (self.queue_timeout, timeout, remaining_time()) if t is not None]
+        waiting_since = time.perf_counter()
+        with self.semaphore(endpoint).slot(current_priority() if priority is None else priority, min(limits) if limits else None):
+            note_queue_wait(time.perf_counter() - waiting_since)
+            yield
+
+    def coalesce(self, key: str, fn: Callable[[], T]) -> T:
+        return self._flight.do(key, fn)
+
+    def call(self, endpoint: str, key: str, fn: Callable[[], T], priority: Optional[Priority] = None) -> T:
+        """Coalesce identical calls, then run the leader inside an endpoint slot"""
+        priority = current_priority() if priority is None else priority
+
+        def run() -> T:
+            with self.slot(endpoint, priority):
+                return fn()
+
+        return self._flight.do(f"{endpoint}:{key}", run)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = {name: sem.stats() for name, sem in self._semaphores.items()}
+        return {
+            "default_limit": self.default_limit,
+            "in_flight_keys": self._flight.in_flight(),
+            "executed": self._flight.executed,
+            "coalesced": self._flight.coalesced,
+            "endpoints": endpoints,
+        }
+
+
+def _parse_limits(value: str) -> Dict[str, int]:
+    """Parse "endpoint-a=2,endpoint-b=8" into per-endpoint limits"""
+    limits = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, limit = item.split("=", 1)
+            limits[name.strip()] = int(limit)
+    return limits
+
+
+# Singleton instance
+_model_gate = None
+
+
+def get_model_gate() -> ModelCallGate:
+    """Get or create the model call gate singleton"""
+    global _model_gate
+    if _model_gate is None:
+        _model_gate = ModelCallGate(
+            default_limit=int(os.getenv("MODEL_MAX_CONCURRENCY", "4")),
+            limits=_parse_limits(os.getenv("MODEL_ENDPOINT_CONCURRENCY", "")),
+            queue_timeout=float(os.getenv("MODEL_QUEUE_TIMEOUT_SECONDS", "0")) or None,
+        )
+    return _model_gate
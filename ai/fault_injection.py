@@ -0,0 +1,165 @@
+"""
+Fault-Injecting Serving Stub
+A local stand-in for a model serving endpoint that fails, stalls or slows down
+on demand. Point DATABRICKS_SERVING_URL at it to exercise the circuit breaker,
+deadlines and hedged requests without a workspace:
+
+    python -m ai.fault_injection --port 8765 --error-rate 0.5 --latency 0.2
+    DATABRICKS_SERVING_URL=http://127.0.0.1:8765 ./start.sh
+
+Faults can be changed while it runs with POST /faults {"error_rate": 1.0, ...}.
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+
+ANSWER = "The PPA profile points to high Dominance and steady Compliance, a good fit for IFS Cloud delivery roles."
+
+
+@dataclass
+class FaultConfig:
+    """What the stub does to each invocation"""
+    error_rate: float = 0.0        # share of requests answered with error_status
+    error_status: int = 503
+    latency: float = 0.05          # base seconds before answering
+    slow_rate: float = 0.0         # share of requests that take slow_latency instead
+    slow_latency: float = 5.0
+    hang_rate: float = 0.0         # share of requests that never answer within hang_latency
+    hang_latency: float = 60.0
+    stream_interval: float = 0.0   # seconds between streamed chunks (a slow-drip stream)
+
+    def update(self, changes: Dict[str, Any]) -> None:
+        for key, value in changes.items():
+            if hasattr(self, key):
+                setattr(self, key, type(getattr(self, key))(value))
+
+
+class FaultInjectingServer:
+    """Serving endpoint stub running on a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, faults: Optional[FaultConfig] = None, seed: Optional[int] = None):
+        self.faults = faults or FaultConfig()
+        self.counts = {"requests": 0, "errors": 0, "slow": 0, "hangs": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _decide(self) -> str:
+        with self._lock:
+            self.counts["requests"] += 1
+            roll = self._random.random()
+            faults = self.faults
+            if roll < faults.error_rate:
+                self.counts["errors"] += 1
+                return "error"
+            roll -= faults.error_rate
+            if roll < faults.hang_rate:
+                self.counts["hangs"] += 1
+                return "hang"
+            roll -= faults.hang_rate
+            if roll < faults.slow_rate:
+                self.counts["slow"] += 1
+                return "slow"
+            return "ok"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._send_json(200, {"faults": asdict(stub.faults), "counts": dict(stub.counts)})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if self.path == "/faults":
+                    with stub._lock:
+                        stub.faults.update(request)
+                    self._send_json(200, {"faults": asdict(stub.faults)})
+                    return
+
+                outcome = stub._decide()
+                faults = stub.faults
+                if outcome == "error":
+                    time.sleep(faults.latency)
+                    self._send_json(faults.error_status, {"error_code": "TEMPORARILY_UNAVAILABLE", "message": "injected fault"})
+                    return
+                time.sleep({"hang": faults.hang_latency, "slow": faults.slow_latency}.get(outcome, faults.latency))
+
+                if request.get("stream"):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.end_headers()
+                    for word in ANSWER.split(" "):
+                        time.sleep(faults.stream_interval)
+                        chunk = {"choices": [{"delta": {"content": word + " "}}]}
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    return
+                self._send_json(200, {"choices": [{"message": {"role": "assistant", "content": ANSWER}}]})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "FaultInjectingServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fault-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fault-injecting model serving stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=5.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0)
+    parser.add_argument("--stream-interval", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    faults = FaultConfig(
+        error_rate=args.error_rate, error_status=args.error_status, latency=args.latency,
+        slow_rate=args.slow_rate, slow_latency=args.slow_latency, hang_rate=args.hang_rate,
+        stream_interval=args.stream_interval,
+    )
+    server = FaultInjectingServer(args.host, args.port, faults, seed=args.seed)
+    print(f"Fault-injecting serving stub on {server.url} ({faults})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -6,6 +6,9 @@ Provides GenAI capabilities using Databricks Mosaic AI or local mock responses
 import random
 from typing import Dict, Any, List, Optional
 from config import is_local_mode, get_databricks_client, DatabricksConfig
+from .response_cache import get_response_cache, make_cache_key
+from .concurrency import get_model_gate
+from .telemetry import track
 
 
 class LLMService:
@@ -16,24 +19,54 @@ class LLMService:
     
     def __init__(self):
         self.is_local = is_local_mode()
-        self.client = None if self.is_local else get_databricks_client()
+        self._client = None
         self.config = DatabricksConfig.from_env()
     
-    def _call_llm(self, prompt: str, max_tokens: int = 500) -> str:
-        """Call the LLM API"""
+    @property
+    def client(self):
+        """Workspace client, created on the first model call rather than at import/startup"""
+        if self._client is None and not self.is_local:
+            self._client = get_databricks_client()
+        return self._client
+    
+    def _call_llm(self, prompt: str, max_tokens: int = 500, feature: str = "general") -> str:
+        """Call the LLM API (instrumented per feature, see ai/telemetry.py)"""
         if self.is_local:
             return self._mock_llm_response(prompt)
         
         # Use Databricks Foundation Model API
         from databricks.sdk.service.serving import ChatMessage
-        
-        response = self.client.serving_endpoints.query(
-            name=self.config.model_endpoint,
-            messages=[ChatMessage(role="user", content=prompt)],
-            max_tokens=max_tokens,
-        )
-        
-        return response.choices[0].message.content
+        from .response_cache import cache_bypassed
+        
+        endpoint = self.config.model_endpoint
+        with track(endpoint, feature) as call:
+            executed = []
+            
+            def query() -> str:
+                executed.append(True)
+                response = self.client.serving_endpoints.query(
+                    name=endpoint,
+                    messages=[ChatMessage(role="user", content=prompt)],
+                    max_tokens=max_tokens,
+                )
+                answer = response.choices[0].message.content
+                usage = getattr(response, "usage", None)
+                call.usage(
+                    getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None),
+                    prompt, answer,
+                )
+                return answer
+            
+            def load() -> str:
+                call.cache = "miss"
+                answer = get_model_gate().call(endpoint, key, query)
+                call.coalesced = not executed
+                return answer
+            
+            cache = get_response_cache()
+            call.cache = "bypass" if not cache.enabled or cache_bypassed() else "hit"
+            key = make_cache_key(endpoint, None, prompt, max_tokens)
+            return cache.get_or_call(endpoint, None, prompt, max_tokens, load)
     
     def _mock_llm_response(self, prompt: str) -> str:
         """Generate mock LLM response for local development"""
@@ -78,7 +111,74 @@ class LLMService:
         4. Recommendation for next steps
         """
         
-        return self._call_llm(prompt)
+        return self._call_llm(prompt, feature="interaction-summary")
+    
+    def update_interaction_summary(
+        self,
+        previous_summary: str,
+        new_interactions: List[Dict[str, Any]],
+        candidate_name: str,
+        all_interactions: Optional[List[Dict[str, Any]]] = None,
+    ) -> str:
+        """Fold new interview interactions into an existing summary (prompt holds only the new notes)"""
+        if self.is_local:
+            return self._mock_interaction_summary_detailed(all_interactions or new_interactions, candidate_name)
+        
+        interactions_text = "\n".join([
+            f"- {i['stage']}: Score {i['score']}/100, {i['recommendation']}. Notes: {i['notes']}"
+            for i in new_interactions
+        ])
+        
+        prompt = f"""
+        Update the interview summary for candidate {candidate_name}.
+        
+        Current summary:
+        {previous_summary}
+        
+        New interactions since that summary:
+        {interactions_text}
+        
+        Rewrite the executive summary (3-4 sentences) so it reflects all interactions, highlighting:
+        1. Overall trajectory and consistency
+        2. Key strengths demonstrated
+        3. Any areas of concern
+        4. Recommendation for next steps
+        """
+        
+        return self._call_llm(prompt, feature="interaction-summary")
+    
+    def summarize_transcript_chunk(self, chunk: str, stage: str, candidate_name: str, part: int, parts: int) -> str:
+        """Map step: summarize one chunk of a long interview transcript"""
+        if self.is_local:
+            return self._mock_transcript_chunk_summary(chunk)
+        
+        prompt = f"""
+        This is part {part} of {parts} of the {stage} interview transcript for candidate {candidate_name}.
+        
+        {chunk}
+        
+        Summarize this part in 3-5 bullet points. Keep concrete evidence: skills demonstrated,
+        concerns raised, compensation or notice-period mentions, and anything the candidate committed to.
+        """
+        
+        return self._call_llm(prompt, max_tokens=300, feature="transcript-map")
+    
+    def reduce_transcript_summaries(self, summaries: List[str], stage: str, candidate_name: str) -> str:
+        """Reduce step: merge partial transcript summaries into one stage-level summary"""
+        if self.is_local:
+            return self._mock_transcript_reduce(summaries)
+        
+        partials = "\n\n".join(f"Part {n}:\n{summary}" for n, summary in enumerate(summaries, 1))
+        prompt = f"""
+        Combine these partial summaries of {candidate_name}'s {stage} interview into one stage summary.
+        
+        {partials}
+        
+        Write 4-6 bullet points without repetition: overall impression, strongest evidence,
+        concerns to probe in later stages, and any compensation or timeline details.
+        """
+        
+        return self._call_llm(prompt, max_tokens=400, feature="transcript-reduce")
     
     def generate_negotiation_advice(
         self,
@@ -116,7 +216,7 @@ class LLMService:
         Format as JSON with keys: likelihood, levers, emphasize, avoid, approach
         """
         
-        response = self._call_llm(prompt)
+        response = self._call_llm(prompt, feature="negotiation")
         
         # Parse JSON response (simplified)
         try:
@@ -167,7 +267,7 @@ class LLMService:
         Be specific and actionable.
         """
         
-        response = self._call_llm(prompt)
+        response = self._call_llm(prompt, feature="profile-match")
         
         return {
             "match_score": random.randint(65, 95),
@@ -207,17 +307,22 @@ class LLMService:
         Highlight key achievements, areas of growth, and any concerns.
         """
         
-        return self._call_llm(prompt)
+        return self._call_llm(prompt, feature="performance-summary")
     
     def predict_leadership_potential(
         self,
         employee_profile: Dict[str, Any],
         thomas_scores: Dict[str, Any],
-        performance_history: List[Dict[str, Any]]
+        performance_history: List[Dict[str, Any]],
+        readiness_score: Optional[float] = None
     ) -> Dict[str, Any]:
-        """Predict leadership readiness and next role fit"""
+        """
+        Predict leadership readiness and next role fit.
+        Pass readiness_score (e.g. from the succession engine) to use a computed score
+        and only have the LLM write the narrative.
+        """
         if self.is_local:
-            return self._mock_leadership_prediction(thomas_scores)
+            return self._mock_leadership_prediction(thomas_scores, readiness_score)
         
         prompt = f"""
         Assess leadership potential for an employee based on their profile:
@@ -234,6 +339,7 @@ class LLMService:
         - Competitiveness: {thomas_scores.get('hpti_competitiveness')}
         
         Performance Trend: {[p.get('performance_score') for p in performance_history]}
+        {f"Computed Readiness Score: {readiness_score:.0f}/100" if readiness_score is not None else ""}
         
         Provide:
         1. Leadership readiness score (0-100)
@@ -242,13 +348,14 @@ class LLMService:
         4. Timeline recommendation
         """
         
-        response = self._call_llm(prompt)
+        response = self._call_llm(prompt, feature="leadership")
         
+        from data.succession import readiness_timeline
         return {
-            "readiness_score": random.randint(50, 90),
+            "readiness_score": int(round(readiness_score)) if readiness_score is not None else random.randint(50, 90),
             "recommended_role": "Senior " + employee_profile.get('title', 'Role'),
             "development_areas": ["Strategic thinking", "Cross-functional collaboration"],
-            "timeline": "6-12 months",
+            "timeline": readiness_timeline(readiness_score) if readiness_score is not None else "6-12 months",
             "analysis": response
         }
     
@@ -279,7 +386,7 @@ class LLMService:
         Be direct and practical.
         """
         
-        return self._call_llm(prompt)
+        return self._call_llm(prompt, feature="churn")
     
     # ========================================
     # MOCK RESPONSES FOR LOCAL DEVELOPMENT
@@ -417,6 +524,25 @@ class LLMService:
             "gap_traits": ["Executive presence", "Strategic communication"],
         }
     
+    def _mock_transcript_chunk_summary(self, chunk: str) -> str:
+        """Extractive stand-in: the candidate's most substantive answers in the chunk"""
+        answers = [
+            line.split(":", 1)[1].strip()
+            for line in chunk.splitlines()
+            if line.startswith("Candidate:") and len(line) > 40
+        ]
+        answers.sort(key=len, reverse=True)
+        return "\n".join(f"- {answer[:160]}" for answer in answers[:3]) or "- No substantive candidate answers in this part."
+    
+    def _mock_transcript_reduce(self, summaries: List[str]) -> str:
+        """Stand-in reduce: unique bullets across partial summaries"""
+        bullets = []
+        for summary in summaries:
+            for line in summary.splitlines():
+                if line.startswith("- ") and line not in bullets:
+                    bullets.append(line)
+        return "\n".join(bullets[:6]) or "- No transcript content to summarize."
+    
     def _mock_performance_summary(self) -> str:
         summaries = [
             "Strong quarter with consistent delivery across all key objectives. Exceeded targets in customer engagement metrics and demonstrated growing leadership capabilities through cross-team initiatives. Areas for continued development include executive communication and strategic planning.",
@@ -441,13 +567,16 @@ class LLMService:
     def _mock_leadership_assessment(self) -> str:
         return "Employee shows strong leadership indicators in HPTI assessment, particularly in Conscientiousness and Adjustment (stress resilience). Their trajectory over the past 4 quarters demonstrates consistent growth. Recommended next step: shadow leadership roles in cross-functional projects."
     
-    def _mock_leadership_prediction(self, thomas_scores: Dict) -> Dict[str, Any]:
+    def _mock_leadership_prediction(self, thomas_scores: Dict, readiness_score: Optional[float] = None) -> Dict[str, Any]:
         """Generate mock leadership prediction"""
         conscientiousness = thomas_scores.get('hpti_conscientiousness', 60)
         adjustment = thomas_scores.get('hpti_adjustment', 60)
         
-        readiness = (conscientiousness + adjustment) / 2 + random.randint(-10, 10)
-        readiness = min(95, max(30, readiness))
+        if readiness_score is not None:
+            readiness = round(readiness_score)
+        else:
+            readiness = (conscientiousness + adjustment) / 2 + random.randint(-10, 10)
+            readiness = min(95, max(30, readiness))
         
         if readiness >= 75:
             timeline = "3-6 months"
@@ -0,0 +1,361 @@
+"""
+Model Serving Resilience
+Per-endpoint circuit breakers, end-to-end deadlines, jittered retry backoff
+and optional hedged requests. When an endpoint is failing the breaker opens
+and callers get their fallback at once instead of waiting out retries;
+half-open probes let traffic back in once the endpoint recovers.
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Callable, TypeVar
+
+from .telemetry import note_retry, note_hedge, note_fallback
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """The endpoint's breaker is open; the call was not attempted"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """No time left in the request's deadline"""
+
+
+# ============================================================================
+# DEADLINES
+# ============================================================================
+
+_deadline: ContextVar[Optional[float]] = ContextVar("model_call_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Bound every model call inside this block by an absolute deadline (nested deadlines keep the earlier one)"""
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(current, at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time(default: Optional[float] = None) -> Optional[float]:
+    """Seconds left before the current deadline, or default when none is set"""
+    at = _deadline.get()
+    if at is None:
+        return default
+    return max(0.0, at - time.monotonic())
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given (1-based) retry"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+# ============================================================================
+# CIRCUIT BREAKER
+# ============================================================================
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and stays open for
+    `reset_timeout` seconds. It then lets `half_open_max_calls` probes through:
+    a successful probe closes it, a failed one opens it again. A probe that
+    ends without an outcome (a cancelled stream) is released; one that never
+    reports back frees its slot after another `reset_timeout`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_started_at = 0.0
+        self._lock = threading.Lock()
+        self._counts = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        now = time.monotonic()
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        elif self._state == HALF_OPEN and self._probes and now - self._probe_started_at >= self.reset_timeout:
+            # A probe that never reported back must not keep the circuit shut
+            self._probes = 0
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go out now (claims a probe slot when half-open)"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                self._probe_started_at = time.monotonic()
+                return True
+            self._counts["rejected"] += 1
+            return False
+
+    def release(self) -> None:
+        """Give back an allowed call that ended without an outcome (e.g. a client closed the stream)"""
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._counts["successes"] += 1
+            self._failures = 0
+            if self._state != CLOSED:
+                logger.info(f"Circuit {self.name} closed")
+            self._state = CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._counts["failures"] += 1
+            self._failures += 1
+            state = self._current_state()
+            if state == HALF_OPEN or (state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._counts["opened"] += 1
+                logger.warning(f"Circuit {self.name} opened after {self._failures} consecutive failures")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)) if state == OPEN else 0.0
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "retry_in_seconds": round(retry_in, 1),
+                **self._counts,
+            }
+
+
+class LatencyTracker:
+    """Recent successful call latencies for the hedging threshold"""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+# ============================================================================
+# RESILIENT CALLS
+# ============================================================================
+
+class ResilientCaller:
+    """Breaker + deadline + retries (+ hedging) around calls to one serving endpoint"""
+
+    def __init__(
+        self,
+        endpoint: str,
+        breaker: CircuitBreaker,
+        max_attempts: int = 3,
+        deadline_seconds: float = 20.0,
+        retry_base_seconds: float = 0.25,
+        retry_max_seconds: float = 2.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+    ):
+        self.endpoint = endpoint
+        self.breaker = breaker
+        self.max_attempts = max(1, max_attempts)
+        self.deadline_seconds = deadline_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.latency = LatencyTracker()
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+        self._counts = {"calls": 0, "retries": 0, "hedged": 0, "hedge_wins": 0, "fallbacks": 0, "deadline_exceeded": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def hedge_after(self) -> Optional[float]:
+        """Seconds to wait before sending a hedged duplicate, once enough latencies are known"""
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.hedge_quantile)
+
+    def _attempt(self, fn: Callable[[float], T], timeout: float) -> T:
+        """One attempt; with hedging a duplicate goes out if the first is slower than the p95"""
+        hedge_after = self.hedge_after()
+        if hedge_after is None or hedge_after >= timeout:
+            return fn(timeout)
+
+        started = time.monotonic()
+        primary = self._pool.submit(contextvars.copy_context().run, fn, timeout)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self._count("hedged")
+        note_hedge()
+        hedge_timeout = max(0.001, timeout - (time.monotonic() - started))
+        secondary = self._pool.submit(contextvars.copy_context().run, fn, hedge_timeout)
+        pending = {primary, secondary}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, timeout - (time.monotonic() - started)), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is secondary:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error or DeadlineExceeded(f"{self.endpoint} did not answer within {timeout:.1f}s")
+
+    def call(self, fn: Callable[[float], T], fallback: Callable[[], T]) -> T:
+        """
+        Run fn(timeout_seconds) until it succeeds, attempts run out or the deadline
+        passes; return fallback() instead of raising. An open circuit falls back immediately.
+        """
+        self._count("calls")
+        with deadline(self.deadline_seconds):
+            for attempt in range(1, self.max_attempts + 1):
+                timeout = remaining_time()
+                if timeout <= 0:
+                    self._count("deadline_exceeded")
+                    break
+                if not self.breaker.allow():
+                    logger.warning(f"Circuit {self.endpoint} is open, using fallback")
+                    break
+
+                started = time.monotonic()
+                try:
+                    result = self._attempt(fn, timeout)
+                except Exception as e:
+                    self.breaker.record_failure()
+                    logger.warning(f"{self.endpoint} attempt {attempt}/{self.max_attempts} failed: {e}")
+                    if attempt == self.max_attempts:
+                        break
+                    delay = backoff_delay(attempt, self.retry_base_seconds, self.retry_max_seconds)
+                    if delay >= remaining_time():
+                        self._count("deadline_exceeded")
+                        break
+                    self._count("retries")
+                    note_retry()
+                    time.sleep(delay)
+                    continue
+                except BaseException:
+                    self.breaker.release()
+                    raise
+
+                self.breaker.record_success()
+                self.latency.record(time.monotonic() - started)
+                return result
+
+        self._count("fallbacks")
+        note_fallback()
+        return fallback()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        p95 = self.latency.percentile(0.95)
+        return {
+            "breaker": self.breaker.stats(),
+            "deadline_seconds": self.deadline_seconds,
+            "max_attempts": self.max_attempts,
+            "hedging": self.hedge,
+            "hedge_after_ms": round(self.hedge_after() * 1000, 1) if self.hedge_after() is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            **counts,
+        }
+
+
+class ResilienceRegistry:
+    """One ResilientCaller per serving endpoint"""
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self._callers: Dict[str, ResilientCaller] = {}
+        self._lock = threading.Lock()
+
+    def caller(self, endpoint: str) -> ResilientCaller:
+        with self._lock:
+            if endpoint not in self._callers:
+                settings = dict(self.settings)
+                breaker = CircuitBreaker(
+                    endpoint,
+                    failure_threshold=settings.pop("failure_threshold", 5),
+                    reset_timeout=settings.pop("reset_timeout", 30.0),
+                )
+                self._callers[endpoint] = ResilientCaller(endpoint, breaker, **settings)
+            return self._callers[endpoint]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            callers = dict(self._callers)
+        return {endpoint: caller.stats() for endpoint, caller in callers.items()}
+
+
+# Singleton instance
+_resilience = None
+
+
+def get_resilience() -> ResilienceRegistry:
+    """Get or create the resilience registry singleton"""
+    global _resilience
+    if _resilience is None:
+        _resilience = ResilienceRegistry(
+            failure_threshold=int(os.getenv("MODEL_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("MODEL_BREAKER_RESET_SECONDS", "30")),
+            max_attempts=int(os.getenv("MODEL_MAX_ATTEMPTS", "3")),
+            deadline_seconds=float(os.getenv("MODEL_DEADLINE_SECONDS", "20")),
+            retry_base_seconds=float(os.getenv("MODEL_RETRY_BASE_SECONDS", "0.25")),
+            hedge=os.getenv("MODEL_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes"),
+            hedge_min_samples=int(os.getenv("MODEL_HEDGE_MIN_SAMPLES", "20")),
+        )
+    return _resilience
@@ -0,0 +1,265 @@
+"""
+LLM Response Cache
+Content-addressed cache for model serving responses, persisted in SQLite.
+Keys are a hash of (endpoint, system prompt, user prompt, max_tokens, params)
+after whitespace normalisation, so byte-identical prompts are answered locally.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "talent_hub_llm_cache.sqlite3")
+
+# Set for the duration of a request that asked to skip the cache
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypass_cache():
+    """Skip cache reads and writes for LLM calls made inside this block"""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_bypassed() -> bool:
+    return _bypass.get()
+
+
+def _normalise(text: Optional[str]) -> str:
+    return " ".join((text or "").split())
+
+
+def make_cache_key(
+    endpoint: str,
+    system_prompt: Optional[str],
+    user_prompt: str,
+    max_tokens: int,
+    params: Optional[Dict[str, Any]] = None,
+) -> str:
+    """sha256 over the whitespace-normalised request"""
+    payload = json.dumps(
+        {
+            "endpoint": endpoint,
+            "system": _normalise(system_prompt),
+            "user": _normalise(user_prompt),
+            "max_tokens": max_tokens,
+            "params": params or {},
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache with TTL and size-based LRU eviction.
+    Tracks hits, misses and the model latency saved by each hit.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = 86400,
+        max_entries: int = 5000,
+        max_bytes: int = 50 * 1024 * 1024,
+        enabled: bool = True,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._evictions = 0
+
+        if self.enabled:
+            try:
+                self._connect()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache disabled - could not open {path}: {e}")
+                self.enabled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    endpoint TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    latency_ms REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        return self._conn
+
+    def _record(self, endpoint: str, stat: str, amount: float = 1) -> None:
+        stats = self._stats.setdefault(endpoint, {
+            "hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "latency_saved_ms": 0.0,
+        })
+        stats[stat] += amount
+
+    def get(self, key: str, endpoint: str = "default") -> Optional[str]:
+        """Cached response for a key, or None if missing or expired"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, latency_ms, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl_seconds and now - row[2] > self.ttl_seconds):
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._record(endpoint, "misses")
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self._record(endpoint, "hits")
+            self._record(endpoint, "latency_saved_ms", row[1])
+            return row[0]
+
+    def put(self, key: str, response: str, endpoint: str = "default", latency_ms: float = 0.0) -> None:
+        if not self.enabled or not response:
+            return
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, response, size, latency_ms, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, endpoint, response, size, latency_ms, now, now),
+            )
+            self._record(endpoint, "stores")
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then least-recently-used rows until under the size limits"""
+        evicted = 0
+        if self.ttl_seconds:
+            evicted += self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if count > self.max_entries or total > self.max_bytes:
+            victims = []
+            for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC"):
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                victims.append((key,))
+                count -= 1
+                total -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+            evicted += len(victims)
+        self._evictions += evicted
+
+    def get_or_call(
+        self,
+        endpoint: str,
+        system_prompt: Optional[str],
+        user_prompt: str,
+        max_tokens: int,
+        call: Callable[[], str],
+        params: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+    ) -> str:
+        """Return a cached response or make the call and store its result"""
+        if not self.enabled or not use_cache or cache_bypassed():
+            if self.enabled:
+                with self._lock:
+                    self._record(endpoint, "bypassed")
+            return call()
+
+        key = make_cache_key(endpoint, system_prompt, user_prompt, max_tokens, params)
+        cached = self.get(key, endpoint)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        response = call()
+        self.put(key, response, endpoint, (time.perf_counter() - start) * 1000)
+        return response
+
+    def clear(self) -> int:
+        if not self.enabled:
+            return 0
+        with self._lock:
+            return self._conn.execute("DELETE FROM responses").rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rates and latency saved, overall and per endpoint"""
+        with self._lock:
+            per_endpoint = {k: dict(v) for k, v in self._stats.items()}
+            evictions = self._evictions
+            entries, total_bytes = (0, 0)
+            if self.enabled:
+                entries, total_bytes = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+                ).fetchone()
+
+        for stats in per_endpoint.values():
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+            stats["latency_saved_ms"] = round(stats["latency_saved_ms"], 1)
+
+        hits = sum(s["hits"] for s in per_endpoint.values())
+        misses = sum(s["misses"] for s in per_endpoint.values())
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "entries": entries,
+            "bytes": total_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "evictions": int(evictions),
+            "latency_saved_ms": round(sum(s["latency_saved_ms"] for s in per_endpoint.values()), 1),
+            "endpoints": per_endpoint,
+        }
+
+
+# Singleton instance
+_response_cache = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the response cache singleton"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000")),
+            max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "50")) * 1024 * 1024),
+            enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes"),
+        )
+    return _response_cache
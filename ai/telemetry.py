@@ -0,0 +1,306 @@
+"""
+Model Call Telemetry
+Structured instrumentation for every model call: queue wait, time to first byte,
+total latency, prompt/completion tokens, cache outcome, retries and fallbacks.
+Calls are aggregated into histograms per endpoint and feature; a sample of them
+is logged as JSON from a background thread so the request path never blocks on I/O.
+"""
+
+import os
+import json
+import time
+import queue
+import random
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+call_logger = logging.getLogger("ai.telemetry.calls")
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000, 60000)
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count (about four characters per token) when the endpoint reports no usage"""
+    return len(text) // 4 if text else 0
+
+
+@dataclass
+class ModelCall:
+    """One model call as seen by the caller"""
+    endpoint: str
+    feature: str
+    started: float
+    queue_wait_ms: float = 0.0
+    ttfb_ms: Optional[float] = None
+    latency_ms: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_estimated: bool = False
+    cache: str = "miss"              # hit / miss / bypass
+    coalesced: bool = False          # shared another caller's in-flight result
+    retries: int = 0
+    hedged: bool = False
+    fallback: bool = False
+    error: Optional[str] = None
+
+    def first_byte(self) -> None:
+        if self.ttfb_ms is None:
+            self.ttfb_ms = (time.perf_counter() - self.started) * 1000
+
+    def usage(self, prompt_tokens: Optional[int], completion_tokens: Optional[int],
+              prompt_text: Optional[str] = None, completion_text: Optional[str] = None) -> None:
+        """Token counts from the response, estimated from the texts when the endpoint reports none"""
+        if prompt_tokens is None or completion_tokens is None:
+            self.tokens_estimated = True
+            prompt_tokens = estimate_tokens(prompt_text) if prompt_tokens is None else prompt_tokens
+            completion_tokens = estimate_tokens(completion_text) if completion_tokens is None else completion_tokens
+        self.prompt_tokens = int(prompt_tokens)
+        self.completion_tokens = int(completion_tokens)
+
+
+# ============================================================================
+# CALL CONTEXT
+# ============================================================================
+
+_current_call: ContextVar[Optional[ModelCall]] = ContextVar("current_model_call", default=None)
+
+
+def current_call() -> Optional[ModelCall]:
+    return _current_call.get()
+
+
+def note_queue_wait(seconds: float) -> None:
+    """Time spent waiting for an endpoint slot, added to the current call"""
+    call = _current_call.get()
+    if call is not None:
+        call.queue_wait_ms += seconds * 1000
+
+
+def note_retry() -> None:
+    call = _current_call.get()
+    if call is not None:
+        call.retries += 1
+
+
+def note_hedge() -> None:
+    call = _current_call.get()
+    if call is not None:
+        call.hedged = True
+
+
+def note_fallback() -> None:
+    call = _current_call.get()
+    if call is not None:
+        call.fallback = True
+
+
+def start_call(endpoint: str, feature: str) -> ModelCall:
+    """A call record for code that cannot hold a context manager open (e.g. generators)"""
+    return ModelCall(endpoint=endpoint, feature=feature, started=time.perf_counter())
+
+
+@contextmanager
+def track(endpoint: str, feature: str):
+    """Instrument the model call made inside the block; yields its ModelCall"""
+    call = start_call(endpoint, feature)
+    token = _current_call.set(call)
+    try:
+        yield call
+    except Exception as e:
+        call.error = type(e).__name__
+        raise
+    finally:
+        _current_call.reset(token)
+        get_telemetry().record(call)
+
+
+# ============================================================================
+# AGGREGATION
+# ============================================================================
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative on export, Prometheus style)"""
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile"""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return float(self.bounds[i]) if i < len(self.bounds) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, running = [], 0
+        for bound, n in zip(list(self.bounds) + ["+Inf"], self.counts):
+            running += n
+            cumulative.append([bound, running])
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 1),
+            "avg": round(self.sum / self.count, 1) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": cumulative,
+        }
+
+
+class _Series:
+    """Aggregates for one (endpoint, feature) pair"""
+
+    COUNTERS = (
+        "calls", "errors", "fallbacks", "cache_hits", "cache_misses", "cache_bypassed",
+        "coalesced", "retries", "hedged", "prompt_tokens", "completion_tokens",
+    )
+
+    def __init__(self):
+        self.counters = {name: 0 for name in self.COUNTERS}
+        self.cost = 0.0
+        self.latency = Histogram()
+        self.ttfb = Histogram()
+        self.queue_wait = Histogram()
+
+
+class ModelTelemetry:
+    """Per endpoint/feature histograms and counters plus a sampled call log"""
+
+    def __init__(self, log_sample_rate: float = 0.05, prices: Optional[Dict[str, Dict[str, float]]] = None, log_queue_size: int = 1000):
+        self.log_sample_rate = log_sample_rate
+        # Price per 1K tokens by endpoint: {"endpoint": {"input": 0.0005, "output": 0.0015}}
+        self.prices = prices or {}
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+        self._since = time.time()
+        self._log_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=log_queue_size)
+        self._log_dropped = 0
+        self._writer = threading.Thread(target=self._write_logs, name="model-call-log", daemon=True)
+        self._writer.start()
+
+    def cost_of(self, call: ModelCall) -> float:
+        price = self.prices.get(call.endpoint)
+        if not price:
+            return 0.0
+        return (call.prompt_tokens * price.get("input", 0.0) + call.completion_tokens * price.get("output", 0.0)) / 1000
+
+    def record(self, call: ModelCall) -> None:
+        if not call.latency_ms:
+            call.latency_ms = (time.perf_counter() - call.started) * 1000
+        cost = self.cost_of(call)
+        with self._lock:
+            series = self._series.get((call.endpoint, call.feature))
+            if series is None:
+                series = self._series[(call.endpoint, call.feature)] = _Series()
+            c = series.counters
+            c["calls"] += 1
+            c["errors"] += call.error is not None
+            c["fallbacks"] += call.fallback
+            c["cache_hits"] += call.cache == "hit"
+            c["cache_misses"] += call.cache == "miss"
+            c["cache_bypassed"] += call.cache == "bypass"
+            c["coalesced"] += call.coalesced
+            c["retries"] += call.retries
+            c["hedged"] += call.hedged
+            c["prompt_tokens"] += call.prompt_tokens
+            c["completion_tokens"] += call.completion_tokens
+            series.cost += cost
+            series.latency.observe(call.latency_ms)
+            if call.ttfb_ms is not None:
+                series.ttfb.observe(call.ttfb_ms)
+            if call.cache != "hit":
+                series.queue_wait.observe(call.queue_wait_ms)
+
+        # Failures are always logged, the rest sampled; never block the caller on the log
+        if call.error or call.fallback or random.random() < self.log_sample_rate:
+            entry = {k: v for k, v in asdict(call).items() if k != "started"}
+            entry["cost"] = round(cost, 6)
+            try:
+                self._log_queue.put_nowait(entry)
+            except queue.Full:
+                with self._lock:
+                    self._log_dropped += 1
+
+    def _write_logs(self) -> None:
+        while True:
+            entry = self._log_queue.get()
+            call_logger.info(json.dumps(entry, default=str))
+
+    def series(self) -> List[Dict[str, Any]]:
+        """Raw per endpoint/feature aggregates (histograms included)"""
+        with self._lock:
+            return [
+                {
+                    "endpoint": endpoint,
+                    "feature": feature,
+                    **s.counters,
+                    "cost": round(s.cost, 6),
+                    "latency_ms": s.latency.snapshot(),
+                    "ttfb_ms": s.ttfb.snapshot(),
+                    "queue_wait_ms": s.queue_wait.snapshot(),
+                }
+                for (endpoint, feature), s in sorted(self._series.items())
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        series = self.series()
+        totals = {name: sum(s[name] for s in series) for name in _Series.COUNTERS}
+        totals["cost"] = round(sum(s["cost"] for s in series), 6)
+        with self._lock:
+            dropped = self._log_dropped
+        return {
+            "since": self._since,
+            "totals": totals,
+            "series": series,
+            "log_sample_rate": self.log_sample_rate,
+            "log_dropped": dropped,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self._since = time.time()
+
+
+# Singleton instance
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> ModelTelemetry:
+    """Get or create the model telemetry singleton"""
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                prices = {}
+                raw_prices = os.getenv("MODEL_TOKEN_PRICES", "")
+                if raw_prices:
+                    try:
+                        prices = json.loads(raw_prices)
+                    except json.JSONDecodeError:
+                        logger.warning("MODEL_TOKEN_PRICES is not valid JSON; costs will be reported as 0")
+                _telemetry = ModelTelemetry(
+                    log_sample_rate=float(os.getenv("MODEL_CALL_LOG_SAMPLE_RATE", "0.05")),
+                    prices=prices,
+                )
+    return _telemetry
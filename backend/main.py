@@ -1,9 +1,13 @@
 """FastAPI app with routers, static files, and lifespan - debugging step 4"""
 import os
 import sys
+import time
 import logging
+import importlib
+import threading
 import traceback as tb
 
+_boot_started = time.perf_counter()
 print(f"[BOOT] DATABRICKS_APP_NAME={os.getenv('DATABRICKS_APP_NAME')}")
 print(f"[BOOT] CWD={os.getcwd()}")
 
@@ -16,7 +20,8 @@ if os.getenv("DATABRICKS_APP_NAME"):
     os.environ["_DATABRICKS_PROD_FORCED"] = "1"
     print("[BOOT] Production mode set")
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, APIRouter, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, JSONResponse
@@ -35,11 +40,19 @@ print("[BOOT] FastAPI imported")
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 print(f"[BOOT] Path updated, trying imports...")
 
-try:
-    from backend.routers import recruitment, performance, analytics, ai_insights, system
-    print("[BOOT] Routers imported")
-except Exception as e:
-    print(f"[BOOT] Router import failed: {e}")
+# Routers by URL prefix. With LAZY_ROUTERS a router module (and the pandas / Faker /
+# data layer imports behind it) is loaded on the first request under its prefix, so
+# /api/health answers within the Databricks Apps startup budget on cold starts.
+ROUTERS = {
+    "/api/recruitment": ("backend.routers.recruitment", "Recruitment"),
+    "/api/performance": ("backend.routers.performance", "Performance"),
+    "/api/analytics": ("backend.routers.analytics", "Analytics"),
+    "/api/ai": ("backend.routers.ai_insights", "AI Insights"),
+    "/api/system": ("backend.routers.system", "System"),
+}
+LAZY_ROUTERS = os.getenv("LAZY_ROUTERS", "true" if os.getenv("DATABRICKS_APP_NAME") else "false").lower() == "true"
+_loaded_routers = set()
+_router_lock = threading.Lock()
 
 try:
     from config import is_local_mode, is_databricks_app
@@ -74,18 +87,20 @@ async def lifespan(app: FastAPI):
     
     print(f"[LIFESPAN] Static Files: {'Enabled' if HAS_STATIC else 'Disabled'}")
     
-    # Skip warmup in this debug version
-    # if not is_local_mode():
-    #     try:
-    #         from backend.services.databricks_ai import get_databricks_ai_service
-    #         ai_service = get_databricks_ai_service()
-    #         if ai_service.warmup():
-    #             print("[LIFESPAN] SQL Warehouse warmed up")
-    #     except Exception as e:
-    #         print(f"[LIFESPAN] Warmup error: {e}")
+    # Warm up in the background; /api/ready reports progress while /api/health stays live
+    from backend.services.warmup import get_warmup_orchestrator, warmup_enabled, WarmupTask
+    warmup = get_warmup_orchestrator()
+    warmup.add(WarmupTask("routers", load_all_routers, after=("data-access",)))
+    if warmup_enabled():
+        warmup.start()
+        print("[LIFESPAN] Warmup started")
     
     yield
     print("[LIFESPAN] Shutting down...")
+    from backend.services.jobs import shutdown_job_queue
+    shutdown_job_queue()
+    from backend.services.traffic import close_traffic_recorder
+    close_traffic_recorder()
 
 
 app = FastAPI(
@@ -104,6 +119,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request LLM cache bypass: send "X-LLM-Cache: bypass" to force fresh model calls
+@app.middleware("http")
+async def llm_cache_bypass_middleware(request: Request, call_next):
+    if request.headers.get("x-llm-cache", "").lower() == "bypass":
+        from ai.response_cache import bypass_cache
+        with bypass_cache():
+            return await call_next(request)
+    return await call_next(request)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -121,16 +145,77 @@ async def global_exception_handler(request: Request, exc: Exception):
         }
     )
 
-# Include routers
-try:
-    app.include_router(recruitment.router, prefix="/api/recruitment", tags=["Recruitment"])
-    app.include_router(performance.router, prefix="/api/performance", tags=["Performance"])
-    app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
-    app.include_router(ai_insights.router, prefix="/api/ai", tags=["AI Insights"])
-    app.include_router(system.router, prefix="/api/system", tags=["System"])
+def load_router(prefix: str) -> bool:
+    """Import and register the router for a prefix; safe to call repeatedly and from threads"""
+    if prefix in _loaded_routers:
+        return True
+    with _router_lock:
+        if prefix in _loaded_routers:
+            return True
+        module_name, tag = ROUTERS[prefix]
+        started = time.perf_counter()
+        try:
+            module = importlib.import_module(module_name)
+            # Stage the routes on a separate router: this may run in a worker thread while
+            # the event loop iterates app.router.routes, so that list is never mutated in place
+            staging = APIRouter()
+            staging.include_router(module.router, prefix=prefix, tags=[tag])
+        except Exception as e:
+            print(f"[BOOT] Router {prefix} failed to load: {e}")
+            return False
+        # Routes registered after startup must still come before the SPA catch-all;
+        # the new list replaces the old one in a single assignment
+        app.router.routes = sorted(
+            [*app.router.routes, *staging.routes],
+            key=lambda route: getattr(route, "path", "") == "/{full_path:path}",
+        )
+        _loaded_routers.add(prefix)
+        print(f"[BOOT] Router {prefix} loaded in {(time.perf_counter() - started) * 1000:.0f}ms")
+        return True
+
+
+def load_all_routers() -> None:
+    for prefix in ROUTERS:
+        load_router(prefix)
+
+
+if LAZY_ROUTERS:
+    _DOCS_PATHS = {app.openapi_url, app.docs_url, app.redoc_url}
+
+    @app.middleware("http")
+    async def lazy_router_middleware(request: Request, call_next):
+        path = request.url.path
+        pending = [
+            prefix for prefix in ROUTERS
+            if prefix not in _loaded_routers and (path in _DOCS_PATHS or path == prefix or path.startswith(prefix + "/"))
+        ]
+        for prefix in pending:
+            # Importing a router is blocking work; keep it off the event loop
+            await run_in_threadpool(load_router, prefix)
+        return await call_next(request)
+
+    print("[BOOT] Routers deferred until first use (LAZY_ROUTERS)")
+else:
+    load_all_routers()
     print("[BOOT] Routers registered")
-except Exception as e:
-    print(f"[BOOT] Router registration failed: {e}")
+
+# Opt-in request profiling: "X-Profile: 1" or ?profile=1 samples that request's call stacks.
+# Off unless PROFILING_ENABLED=true: profiles expose code paths and the endpoints are unauthenticated
+from backend.services.profiler import profiling_enabled
+if profiling_enabled():
+    from backend.services.profiler import ProfilingMiddleware
+    app.add_middleware(ProfilingMiddleware)
+
+# Anonymized request traces for benchmarks.replay (off unless TRAFFIC_CAPTURE=true)
+if os.getenv("TRAFFIC_CAPTURE", "false").lower() == "true":
+    from backend.services.traffic import TrafficCaptureMiddleware
+    app.add_middleware(TrafficCaptureMiddleware)
+
+# Per-route HTTP metrics for /api/system/metrics. Added last so it is the outermost
+# middleware and also times lazy router loading and the other middleware.
+if os.getenv("HTTP_METRICS", "true").lower() == "true":
+    from backend.services.metrics import MetricsMiddleware
+    app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/api")
@@ -148,6 +233,16 @@ async def health():
     return {"status": "ok"}
 
 
+@app.get("/api/ready")
+async def ready():
+    """Readiness probe: 503 until startup warmup has finished (or timed out)"""
+    from backend.services.warmup import get_warmup_orchestrator, warmup_enabled
+    status = get_warmup_orchestrator().status()
+    if status["state"] == "not_started" and not warmup_enabled():
+        status.update(ready=True, state="disabled")
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
 # Static file serving
 if HAS_STATIC:
     print("[BOOT] Mounting static files...")
@@ -171,3 +266,5 @@ else:
     @app.get("/")
     async def root():
         return {"message": "API only mode - no static files", "static_dir": STATIC_DIR}
+
+print(f"[BOOT] App ready in {(time.perf_counter() - _boot_started) * 1000:.0f}ms")
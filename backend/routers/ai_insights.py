@@ -4,11 +4,14 @@ Mosaic AI Foundation Model Integration
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool, iterate_in_threadpool
+from fastapi.responses import StreamingResponse, JSONResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import pandas as pd
 import numpy as np
 import math
+import json
 
 
 def clean_numpy_types(obj):
@@ -41,6 +44,12 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from data.data_access import get_data_access
+from data.norms import get_norm_engine, ordinal
+from data.succession import get_succession_engine
+from backend.services.context_assembler import get_context_assembler, page_sections
+from backend.services.keyword_engine import get_keyword_engine, DEFAULT_SOURCES
+from backend.services.interaction_summaries import get_interaction_summary_service, NoInteractionsError
+from backend.services.transcripts import get_transcript_pipeline
 from ai.llm_service import get_llm_service
 
 # Lazy import for Databricks AI service to avoid import errors
@@ -57,25 +66,10 @@ def get_ai_service():
             databricks_ai = None
     return databricks_ai
 
-def get_thomas_kw():
-    """Get Thomas keywords with fallback"""
-    try:
-        from backend.services.databricks_ai import get_thomas_keywords
-        return get_thomas_keywords()
-    except ImportError:
-        return ["PPA", "GIA", "HPTI", "Thomas", "DISC", "Chemistry"]
-
-def get_ifs_kw():
-    """Get IFS keywords with fallback"""
-    try:
-        from backend.services.databricks_ai import get_ifs_keywords
-        return get_ifs_keywords()
-    except ImportError:
-        return ["IFS", "IFS Cloud", "ERP", "EAM", "FSM"]
-
 router = APIRouter()
 data_access = get_data_access()
 llm_service = get_llm_service()
+interaction_summaries = get_interaction_summary_service()
 
 
 def generate_negotiation_profile_insight(profile: dict, candidate_data) -> str:
@@ -134,33 +128,74 @@ class ChurnAnalysisRequest(BaseModel):
 
 
 @router.get("/interaction-summary/{candidate_id}")
-async def get_interaction_summary(candidate_id: str):
-    """Generate AI summary of candidate interactions"""
-    interactions = data_access.get_interaction_logs(candidate_id)
-    
-    if interactions.empty:
-        raise HTTPException(status_code=404, detail="No interactions found")
-    
+async def get_interaction_summary(candidate_id: str, refresh: bool = False):
+    """
+    AI summary of candidate interactions, served from the precomputed summary store.
+    `freshness.status` is "stale" while new interactions are being folded in;
+    refresh=true rebuilds from the full history before answering.
+    """
     candidates = data_access.get_candidates()
     candidate = candidates[candidates["candidate_id"] == candidate_id]
     
     if candidate.empty:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
-    candidate_name = candidate.iloc[0]["name"]
-    summary = llm_service.summarize_interactions(
-        interactions.to_dict(orient="records"),
-        candidate_name
-    )
+    if refresh:
+        try:
+            await run_in_threadpool(interaction_summaries.refresh, candidate_id, True)
+        except NoInteractionsError:
+            raise HTTPException(status_code=404, detail="No interactions found")
+    stored = await run_in_threadpool(interaction_summaries.get, candidate_id)
+    
+    if stored is None:
+        raise HTTPException(status_code=404, detail="No interactions found")
     
     return {
         "candidate_id": candidate_id,
-        "candidate_name": candidate_name,
-        "summary": summary,
-        "interaction_count": len(interactions),
+        "candidate_name": candidate.iloc[0]["name"],
+        **stored,
     }
 
 
+@router.get("/interaction-summaries/stats")
+async def get_interaction_summary_stats():
+    """Full vs incremental summary refreshes and interactions kept out of prompts"""
+    return interaction_summaries.stats()
+
+
+@router.post("/transcripts/{interaction_id}/summarize")
+async def summarize_transcript(interaction_id: str, background: bool = False):
+    """
+    Map-reduce summary of a full interview transcript. Unchanged transcripts are
+    answered from the content-hash cache; background=true queues a job instead.
+    """
+    pipeline = get_transcript_pipeline()
+    try:
+        if background:
+            job = await run_in_threadpool(pipeline.submit, interaction_id)
+            return JSONResponse(status_code=202, content={
+                "job_id": job["job_id"],
+                "status": job["status"],
+                "deduplicated": job["deduplicated"],
+                "status_url": f"/api/system/jobs/{job['job_id']}",
+                "result_url": f"/api/system/jobs/{job['job_id']}/result",
+            })
+        return await run_in_threadpool(pipeline.summarize_interaction, interaction_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/candidates/{candidate_id}/transcript-summary")
+async def get_transcript_stage_summaries(candidate_id: str):
+    """Stage-level summaries reduced from each interview transcript of a candidate"""
+    try:
+        return await run_in_threadpool(get_transcript_pipeline().stage_summaries, candidate_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+
 @router.post("/negotiation-advice")
 async def get_negotiation_advice(request: NegotiationRequest):
     """Generate AI-powered negotiation advice"""
@@ -188,7 +223,8 @@ async def get_negotiation_advice(request: NegotiationRequest):
         "hpti_risk_approach": candidate_data["hpti_risk_approach"],
     }
     
-    advice = llm_service.generate_negotiation_advice(
+    advice = await run_in_threadpool(
+        llm_service.generate_negotiation_advice,
         candidate_profile,
         request.proposed_tc,
         (int(role_data["min_salary"]), int(role_data["max_salary"])),
@@ -246,7 +282,8 @@ async def get_performance_summary(employee_id: str):
     # Clean metrics data to handle NaN values
     metrics_dict = clean_numpy_types(latest.iloc[0].to_dict())
     
-    summary = llm_service.summarize_quarter_performance(
+    summary = await run_in_threadpool(
+        llm_service.summarize_quarter_performance,
         employee.iloc[0]["name"],
         metrics_dict,
         ["Strong execution on key deliverables", "Growing into leadership role"]
@@ -280,10 +317,14 @@ async def get_leadership_potential(employee_id: str):
     assessment_dict = clean_numpy_types(assessments.iloc[0].to_dict())
     performance_list = clean_numpy_types(performance.to_dict(orient="records"))
     
-    prediction = llm_service.predict_leadership_potential(
+    readiness = get_succession_engine().score(employee_id)
+    
+    prediction = await run_in_threadpool(
+        llm_service.predict_leadership_potential,
         employee_dict,
         assessment_dict,
-        performance_list
+        performance_list,
+        readiness_score=readiness["readiness_score"] if readiness else None
     )
     
     return clean_numpy_types({
@@ -291,31 +332,100 @@ async def get_leadership_potential(employee_id: str):
         "employee_name": str(employee.iloc[0]["name"]),
         "current_title": str(employee.iloc[0]["title"]),
         "prediction": prediction,
+        "readiness_components": readiness["components"] if readiness else None,
+    })
+
+
+async def _add_leadership_narratives(ranked: List[Dict[str, Any]], narratives: int) -> None:
+    """Generate the LLM narrative for the top entries of a ranking only"""
+    for entry in ranked[:narratives]:
+        employee_id = entry["employee_id"]
+        assessments = data_access.get_employee_assessment(employee_id)
+        if assessments.empty:
+            continue
+        employee = data_access.get_employee_by_id(employee_id)
+        performance = data_access.get_performance_metrics(employee_id=employee_id)
+        prediction = await run_in_threadpool(
+            llm_service.predict_leadership_potential,
+            clean_numpy_types(employee.iloc[0].to_dict()),
+            clean_numpy_types(assessments.iloc[0].to_dict()),
+            clean_numpy_types(performance.to_dict(orient="records")),
+            readiness_score=entry["readiness_score"]
+        )
+        entry["narrative"] = prediction
+
+
+@router.get("/succession/{manager_id}")
+async def get_succession_candidates(manager_id: str, n: int = 5, pool: str = "reports", narratives: int = 0):
+    """Ranked successor candidates for a manager; LLM narratives for the top `narratives` only"""
+    if n < 1 or n > 100:
+        raise HTTPException(status_code=400, detail="n must be between 1 and 100")
+    try:
+        ranked = get_succession_engine().successors(manager_id, n=n, pool=pool)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Manager not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    await _add_leadership_narratives(ranked, max(0, min(narratives, n)))
+    
+    return clean_numpy_types({
+        "manager_id": manager_id,
+        "pool": pool,
+        "successors": ranked,
+    })
+
+
+@router.get("/leadership-rankings")
+async def get_leadership_rankings(
+    n: int = 20,
+    department: Optional[str] = None,
+    level: Optional[str] = None,
+    narratives: int = 0
+):
+    """Org-wide leadership readiness ranking"""
+    if n < 1 or n > 1000:
+        raise HTTPException(status_code=400, detail="n must be between 1 and 1000")
+    engine = get_succession_engine()
+    ranked = engine.ranking(n=n, department=department, level=level)
+    await _add_leadership_narratives(ranked, max(0, min(narratives, n)))
+    
+    return clean_numpy_types({
+        "data_version": engine.version,
+        "department": department,
+        "level": level,
+        "rankings": ranked,
     })
 
 
 @router.post("/churn-recommendation")
 async def get_churn_recommendation(request: ChurnAnalysisRequest):
     """Generate recommendations to prevent employee churn"""
+    from data.churn_scoring import get_churn_engine
+    
     employee = data_access.get_employee_by_id(request.employee_id)
     
     if employee.empty:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    performance = data_access.get_performance_metrics(employee_id=request.employee_id, quarter="2024-Q4")
+    engine = get_churn_engine()
+    performance = data_access.get_performance_metrics(employee_id=request.employee_id, quarter=engine.quarter)
     
     if performance.empty:
         raise HTTPException(status_code=404, detail="No performance data found")
     
-    latest = performance.iloc[0]
-    
+    # Same score, label and indicators as /performance/employees/{id}/churn-score
+    churn = engine.explain(request.employee_id)
+    indicators = churn["indicators"]
     risk_factors = {
-        "morale_trend": "Declining" if latest.get("morale_score", 70) < 60 else "Stable",
-        "slack_sentiment": latest.get("slack_sentiment", 0.5),
-        "velocity_change": "Decreased" if latest.get("jira_velocity", 30) and latest.get("jira_velocity") < 25 else "Stable",
+        "morale_trend": "Declining" if {"low_morale", "declining_morale"} & set(indicators) else "Stable",
+        "slack_sentiment": churn["features"]["slack_sentiment"],
+        "velocity_change": "Decreased" if "low_velocity" in indicators else "Stable",
+        "indicators": indicators,
     }
     
-    recommendation = llm_service.generate_churn_recommendation(
+    recommendation = await run_in_threadpool(
+        llm_service.generate_churn_recommendation,
         employee.iloc[0]["name"],
         risk_factors,
         f"Employee has been with the company for {employee.iloc[0]['tenure_months']} months"
@@ -324,7 +434,8 @@ async def get_churn_recommendation(request: ChurnAnalysisRequest):
     return {
         "employee_id": request.employee_id,
         "employee_name": employee.iloc[0]["name"],
-        "churn_risk": latest.get("churn_risk", "Unknown"),
+        "churn_risk": churn["churn_risk"],
+        "churn_score": churn["churn_score"],
         "risk_factors": risk_factors,
         "recommendation": recommendation,
     }
@@ -401,7 +512,8 @@ async def get_profile_match(candidate_id: str):
         "hpti_curiosity": candidate_data["hpti_curiosity"],
     }
     
-    match_analysis = llm_service.match_candidate_to_ideal(
+    match_analysis = await run_in_threadpool(
+        llm_service.match_candidate_to_ideal,
         candidate_profile,
         ideal,
         role_title
@@ -431,18 +543,33 @@ async def get_psychometric_analysis(candidate_id: str):
     role_title = candidate_data["role_title"]
     ideal = ideal_profiles.get(role_title, {})
     
+    # Norm group: employees in the role's department and level
+    norms = get_norm_engine()
+    role = data_access.get_role_by_id(candidate_data["role_id"])
+    norm_department = str(role.iloc[0]["department"]) if not role.empty else None
+    norm_level = str(role.iloc[0]["level"]) if not role.empty else None
+    
+    def display_percentile(rank: Dict[str, Any]) -> Optional[int]:
+        # None when the norm group is empty; otherwise kept off the 0/100 extremes
+        if rank["percentile"] is None:
+            return None
+        return min(99, max(1, int(round(rank["percentile"]))))
+    
     # Calculate trait gaps
     def calc_gap(trait: str, is_ppa: bool = True):
         prefix = "ppa_" if is_ppa else "hpti_"
         candidate_val = int(candidate_data.get(f"{prefix}{trait}", 50))
         ideal_val = int(ideal.get(f"{prefix}{trait}", 50))
         gap = candidate_val - ideal_val
+        rank = norms.percentile_rank(f"{prefix}{trait}", candidate_val, norm_department, norm_level)
         return {
             "candidate": candidate_val,
             "ideal": ideal_val,
             "gap": gap,
             "gap_percent": round(float(gap), 1),
-            "status": "above" if gap > 5 else "below" if gap < -5 else "aligned"
+            "status": "above" if gap > 5 else "below" if gap < -5 else "aligned",
+            "percentile": display_percentile(rank),
+            "norm_group": rank["norm_group"],
         }
     
     ppa_analysis = {
@@ -463,14 +590,17 @@ async def get_psychometric_analysis(candidate_id: str):
     
     gia_score = int(candidate_data.get("gia_score", 100))
     gia_ideal = int(ideal.get("gia_overall", 110))
+    gia_rank = norms.percentile_rank("gia_overall", gia_score, norm_department, norm_level)
     gia_analysis = {
         "score": gia_score,
         "ideal": gia_ideal,
-        "percentile": min(99, max(1, int(gia_score / 130 * 100)))
+        "percentile": display_percentile(gia_rank),
+        "norm_group": gia_rank["norm_group"],
+        "norm_sample_size": gia_rank["sample_size"],
     }
     
     # GenAI descriptions for each assessment
-    ppa_description = f"""This candidate shows a **{'High' if ppa_analysis['dominance']['candidate'] > 60 else 'Moderate' if ppa_analysis['dominance']['candidate'] > 40 else 'Low'} Dominance** profile, indicating {'a results-driven, assertive approach to challenges' if ppa_analysis['dominance']['candidate'] > 60 else 'balanced assertiveness with collaborative tendencies'}. 
+    ppa_description = f"""This candidate shows a **{'High' if ppa_analysis['dominance']['candidate'] > 60 else 'Moderate' if ppa_analysis['dominance']['candidate'] > 40 else 'Low'} Dominance** profile ({ordinal(ppa_analysis['dominance']['percentile'])} percentile vs {ppa_analysis['dominance']['norm_group']}), indicating {'a results-driven, assertive approach to challenges' if ppa_analysis['dominance']['candidate'] > 60 else 'balanced assertiveness with collaborative tendencies'}. 
 
 Their **{'High' if ppa_analysis['influence']['candidate'] > 60 else 'Moderate'} Influence** score suggests {'strong interpersonal skills and enthusiasm for team collaboration' if ppa_analysis['influence']['candidate'] > 60 else 'selective social engagement with focus on key relationships'}.
 
@@ -480,13 +610,13 @@ With **{'High' if ppa_analysis['steadiness']['candidate'] > 60 else 'Moderate' i
 
     hpti_description = f"""**Leadership Potential Assessment**: This candidate demonstrates {'strong' if hpti_analysis['conscientiousness']['candidate'] > 70 else 'moderate'} conscientiousness, indicating {'high reliability and commitment to quality deliverables' if hpti_analysis['conscientiousness']['candidate'] > 70 else 'balanced approach to detail and efficiency'}.
 
-Their adjustment score of {hpti_analysis['adjustment']['candidate']}% suggests {'emotional resilience under pressure and stable performance during stress' if hpti_analysis['adjustment']['candidate'] > 60 else 'sensitivity to environmental factors that may require supportive management'}.
+Their adjustment score of {hpti_analysis['adjustment']['candidate']}% ({ordinal(hpti_analysis['adjustment']['percentile'])} percentile vs {hpti_analysis['adjustment']['norm_group']}) suggests {'emotional resilience under pressure and stable performance during stress' if hpti_analysis['adjustment']['candidate'] > 60 else 'sensitivity to environmental factors that may require supportive management'}.
 
 With curiosity at {hpti_analysis['curiosity']['candidate']}%, they show {'eagerness to learn and explore new approaches' if hpti_analysis['curiosity']['candidate'] > 60 else 'focused expertise with preference for proven methods'}.
 
 Top performers in this role typically show similar patterns in risk approach and competitiveness, driving innovation while maintaining team harmony."""
 
-    gia_description = f"""**General Intelligence Assessment**: With a GIA score of {gia_analysis['score']}, this candidate ranks in the **{gia_analysis['percentile']}th percentile** for cognitive ability.
+    gia_description = f"""**General Intelligence Assessment**: With a GIA score of {gia_analysis['score']}, this candidate ranks in the **{ordinal(gia_analysis['percentile'])} percentile** for cognitive ability against {gia_analysis['norm_group']} employees (n={gia_analysis['norm_sample_size']}).
 
 This indicates {'exceptional' if gia_analysis['score'] > 115 else 'strong' if gia_analysis['score'] > 100 else 'solid'} problem-solving capabilities, {'rapid learning potential' if gia_analysis['score'] > 110 else 'effective skill acquisition'}, and {'excellent analytical thinking' if gia_analysis['score'] > 105 else 'practical reasoning ability'}.
 
@@ -806,6 +936,7 @@ class AskThomRequest(BaseModel):
     question: str
     context: Optional[Dict[str, Any]] = None  # Universal page context - any JSON object
     page_context: Optional[str] = None  # Legacy: page name string
+    use_cache: bool = True  # Set False to always query the model
 
 
 class AskThomResponse(BaseModel):
@@ -814,170 +945,31 @@ class AskThomResponse(BaseModel):
     thomas_keywords_found: List[str]
     ifs_keywords_found: List[str]
     sources: List[str]
+    keyword_spans: List[Dict[str, Any]] = []  # Whole-word {start, end, keyword, category} in the answer
     debug_info: Optional[dict] = None  # Optional diagnostics
 
 
-def get_thomas_trait_kw():
-    """Get Thomas trait keywords with fallback"""
-    try:
-        from backend.services.databricks_ai import get_thomas_trait_keywords
-        return get_thomas_trait_keywords()
-    except ImportError:
-        return ["Dominance", "Influence", "Steadiness", "Compliance"]
-
-
 def highlight_keywords(text: str) -> dict:
     """
-    Parse text and identify Thomas and IFS keywords for frontend highlighting.
-    Uses case-insensitive matching for product names, case-sensitive for traits.
+    Identify Thomas and IFS keywords for frontend highlighting with the precompiled keyword engine.
+    Product names match case-insensitively, traits only when capitalised.
     """
-    import re
-    
-    thomas_keywords = get_thomas_kw()  # Product names - case insensitive is OK
-    thomas_traits = get_thomas_trait_kw()  # Traits - need case-sensitive
-    ifs_keywords = get_ifs_kw()
-    
-    found_thomas = []
-    found_ifs = []
-    
-    # Case-insensitive for product names (but not for common words)
-    text_lower = text.lower()
-    for keyword in thomas_keywords:
-        # Skip if it could match common verbs/nouns
-        if keyword.lower() in ["engage", "influence", "adjustment"]:
-            continue
-        if keyword.lower() in text_lower:
-            found_thomas.append(keyword)
-    
-    # Case-SENSITIVE for trait keywords (only match when capitalized)
-    for trait in thomas_traits:
-        if trait in text:  # Case-sensitive check
-            found_thomas.append(trait)
-    
-    # IFS keywords - case insensitive
-    for keyword in ifs_keywords:
-        if keyword.lower() in text_lower:
-            found_ifs.append(keyword)
-    
+    found = get_keyword_engine().keywords(text)
     return {
         "highlighted_text": text,
-        "thomas_keywords": list(set(found_thomas)),
-        "ifs_keywords": list(set(found_ifs))
+        "thomas_keywords": found["thomas_keywords"],
+        "ifs_keywords": found["ifs_keywords"],
     }
 
 
+def detect_sources(text: str) -> List[str]:
+    """Data sources referenced by an answer, in SOURCE_TERMS order"""
+    return get_keyword_engine().sources(text)
+
+
 def build_context_prompt(context: Optional[Dict[str, Any]], page_context: Optional[str]) -> str:
-    """Build context for the LLM from the current page state."""
-    if not context and not page_context:
-        return ""
-    
-    parts = []
-    
-    # Who is being viewed
-    currently_viewing = (
-        context.get("currentlyViewingEmployee") or 
-        context.get("currentlyViewingReferral") or 
-        context.get("currentlyViewingCandidate") if context else None
-    )
-    
-    if currently_viewing:
-        parts.append(f"Currently viewing: {currently_viewing}")
-    
-    if page_context:
-        parts.append(f"Page: {page_context}")
-    
-    if context:
-        # Selected person details (for Referrals/Candidates pages)
-        selected = context.get("selectedReferral") or context.get("selectedCandidate") or context.get("selectedEmployee")
-        if selected and isinstance(selected, dict):
-            parts.append("")
-            for key, value in selected.items():
-                if value is not None and value != "" and key not in ["hasAIInsights"]:
-                    if isinstance(value, list):
-                        parts.append(f"{key}: {', '.join(str(v) for v in value[:8])}")
-                    elif not isinstance(value, dict):
-                        parts.append(f"{key}: {value}")
-        
-        # Employee details (for Employee Detail page)
-        employee = context.get("employee")
-        if employee and isinstance(employee, dict):
-            parts.append("")
-            parts.append("Employee Details:")
-            for key, value in employee.items():
-                if value is not None:
-                    parts.append(f"  {key}: {value}")
-        
-        # Performance data (for Employee Detail page)
-        performance = context.get("performance")
-        if performance and isinstance(performance, dict):
-            parts.append("")
-            parts.append("Performance Data:")
-            if performance.get("score"):
-                parts.append(f"  Performance Score: {performance['score']}")
-            if performance.get("moraleScore"):
-                parts.append(f"  Morale Score: {performance['moraleScore']} (out of 100, below 60 is concerning)")
-            if performance.get("churnRisk"):
-                parts.append(f"  Churn Risk (likelihood of leaving): {performance['churnRisk']}")
-            if performance.get("slackSentiment"):
-                parts.append(f"  Slack Sentiment: {performance['slackSentiment']} (0-1 scale, below 0.5 is negative)")
-        
-        # Thomas Assessments (for Employee Detail page - actual scores, not predictions)
-        thomas = context.get("thomasAssessments")
-        if thomas and isinstance(thomas, dict):
-            parts.append("")
-            parts.append("Thomas Assessments (actual scores):")
-            ppa = thomas.get("ppa")
-            if ppa and isinstance(ppa, dict):
-                parts.append(f"  PPA: D={ppa.get('dominance')}, I={ppa.get('influence')}, S={ppa.get('steadiness')}, C={ppa.get('compliance')}")
-            if thomas.get("gia"):
-                parts.append(f"  GIA: {thomas['gia']}")
-            hpti = thomas.get("hpti")
-            if hpti and isinstance(hpti, dict):
-                parts.append(f"  HPTI: Conscientiousness={hpti.get('conscientiousness')}, Adjustment={hpti.get('adjustment')}, Curiosity={hpti.get('curiosity')}, Risk={hpti.get('riskApproach')}, Ambiguity={hpti.get('ambiguityAcceptance')}, Competitiveness={hpti.get('competitiveness')}")
-        
-        # Leadership data
-        if context.get("leadershipReadiness"):
-            parts.append(f"Leadership Readiness: {context['leadershipReadiness']}")
-        if context.get("recommendedNextRole"):
-            parts.append(f"Recommended Next Role: {context['recommendedNextRole']}")
-        
-        # Team collaboration
-        team = context.get("teamCollaboration")
-        if team and isinstance(team, dict):
-            parts.append("")
-            parts.append("Team Collaboration:")
-            if team.get("avgChemistryScore"):
-                parts.append(f"  Avg Chemistry Score: {team['avgChemistryScore']}")
-            if team.get("avgRelationshipScore"):
-                parts.append(f"  Avg Relationship Score: {team['avgRelationshipScore']}")
-            if team.get("interpersonalFlexibility"):
-                parts.append(f"  Interpersonal Flexibility: {team['interpersonalFlexibility']}")
-        
-        # AI Insights (for Referrals - predicted scores)
-        ai_insights = context.get("aiInsights")
-        if ai_insights and isinstance(ai_insights, dict):
-            parts.append("")
-            parts.append("AI Insights (predicted):")
-            
-            if ai_insights.get("summary"):
-                parts.append(f"  Summary: {ai_insights['summary']}")
-            
-            ppa = ai_insights.get("predictedPPA") or ai_insights.get("predicted_ppa")
-            if ppa and isinstance(ppa, dict):
-                parts.append(f"  Predicted PPA: D={ppa.get('dominance')}, I={ppa.get('influence')}, S={ppa.get('steadiness')}, C={ppa.get('compliance')}")
-            
-            hpti = ai_insights.get("predictedHPTI") or ai_insights.get("predicted_hpti")
-            if hpti and isinstance(hpti, dict):
-                parts.append(f"  Predicted HPTI: Conscientiousness={hpti.get('conscientiousness')}, Curiosity={hpti.get('curiosity')}, Ambiguity={hpti.get('ambiguity_acceptance')}")
-            
-            gia = ai_insights.get("estimatedGIA") or ai_insights.get("estimated_gia")
-            if gia and isinstance(gia, dict):
-                parts.append(f"  Estimated GIA: {gia.get('percentile')}th percentile")
-            
-            if ai_insights.get("recommendation"):
-                parts.append(f"  Recommendation: {ai_insights['recommendation']}")
-    
-    return "\n".join(parts)
+    """Build context for the LLM from the current page state (every section, no token budget)."""
+    return "\n\n".join(section.text for section in page_sections(context, page_context))
 
 
 @router.post("/ask-thom", response_model=AskThomResponse)
@@ -993,13 +985,14 @@ async def ask_thom(request: AskThomRequest):
     logger = logging.getLogger(__name__)
     
     # Log incoming context for debugging
-    logger.info(f"AskThom received context keys: {list(request.context.keys()) if request.context else 'none'}")
-    logger.info(f"AskThom page_context: {request.page_context}")
+    logger.debug(f"AskThom received context keys: {list(request.context.keys()) if request.context else 'none'}")
+    logger.debug(f"AskThom page_context: {request.page_context}")
     
-    # Build SECTION 4: DYNAMIC CONTEXT from the request
-    dynamic_context = build_context_prompt(request.context, request.page_context)
+    # Build SECTION 4: DYNAMIC CONTEXT from the request, ranked and fitted to the token budget
+    assembled = get_context_assembler().assemble(request.question, request.context, request.page_context)
+    dynamic_context = assembled.text
     
-    logger.info(f"Built dynamic context (first 500 chars): {dynamic_context[:500] if dynamic_context else 'empty'}")
+    logger.debug(f"Built dynamic context (first 500 chars): {dynamic_context[:500] if dynamic_context else 'empty'}")
     
     # Call Databricks AI service
     # The service will combine static prompt (Sections 1-3, 5) with dynamic context (Section 4)
@@ -1008,7 +1001,9 @@ async def ask_thom(request: AskThomRequest):
     auth_mode = "oauth" if os.getenv("DATABRICKS_CLIENT_ID") else "pat" if os.getenv("DATABRICKS_TOKEN") else "none"
     
     if ai_service:
-        answer = ai_service.ask_thom(request.question, dynamic_context)
+        answer = await run_in_threadpool(
+            ai_service.ask_thom, request.question, dynamic_context, use_cache=request.use_cache
+        )
         # Check if it returned a fallback response
         if "offline mode" in answer.lower() or "I'm Thom, your People Science advisor" in answer:
             used_fallback = True
@@ -1017,28 +1012,9 @@ async def ask_thom(request: AskThomRequest):
         answer = generate_fallback_response(request.question)
         used_fallback = True
     
-    # Apply keyword highlighting
+    # Keyword highlighting and source detection
     highlighting = highlight_keywords(answer)
-    
-    # Determine sources based on content
-    sources = []
-    answer_lower = answer.lower()
-    
-    if any(k.lower() in answer_lower for k in ["ppa", "disc", "dominance", "influence", "steadiness", "compliance"]):
-        sources.append("Thomas PPA Assessment")
-    if any(k.lower() in answer_lower for k in ["gia", "intelligence", "cognitive"]):
-        sources.append("Thomas GIA Assessment")
-    if any(k.lower() in answer_lower for k in ["hpti", "leadership", "conscientiousness", "adjustment"]):
-        sources.append("Thomas HPTI Assessment")
-    if any(k.lower() in answer_lower for k in ["chemistry", "team", "collaboration"]):
-        sources.append("Thomas Connect")
-    if any(k.lower() in answer_lower for k in ["ifs", "erp", "eam", "fsm", "cloud"]):
-        sources.append("IFS Cloud Platform")
-    if any(k.lower() in answer_lower for k in ["churn", "retention", "engagement"]):
-        sources.append("Thomas Engage")
-    
-    if not sources:
-        sources = ["Thomas Insights", "Application Knowledge Base"]
+    sources = detect_sources(answer) or list(DEFAULT_SOURCES)
     
     return AskThomResponse(
         answer=answer,
@@ -1046,15 +1022,106 @@ async def ask_thom(request: AskThomRequest):
         thomas_keywords_found=highlighting["thomas_keywords"],
         ifs_keywords_found=highlighting["ifs_keywords"],
         sources=sources,
+        keyword_spans=get_keyword_engine().spans(answer),
         debug_info={
             "used_fallback": used_fallback,
             "auth_mode": auth_mode,
             "model_endpoint": os.getenv("DATABRICKS_MODEL_ENDPOINT", "databricks-gemini-2-5-flash"),
             "host": os.getenv("DATABRICKS_HOST", "not set")[:50],
+            **assembled.summary(),
         }
     )
 
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/ask-thom/stream")
+async def ask_thom_stream(request: AskThomRequest):
+    """
+    Streaming Ask Thom over Server-Sent Events.
+    
+    Events: `token` (text delta), `keywords` / `sources` (first seen in the
+    growing answer), then `done` with the same fields as /ask-thom plus timings.
+    """
+    import logging
+    import os
+    import time
+    logger = logging.getLogger(__name__)
+    
+    started = time.perf_counter()
+    assembled = get_context_assembler().assemble(request.question, request.context, request.page_context)
+    dynamic_context = assembled.text
+    ai_service = get_ai_service()
+    
+    async def events():
+        highlighter = get_keyword_engine().scanner()
+        ttft_ms = None
+        token_events = 0
+        outcome = {"used_fallback": True, "cached": False}
+        
+        source = None
+        if ai_service:
+            source = ai_service.stream_thom(request.question, dynamic_context, use_cache=request.use_cache)
+            stream = iterate_in_threadpool(source)
+        else:
+            async def fallback_stream():
+                yield {"type": "token", "text": generate_fallback_response(request.question)}
+                yield {"type": "done", "used_fallback": True, "cached": False}
+            stream = fallback_stream()
+        
+        try:
+            async for item in stream:
+                if item["type"] == "done":
+                    outcome = item
+                    continue
+                if ttft_ms is None:
+                    ttft_ms = (time.perf_counter() - started) * 1000
+                    logger.info(f"AskThom stream TTFT {ttft_ms:.0f}ms")
+                token_events += 1
+                yield _sse("token", {"text": item["text"]})
+                
+                found = highlighter.feed(item["text"])
+                if found["thomas_keywords"] or found["ifs_keywords"]:
+                    yield _sse("keywords", {"thomas": found["thomas_keywords"], "ifs": found["ifs_keywords"]})
+                if found["sources"]:
+                    yield _sse("sources", {"sources": found["sources"]})
+        except Exception as e:
+            logger.error(f"AskThom stream failed: {e}")
+            yield _sse("error", {"message": str(e)})
+        finally:
+            if source is not None:
+                # Release the serving slot and connection even if the client went away
+                await run_in_threadpool(source.close)
+        highlighter.finish()
+        
+        yield _sse("done", {
+            "answer": highlighter.text,
+            "highlighted_answer": highlighter.text,
+            "thomas_keywords_found": highlighter.thomas_keywords,
+            "ifs_keywords_found": highlighter.ifs_keywords,
+            "sources": highlighter.sources or list(DEFAULT_SOURCES),
+            "keyword_spans": highlighter.spans,
+            "debug_info": {
+                "used_fallback": outcome.get("used_fallback", False),
+                "cached": outcome.get("cached", False),
+                "truncated": outcome.get("truncated", False),
+                "ttft_ms": round(ttft_ms, 1) if ttft_ms is not None else None,
+                "total_ms": round((time.perf_counter() - started) * 1000, 1),
+                "token_events": token_events,
+                "model_endpoint": os.getenv("DATABRICKS_MODEL_ENDPOINT", "databricks-gemini-2-5-flash"),
+                **assembled.summary(),
+            },
+        })
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 def generate_fallback_response(question: str) -> str:
     """Generate a helpful fallback response when AI service is unavailable"""
     question_lower = question.lower()
@@ -1107,6 +1174,26 @@ The Talent Hub integrates with IFS Cloud to correlate Thomas assessments with bu
 What specific aspect would you like to explore?"""
 
 
+@router.get("/search")
+async def search_knowledge(q: str, k: int = 5, source: Optional[str] = None):
+    """Semantic search over interaction notes, referral CVs and Thomas documentation"""
+    from backend.services.retrieval import get_retrieval_service, SOURCES
+    
+    if k < 1 or k > 50:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 50")
+    sources = [s.strip() for s in source.split(",")] if source else None
+    if sources and any(s not in SOURCES for s in sources):
+        raise HTTPException(status_code=400, detail=f"source must be one of: {', '.join(SOURCES)}")
+    
+    service = get_retrieval_service()
+    results = await run_in_threadpool(service.search, q, k, sources)
+    return clean_numpy_types({
+        "query": q,
+        "results": results,
+        "index": service.stats(),
+    })
+
+
 @router.get("/thom-status")
 async def get_thom_status():
     """Check Thom AI service status and warmup state"""
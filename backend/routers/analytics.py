@@ -2,7 +2,7 @@
 Analytics & Reporting API Routes
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import Optional
 
 import sys
@@ -10,6 +10,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from data.data_access import get_data_access
+from data.analytics_cube import get_analytics_cube
+from data.norms import get_norm_engine
 
 router = APIRouter()
 data_access = get_data_access()
@@ -25,75 +27,142 @@ async def get_weight_overrides(manager_id: Optional[str] = None):
 @router.get("/hiring-funnel")
 async def get_hiring_funnel():
     """Get hiring funnel analytics"""
-    candidates = data_access.get_candidates()
+    cube = get_analytics_cube()
+    by_stage = {r["current_stage"]: r["rows"] for r in cube.query("pipeline", by=["current_stage"], measures=[])}
     
     stages = ["Screening", "Phone Interview", "Technical Assessment", "Onsite Interview", "Final Round"]
-    funnel = []
-    
-    for stage in stages:
-        count = len(candidates[candidates["current_stage"] == stage])
-        funnel.append({"stage": stage, "count": count})
-    
-    return funnel
+    return [{"stage": stage, "count": by_stage.get(stage, 0)} for stage in stages]
 
 
 @router.get("/department-metrics")
 async def get_department_metrics():
     """Get aggregated metrics by department"""
-    employees = data_access.get_employees()
-    performance = data_access.get_performance_metrics(quarter="2024-Q4")
-    
-    merged = employees.merge(performance, on="employee_id")
+    cube = get_analytics_cube()
+    records = cube.query(
+        "performance",
+        by=["department"],
+        filters={"quarter": "2024-Q4"},
+        measures=["performance_score", "morale_score", "leadership_readiness"],
+    )
     
-    dept_metrics = merged.groupby("department").agg({
-        "employee_id": "count",
-        "performance_score": "mean",
-        "morale_score": "mean",
-        "leadership_readiness": "mean",
-    }).reset_index()
-    
-    dept_metrics.columns = ["department", "headcount", "avg_performance", "avg_morale", "avg_leadership_readiness"]
-    
-    return dept_metrics.to_dict(orient="records")
+    return [
+        {
+            "department": r["department"],
+            "headcount": r["rows"],
+            "avg_performance": r["measures"]["performance_score"].mean,
+            "avg_morale": r["measures"]["morale_score"].mean,
+            "avg_leadership_readiness": r["measures"]["leadership_readiness"].mean,
+        }
+        for r in records
+    ]
+
+
+def _distribution(moments, column: str) -> dict:
+    """Format cube moments and norm quantiles as a score distribution"""
+    return {
+        "mean": moments.mean,
+        "std": moments.std,
+        "min": int(moments.min) if moments.count else None,
+        "max": int(moments.max) if moments.count else None,
+        "percentiles": get_norm_engine().quantiles(column),
+    }
 
 
 @router.get("/thomas-profile-distribution")
 async def get_thomas_profile_distribution():
     """Get distribution of Thomas assessment scores across org"""
-    assessments = data_access.get_thomas_assessments()
+    cube = get_analytics_cube()
+    totals = cube.query("assessments")[0]
+    measures = totals["measures"]
     
     return {
         "ppa": {
-            "dominance": {
-                "mean": float(assessments["ppa_dominance"].mean()),
-                "std": float(assessments["ppa_dominance"].std()),
-                "min": int(assessments["ppa_dominance"].min()),
-                "max": int(assessments["ppa_dominance"].max()),
-            },
-            "influence": {
-                "mean": float(assessments["ppa_influence"].mean()),
-                "std": float(assessments["ppa_influence"].std()),
-                "min": int(assessments["ppa_influence"].min()),
-                "max": int(assessments["ppa_influence"].max()),
-            },
-            "steadiness": {
-                "mean": float(assessments["ppa_steadiness"].mean()),
-                "std": float(assessments["ppa_steadiness"].std()),
-                "min": int(assessments["ppa_steadiness"].min()),
-                "max": int(assessments["ppa_steadiness"].max()),
-            },
-            "compliance": {
-                "mean": float(assessments["ppa_compliance"].mean()),
-                "std": float(assessments["ppa_compliance"].std()),
-                "min": int(assessments["ppa_compliance"].min()),
-                "max": int(assessments["ppa_compliance"].max()),
-            },
+            "dominance": _distribution(measures["ppa_dominance"], "ppa_dominance"),
+            "influence": _distribution(measures["ppa_influence"], "ppa_influence"),
+            "steadiness": _distribution(measures["ppa_steadiness"], "ppa_steadiness"),
+            "compliance": _distribution(measures["ppa_compliance"], "ppa_compliance"),
         },
-        "gia": {
-            "mean": float(assessments["gia_overall"].mean()),
-            "std": float(assessments["gia_overall"].std()),
-            "min": int(assessments["gia_overall"].min()),
-            "max": int(assessments["gia_overall"].max()),
-        },
-        "sample_size": len(assessments),
+        "gia": _distribution(measures["gia_overall"], "gia_overall"),
+        "sample_size": totals["rows"],
+    }
+
+
+@router.get("/cube")
+async def describe_cube():
+    """List the analytics cubes with their dimensions and measures"""
+    return get_analytics_cube().describe()
+
+
+@router.get("/cube/{cube_name}")
+async def query_cube(
+    cube_name: str,
+    request: Request,
+    by: Optional[str] = None,
+    measures: Optional[str] = None,
+):
+    """
+    Slice/dice query against the analytics cube.
+    Group with ?by=department,level, filter on any dimension (?quarter=2024-Q4&department=R%26D,ERP),
+    and restrict measures with ?measures=performance_score,morale_score.
+    """
+    cube = get_analytics_cube()
+    if cube_name not in cube.cubes:
+        raise HTTPException(status_code=404, detail=f"Unknown cube: {cube_name}")
+    
+    dimensions = cube.cubes[cube_name].dimensions
+    filters = {
+        dim: request.query_params[dim].split(",")
+        for dim in dimensions
+        if dim in request.query_params
+    }
+    
+    try:
+        records = cube.query(
+            cube_name,
+            by=[d for d in (by or "").split(",") if d],
+            filters=filters,
+            measures=[m for m in (measures or "").split(",") if m] or None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "cube": cube_name,
+        "data_version": cube.version,
+        "groups": [
+            {**{k: v for k, v in r.items() if k != "measures"},
+             "measures": {m: moments.to_dict() for m, moments in r["measures"].items()}}
+            for r in records
+        ],
     }
+
+
+@router.get("/percentile-rank")
+async def get_percentile_rank(
+    column: str,
+    value: float,
+    department: Optional[str] = None,
+    level: Optional[str] = None,
+):
+    """Percentile rank of a score against org norms (department/level when the group is large enough)"""
+    try:
+        return get_norm_engine().percentile_rank(column, value, department, level)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/histogram/{column}")
+async def get_histogram(
+    column: str,
+    bins: int = Query(10, ge=1, le=100),
+    department: Optional[str] = None,
+    level: Optional[str] = None,
+):
+    """Histogram and quantiles of a score column against org norms"""
+    norms = get_norm_engine()
+    try:
+        histogram = norms.histogram(column, bins, department, level)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    histogram["percentiles"] = norms.quantiles(column, department, level)
+    return histogram
@@ -12,6 +12,7 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from data.data_access import get_data_access
+from data.churn_scoring import get_churn_engine
 
 router = APIRouter()
 data_access = get_data_access()
@@ -86,15 +87,20 @@ async def get_manager_team(manager_id: str):
 
 @router.get("/managers/{manager_id}/at-risk")
 async def get_at_risk_employees(manager_id: str):
-    """Get high-risk employees for a manager"""
+    """Get high-risk employees for a manager, scored by the churn engine (highest first)"""
     direct_reports = data_access.get_direct_reports(manager_id)
-    performance = data_access.get_performance_metrics(quarter="2024-Q4")
     
     if direct_reports.empty:
         return {"at_risk": [], "critical_events": []}
     
-    team_performance = performance[performance["employee_id"].isin(direct_reports["employee_id"])]
-    high_risk = team_performance[team_performance["churn_risk"] == "High"]
+    engine = get_churn_engine()
+    ranked = engine.top_at_risk(manager_id, n=len(direct_reports), direct_only=True, min_risk="High")
+    scored = {entry["employee_id"]: entry for entry in ranked}
+    performance = data_access.get_performance_metrics(quarter=engine.quarter)
+    high_risk = performance[performance["employee_id"].isin(list(scored))].copy()
+    high_risk["churn_risk"] = high_risk["employee_id"].map(lambda emp_id: scored[emp_id]["churn_risk"])
+    high_risk["churn_risk_score"] = high_risk["employee_id"].map(lambda emp_id: scored[emp_id]["churn_score"])
+    high_risk = high_risk.sort_values(["churn_risk_score", "employee_id"], ascending=[False, True])
     
     # Merge with employee info
     at_risk_employees = high_risk.merge(
@@ -112,6 +118,55 @@ async def get_at_risk_employees(manager_id: str):
     })
 
 
+@router.get("/at-risk/top")
+async def get_top_at_risk(
+    manager_id: Optional[str] = None,
+    n: int = 10,
+    model: str = "rules",
+    direct_only: bool = False,
+    min_risk: Optional[str] = None,
+):
+    """Rank the highest churn risks across an org subtree (whole org if no manager)"""
+    if n < 1 or n > 500:
+        raise HTTPException(status_code=400, detail="n must be between 1 and 500")
+    if min_risk and min_risk not in ("Low", "Medium", "High"):
+        raise HTTPException(status_code=400, detail="min_risk must be Low, Medium or High")
+
+    engine = get_churn_engine()
+    if manager_id and data_access.get_employee_by_id(manager_id).empty:
+        raise HTTPException(status_code=404, detail="Manager not found")
+    try:
+        ranked = engine.top_at_risk(manager_id, n=n, model=model, direct_only=direct_only, min_risk=min_risk)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    employees = data_access.get_employees().set_index("employee_id")
+    for entry in ranked:
+        if entry["employee_id"] in employees.index:
+            emp = employees.loc[entry["employee_id"]]
+            entry.update({"name": emp["name"], "title": emp["title"], "department": emp["department"]})
+
+    return clean_nan_values({
+        "manager_id": manager_id,
+        "model": model,
+        "quarter": engine.quarter,
+        "subtree_size": int(len(engine.subtree(manager_id, direct_only))),
+        "at_risk": ranked,
+    })
+
+
+@router.get("/employees/{employee_id}/churn-score")
+async def get_churn_score(employee_id: str, model: str = "rules"):
+    """Churn score with the indicators behind it for one employee"""
+    engine = get_churn_engine()
+    if model not in engine.models:
+        raise HTTPException(status_code=400, detail=f"Unknown churn model: {model}")
+    try:
+        return clean_nan_values(engine.explain(employee_id, model))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+
 @router.get("/metrics")
 async def get_performance_metrics(
     employee_id: Optional[str] = None,
@@ -3,16 +3,22 @@ Recruitment Intelligence API Routes
 """
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from typing import Optional, List
 from pydantic import BaseModel
 from datetime import date
 import math
+import time
+import asyncio
 
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from data.data_access import get_data_access
+from backend.services.cv_text import build_cv_text
+from backend.services.jobs import get_job_queue, ACTIVE_STATES, SUCCEEDED, FAILED
 
 router = APIRouter()
 data_access = get_data_access()
@@ -279,64 +285,20 @@ async def get_referral_details(referral_id: str):
     })
 
 
-def _build_cv_text(referral: dict) -> str:
-    """Build CV text from referral data for AI extraction"""
-    import random
-    
-    name = referral["name"]
-    role = referral.get("role_title", "Software Engineer")
-    years_exp = referral.get("years_experience", 5)
-    current_company = referral.get("current_company", "TechCorp")
-    skills = referral.get("skills", ["Python", "SQL", "Leadership"])
-    
-    cv_text = f"""
-CURRICULUM VITAE
-
-Name: {name}
-Current Role: {role}
-Years of Experience: {years_exp}
-Current Company: {current_company}
-
-PROFESSIONAL SUMMARY
-Experienced {role} with {years_exp}+ years of expertise in enterprise software development. 
-Proven track record of delivering impactful solutions at scale. Strong technical foundation 
-combined with excellent communication and leadership abilities.
-
-SKILLS
-Technical: {', '.join(skills[:5]) if isinstance(skills, list) else skills}
-Tools: AWS, Azure, Docker, Kubernetes, Git, CI/CD
-Soft Skills: Leadership, Communication, Problem Solving, Stakeholder Management
-
-WORK EXPERIENCE
-{current_company} - {role}
-2021 - Present
-- Led cross-functional team on strategic initiatives
-- Delivered significant business value through process improvements
-- Established best practices for technical excellence
-
-Previous Company - Senior Engineer
-2018 - 2021
-- Promoted within 12 months due to exceptional performance
-- Mentored junior team members
-- Implemented scalable solutions serving large user base
-
-EDUCATION
-Computer Science, Imperial College London - 2015
-First Class Honours
-
-CERTIFICATIONS
-- AWS Solutions Architect - 2023
-- Agile Scrum Master - 2022
-
-LANGUAGES
-English (Native), French (Conversational)
-"""
-    return cv_text
+AI_INSIGHT_FIELDS = ("skills", "summary", "years_experience", "education")
 
 
-@router.post("/referrals/{referral_id}/extract-insights")
-async def extract_referral_insights(referral_id: str):
-    """Extract AI insights from CV and web crawling for a referral candidate using Databricks AI"""
+def merge_ai_insights(mock_gen, referral_id: str, ai_insights: dict) -> dict:
+    """Merge model-extracted CV fields over the base insights; the result is the cached insights dict"""
+    insights = mock_gen.extract_ai_insights(referral_id)
+    for key in AI_INSIGHT_FIELDS:
+        if key in ai_insights:
+            insights["cv_insights"][key] = ai_insights[key]
+    return insights
+
+
+def enrich_referral(referral_id: str) -> Optional[dict]:
+    """Extract AI insights for one referral (blocking); None if the referral does not exist"""
     from data.mock_data import get_mock_data_generator
     import logging
     
@@ -348,7 +310,7 @@ async def extract_referral_insights(referral_id: str):
     referral = next((r for r in referrals if r["referral_id"] == referral_id), None)
     
     if not referral:
-        raise HTTPException(status_code=404, detail="Referral not found")
+        return None
     
     # Try to use real Databricks AI for extraction
     ai_generated = False
@@ -360,7 +322,7 @@ async def extract_referral_insights(referral_id: str):
         
         if ai_service:
             # Build CV text from referral data
-            cv_text = _build_cv_text(referral)
+            cv_text = build_cv_text(referral)
             
             logger.info(f"Extracting insights for {referral['name']} using Databricks AI")
             
@@ -372,16 +334,7 @@ async def extract_referral_insights(referral_id: str):
             
             if ai_insights:
                 logger.info("AI extraction successful")
-                # Get base mock data and merge with real AI insights
-                insights = mock_gen.extract_ai_insights(referral_id)
-                if "skills" in ai_insights:
-                    insights["cv_insights"]["skills"] = ai_insights["skills"]
-                if "summary" in ai_insights:
-                    insights["cv_insights"]["summary"] = ai_insights["summary"]
-                if "years_experience" in ai_insights:
-                    insights["cv_insights"]["years_experience"] = ai_insights["years_experience"]
-                if "education" in ai_insights:
-                    insights["cv_insights"]["education"] = ai_insights["education"]
+                insights = merge_ai_insights(mock_gen, referral_id, ai_insights)
                 ai_generated = True
             else:
                 logger.info("AI extraction returned None")
@@ -410,6 +363,179 @@ async def extract_referral_insights(referral_id: str):
     })
 
 
+def enrich_referrals_batch(referral_ids: List[str], chunk_size: Optional[int] = None) -> dict:
+    """Enrich many referrals with one set-based AI_QUERY per chunk (blocking)"""
+    from data.mock_data import get_mock_data_generator
+    from backend.services.databricks_ai import get_databricks_ai_service
+    
+    mock_gen = get_mock_data_generator()
+    by_id = {r["referral_id"]: r for r in mock_gen.generate_referrals()}
+    
+    items = [
+        {"referral_id": rid, "name": by_id[rid]["name"], "cv_text": build_cv_text(by_id[rid])}
+        for rid in referral_ids
+    ]
+    result = get_databricks_ai_service().extract_cv_insights_batch(items, chunk_size)
+    
+    ai_generated = result.extractor == "warehouse"
+    for referral_id, ai_insights in result.insights.items():
+        insights = merge_ai_insights(mock_gen, referral_id, ai_insights)
+        insights["ai_generated"] = ai_generated
+    
+    return clean_nan_values({
+        "success": not result.errors,
+        **result.summary(),
+        "enriched": sorted(result.insights),
+        "errors": result.errors,
+    })
+
+
+def pending_referral_ids() -> List[str]:
+    from data.mock_data import get_mock_data_generator
+    return [r["referral_id"] for r in get_mock_data_generator().generate_referrals() if not r["ai_enriched"]]
+
+
+# ============================================================================
+# ENRICHMENT JOBS
+# ============================================================================
+
+ENRICHMENT_JOB = "referral_enrichment"
+BATCH_ENRICHMENT_JOB = "referral_enrichment_batch"
+
+# How long POST /referrals/{id}/extract-insights waits for its job before answering 202
+ENRICHMENT_WAIT_SECONDS = float(os.getenv("ENRICHMENT_WAIT_SECONDS", "60"))
+
+
+def _referral_key(referral_id: str) -> str:
+    """Dedupe key held by every job (single or batch) that enriches this referral"""
+    return f"referral:{referral_id}"
+
+
+def _run_enrichment_job(payload: dict) -> dict:
+    result = enrich_referral(payload["referral_id"])
+    if result is None:
+        raise ValueError(f"Referral {payload['referral_id']} not found")
+    return result
+
+
+def _run_batch_enrichment_job(payload: dict) -> dict:
+    # Retries only redo the referrals an earlier attempt did not enrich
+    pending = set(pending_referral_ids())
+    referral_ids = [rid for rid in payload["referral_ids"] if rid in pending]
+    result = enrich_referrals_batch(referral_ids, payload.get("chunk_size"))
+    if result["errors"]:
+        raise RuntimeError(f"{result['failed']} of {result['requested']} referrals failed: {result['errors']}")
+    return result
+
+
+def _job_view(job: dict) -> dict:
+    return {
+        "job_id": job["job_id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "deduplicated": job.get("deduplicated", False),
+        "status_url": f"/api/system/jobs/{job['job_id']}",
+        "result_url": f"/api/system/jobs/{job['job_id']}/result",
+    }
+
+
+_job_queue = get_job_queue()
+_job_queue.register(ENRICHMENT_JOB, _run_enrichment_job)
+_job_queue.register(BATCH_ENRICHMENT_JOB, _run_batch_enrichment_job)
+
+
+class BatchExtractionRequest(BaseModel):
+    referral_ids: Optional[List[str]] = None  # Default: every referral not yet enriched
+    chunk_size: Optional[int] = None
+
+
+def _select_referral_ids(referral_ids: Optional[List[str]]) -> List[str]:
+    from data.mock_data import get_mock_data_generator
+    
+    if not referral_ids:
+        return pending_referral_ids()
+    known = {r["referral_id"] for r in get_mock_data_generator().generate_referrals()}
+    missing = [rid for rid in referral_ids if rid not in known]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Referrals not found: {', '.join(missing)}")
+    return list(dict.fromkeys(referral_ids))
+
+
+@router.post("/referrals/extract-insights/batch")
+async def extract_referral_insights_batch(request: BatchExtractionRequest):
+    """Enrich many referrals with one set-based AI_QUERY per chunk instead of one query each"""
+    referral_ids = _select_referral_ids(request.referral_ids)
+    return await run_in_threadpool(enrich_referrals_batch, referral_ids, request.chunk_size)
+
+
+@router.post("/referrals/enrich-pending", status_code=202)
+async def enrich_pending_referrals(request: Optional[BatchExtractionRequest] = None):
+    """Queue one batch enrichment job for every referral not yet enriched; poll the returned job"""
+    request = request or BatchExtractionRequest()
+    referral_ids = _select_referral_ids(request.referral_ids)
+    if not referral_ids:
+        return {"job": None, "pending_enrichment": 0}
+    
+    # Referrals another job is already enriching are left to that job
+    held = _job_queue.store.active_keys([_referral_key(rid) for rid in referral_ids])
+    remaining = [rid for rid in referral_ids if _referral_key(rid) not in held]
+    if not remaining:
+        return {"job": None, "pending_enrichment": 0, "already_queued": len(held)}
+    
+    job = _job_queue.submit(
+        BATCH_ENRICHMENT_JOB,
+        {"referral_ids": remaining, "chunk_size": request.chunk_size},
+        dedupe_key=[_referral_key(rid) for rid in remaining],
+    )
+    return {"job": _job_view(job), "pending_enrichment": len(remaining), "already_queued": len(held)}
+
+
+@router.post("/referrals/{referral_id}/extract-insights/jobs", status_code=202)
+async def submit_referral_enrichment(referral_id: str):
+    """Queue CV extraction for a referral and return the job at once"""
+    _select_referral_ids([referral_id])
+    job = _job_queue.submit(ENRICHMENT_JOB, {"referral_id": referral_id}, dedupe_key=_referral_key(referral_id))
+    return _job_view(job)
+
+
+async def _wait_for_job(job_id: str, timeout: float) -> dict:
+    deadline = time.monotonic() + timeout
+    job = _job_queue.get(job_id)
+    while job["status"] in ACTIVE_STATES and time.monotonic() < deadline:
+        await asyncio.sleep(0.25)
+        job = _job_queue.get(job_id)
+    return job
+
+
+@router.post("/referrals/{referral_id}/extract-insights")
+async def extract_referral_insights(referral_id: str):
+    """
+    Extract AI insights from CV and web crawling for a referral candidate using Databricks AI.
+    Runs as the referral's enrichment job (shared with any job already enriching it) and
+    waits for it; answers 202 with the job if it takes longer than ENRICHMENT_WAIT_SECONDS.
+    """
+    from data.mock_data import get_mock_data_generator
+    
+    _select_referral_ids([referral_id])
+    job = _job_queue.submit(ENRICHMENT_JOB, {"referral_id": referral_id}, dedupe_key=_referral_key(referral_id))
+    job = await _wait_for_job(job["job_id"], ENRICHMENT_WAIT_SECONDS)
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=502, detail=f"Enrichment failed: {job['error']}")
+    if job["status"] != SUCCEEDED:
+        return JSONResponse(status_code=202, content=_job_view(job))
+    if job["kind"] == ENRICHMENT_JOB:
+        return job["result"]
+    
+    # Enriched by a batch job: answer from the insights it stored
+    mock_gen = get_mock_data_generator()
+    insights = mock_gen._referral_insights.get(referral_id)
+    if insights is None:
+        # The batch ran in another worker process; this one has no copy yet
+        return await run_in_threadpool(enrich_referral, referral_id)
+    referral = next(r for r in mock_gen.generate_referrals() if r["referral_id"] == referral_id)
+    return clean_nan_values({"success": True, "referral": referral, "insights": insights})
+
+
 @router.get("/referrals/stats/summary")
 async def get_referral_stats():
     """Get summary statistics for referrals"""
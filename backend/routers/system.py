@@ -3,7 +3,9 @@ System Status Router
 Provides endpoints for checking Databricks connectivity and system health
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
 import logging
 import os
 import asyncio
@@ -109,24 +111,215 @@ async def get_system_status():
 
 
 @router.post("/warmup")
-async def warmup_services():
-    """Warm up Databricks services"""
-    from backend.services.databricks_ai import get_databricks_ai_service
+async def warmup_services(timeout: float = Query(120.0, gt=0, le=600)):
+    """Re-run the startup warmup (all tasks, concurrently) and wait for it to finish"""
+    from fastapi.concurrency import run_in_threadpool
+    from backend.services.warmup import get_warmup_orchestrator, SUCCEEDED
     
-    ai_service = get_databricks_ai_service()
-    
-    # Warm up SQL warehouse
-    sql_warmed = ai_service.warmup()
-    
-    # Test model serving with a simple query
-    model_warmed = False
-    try:
-        response = ai_service.ask_thom("Hello, this is a warmup test. Reply with 'Ready!'")
-        model_warmed = "Ready" in response or len(response) > 10
-    except Exception as e:
-        logger.warning(f"Model warmup failed: {e}")
+    warmup = get_warmup_orchestrator().start()
+    await run_in_threadpool(warmup.wait, timeout)
     
+    status = warmup.status()
+    task_status = {task["name"]: task["status"] for task in status["tasks"]}
     return {
-        "sql_warehouse_warmed": sql_warmed,
-        "model_serving_warmed": model_warmed,
+        "sql_warehouse_warmed": task_status.get("sql-warehouse") == SUCCEEDED,
+        "model_serving_warmed": task_status.get("model-endpoint") == SUCCEEDED,
+        **status,
     }
+
+
+@router.get("/llm-cache")
+async def get_llm_cache_stats():
+    """LLM response cache hit rates and model latency saved"""
+    from ai.response_cache import get_response_cache
+    return get_response_cache().stats()
+
+
+@router.delete("/llm-cache")
+async def clear_llm_cache():
+    """Drop every cached LLM response"""
+    from ai.response_cache import get_response_cache
+    return {"cleared": get_response_cache().clear()}
+
+
+@router.get("/model-gate")
+async def get_model_gate_stats():
+    """Model serving concurrency: slots in use, queued callers by priority, coalesced calls"""
+    from ai.concurrency import get_model_gate
+    return get_model_gate().stats()
+
+
+@router.get("/model-resilience")
+async def get_model_resilience_stats():
+    """Circuit breaker state, retries, hedged requests and fallbacks per serving endpoint"""
+    from ai.resilience import get_resilience
+    return get_resilience().stats()
+
+
+@router.get("/model-metrics")
+async def get_model_metrics():
+    """Model call latency/TTFB/queue-wait histograms, tokens, cost, cache and fallback counts by endpoint and feature"""
+    from ai.telemetry import get_telemetry
+    return get_telemetry().stats()
+
+
+@router.delete("/model-metrics")
+async def reset_model_metrics():
+    """Start a fresh measurement window (e.g. before a load test)"""
+    from ai.telemetry import get_telemetry
+    get_telemetry().reset()
+    return {"reset": True}
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition: per-route HTTP latency, sizes and errors plus cache, model, pool and job metrics"""
+    from fastapi.responses import PlainTextResponse
+    from backend.services.metrics import get_metrics as get_metrics_registry
+    return PlainTextResponse(get_metrics_registry().render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.delete("/metrics")
+async def reset_metrics():
+    """Reset the HTTP request metrics (subsystem counters keep their own windows)"""
+    from backend.services.metrics import get_metrics as get_metrics_registry
+    get_metrics_registry().reset()
+    return {"reset": True}
+
+
+@router.get("/traffic-capture")
+async def get_traffic_capture():
+    """Whether request traces are being captured, and where (replay with python -m benchmarks.replay)"""
+    from backend.services.traffic import get_traffic_recorder, traffic_capture_enabled
+    if not traffic_capture_enabled():
+        return {"enabled": False}
+    recorder = get_traffic_recorder()
+    recorder.flush()
+    return {"enabled": True, **recorder.stats()}
+
+
+def _profile_response(profile, format: str):
+    from fastapi.responses import JSONResponse, PlainTextResponse
+    headers = {"X-Profile-Id": profile.id}
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed(), headers=headers)
+    if format == "summary":
+        return JSONResponse(profile.summary(), headers=headers)
+    return JSONResponse(profile.speedscope(), headers={**headers, "Content-Disposition": f'inline; filename="{profile.id}.speedscope.json"'})
+
+
+def _require_profiling():
+    from backend.services.profiler import profiling_enabled
+    if not profiling_enabled():
+        raise HTTPException(status_code=403, detail="Profiling is disabled (PROFILING_ENABLED=false)")
+
+
+@router.post("/profile")
+async def run_profiler(
+    seconds: float = Query(10.0, gt=0, le=300),
+    hz: int = Query(100, ge=1, le=1000),
+    format: str = Query("speedscope", pattern="^(speedscope|collapsed|summary)$"),
+    include_idle: bool = False,
+):
+    """Sample every thread's call stack for a time window; speedscope JSON or collapsed stacks for flamegraphs"""
+    from backend.services.profiler import SamplingProfiler, get_profile_store, profile_window_lock
+    _require_profiling()
+    if not profile_window_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profiling window is already running")
+    profiler = SamplingProfiler(f"window {seconds:g}s @ {hz}Hz", interval=1.0 / hz, include_idle=include_idle).start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile = profiler.stop()
+        profile_window_lock.release()
+    get_profile_store().add(profile)
+    return _profile_response(profile, format)
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """Recent request and window profiles, newest first"""
+    from backend.services.profiler import get_profile_store
+    _require_profiling()
+    return {"profiles": get_profile_store().list()}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = Query("speedscope", pattern="^(speedscope|collapsed|summary)$")):
+    """A stored profile, e.g. the one named by a response's X-Profile-Id header"""
+    from backend.services.profiler import get_profile_store
+    _require_profiling()
+    profile = get_profile_store().get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return _profile_response(profile, format)
+
+
+@router.get("/jobs")
+async def list_jobs(kind: Optional[str] = None, status: Optional[str] = None, limit: int = Query(50, ge=1, le=500)):
+    """Recent background jobs, newest first, with queue statistics"""
+    from backend.services.jobs import get_job_queue
+    queue = get_job_queue()
+    return {"stats": queue.stats(), "jobs": queue.store.list(kind, status, limit)}
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Status of a background job (the result is served separately)"""
+    from backend.services.jobs import get_job_queue
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job.pop("result")
+    return job
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Result of a finished job; 409 while it is still queued, running or waiting to retry"""
+    from backend.services.jobs import get_job_queue, SUCCEEDED, FAILED
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == FAILED:
+        raise HTTPException(status_code=500, detail=f"Job failed after {job['attempts']} attempts: {job['error']}")
+    if job["status"] != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job["result"]
+
+
+# ============================================================================
+# DATA INGEST
+# ============================================================================
+
+class IngestRequest(BaseModel):
+    rows: List[Dict[str, Any]]
+
+
+def _ingest_enabled() -> bool:
+    # On by default for local/demo data; a deployed app must opt in (the endpoint is unauthenticated)
+    default = "false" if os.getenv("DATABRICKS_APP_NAME") else "true"
+    return os.getenv("DATA_INGEST_ENABLED", default).lower() == "true"
+
+
+@router.post("/ingest/{table}")
+async def ingest_rows(table: str, request: IngestRequest):
+    """
+    Hand newly arrived rows to the data layer. Locally they are added to the demo tables;
+    with USE_REAL_SQL, post rows already written upstream. Either way the analytics cube,
+    norms, churn scores, retrieval index and interaction summaries update incrementally.
+    """
+    from fastapi.concurrency import run_in_threadpool
+    from data.data_access import get_data_access
+    
+    if not _ingest_enabled():
+        raise HTTPException(status_code=403, detail="Data ingest is disabled (DATA_INGEST_ENABLED=false)")
+    data_access = get_data_access()
+    if table not in data_access.APPENDABLE_TABLES:
+        raise HTTPException(status_code=404, detail=f"Table {table} does not accept rows; one of: {', '.join(data_access.APPENDABLE_TABLES)}")
+    try:
+        rows = await run_in_threadpool(data_access.rows_from_records, table, request.rows)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    version = await run_in_threadpool(data_access.append_rows, table, rows)
+    return {"table": table, "rows": len(rows), "data_version": version}
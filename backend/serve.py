@@ -0,0 +1,62 @@
+"""
+Multi-Worker Launcher
+Publishes the dataset snapshot once into shared memory and then starts uvicorn
+with several worker processes that all map the same snapshot files:
+
+    python -m backend.serve --workers 4
+    python -m backend.serve --workers 4 --watch-seconds 30   # pick up re-published snapshots
+
+Each worker memory-maps the Arrow tables under <root>/current, so numeric
+columns are shared through the page cache instead of being generated and held
+once per worker. After `python -m data.snapshot publish --root <root>`, workers
+started with --watch-seconds swap to the new version without a restart.
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+from data.snapshot import default_shared_root, HAS_ARROW
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend with shared-memory dataset workers")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "2")))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--root", default=default_shared_root(), help="Directory holding published snapshot versions")
+    parser.add_argument("--watch-seconds", type=float, default=float(os.getenv("DATA_SNAPSHOT_WATCH_SECONDS", "0")),
+                        help="Poll interval for re-published snapshots (0 = off)")
+    parser.add_argument("--skip-publish", action="store_true", help="Serve the version already published under --root")
+    args = parser.parse_args()
+
+    if not HAS_ARROW:
+        print("[SERVE] WARNING: pyarrow is not installed; each worker unpickles its own copy of the dataset "
+              "instead of sharing memory-mapped tables (pip install pyarrow)", file=sys.stderr)
+
+    if not args.skip_publish:
+        result = subprocess.run([sys.executable, "-m", "data.snapshot", "publish", "--root", args.root], cwd=ROOT)
+        if result.returncode != 0:
+            # Workers fall back to generating the dataset themselves
+            print(f"[SERVE] Snapshot publish failed (exit {result.returncode}); workers will generate data", file=sys.stderr)
+
+    env = {
+        **os.environ,
+        "DATA_SNAPSHOT": "auto",
+        "DATA_SNAPSHOT_PATH": os.path.join(args.root, "current"),
+        "DATA_SNAPSHOT_WATCH_SECONDS": str(args.watch_seconds),
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "backend.main:app",
+        "--host", args.host, "--port", str(args.port), "--workers", str(max(1, args.workers)),
+    ]
+    print(f"[SERVE] Starting {args.workers} workers on {args.host}:{args.port} with dataset {env['DATA_SNAPSHOT_PATH']}")
+    os.chdir(ROOT)
+    os.execvpe(command[0], command, env)
+
+
+if __name__ == "__main__":
+    main()
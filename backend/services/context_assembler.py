@@ -0,0 +1,408 @@
+"""
+Ask Thom Context Assembler
+Builds the dynamic part of the Ask Thom prompt within a token budget.
+Page context, reference knowledge and retrieved records are split into sections,
+ranked by relevance to the question, and truncated or dropped to fit. Sections
+are rendered in a fixed order after the static system prompt so the prompt
+prefix stays stable for serving-side prefix caching.
+"""
+
+import os
+import re
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Approximate characters per token for English prose and key/value text
+CHARS_PER_TOKEN = 4
+
+DEFAULT_CONTEXT_TOKENS = 1500
+
+# Reference knowledge below this relevance is left out even when there is room
+MIN_KNOWLEDGE_RELEVANCE = 0.3
+
+_STOPWORDS = {
+    "the", "and", "for", "are", "was", "what", "how", "why", "who", "does", "this", "that",
+    "with", "about", "can", "you", "your", "have", "has", "should", "would", "could", "their",
+    "they", "them", "from", "there", "which", "tell", "give", "show", "explain", "please",
+}
+
+# Question words that point at a topic even when the section text does not contain them
+TOPIC_TERMS = {
+    "churn": ["leave", "leaving", "quit", "attrition", "retain", "retention", "churn", "risk", "flight"],
+    "performance": ["performance", "morale", "sentiment", "score", "rating", "quarter", "velocity"],
+    "assessment": ["ppa", "gia", "hpti", "disc", "dominance", "influence", "steadiness", "compliance", "trait", "profile", "personality"],
+    "leadership": ["leader", "leadership", "promote", "promotion", "potential", "successor", "readiness", "manager"],
+    "team": ["team", "chemistry", "collaboration", "relationship", "flexibility", "together"],
+    "hiring": ["hire", "hiring", "candidate", "referral", "interview", "offer", "fit", "cv", "resume"],
+    "ifs": ["ifs", "cloud", "erp", "eam", "fsm", "industrial"],
+}
+
+
+def _normalise(text: str) -> str:
+    return " ".join(text.split())
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _terms(text: str) -> set:
+    return {w for w in re.findall(r"[a-z0-9]+", text.lower()) if len(w) >= 3 and w not in _STOPWORDS}
+
+
+@dataclass
+class ContextSection:
+    """One block of prompt context"""
+    name: str
+    text: str
+    priority: int  # 0 = always included, higher = dropped first
+    order: int  # Position in the rendered prompt
+    topics: Tuple[str, ...] = ()
+    relevance: float = 0.0
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+@dataclass
+class AssembledContext:
+    text: str
+    tokens: int
+    budget: int
+    included: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "context_tokens": self.tokens,
+            "context_budget": self.budget,
+            "sections_included": self.included,
+            "sections_truncated": self.truncated,
+            "sections_dropped": self.dropped,
+        }
+
+
+def _fields(values: Dict[str, Any], skip: Tuple[str, ...] = (), indent: str = "") -> List[str]:
+    lines = []
+    for key, value in values.items():
+        if value is None or value == "" or key in skip:
+            continue
+        if isinstance(value, list):
+            lines.append(f"{indent}{key}: {', '.join(str(v) for v in value[:8])}")
+        elif not isinstance(value, dict):
+            lines.append(f"{indent}{key}: {value}")
+    return lines
+
+
+def page_sections(context: Optional[Dict[str, Any]], page_context: Optional[str]) -> List[ContextSection]:
+    """Split the page context sent by the frontend into prompt sections"""
+    sections: List[ContextSection] = []
+    if not context and not page_context:
+        return sections
+
+    header = []
+    currently_viewing = (
+        context.get("currentlyViewingEmployee") or
+        context.get("currentlyViewingReferral") or
+        context.get("currentlyViewingCandidate") if context else None
+    )
+    if currently_viewing:
+        header.append(f"Currently viewing: {currently_viewing}")
+    if page_context:
+        header.append(f"Page: {page_context}")
+    if header:
+        sections.append(ContextSection("viewing", "\n".join(header), priority=0, order=0))
+
+    if not context:
+        return sections
+
+    # Selected person details (for Referrals/Candidates pages)
+    selected = context.get("selectedReferral") or context.get("selectedCandidate") or context.get("selectedEmployee")
+    if selected and isinstance(selected, dict):
+        lines = _fields(selected, skip=("hasAIInsights",))
+        if lines:
+            sections.append(ContextSection("selected", "\n".join(lines), priority=1, order=1, topics=("hiring",)))
+
+    # Employee details (for Employee Detail page)
+    employee = context.get("employee")
+    if employee and isinstance(employee, dict):
+        lines = ["Employee Details:"] + [f"  {k}: {v}" for k, v in employee.items() if v is not None]
+        sections.append(ContextSection("employee", "\n".join(lines), priority=1, order=2))
+
+    # Performance data (for Employee Detail page)
+    performance = context.get("performance")
+    if performance and isinstance(performance, dict):
+        lines = ["Performance Data:"]
+        if performance.get("score"):
+            lines.append(f"  Performance Score: {performance['score']}")
+        if performance.get("moraleScore"):
+            lines.append(f"  Morale Score: {performance['moraleScore']} (out of 100, below 60 is concerning)")
+        if performance.get("churnRisk"):
+            lines.append(f"  Churn Risk (likelihood of leaving): {performance['churnRisk']}")
+        if performance.get("slackSentiment"):
+            lines.append(f"  Slack Sentiment: {performance['slackSentiment']} (0-1 scale, below 0.5 is negative)")
+        if len(lines) > 1:
+            sections.append(ContextSection("performance", "\n".join(lines), priority=2, order=3, topics=("performance", "churn")))
+
+    # Thomas Assessments (for Employee Detail page - actual scores, not predictions)
+    thomas = context.get("thomasAssessments")
+    if thomas and isinstance(thomas, dict):
+        lines = ["Thomas Assessments (actual scores):"]
+        ppa = thomas.get("ppa")
+        if ppa and isinstance(ppa, dict):
+            lines.append(f"  PPA: D={ppa.get('dominance')}, I={ppa.get('influence')}, S={ppa.get('steadiness')}, C={ppa.get('compliance')}")
+        if thomas.get("gia"):
+            lines.append(f"  GIA: {thomas['gia']}")
+        hpti = thomas.get("hpti")
+        if hpti and isinstance(hpti, dict):
+            lines.append(f"  HPTI: Conscientiousness={hpti.get('conscientiousness')}, Adjustment={hpti.get('adjustment')}, Curiosity={hpti.get('curiosity')}, Risk={hpti.get('riskApproach')}, Ambiguity={hpti.get('ambiguityAcceptance')}, Competitiveness={hpti.get('competitiveness')}")
+        if len(lines) > 1:
+            sections.append(ContextSection("assessments", "\n".join(lines), priority=2, order=4, topics=("assessment", "leadership")))
+
+    # Leadership data
+    leadership = []
+    if context.get("leadershipReadiness"):
+        leadership.append(f"Leadership Readiness: {context['leadershipReadiness']}")
+    if context.get("recommendedNextRole"):
+        leadership.append(f"Recommended Next Role: {context['recommendedNextRole']}")
+    if leadership:
+        sections.append(ContextSection("leadership", "\n".join(leadership), priority=2, order=5, topics=("leadership",)))
+
+    # Team collaboration
+    team = context.get("teamCollaboration")
+    if team and isinstance(team, dict):
+        lines = ["Team Collaboration:"]
+        if team.get("avgChemistryScore"):
+            lines.append(f"  Avg Chemistry Score: {team['avgChemistryScore']}")
+        if team.get("avgRelationshipScore"):
+            lines.append(f"  Avg Relationship Score: {team['avgRelationshipScore']}")
+        if team.get("interpersonalFlexibility"):
+            lines.append(f"  Interpersonal Flexibility: {team['interpersonalFlexibility']}")
+        if len(lines) > 1:
+            sections.append(ContextSection("team", "\n".join(lines), priority=3, order=6, topics=("team",)))
+
+    # AI Insights (for Referrals - predicted scores)
+    ai_insights = context.get("aiInsights")
+    if ai_insights and isinstance(ai_insights, dict):
+        lines = ["AI Insights (predicted):"]
+        if ai_insights.get("summary"):
+            lines.append(f"  Summary: {ai_insights['summary']}")
+        ppa = ai_insights.get("predictedPPA") or ai_insights.get("predicted_ppa")
+        if ppa and isinstance(ppa, dict):
+            lines.append(f"  Predicted PPA: D={ppa.get('dominance')}, I={ppa.get('influence')}, S={ppa.get('steadiness')}, C={ppa.get('compliance')}")
+        hpti = ai_insights.get("predictedHPTI") or ai_insights.get("predicted_hpti")
+        if hpti and isinstance(hpti, dict):
+            lines.append(f"  Predicted HPTI: Conscientiousness={hpti.get('conscientiousness')}, Curiosity={hpti.get('curiosity')}, Ambiguity={hpti.get('ambiguity_acceptance')}")
+        gia = ai_insights.get("estimatedGIA") or ai_insights.get("estimated_gia")
+        if gia and isinstance(gia, dict):
+            lines.append(f"  Estimated GIA: {gia.get('percentile')}th percentile")
+        if ai_insights.get("recommendation"):
+            lines.append(f"  Recommendation: {ai_insights['recommendation']}")
+        if len(lines) > 1:
+            sections.append(ContextSection("ai_insights", "\n".join(lines), priority=2, order=7, topics=("hiring", "assessment")))
+
+    return sections
+
+
+def page_subjects(context: Optional[Dict[str, Any]]) -> List[str]:
+    """Ids of the candidate or referral the page shows; retrieval only returns records about them"""
+    if not context:
+        return []
+    ids = [context.get("candidateId"), context.get("referralId")]
+    for key in ("candidate", "selectedCandidate", "selectedReferral"):
+        entity = context.get(key)
+        if isinstance(entity, dict):
+            ids += [entity.get("id"), entity.get("candidateId"), entity.get("referralId")]
+    return list(dict.fromkeys(str(i) for i in ids if i))
+
+
+def knowledge_sections() -> List[ContextSection]:
+    """Reference knowledge (Thomas products, IFS, the app) split at ### headings"""
+    from backend.services.databricks_ai import THOMAS_CONTEXT, IFS_CONTEXT, APPLICATION_CONTEXT
+
+    sections = []
+    order = 100
+    for source, text in (("thomas", THOMAS_CONTEXT), ("ifs", IFS_CONTEXT), ("application", APPLICATION_CONTEXT)):
+        for chunk in re.split(r"\n(?=### )", text.strip()):
+            chunk = chunk.strip()
+            if not chunk.startswith("### "):
+                continue  # Skip the "## Title" preamble
+            title = chunk.splitlines()[0][4:].strip(": ").lower().replace(" ", "_")
+            words = _terms(chunk)
+            topics = tuple(topic for topic, terms in TOPIC_TERMS.items() if words & set(terms))
+            sections.append(ContextSection(f"{source}:{title}", chunk, priority=4, order=order, topics=topics))
+            order += 1
+    return sections
+
+
+def score_relevance(section: ContextSection, question_terms: set) -> float:
+    """Share of question terms found in the section, plus a bonus for a matching topic"""
+    if not question_terms:
+        return 0.0
+    overlap = len(question_terms & _terms(section.text)) / len(question_terms)
+    topic_bonus = 0.0
+    for topic in section.topics:
+        if question_terms & set(TOPIC_TERMS.get(topic, ())):
+            topic_bonus = 0.5
+            break
+    return min(1.0, overlap + topic_bonus)
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """Keep whole lines up to the token budget, marking the cut"""
+    if estimate_tokens(text) <= tokens:
+        return text
+    kept, used = [], 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line + "\n")
+        if used + cost > tokens - 1:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept + ["  …"]) if kept else ""
+
+
+class ContextAssembler:
+    """Fits ranked context sections into a token budget"""
+
+    def __init__(self, budget_tokens: int = DEFAULT_CONTEXT_TOKENS, include_knowledge: bool = True, retrieval_k: int = 0):
+        self.budget_tokens = budget_tokens
+        self.include_knowledge = include_knowledge
+        self.retrieval_k = retrieval_k
+        self._knowledge: Optional[List[ContextSection]] = None
+        self._knowledge_spans: Dict[str, Tuple[int, int]] = {}
+        self._knowledge_text = ""
+
+    def _knowledge_sections(self) -> List[ContextSection]:
+        if self._knowledge is None:
+            from backend.services.databricks_ai import THOMAS_CONTEXT, IFS_CONTEXT, APPLICATION_CONTEXT
+
+            self._knowledge = knowledge_sections()
+            # Where each section sits in the whitespace-normalised reference text, to
+            # recognise retrieved documentation chunks that repeat it
+            self._knowledge_text = _normalise(" ".join((THOMAS_CONTEXT, IFS_CONTEXT, APPLICATION_CONTEXT)))
+            for section in self._knowledge:
+                text = _normalise(section.text)
+                start = self._knowledge_text.find(text)
+                self._knowledge_spans[section.name] = (start, start + len(text))
+        return self._knowledge
+
+    def _covering_sections(self, text: str) -> Optional[List[str]]:
+        """Knowledge sections a retrieved passage overlaps, or None when it is not reference text"""
+        chunk = _normalise(text)
+        start = self._knowledge_text.find(chunk) if chunk else -1
+        if start < 0:
+            return None
+        end = start + len(chunk)
+        return [name for name, (lo, hi) in self._knowledge_spans.items() if lo < end and start < hi]
+
+    def _retrieved_sections(self, question: str, subjects: List[str], knowledge: Dict[str, ContextSection]) -> List[ContextSection]:
+        """
+        Top-k documentation chunks, plus notes and CV passages about the people on the
+        page; other candidates' records never reach the prompt. A documentation chunk
+        that repeats reference knowledge lifts those sections instead of adding a copy.
+        """
+        if self.retrieval_k <= 0:
+            return []
+        try:
+            from backend.services.retrieval import get_retrieval_service
+            hits = get_retrieval_service().search(question, k=self.retrieval_k, subjects=subjects)
+        except Exception as e:
+            logger.warning(f"Retrieval failed, continuing without it: {e}")
+            return []
+        sections = []
+        for i, hit in enumerate(hits):
+            relevance = min(1.0, hit["score"] * 2)
+            covering = self._covering_sections(hit["text"]) if knowledge else None
+            if covering is not None:
+                for name in covering:
+                    knowledge[name].relevance = max(knowledge[name].relevance, relevance)
+                continue
+            sections.append(ContextSection(
+                f"retrieved:{hit['chunk_id']}",
+                f"Record [{hit['source']} {hit['ref_id']}]: {hit['text']}",
+                priority=3,
+                order=50 + i,
+                relevance=relevance,
+            ))
+        return sections
+
+    def assemble(
+        self,
+        question: str,
+        context: Optional[Dict[str, Any]] = None,
+        page_context: Optional[str] = None,
+    ) -> AssembledContext:
+        question_terms = _terms(question)
+        for term in list(question_terms):
+            # Expand plural/singular so "leaders" still matches "leadership"
+            question_terms.add(term.rstrip("s"))
+
+        candidates = page_sections(context, page_context)
+        knowledge: Dict[str, ContextSection] = {}
+        if self.include_knowledge:
+            for section in self._knowledge_sections():
+                knowledge[section.name] = ContextSection(section.name, section.text, section.priority, section.order, section.topics)
+            candidates.extend(knowledge.values())
+
+        for section in candidates:
+            section.relevance = score_relevance(section, question_terms)
+
+        # Retrieved records carry their similarity as a relevance floor
+        for section in self._retrieved_sections(question, page_subjects(context), knowledge):
+            section.relevance = max(section.relevance, score_relevance(section, question_terms))
+            candidates.append(section)
+
+        # Highest value first: must-have sections, then relevance weighted against priority
+        ranked = sorted(candidates, key=lambda s: (s.priority != 0, -(3 * s.relevance + (4 - s.priority))))
+
+        chosen: List[Tuple[ContextSection, str]] = []
+        result = AssembledContext(text="", tokens=0, budget=self.budget_tokens)
+        remaining = self.budget_tokens
+        for section in ranked:
+            if section.priority >= 4 and section.relevance < MIN_KNOWLEDGE_RELEVANCE:
+                result.dropped.append(section.name)
+                continue
+            cost = section.tokens + 1
+            if cost <= remaining:
+                chosen.append((section, section.text))
+                result.included.append(section.name)
+                remaining -= cost
+            elif section.priority == 0 or remaining >= 32:
+                text = truncate_to_tokens(section.text, remaining - 1)
+                if text:
+                    chosen.append((section, text))
+                    result.truncated.append(section.name)
+                    remaining -= estimate_tokens(text) + 1
+                else:
+                    result.dropped.append(section.name)
+            else:
+                result.dropped.append(section.name)
+
+        # Render in canonical order so the same page yields the same prompt text
+        chosen.sort(key=lambda pair: pair[0].order)
+        result.text = "\n\n".join(text for _, text in chosen)
+        result.tokens = estimate_tokens(result.text)
+        return result
+
+
+# Singleton instance
+_context_assembler = None
+
+
+def get_context_assembler() -> ContextAssembler:
+    """Get or create the context assembler singleton"""
+    global _context_assembler
+    if _context_assembler is None:
+        _context_assembler = ContextAssembler(
+            budget_tokens=int(os.getenv("ASK_THOM_CONTEXT_TOKENS", str(DEFAULT_CONTEXT_TOKENS))),
+            include_knowledge=os.getenv("ASK_THOM_REFERENCE_KNOWLEDGE", "true").lower() in ("1", "true", "yes"),
+            retrieval_k=int(os.getenv("ASK_THOM_RETRIEVAL_K", "4")),
+        )
+    return _context_assembler
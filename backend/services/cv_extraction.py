@@ -0,0 +1,270 @@
+"""
+Batch CV Extraction
+Set-based AI_QUERY over many referral CVs at once. CV texts are staged as a
+parameterised VALUES list, one warehouse statement enriches a whole chunk, and
+the JSON responses are parsed in bulk with per-row errors kept separate.
+A local stand-in extractor reads the CV sections directly when there is no warehouse.
+"""
+
+import os
+import re
+import json
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CV_EXTRACTION_PROMPT = (
+    "Extract professional insights from this CV. "
+    "Return a JSON object with: skills (array), years_experience (number), "
+    "education (array), certifications (array), summary (2-3 sentences). "
+    "Return ONLY valid JSON. Candidate: "
+)
+
+# AI_QUERY needs the endpoint as a literal, so only plain endpoint names are inlined
+_ENDPOINT_NAME = re.compile(r"^[A-Za-z0-9_.\-]+$")
+
+MAX_CV_CHARS = 2000
+
+# DB-API errors (matched by class name; the connector is optional) raised for what a
+# statement contains, versus those raised for the connection, session or credentials.
+# Connector hierarchies nest the latter under DatabaseError, so they are checked first.
+_STATEMENT_ERRORS = {"DatabaseError", "ServerOperationError", "DataError", "ProgrammingError", "IntegrityError"}
+_CONNECTION_ERRORS = {"OperationalError", "RequestError", "InterfaceError", "SessionAlreadyClosedError", "CursorAlreadyClosedError"}
+
+
+@dataclass
+class CVItem:
+    referral_id: str
+    name: str
+    cv_text: str
+
+
+@dataclass
+class BatchExtractionResult:
+    extractor: str
+    insights: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    chunks: int = 0
+    statements: int = 0
+    elapsed_ms: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "extractor": self.extractor,
+            "requested": len(self.insights) + len(self.errors),
+            "succeeded": len(self.insights),
+            "failed": len(self.errors),
+            "chunks": self.chunks,
+            "statements": self.statements,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+        }
+
+
+def parse_insights_json(raw: Optional[str]) -> Dict[str, Any]:
+    """Parse a model response into an insights dict, tolerating code fences and surrounding prose"""
+    if raw is None or not str(raw).strip():
+        raise ValueError("empty response")
+    text = str(raw).strip()
+    if text.startswith("```"):
+        text = re.sub(r"^```[a-zA-Z]*\s*|\s*```$", "", text)
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        start, end = text.find("{"), text.rfind("}")
+        if start < 0 or end <= start:
+            raise ValueError("response is not JSON")
+        parsed = json.loads(text[start:end + 1])
+    if not isinstance(parsed, dict):
+        raise ValueError("response is not a JSON object")
+    return parsed
+
+
+def build_batch_query(endpoint: str, items: Sequence[CVItem]) -> Tuple[str, Dict[str, Any]]:
+    """
+    One AI_QUERY over a VALUES list of staged CVs. Every CV value is a named
+    parameter; failOnError => false returns per-row errors instead of failing the statement.
+    """
+    if not _ENDPOINT_NAME.match(endpoint):
+        raise ValueError(f"Invalid model endpoint name: {endpoint!r}")
+
+    params: Dict[str, Any] = {"prompt": CV_EXTRACTION_PROMPT}
+    rows = []
+    for i, item in enumerate(items):
+        rows.append(f"(:id_{i}, :name_{i}, :cv_{i})")
+        params[f"id_{i}"] = item.referral_id
+        params[f"name_{i}"] = item.name
+        params[f"cv_{i}"] = item.cv_text[:MAX_CV_CHARS]
+
+    query = f"""
+    SELECT referral_id, response.result, response.errorMessage
+    FROM (
+        SELECT
+            referral_id,
+            AI_QUERY(
+                '{endpoint}',
+                CONCAT(:prompt, name, '\\nCV Content: ', cv),
+                failOnError => false
+            ) AS response
+        FROM VALUES {", ".join(rows)} AS staged(referral_id, name, cv)
+    )
+    """
+    return query, params
+
+
+# ============================================================================
+# EXECUTORS
+# ============================================================================
+
+class WarehouseBatchExecutor:
+    """Runs a chunk as one statement on the SQL warehouse"""
+
+    name = "warehouse"
+
+    def __init__(self, connection, endpoint: str):
+        self.connection = connection
+        self.endpoint = endpoint
+
+    def run(self, items: Sequence[CVItem]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        from ai.concurrency import get_model_gate, Priority
+        from ai.telemetry import track
+
+        query, params = build_batch_query(self.endpoint, items)
+        # One slot per statement; enrichment waits behind interactive calls on the endpoint
+        with track(self.endpoint, "cv-extraction-batch") as call, get_model_gate().slot(self.endpoint, Priority.BACKGROUND):
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute(query, params)
+                rows = [(row[0], row[1], row[2]) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+            # AI_QUERY reports no usage; estimate from the prompts sent and the responses returned
+            prompt_text = "".join(CV_EXTRACTION_PROMPT + item.name + item.cv_text[:MAX_CV_CHARS] for item in items)
+            call.usage(None, None, prompt_text, "".join(row[1] or "" for row in rows))
+            return rows
+
+
+class LocalCVExtractor:
+    """
+    Deterministic stand-in for AI_QUERY: reads the sections of the rendered CV
+    and returns the same JSON shape the model is asked for.
+    """
+
+    name = "local"
+
+    SECTION = re.compile(r"^([A-Z][A-Z ]{3,})$", re.MULTILINE)
+
+    def _sections(self, cv_text: str) -> Dict[str, str]:
+        parts = self.SECTION.split(cv_text)
+        return {parts[i].strip(): parts[i + 1].strip() for i in range(1, len(parts) - 1, 2)}
+
+    def extract(self, name: str, cv_text: str) -> str:
+        if not cv_text or not cv_text.strip():
+            raise ValueError("empty CV")
+        sections = self._sections(cv_text)
+
+        skills = []
+        for line in sections.get("SKILLS", "").splitlines():
+            if line.startswith("Technical:"):
+                skills = [s.strip() for s in line.split(":", 1)[1].split(",") if s.strip()]
+
+        years = re.search(r"Years of Experience:\s*(\d+)", cv_text)
+        education = [line.strip() for line in sections.get("EDUCATION", "").splitlines() if line.strip()][:1]
+        certifications = [
+            line.lstrip("- ").strip()
+            for line in sections.get("CERTIFICATIONS", "").splitlines()
+            if line.strip().startswith("-")
+        ]
+        summary = " ".join(sections.get("PROFESSIONAL SUMMARY", "").split())
+
+        return json.dumps({
+            "skills": skills,
+            "years_experience": int(years.group(1)) if years else None,
+            "education": education,
+            "certifications": certifications,
+            "summary": summary or f"{name} has a background in enterprise software.",
+        })
+
+    def run(self, items: Sequence[CVItem]) -> List[Tuple[str, Optional[str], Optional[str]]]:
+        rows = []
+        for item in items:
+            try:
+                rows.append((item.referral_id, self.extract(item.name, item.cv_text[:MAX_CV_CHARS]), None))
+            except Exception as e:
+                rows.append((item.referral_id, None, str(e)))
+        return rows
+
+
+# ============================================================================
+# BATCH EXTRACTOR
+# ============================================================================
+
+def is_row_error(exc: BaseException) -> bool:
+    """True when a failed chunk may succeed without one of its rows, so splitting it helps"""
+    if isinstance(exc, OSError):  # Connection resets and timeouts, including waiting for a model slot
+        return False
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    if names & _CONNECTION_ERRORS:
+        return False
+    return bool(names & _STATEMENT_ERRORS) or isinstance(exc, (ValueError, TypeError))
+
+
+class BatchCVExtractor:
+    """
+    Splits items into chunks, runs one statement per chunk and parses the responses.
+    A chunk whose statement is rejected for a row it contains is bisected so one bad
+    CV only loses itself; connection and auth errors fail the chunk at once.
+    """
+
+    def __init__(self, executor, chunk_size: int = 25):
+        self.executor = executor
+        self.chunk_size = max(1, chunk_size)
+
+    def _run_chunk(self, items: Sequence[CVItem], result: BatchExtractionResult) -> None:
+        result.statements += 1
+        try:
+            rows = self.executor.run(items)
+        except Exception as e:
+            if not is_row_error(e):
+                logger.warning(f"CV batch of {len(items)} failed, not retrying per row: {e}")
+                for item in items:
+                    result.errors[item.referral_id] = f"statement failed: {e}"
+                return
+            if len(items) > 1:
+                middle = len(items) // 2
+                logger.warning(f"CV batch of {len(items)} failed, splitting: {e}")
+                self._run_chunk(items[:middle], result)
+                self._run_chunk(items[middle:], result)
+            else:
+                result.errors[items[0].referral_id] = f"statement failed: {e}"
+            return
+
+        returned = set()
+        for referral_id, raw, error in rows:
+            returned.add(referral_id)
+            if error:
+                result.errors[referral_id] = error
+                continue
+            try:
+                result.insights[referral_id] = parse_insights_json(raw)
+            except ValueError as e:
+                result.errors[referral_id] = f"unparseable response: {e}"
+        for item in items:
+            if item.referral_id not in returned:
+                result.errors[item.referral_id] = "no row returned"
+
+    def extract(self, items: Sequence[CVItem]) -> BatchExtractionResult:
+        result = BatchExtractionResult(extractor=self.executor.name)
+        start = time.perf_counter()
+        for offset in range(0, len(items), self.chunk_size):
+            result.chunks += 1
+            self._run_chunk(list(items[offset:offset + self.chunk_size]), result)
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Batch CV extraction: {result.summary()}")
+        return result
+
+
+def default_chunk_size() -> int:
+    return int(os.getenv("CV_BATCH_CHUNK_SIZE", "25"))
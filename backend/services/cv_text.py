@@ -0,0 +1,57 @@
+"""
+Referral CV Text
+Renders the CV document for a referral used by AI extraction and retrieval
+"""
+
+
+def build_cv_text(referral: dict) -> str:
+    """Build CV text from referral data for AI extraction"""
+    name = referral["name"]
+    role = referral.get("role_title", "Software Engineer")
+    years_exp = referral.get("years_experience", 5)
+    current_company = referral.get("current_company", "TechCorp")
+    skills = referral.get("skills", ["Python", "SQL", "Leadership"])
+    
+    cv_text = f"""
+CURRICULUM VITAE
+
+Name: {name}
+Current Role: {role}
+Years of Experience: {years_exp}
+Current Company: {current_company}
+
+PROFESSIONAL SUMMARY
+Experienced {role} with {years_exp}+ years of expertise in enterprise software development. 
+Proven track record of delivering impactful solutions at scale. Strong technical foundation 
+combined with excellent communication and leadership abilities.
+
+SKILLS
+Technical: {', '.join(skills[:5]) if isinstance(skills, list) else skills}
+Tools: AWS, Azure, Docker, Kubernetes, Git, CI/CD
+Soft Skills: Leadership, Communication, Problem Solving, Stakeholder Management
+
+WORK EXPERIENCE
+{current_company} - {role}
+2021 - Present
+- Led cross-functional team on strategic initiatives
+- Delivered significant business value through process improvements
+- Established best practices for technical excellence
+
+Previous Company - Senior Engineer
+2018 - 2021
+- Promoted within 12 months due to exceptional performance
+- Mentored junior team members
+- Implemented scalable solutions serving large user base
+
+EDUCATION
+Computer Science, Imperial College London - 2015
+First Class Honours
+
+CERTIFICATIONS
+- AWS Solutions Architect - 2023
+- Agile Scrum Master - 2022
+
+LANGUAGES
+English (Native), French (Conversational)
+"""
+    return cv_text
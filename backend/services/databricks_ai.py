@@ -237,6 +237,14 @@ class DatabricksAIService:
                 logger.info("SQL connection skipped in Databricks Apps (not supported)")
                 return None
             
+            from config import get_emulator_url
+            emulator_url = get_emulator_url()
+            if emulator_url:
+                from emulator.warehouse import connect
+                self._connection = connect(serving_url=emulator_url, access_token=self.token)
+                logger.info(f"Connected to emulated SQL Warehouse ({emulator_url})")
+                return self._connection
+            
             if not self.token:
                 logger.info("No token available for SQL connection")
                 return None
@@ -279,7 +287,11 @@ class DatabricksAIService:
             logger.info(f"CV extraction skipped for {candidate_name} - no SQL connection")
             return None
         
-        try:
+        from ai.response_cache import make_cache_key
+        from ai.concurrency import get_model_gate, Priority
+        from ai.telemetry import track
+        
+        def run_query():
             cursor = conn.cursor()
             query = f"""
             SELECT AI_QUERY(
@@ -294,72 +306,300 @@ class DatabricksAIService:
             cursor.execute(query)
             result = cursor.fetchone()
             cursor.close()
-            if result and result[0]:
-                import json
-                return json.loads(result[0])
+            raw = result[0] if result else None
+            call.usage(None, None, query, raw)
+            return raw
+        
+        try:
+            with track(self.model_endpoint, "cv-extraction") as call:
+                # Double-clicks and concurrent viewers of the same CV share one AI_QUERY;
+                # enrichment waits behind interactive calls on the same endpoint
+                key = make_cache_key(self.model_endpoint, "extract_cv_insights", cv_text[:2000], 0, {"candidate": candidate_name})
+                raw = get_model_gate().call(self.model_endpoint, key, run_query, priority=Priority.BACKGROUND)
+            if raw:
+                return json.loads(raw)
         except Exception as e:
             logger.warning(f"SQL CV extraction failed: {e}")
         
         return None
 
-    def ask_thom(self, question: str, context: Optional[str] = None) -> str:
+    def extract_cv_insights_batch(self, items: List[Dict[str, str]], chunk_size: Optional[int] = None):
+        """
+        Extract CV insights for many referrals with one set-based AI_QUERY per chunk.
+        Items carry referral_id, name and cv_text. Uses the local stand-in
+        extractor when there is no SQL connection.
+        """
+        from backend.services.cv_extraction import (
+            CVItem, BatchCVExtractor, WarehouseBatchExecutor, LocalCVExtractor, default_chunk_size,
+        )
+
+        conn = self.get_connection()
+        executor = WarehouseBatchExecutor(conn, self.model_endpoint) if conn else LocalCVExtractor()
+        extractor = BatchCVExtractor(executor, chunk_size or default_chunk_size())
+        return extractor.extract([CVItem(i["referral_id"], i["name"], i["cv_text"]) for i in items])
+
+    def ask_thom(self, question: str, context: Optional[str] = None, use_cache: bool = True) -> str:
         """Ask Thom a question using the model serving endpoint"""
+        from ai.response_cache import get_response_cache, make_cache_key, cache_bypassed
+        from ai.concurrency import get_model_gate
+        from ai.telemetry import track
+        
+        system_prompt = FULL_THOM_CONTEXT
+        if context:
+            system_prompt += f"\n\n### Current Context:\n{context}"
+        
+        with track(self.model_endpoint, "ask-thom") as call:
+            # Identical questions in identical context are answered from the cache
+            request_key = make_cache_key(self.model_endpoint, system_prompt, question, 2000)
+            cache = get_response_cache()
+            store = use_cache and not cache_bypassed()
+            if store:
+                cached = cache.get(request_key, self.model_endpoint)
+                if cached is not None:
+                    logger.debug(f"Ask Thom cache hit {request_key[:12]}")
+                    call.cache = "hit"
+                    return cached
+            else:
+                call.cache = "bypass"
+            
+            # Identical questions already in flight share the same model call
+            executed = []
+            
+            def query() -> str:
+                executed.append(True)
+                return self._query_thom(question, context, system_prompt, request_key if store else None)
+            
+            answer = get_model_gate().coalesce(f"ask_thom:{request_key}", query)
+            call.coalesced = not executed
+            return answer
+    
+    def _query_thom(self, question: str, context: Optional[str], system_prompt: str, cache_key: Optional[str]) -> str:
+        """
+        Query the serving endpoint through the resilience layer: deadline-bounded
+        attempts with jittered backoff, and the canned answer at once when the circuit is open.
+        """
         import time
-        MAX_RETRIES = 2
+        from ai.response_cache import get_response_cache
+        from ai.concurrency import get_model_gate, Priority
+        from ai.resilience import get_resilience
         
-        for attempt in range(MAX_RETRIES + 1):
+        logger.debug(f"Ask Thom question: {question[:100]}... (system prompt {len(system_prompt)} chars)")
+        
+        def attempt(timeout: float) -> str:
+            with get_model_gate().slot(self.model_endpoint, Priority.INTERACTIVE):
+                call_start = time.perf_counter()
+                answer = self._invoke_chat(system_prompt, question, timeout)
+            if cache_key:
+                get_response_cache().put(cache_key, answer, self.model_endpoint, (time.perf_counter() - call_start) * 1000)
+            return answer
+        
+        def fallback() -> str:
+            logger.error("Model serving unavailable, using fallback")
+            return self._fallback_response(question, context)
+        
+        return get_resilience().caller(self.model_endpoint).call(attempt, fallback)
+    
+    def _invoke_chat(self, system_prompt: str, question: str, timeout: float) -> str:
+        """One non-streaming chat invocation, bounded by the caller's remaining deadline"""
+        import urllib.error
+        import urllib.request
+        from ai.telemetry import current_call
+        
+        target = self._serving_invocation_target()
+        if not target:
+            raise RuntimeError("No serving target available")
+        url, headers = target
+        body = json.dumps({
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": question},
+            ],
+            "max_tokens": 2000,
+        }).encode("utf-8")
+        request = urllib.request.Request(
+            url, data=body, headers={**headers, "Content-Type": "application/json"}, method="POST"
+        )
+        call = current_call()
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                if call:
+                    call.first_byte()
+                payload = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code in (401, 403):
+                # Credentials may have expired; rebuild the client on the next attempt only
+                self._workspace_client = None
+            raise
+        answer = payload["choices"][0]["message"]["content"]
+        if not answer:
+            raise ValueError("Empty model response")
+        if call:
+            usage = payload.get("usage") or {}
+            call.usage(usage.get("prompt_tokens"), usage.get("completion_tokens"), system_prompt + question, answer)
+        return answer
+    
+    def _serving_invocation_target(self, endpoint: Optional[str] = None) -> Optional[tuple]:
+        """
+        URL and auth headers for a direct serving endpoint invocation (chat model by default).
+        DATABRICKS_SERVING_URL (or a DATABRICKS_HOST on localhost) points at another
+        base URL, e.g. the local emulator.
+        """
+        from config import get_emulator_url
+        endpoint = endpoint or self.model_endpoint
+        override = os.getenv("DATABRICKS_SERVING_URL", "").rstrip("/") or get_emulator_url()
+        if override:
+            headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+            return f"{override}/serving-endpoints/{endpoint}/invocations", headers
+        
+        w = self._get_workspace_client()
+        if not w:
+            return None
+        host = w.config.host.rstrip("/")
+        return f"{host}/serving-endpoints/{endpoint}/invocations", w.config.authenticate()
+    
+    def stream_thom(self, question: str, context: Optional[str] = None, use_cache: bool = True):
+        """
+        Stream an Ask Thom answer. Yields {"type": "token", "text": ...} as the model
+        generates, then {"type": "done", "used_fallback": ..., "cached": ...}.
+        """
+        from ai.telemetry import start_call, get_telemetry
+        
+        # A generator can't hold the telemetry context open across yields; record explicitly
+        call = start_call(self.model_endpoint, "ask-thom-stream")
+        try:
+            for event in self._stream_events(question, context, use_cache, call):
+                if event["type"] == "token":
+                    call.first_byte()
+                elif event["type"] == "done":
+                    call.fallback = bool(event.get("used_fallback"))
+                    if event.get("cached"):
+                        call.cache = "hit"
+                yield event
+        except Exception as e:
+            call.error = type(e).__name__
+            raise
+        finally:
+            get_telemetry().record(call)
+    
+    def _stream_events(self, question: str, context: Optional[str], use_cache: bool, call):
+        import time
+        import urllib.request
+        from ai.response_cache import get_response_cache, make_cache_key, cache_bypassed
+        from ai.concurrency import get_model_gate, Priority
+        
+        system_prompt = FULL_THOM_CONTEXT
+        if context:
+            system_prompt += f"\n\n### Current Context:\n{context}"
+        
+        cache = get_response_cache()
+        cache_key = None
+        if not use_cache or cache_bypassed():
+            call.cache = "bypass"
+        else:
+            cache_key = make_cache_key(self.model_endpoint, system_prompt, question, 2000)
+            cached = cache.get(cache_key, self.model_endpoint)
+            if cached is not None:
+                yield {"type": "token", "text": cached}
+                yield {"type": "done", "used_fallback": False, "cached": True}
+                return
+        
+        from ai.resilience import get_resilience, remaining_time, DeadlineExceeded
+        caller = get_resilience().caller(self.model_endpoint)
+        if not caller.breaker.allow():
+            logger.warning(f"Circuit {self.model_endpoint} is open, streaming fallback")
+            yield {"type": "token", "text": self._fallback_response(question, context)}
+            yield {"type": "done", "used_fallback": True, "cached": False, "circuit_open": True}
+            return
+        
+        settled = False
+
+        def settle(success: bool) -> None:
+            nonlocal settled
+            settled = True
+            if success:
+                caller.breaker.record_success()
+            else:
+                caller.breaker.record_failure()
+
+        try:
+            target = self._serving_invocation_target()
+            if not target:
+                settle(False)
+                logger.error("No serving target available for streaming, using fallback")
+                yield {"type": "token", "text": self._fallback_response(question, context)}
+                yield {"type": "done", "used_fallback": True, "cached": False}
+                return
+        
+            url, headers = target
+            body = json.dumps({
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": question},
+                ],
+                "max_tokens": 2000,
+                "stream": True,
+            }).encode("utf-8")
+            request = urllib.request.Request(
+                url,
+                data=body,
+                headers={**headers, "Content-Type": "application/json", "Accept": "text/event-stream"},
+                method="POST",
+            )
+        
+            parts: List[str] = []
+            call_start = time.perf_counter()
+            # The same end-to-end deadline as non-streaming calls, kept as a local clock:
+            # a context variable set here would leak into the consumer between yields
+            expires_at = time.monotonic() + min(caller.deadline_seconds, remaining_time(caller.deadline_seconds))
             try:
-                logger.info(f"=== ASK THOM ATTEMPT {attempt + 1}/{MAX_RETRIES + 1} ===")
-                logger.info(f"Question: {question[:100]}...")
-                logger.info(f"Context length: {len(context) if context else 0} chars")
-                
-                # Force refresh workspace client on retry
-                if attempt > 0:
-                    self._workspace_client = None
-                
-                w = self._get_workspace_client()
-                if not w:
-                    logger.error("No workspace client available!")
-                    if attempt < MAX_RETRIES:
-                        time.sleep(1)
-                        continue
-                    return self._fallback_response(question, context)
-                
-                system_prompt = FULL_THOM_CONTEXT
-                if context:
-                    system_prompt += f"\n\n### Current Context:\n{context}"
-                
-                logger.info(f"Calling model endpoint: {self.model_endpoint}")
-                logger.info(f"System prompt length: {len(system_prompt)} chars")
-                
-                from databricks.sdk.service.serving import ChatMessage, ChatMessageRole
-                
-                response = w.serving_endpoints.query(
-                    name=self.model_endpoint,
-                    messages=[
-                        ChatMessage(role=ChatMessageRole.SYSTEM, content=system_prompt),
-                        ChatMessage(role=ChatMessageRole.USER, content=question)
-                    ],
-                    max_tokens=2000,
-                )
-                
-                answer = response.choices[0].message.content
-                logger.info(f"=== MODEL SUCCESS === Response: {len(answer)} chars")
-                logger.info(f"Preview: {answer[:200]}...")
-                return answer
-                
+                with get_model_gate().slot(self.model_endpoint, Priority.INTERACTIVE, timeout=expires_at - time.monotonic()):
+                    call.queue_wait_ms = (time.perf_counter() - call_start) * 1000
+                    left = expires_at - time.monotonic()
+                    if left <= 0:
+                        raise DeadlineExceeded(f"{self.model_endpoint} deadline passed while queued")
+                    with urllib.request.urlopen(request, timeout=left) as response:
+                        for raw_line in response:
+                            if time.monotonic() >= expires_at:
+                                raise DeadlineExceeded(f"{self.model_endpoint} stream ran past {caller.deadline_seconds:.0f}s")
+                            line = raw_line.decode("utf-8").strip()
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[len("data:"):].strip()
+                            if data == "[DONE]":
+                                break
+                            chunk = json.loads(data)
+                            choices = chunk.get("choices") or []
+                            delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                            if delta:
+                                parts.append(delta)
+                                yield {"type": "token", "text": delta}
             except Exception as e:
-                logger.error(f"=== MODEL ERROR (attempt {attempt + 1}) ===")
-                logger.error(f"Error: {e}")
-                import traceback
-                logger.error(traceback.format_exc())
-                
-                if attempt < MAX_RETRIES:
-                    time.sleep(1)
-                    continue
-                    
-        logger.error("All attempts failed, using fallback")
-        return self._fallback_response(question, context)
+                settle(False)
+                logger.error(f"=== STREAM ERROR === {e}")
+                if not parts:
+                    yield {"type": "token", "text": self._fallback_response(question, context)}
+                    yield {"type": "done", "used_fallback": True, "cached": False}
+                    return
+                # Keep what was already streamed; it is not cached since it may be truncated
+                yield {"type": "done", "used_fallback": False, "cached": False, "truncated": True}
+                return
+        
+            answer = "".join(parts)
+            if not answer:
+                settle(False)
+                yield {"type": "token", "text": self._fallback_response(question, context)}
+                yield {"type": "done", "used_fallback": True, "cached": False}
+                return
+            settle(True)
+            call.usage(None, None, system_prompt + question, answer)
+            if cache_key:
+                cache.put(cache_key, answer, self.model_endpoint, (time.perf_counter() - call_start) * 1000)
+            yield {"type": "done", "used_fallback": False, "cached": False}
+        finally:
+            # A client that disconnects mid-stream closes this generator with
+            # neither outcome recorded; free the half-open probe slot it holds
+            if not settled:
+                caller.breaker.release()
     
     def _fallback_response(self, question: str, context: Optional[str] = None) -> str:
         """Fallback response when Databricks is unavailable"""
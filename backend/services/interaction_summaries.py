@@ -0,0 +1,251 @@
+"""
+Interaction Summaries
+Precomputed candidate interview summaries keyed by candidate and a hash of the
+interaction set. New interaction_logs rows queue a background refresh that folds
+only the new notes into the previous summary; page views read the stored
+summary instantly together with how fresh it is.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUMMARIES_PATH = os.path.join(tempfile.gettempdir(), "talent_hub_interaction_summaries.sqlite3")
+
+SUMMARY_JOB = "interaction_summary"
+
+# Fields that change what the summary says; anything else (URLs, durations) is ignored
+HASHED_FIELDS = ("interaction_id", "stage", "score", "recommendation", "notes")
+
+
+class NoInteractionsError(ValueError):
+    """The candidate has no interactions to summarize"""
+
+
+def interaction_set_hash(interactions: List[Dict[str, Any]]) -> str:
+    """Order-independent hash of the summarised fields of an interaction set"""
+    rows = sorted(
+        json.dumps({k: i.get(k) for k in HASHED_FIELDS}, sort_keys=True, default=str)
+        for i in interactions
+    )
+    return hashlib.sha256("\n".join(rows).encode("utf-8")).hexdigest()
+
+
+class SummaryStore:
+    """Latest summary per candidate, persisted in SQLite"""
+
+    def __init__(self, path: str = DEFAULT_SUMMARIES_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS interaction_summaries (
+                candidate_id TEXT PRIMARY KEY,
+                interaction_hash TEXT NOT NULL,
+                interaction_ids TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                mode TEXT NOT NULL,
+                incremental_updates INTEGER NOT NULL,
+                prompt_interactions INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+
+    def get(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT candidate_id, interaction_hash, interaction_ids, summary, mode, incremental_updates, "
+                "prompt_interactions, updated_at FROM interaction_summaries WHERE candidate_id = ?",
+                (candidate_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "candidate_id": row[0],
+            "interaction_hash": row[1],
+            "interaction_ids": json.loads(row[2]),
+            "summary": row[3],
+            "mode": row[4],
+            "incremental_updates": row[5],
+            "prompt_interactions": row[6],
+            "updated_at": row[7],
+        }
+
+    def put(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO interaction_summaries (candidate_id, interaction_hash, interaction_ids, "
+                "summary, mode, incremental_updates, prompt_interactions, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record["candidate_id"], record["interaction_hash"], json.dumps(record["interaction_ids"]),
+                    record["summary"], record["mode"], record["incremental_updates"],
+                    record["prompt_interactions"], record["updated_at"],
+                ),
+            )
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM interaction_summaries").fetchone()[0]
+
+
+class InteractionSummaryService:
+    """Keeps interaction summaries current as interview rows arrive"""
+
+    def __init__(self, data_access, llm_service, store: SummaryStore, job_queue, max_incremental: int = 5):
+        self.data_access = data_access
+        self.llm_service = llm_service
+        self.store = store
+        self.job_queue = job_queue
+        # After this many incremental merges the next refresh re-reads the full history to stop drift
+        self.max_incremental = max_incremental
+        self._stats = {"full": 0, "incremental": 0, "unchanged": 0, "prompt_interactions_saved": 0}
+        self._lock = threading.Lock()
+        job_queue.register(SUMMARY_JOB, self._run_job)
+        data_access.subscribe("interaction_logs", self._on_interaction_rows)
+
+    def _interactions(self, candidate_id: str) -> List[Dict[str, Any]]:
+        logs = self.data_access.get_interaction_logs(candidate_id)
+        return logs.where(pd.notna(logs), None).to_dict(orient="records")
+
+    def _candidate_name(self, candidate_id: str) -> Optional[str]:
+        candidates = self.data_access.get_candidates()
+        match = candidates[candidates["candidate_id"] == candidate_id]
+        return None if match.empty else str(match.iloc[0]["name"])
+
+    def _on_interaction_rows(self, rows: pd.DataFrame, version: int) -> None:
+        for candidate_id in rows["candidate_id"].dropna().unique():
+            self.schedule_refresh(str(candidate_id))
+
+    def schedule_refresh(self, candidate_id: str) -> Dict[str, Any]:
+        return self.job_queue.submit(SUMMARY_JOB, {"candidate_id": candidate_id}, dedupe_key=f"summary:{candidate_id}")
+
+    def _run_job(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        record = self.refresh(payload["candidate_id"])
+        return {k: record[k] for k in ("candidate_id", "interaction_hash", "mode", "prompt_interactions")}
+
+    def refresh(self, candidate_id: str, force_full: bool = False) -> Dict[str, Any]:
+        """Bring the stored summary up to date; only new interactions go into the prompt when possible"""
+        interactions = self._interactions(candidate_id)
+        if not interactions:
+            raise NoInteractionsError(f"No interactions for candidate {candidate_id}")
+        current_hash = interaction_set_hash(interactions)
+        previous = self.store.get(candidate_id)
+
+        if previous and previous["interaction_hash"] == current_hash and not force_full:
+            with self._lock:
+                self._stats["unchanged"] += 1
+            return previous
+
+        name = self._candidate_name(candidate_id) or candidate_id
+        ids = [i["interaction_id"] for i in interactions]
+        new_interactions = []
+        if previous and not force_full and previous["incremental_updates"] < self.max_incremental:
+            known = set(previous["interaction_ids"])
+            # Incremental only when rows were added; edited or removed rows need the full history
+            if known.issubset(ids) and interaction_set_hash([i for i in interactions if i["interaction_id"] in known]) == previous["interaction_hash"]:
+                new_interactions = [i for i in interactions if i["interaction_id"] not in known]
+
+        if new_interactions:
+            summary = self.llm_service.update_interaction_summary(
+                previous["summary"], new_interactions, name, all_interactions=interactions
+            )
+            mode, prompt_interactions = "incremental", len(new_interactions)
+            incremental_updates = previous["incremental_updates"] + 1
+        else:
+            summary = self.llm_service.summarize_interactions(interactions, name)
+            mode, prompt_interactions, incremental_updates = "full", len(interactions), 0
+
+        record = {
+            "candidate_id": candidate_id,
+            "interaction_hash": current_hash,
+            "interaction_ids": ids,
+            "summary": summary,
+            "mode": mode,
+            "incremental_updates": incremental_updates,
+            "prompt_interactions": prompt_interactions,
+            "updated_at": time.time(),
+        }
+        self.store.put(record)
+        with self._lock:
+            self._stats[mode] += 1
+            self._stats["prompt_interactions_saved"] += len(interactions) - prompt_interactions
+        logger.info(f"Interaction summary for {candidate_id} refreshed ({mode}, {prompt_interactions} interactions in prompt)")
+        return record
+
+    def get(self, candidate_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Stored summary with freshness. A missing summary is built on the spot; a stale
+        one is returned immediately while a background refresh is queued.
+        """
+        interactions = self._interactions(candidate_id)
+        if not interactions:
+            return None
+        current_hash = interaction_set_hash(interactions)
+        record = self.store.get(candidate_id)
+
+        refresh_job = None
+        if record is None:
+            record = self.refresh(candidate_id)
+            status = "fresh"
+        elif record["interaction_hash"] == current_hash:
+            status = "fresh"
+        else:
+            refresh_job = self.schedule_refresh(candidate_id)
+            status = "stale"
+
+        summarised = set(record["interaction_ids"])
+        return {
+            "summary": record["summary"],
+            "interaction_count": len(interactions),
+            "freshness": {
+                "status": status,
+                "summarized_interactions": len(summarised),
+                "pending_interactions": sum(1 for i in interactions if i["interaction_id"] not in summarised),
+                "mode": record["mode"],
+                "updated_at": datetime.fromtimestamp(record["updated_at"], tz=timezone.utc).isoformat(),
+                "age_seconds": round(time.time() - record["updated_at"], 1),
+                "refresh_job_id": refresh_job["job_id"] if refresh_job else None,
+            },
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        return {**stats, "stored": self.store.count(), "max_incremental": self.max_incremental}
+
+
+# Singleton instance
+_summary_service = None
+
+
+def get_interaction_summary_service() -> InteractionSummaryService:
+    """Get or create the interaction summary service singleton"""
+    global _summary_service
+    if _summary_service is None:
+        from data.data_access import get_data_access
+        from ai.llm_service import get_llm_service
+        from backend.services.jobs import get_job_queue
+
+        _summary_service = InteractionSummaryService(
+            get_data_access(),
+            get_llm_service(),
+            SummaryStore(os.getenv("INTERACTION_SUMMARIES_PATH", DEFAULT_SUMMARIES_PATH)),
+            get_job_queue(),
+            max_incremental=int(os.getenv("INTERACTION_SUMMARY_MAX_INCREMENTAL", "5")),
+        )
+    return _summary_service
@@ -0,0 +1,425 @@
+"""
+Background Jobs
+In-process job queue for slow work such as referral enrichment. Jobs are
+persisted in SQLite, run on a bounded worker pool at background model priority,
+retried with exponential backoff, and deduplicated by key so the same referral
+is never enriched twice concurrently. Callers get a job id back immediately and poll for status.
+
+The table may be shared by several worker processes. A running job holds a
+lease that its process renews while the handler runs; other processes only
+take it over once the lease has expired (its process died).
+"""
+
+import os
+import json
+import socket
+import time
+import uuid
+import random
+import sqlite3
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, List, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOBS_PATH = os.path.join(tempfile.gettempdir(), "talent_hub_jobs.sqlite3")
+
+QUEUED = "queued"
+RUNNING = "running"
+RETRYING = "retrying"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+ACTIVE_STATES = (QUEUED, RUNNING, RETRYING)
+
+DEFAULT_LEASE_SECONDS = 60.0
+
+
+class JobStore:
+    """SQLite job table; survives restarts so unfinished jobs can be picked up again"""
+
+    COLUMNS = (
+        "job_id", "kind", "dedupe_key", "status", "payload", "result", "error",
+        "attempts", "max_attempts", "created_at", "started_at", "finished_at", "next_attempt_at",
+        "owner", "lease_expires_at",
+    )
+
+    def __init__(self, path: str = DEFAULT_JOBS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                dedupe_key TEXT,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                next_attempt_at REAL,
+                owner TEXT,
+                lease_expires_at REAL
+            )
+        """)
+        # Tables created before leases existed
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("lease_expires_at", "REAL")):
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        # Every key a job holds; a job covering many items (a batch) holds one per item
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_keys (
+                dedupe_key TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                PRIMARY KEY (dedupe_key, job_id)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key, status)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)")
+
+    def _to_dict(self, row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _active_holders(self, keys: Sequence[str]) -> Dict[str, str]:
+        """{key: job_id} for the keys held by active jobs (caller holds the lock)"""
+        held: Dict[str, str] = {}
+        for start in range(0, len(keys), 500):  # SQLite caps bound parameters
+            batch = list(keys[start:start + 500])
+            marks = ", ".join("?" * len(batch))
+            # jobs.dedupe_key also covers rows queued before job_keys existed
+            rows = self._conn.execute(
+                f"SELECT k.dedupe_key, j.job_id, j.created_at FROM job_keys k JOIN jobs j ON j.job_id = k.job_id "
+                f"WHERE k.dedupe_key IN ({marks}) AND j.status IN (?, ?, ?) "
+                f"UNION SELECT dedupe_key, job_id, created_at FROM jobs WHERE dedupe_key IN ({marks}) AND status IN (?, ?, ?) "
+                f"ORDER BY 3",
+                (*batch, *ACTIVE_STATES, *batch, *ACTIVE_STATES),
+            ).fetchall()
+            for key, job_id, _ in rows:
+                held.setdefault(key, job_id)
+        return held
+
+    def active_keys(self, keys: Sequence[str]) -> Dict[str, str]:
+        """Which of these dedupe keys an active job already holds: {key: job_id}"""
+        with self._lock:
+            return self._active_holders(keys)
+
+    def insert_unless_active(self, kind: str, payload: Dict[str, Any], dedupe_key: Union[str, Sequence[str], None],
+                             max_attempts: int):
+        """
+        Insert a queued job holding the given dedupe key(s), or return the active job
+        that already holds any of them. Returns (job, created)
+        """
+        keys = [dedupe_key] if isinstance(dedupe_key, str) else list(dedupe_key or [])
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if keys:
+                    held = self._active_holders(keys)
+                    if held:
+                        row = self._conn.execute(
+                            f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE job_id = ?",
+                            (next(iter(held.values())),),
+                        ).fetchone()
+                        self._conn.execute("COMMIT")
+                        return self._to_dict(row), False
+                job_id = uuid.uuid4().hex[:16]
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, kind, dedupe_key, status, payload, max_attempts, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, kind, keys[0] if keys else None, QUEUED, json.dumps(payload, default=str),
+                     max_attempts, time.time()),
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO job_keys (dedupe_key, job_id) VALUES (?, ?)", [(key, job_id) for key in keys]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(job_id), True
+
+    def update(self, job_id: str, **fields) -> None:
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"], default=str)
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def claim(self, job_id: str, attempts: int, owner: str, lease_seconds: float) -> bool:
+        """
+        Mark a job running under owner's lease if no other process has started this
+        attempt and no live process holds it (the store may be shared by workers).
+        Retries are only claimable once their backoff has passed.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, started_at = ?, next_attempt_at = NULL, "
+                "owner = ?, lease_expires_at = ? "
+                "WHERE job_id = ? AND attempts = ? AND ("
+                "status = ? "
+                "OR (status = ? AND (next_attempt_at IS NULL OR next_attempt_at <= ?)) "
+                "OR (status = ? AND (lease_expires_at IS NULL OR lease_expires_at < ?)))",
+                (RUNNING, attempts + 1, now, owner, now + lease_seconds,
+                 job_id, attempts, QUEUED, RETRYING, now, RUNNING, now),
+            )
+        return cursor.rowcount == 1
+
+    def renew(self, job_ids: List[str], owner: str, lease_seconds: float) -> None:
+        """Extend the leases owner holds on running jobs"""
+        if not job_ids:
+            return
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET lease_expires_at = ? WHERE owner = ? AND status = ? "
+                f"AND job_id IN ({', '.join('?' * len(job_ids))})",
+                (time.time() + lease_seconds, owner, RUNNING, *job_ids),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._to_dict(row)
+
+    def list(self, kind: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs {where} ORDER BY created_at DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def unfinished(self, kind: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE kind = ? AND status IN (?, ?, ?) ORDER BY created_at",
+                (kind, *ACTIVE_STATES),
+            ).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+class JobQueue:
+    """Bounded worker pool over a JobStore with per-kind handlers"""
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = 2,
+        max_attempts: int = 3,
+        retry_base_seconds: float = 2.0,
+        retry_max_seconds: float = 60.0,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    ):
+        self.store = store
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._running: set = set()
+        self._heartbeat: Optional[threading.Thread] = None
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        self._timers: Dict[str, threading.Timer] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Register the handler for a job kind and resume its unfinished jobs: queued ones
+        now, retries when their backoff ends, running ones only if their lease expires
+        """
+        self._handlers[kind] = handler
+        for job in self.store.unfinished(kind):
+            delay = self._wait_seconds(job)
+            logger.info(f"Resuming {kind} job {job['job_id']} ({job['status']}) in {delay:.1f}s")
+            if delay > 0:
+                self._schedule(job["job_id"], delay)
+            else:
+                self._dispatch(job["job_id"])
+
+    def submit(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        dedupe_key: Union[str, Sequence[str], None] = None,
+        max_attempts: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Queue a job and return it at once; an active job holding any of its dedupe keys is returned instead"""
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        job, created = self.store.insert_unless_active(kind, payload, dedupe_key, max_attempts or self.max_attempts)
+        if created:
+            self._dispatch(job["job_id"])
+        job["deduplicated"] = not created
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def _dispatch(self, job_id: str) -> None:
+        if not self._closed:
+            self._pool.submit(self._run, job_id)
+
+    def _wait_seconds(self, job: Dict[str, Any]) -> float:
+        """How long until the job may be claimed: retry backoff or another process's lease"""
+        now = time.time()
+        if job["status"] == RETRYING and job["next_attempt_at"]:
+            return max(0.0, job["next_attempt_at"] - now)
+        if job["status"] == RUNNING and job["lease_expires_at"]:
+            return max(0.0, job["lease_expires_at"] - now + 1.0)
+        return 0.0
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempt - 1)))
+
+    def _run(self, job_id: str) -> None:
+        from ai.concurrency import call_priority, Priority
+
+        with self._lock:
+            self._timers.pop(job_id, None)
+        job = self.store.get(job_id)
+        if job is None or job["status"] not in ACTIVE_STATES:
+            return
+        wait = self._wait_seconds(job)
+        if wait > 0:
+            # Not due yet, or another worker holds it: look again when that ends
+            self._schedule(job_id, wait)
+            return
+        if job["status"] == RUNNING and job["attempts"] >= job["max_attempts"]:
+            # Its worker died during the final attempt
+            self.store.update(job_id, status=FAILED, error=job["error"] or "Worker lost during the final attempt",
+                              finished_at=time.time(), lease_expires_at=None)
+            return
+        if not self.store.claim(job_id, job["attempts"], self.owner, self.lease_seconds):
+            return
+        attempt = job["attempts"] + 1
+
+        with self._lock:
+            self._running.add(job_id)
+        self._start_heartbeat()
+        try:
+            with call_priority(Priority.BACKGROUND):
+                result = self._handlers[job["kind"]](job["payload"])
+        except Exception as e:
+            if attempt < job["max_attempts"]:
+                delay = self._backoff(attempt)
+                logger.warning(f"Job {job_id} ({job['kind']}) attempt {attempt} failed, retrying in {delay:.1f}s: {e}")
+                self.store.update(job_id, status=RETRYING, error=str(e), next_attempt_at=time.time() + delay,
+                                  lease_expires_at=None)
+                self._schedule(job_id, delay)
+            else:
+                logger.error(f"Job {job_id} ({job['kind']}) failed after {attempt} attempts: {e}")
+                self.store.update(job_id, status=FAILED, error=str(e), finished_at=time.time(), lease_expires_at=None)
+            return
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+        self.store.update(job_id, status=SUCCEEDED, result=result, error=None, finished_at=time.time(),
+                          lease_expires_at=None)
+
+    def _start_heartbeat(self) -> None:
+        with self._lock:
+            if self._heartbeat is not None:
+                return
+            self._heartbeat = threading.Thread(target=self._renew_leases, name="job-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def _renew_leases(self) -> None:
+        """Keep this process's running jobs leased so other workers leave them alone"""
+        while not self._closed:
+            time.sleep(self.lease_seconds / 3)
+            with self._lock:
+                running = list(self._running)
+            try:
+                self.store.renew(running, self.owner, self.lease_seconds)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not renew job leases: {e}")
+
+    def _schedule(self, job_id: str, delay: float) -> None:
+        timer = threading.Timer(delay, self._dispatch, args=(job_id,))
+        timer.daemon = True
+        with self._lock:
+            self._timers[job_id] = timer
+        timer.start()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waiting_retry = len(self._timers)
+        return {
+            "workers": self.workers,
+            "owner": self.owner,
+            "running_here": len(self._running),
+            "kinds": sorted(self._handlers),
+            "waiting_retry": waiting_retry,
+            "by_status": self.store.counts(),
+            "path": self.store.path,
+        }
+
+    def shutdown(self) -> None:
+        """Stop accepting work; queued and retrying jobs stay in the table and resume on next start"""
+        self._closed = True
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Singleton instance
+_job_queue = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get or create the job queue singleton"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(
+            JobStore(os.getenv("JOBS_DB_PATH", DEFAULT_JOBS_PATH)),
+            workers=int(os.getenv("JOB_WORKERS", "2")),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+            retry_base_seconds=float(os.getenv("JOB_RETRY_BASE_SECONDS", "2")),
+            lease_seconds=float(os.getenv("JOB_LEASE_SECONDS", str(DEFAULT_LEASE_SECONDS))),
+        )
+    return _job_queue
+
+
+def shutdown_job_queue() -> None:
+    if _job_queue is not None:
+        _job_queue.shutdown()
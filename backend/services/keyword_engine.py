@@ -0,0 +1,356 @@
+"""
+Keyword Engine
+Every Thomas, IFS and data-source term, compiled once per process. A complete
+answer is matched with C-level substring search (keywords and sources) and one
+compiled regex (whole-word spans for the frontend). Streamed answers go through
+an Aho-Corasick scanner that keeps its state between feeds, so each delta is
+matched incrementally without rescanning earlier text.
+"""
+
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+# Answer terms that attribute an Ask Thom answer to a data source (matched case-insensitively)
+SOURCE_TERMS = {
+    "Thomas PPA Assessment": ["ppa", "disc", "dominance", "influence", "steadiness", "compliance"],
+    "Thomas GIA Assessment": ["gia", "intelligence", "cognitive"],
+    "Thomas HPTI Assessment": ["hpti", "leadership", "conscientiousness", "adjustment"],
+    "Thomas Connect": ["chemistry", "team", "collaboration"],
+    "IFS Cloud Platform": ["ifs", "erp", "eam", "fsm", "cloud"],
+    "Thomas Engage": ["churn", "retention", "engagement"],
+}
+
+DEFAULT_SOURCES = ("Thomas Insights", "Application Knowledge Base")
+
+# Product keywords that are also everyday words; they only count through the case-sensitive trait list
+COMMON_WORD_KEYWORDS = frozenset({"engage", "influence", "adjustment"})
+
+THOMAS = "thomas"
+IFS = "ifs"
+SOURCE = "source"
+
+
+def _fold(ch: str) -> str:
+    """Lower-case one character without changing the text length (keeps spans aligned)"""
+    lowered = ch.lower()
+    return lowered if len(lowered) == 1 else ch
+
+
+def fold_text(text: str) -> str:
+    lowered = text.lower()
+    return lowered if len(lowered) == len(text) else "".join(_fold(ch) for ch in text)
+
+
+def _is_word_char(ch: Optional[str]) -> bool:
+    return ch is not None and (ch.isalnum() or ch == "_")
+
+
+@dataclass(frozen=True)
+class Pattern:
+    term: str            # As reported (original casing)
+    category: str        # thomas / ifs / source
+    label: str           # Keyword for thomas/ifs, source name for source terms
+    case_sensitive: bool
+
+
+class AhoCorasick:
+    """Multi-pattern automaton over case-folded text"""
+
+    def __init__(self, patterns: Sequence[Pattern]):
+        self.patterns = list(patterns)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self.out: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for ch in pattern.term:
+                ch = _fold(ch)
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self.out.append([])
+                node = nxt
+            self.out[node].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self.out[child] = self.out[child] + self.out[self._fail[child]]
+
+        self.max_length = max((len(p.term) for p in self.patterns), default=0)
+
+        # Fold failure links into a full transition table so each character is one dict lookup
+        self.delta: List[Dict[str, int]] = [dict(self._goto[0])] + [{} for _ in self._goto[1:]]
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            table = dict(self.delta[self._fail[node]])
+            table.update(self._goto[node])
+            self.delta[node] = table
+            queue.extend(self._goto[node].values())
+
+    def step(self, node: int, ch: str) -> int:
+        return self.delta[node].get(ch, 0)
+
+    def outputs(self, node: int) -> List[int]:
+        return self.out[node]
+
+
+class KeywordScanner:
+    """
+    Incremental matcher over a growing text. Keyword and source hits are reported
+    the first time they appear; whole-word spans are emitted once the character
+    after the match is known (or at finish()).
+    """
+
+    def __init__(self, engine: "KeywordEngine"):
+        self.engine = engine
+        self.text = ""
+        self.thomas_keywords: List[str] = []
+        self.ifs_keywords: List[str] = []
+        self._sources_seen: set = set()
+        self.spans: List[Dict[str, Any]] = []
+        self._node = 0
+        self._pending_spans: List[Tuple[int, int, int]] = []  # (start, end, pattern index)
+        self._last_span_end = 0
+
+    @property
+    def sources(self) -> List[str]:
+        """Referenced sources in SOURCE_TERMS order"""
+        return [source for source in SOURCE_TERMS if source in self._sources_seen]
+
+    def feed(self, delta: str) -> Dict[str, List]:
+        automaton = self.engine.automaton
+        patterns = automaton.patterns
+        offset = len(self.text)
+        self.text += delta
+        text = self.text
+
+        new_thomas, new_ifs, new_sources = [], [], []
+        delta_table = automaton.delta
+        outputs = automaton.out
+        node = self._node
+        for i, ch in enumerate(fold_text(delta), offset):
+            node = delta_table[node].get(ch, 0)
+            if not outputs[node]:
+                continue
+            for index in outputs[node]:
+                pattern = patterns[index]
+                start = i + 1 - len(pattern.term)
+                if pattern.case_sensitive and text[start:i + 1] != pattern.term:
+                    continue
+                if pattern.category == SOURCE:
+                    if pattern.label not in self._sources_seen:
+                        self._sources_seen.add(pattern.label)
+                        new_sources.append(pattern.label)
+                    continue
+                found, new = (self.thomas_keywords, new_thomas) if pattern.category == THOMAS else (self.ifs_keywords, new_ifs)
+                if pattern.label not in found:
+                    found.append(pattern.label)
+                    new.append(pattern.label)
+                if not _is_word_char(text[start - 1] if start > 0 else None):
+                    self._pending_spans.append((start, i + 1, index))
+        self._node = node
+
+        return {
+            "thomas_keywords": new_thomas,
+            "ifs_keywords": new_ifs,
+            "sources": new_sources,
+            "spans": self._settle_spans(final=False),
+        }
+
+    def _settle_spans(self, final: bool) -> List[Dict[str, Any]]:
+        """
+        Resolve candidate spans whose right boundary is known into non-overlapping,
+        leftmost-longest whole-word spans.
+        """
+        text = self.text
+        horizon = len(text) if final else len(text) - self.engine.automaton.max_length
+        settled, waiting = [], []
+        for start, end, index in self._pending_spans:
+            if end == len(text) and not final:
+                waiting.append((start, end, index))
+            elif start > horizon:
+                waiting.append((start, end, index))
+            elif not _is_word_char(text[end] if end < len(text) else None):
+                settled.append((start, end, index))
+        self._pending_spans = waiting
+
+        emitted = []
+        for start, end, index in sorted(settled, key=lambda s: (s[0], -(s[1] - s[0]))):
+            if start < self._last_span_end:
+                continue
+            pattern = self.engine.automaton.patterns[index]
+            span = {"start": start, "end": end, "keyword": pattern.label, "category": pattern.category}
+            self.spans.append(span)
+            emitted.append(span)
+            self._last_span_end = end
+        return emitted
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Flush spans still waiting on their right boundary"""
+        return self._settle_spans(final=True)
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "thomas_keywords": list(self.thomas_keywords),
+            "ifs_keywords": list(self.ifs_keywords),
+            "sources": self.sources,
+            "spans": list(self.spans),
+        }
+
+
+class KeywordEngine:
+    """Precompiled Thomas / IFS / source terms: search tables for whole texts, an automaton for streams"""
+
+    def __init__(
+        self,
+        thomas_keywords: Sequence[str],
+        thomas_traits: Sequence[str],
+        ifs_keywords: Sequence[str],
+        source_terms: Optional[Dict[str, Sequence[str]]] = None,
+    ):
+        patterns = [
+            Pattern(k, THOMAS, k, case_sensitive=False)
+            for k in thomas_keywords if k.lower() not in COMMON_WORD_KEYWORDS
+        ]
+        # Traits only count when capitalised ("Influence", not "influence")
+        patterns += [Pattern(t, THOMAS, t, case_sensitive=True) for t in thomas_traits]
+        patterns += [Pattern(k, IFS, k, case_sensitive=False) for k in ifs_keywords]
+        for source, terms in (SOURCE_TERMS if source_terms is None else source_terms).items():
+            patterns += [Pattern(t, SOURCE, source, case_sensitive=False) for t in terms]
+        self.automaton = AhoCorasick(patterns)
+
+        # Each distinct folded keyword once, with the patterns it stands for; source terms by source
+        by_term: Dict[str, List[int]] = {}
+        self._source_terms: Dict[str, List[str]] = {}
+        for index, pattern in enumerate(patterns):
+            if pattern.category == SOURCE:
+                self._source_terms.setdefault(pattern.label, []).append(fold_text(pattern.term))
+            else:
+                by_term.setdefault(fold_text(pattern.term), []).append(index)
+        self._keyword_terms = [
+            (
+                term,
+                len(term),
+                [i for i in indices if not patterns[i].case_sensitive],
+                [(i, patterns[i].term) for i in indices if patterns[i].case_sensitive],
+            )
+            for term, indices in by_term.items()
+        ]
+
+        # Whole-word spans: longest alternative first, so each match is the leftmost-longest term
+        self._span_indices = by_term
+        self._span_regex = self._word_regex(self._span_indices)
+        self._span_regex_insensitive = self._word_regex(
+            [term for term, indices in self._span_indices.items() if any(not patterns[i].case_sensitive for i in indices)]
+        )
+
+    @staticmethod
+    def _word_regex(terms: Sequence[str]) -> "re.Pattern":
+        alternatives = "|".join(re.escape(term) for term in sorted(terms, key=lambda t: (-len(t), t)))
+        return re.compile(rf"(?<!\w)(?:{alternatives or '(?!)'})(?!\w)")
+
+    def scanner(self) -> KeywordScanner:
+        return KeywordScanner(self)
+
+    def keywords(self, text: str) -> Dict[str, List[str]]:
+        """Thomas and IFS keywords in a complete text, in order of first appearance"""
+        patterns = self.automaton.patterns
+        folded = fold_text(text)
+        first = []
+        for term, length, insensitive, case_sensitive in self._keyword_terms:
+            position = folded.find(term)
+            if position < 0:
+                continue
+            for index in insensitive:
+                first.append((position + length, -length, index))
+            for index, original in case_sensitive:
+                # An exact-case occurrence cannot come before the first folded one
+                start = text.find(original, position)
+                if start >= 0:
+                    first.append((start + length, -length, index))
+
+        thomas, ifs = [], []
+        for _, _, index in sorted(first):
+            pattern = patterns[index]
+            found = thomas if pattern.category == THOMAS else ifs
+            if pattern.label not in found:
+                found.append(pattern.label)
+        return {"thomas_keywords": thomas, "ifs_keywords": ifs}
+
+    def sources(self, text: str) -> List[str]:
+        """Data sources a complete text references, in SOURCE_TERMS order"""
+        folded = fold_text(text)
+        return [source for source, terms in self._source_terms.items() if any(term in folded for term in terms)]
+
+    def scan(self, text: str) -> Dict[str, Any]:
+        """Keywords, sources and whole-word spans for a complete text (what a scanner reports for it)"""
+        return {**self.keywords(text), "sources": self.sources(text), "spans": self.spans(text)}
+
+    def _span_pattern(self, text: str, term: str, start: int) -> Optional[int]:
+        """First pattern for a folded match that also holds in the original casing"""
+        for index in self._span_indices[term]:
+            pattern = self.automaton.patterns[index]
+            if not pattern.case_sensitive or text[start:start + len(term)] == pattern.term:
+                return index
+        return None
+
+    def spans(self, text: str) -> List[Dict[str, Any]]:
+        """Non-overlapping, leftmost-longest whole-word keyword spans in a complete text"""
+        patterns = self.automaton.patterns
+        folded = fold_text(text)
+        spans = []
+        position = 0
+        while True:
+            match = self._span_regex.search(folded, position)
+            if match is None:
+                break
+            start = match.start()
+            index = self._span_pattern(text, match.group(), start)
+            if index is None:
+                # Wrong case for a case-sensitive term; fall back to case-insensitive terms at the same start
+                match = self._span_regex_insensitive.match(folded, start)
+                if match is None:
+                    position = start + 1
+                    continue
+                index = self._span_pattern(text, match.group(), start)
+            pattern = patterns[index]
+            spans.append({"start": start, "end": match.end(), "keyword": pattern.label, "category": pattern.category})
+            position = match.end()
+        return spans
+
+
+# Singleton instance
+_keyword_engine = None
+_keyword_engine_lock = threading.Lock()
+
+
+def get_keyword_engine() -> KeywordEngine:
+    """Get or create the keyword engine singleton"""
+    global _keyword_engine
+    if _keyword_engine is None:
+        with _keyword_engine_lock:
+            if _keyword_engine is None:
+                from backend.services.databricks_ai import get_thomas_keywords, get_ifs_keywords
+                try:
+                    from backend.services.databricks_ai import get_thomas_trait_keywords
+                    traits = get_thomas_trait_keywords()
+                except ImportError:
+                    traits = ["Dominance", "Influence", "Steadiness", "Compliance"]
+                _keyword_engine = KeywordEngine(get_thomas_keywords(), traits, get_ifs_keywords())
+    return _keyword_engine
@@ -0,0 +1,387 @@
+"""
+Metrics Registry
+One registry for the process, exposed at /api/system/metrics in Prometheus text
+format. HTTP traffic is recorded by an ASGI middleware: request counts by
+status and latency and response size histograms keyed by route template, plus
+in-flight requests. Everything else (LLM cache, model serving slots, circuit
+breakers, model call telemetry, background jobs, summary refreshes) is read
+from the subsystems' own stats at scrape time, so the hot path only pays for
+the HTTP bookkeeping.
+"""
+
+import time
+import logging
+import threading
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "talent_hub"
+
+# Upper bounds (ms) of the HTTP latency buckets; finer at the low end than the model call buckets
+HTTP_LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+# Upper bounds (bytes) of the response size buckets
+RESPONSE_SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Route label for requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(round(float(value), 6))
+
+
+class MetricFamily:
+    """All samples of one metric name, rendered as a Prometheus text block"""
+
+    def __init__(self, name: str, kind: str, help_text: str):
+        self.name = f"{NAMESPACE}_{name}"
+        self.kind = kind  # counter / gauge / histogram
+        self.help = help_text
+        self.samples: List[Tuple[str, Dict[str, Any], float]] = []
+
+    def add(self, value: Optional[float], **labels) -> "MetricFamily":
+        if value is not None:
+            self.samples.append((self.name, labels, value))
+        return self
+
+    def add_histogram(self, snapshot: Dict[str, Any], scale: float = 1.0, **labels) -> "MetricFamily":
+        """Add a Histogram.snapshot() (cumulative buckets); scale converts units, e.g. 0.001 for ms -> s"""
+        for bound, count in snapshot["buckets"]:
+            le = "+Inf" if bound == "+Inf" else _format_value(bound * scale)
+            self.samples.append((f"{self.name}_bucket", {**labels, "le": le}, count))
+        self.samples.append((f"{self.name}_sum", labels, round(snapshot["sum"] * scale, 6)))
+        self.samples.append((f"{self.name}_count", labels, snapshot["count"]))
+        return self
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for name, labels, value in self.samples:
+            label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if label_text else f"{name} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class _RouteSeries:
+    """HTTP aggregates for one (method, route) pair"""
+
+    def __init__(self, histogram_cls):
+        self.exceptions = 0
+        self.by_status: Dict[int, int] = {}
+        self.latency = histogram_cls(HTTP_LATENCY_BUCKETS_MS)
+        self.size = histogram_cls(RESPONSE_SIZE_BUCKETS)
+
+
+class MetricsRegistry:
+    """HTTP request metrics plus collectors that publish other subsystems' stats"""
+
+    def __init__(self):
+        from ai.telemetry import Histogram
+
+        self._histogram_cls = Histogram
+        self._routes: Dict[Tuple[str, str], _RouteSeries] = {}
+        # The route is only known once routing has run, so in-flight requests are counted by method
+        self._in_flight: Dict[str, int] = {}
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+    def register_collector(self, name: str, collector: Collector) -> None:
+        """Add (or replace) a callable returning MetricFamily objects, run on every scrape"""
+        with self._lock:
+            self._collectors[name] = collector
+
+    # ------------------------------------------------------------------
+    # HTTP bookkeeping (called from the middleware)
+    # ------------------------------------------------------------------
+
+    def request_started(self, method: str) -> None:
+        with self._lock:
+            self._in_flight[method] = self._in_flight.get(method, 0) + 1
+
+    def request_finished(self, method: str, route: str, status: int, latency_ms: float, size: int, exception: bool = False) -> None:
+        with self._lock:
+            self._in_flight[method] -= 1
+            series = self._routes.get((method, route))
+            if series is None:
+                series = self._routes[(method, route)] = _RouteSeries(self._histogram_cls)
+            series.by_status[status] = series.by_status.get(status, 0) + 1
+            series.exceptions += exception
+            series.latency.observe(latency_ms)
+            series.size.observe(size)
+
+    def _http_families(self) -> List[MetricFamily]:
+        requests = MetricFamily("http_requests_total", "counter", "HTTP requests by route template and status code")
+        exceptions = MetricFamily("http_request_exceptions_total", "counter", "Requests that raised an unhandled exception")
+        in_flight = MetricFamily("http_requests_in_flight", "gauge", "Requests currently being served, by method")
+        latency = MetricFamily("http_request_duration_seconds", "histogram", "Time to the end of the response body")
+        size = MetricFamily("http_response_size_bytes", "histogram", "Response body size")
+        with self._lock:
+            for method, count in sorted(self._in_flight.items()):
+                in_flight.add(count, method=method)
+            for (method, route), s in sorted(self._routes.items()):
+                for status, count in sorted(s.by_status.items()):
+                    requests.add(count, method=method, route=route, status=status)
+                if s.exceptions:
+                    exceptions.add(s.exceptions, method=method, route=route)
+                if s.latency.count:
+                    latency.add_histogram(s.latency.snapshot(), scale=0.001, method=method, route=route)
+                    size.add_histogram(s.size.snapshot(), method=method, route=route)
+        return [requests, exceptions, in_flight, latency, size]
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def collect(self) -> List[MetricFamily]:
+        families = [
+            MetricFamily("uptime_seconds", "gauge", "Seconds since the metrics registry was created").add(time.time() - self._started),
+            *self._http_families(),
+        ]
+        with self._lock:
+            collectors = list(self._collectors.items())
+        for name, collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                # A failing subsystem must not take the whole scrape down
+                logger.warning(f"Metrics collector {name} failed: {e}")
+        return families
+
+    def render(self) -> str:
+        return "\n".join(family.render() for family in self.collect() if family.samples) + "\n"
+
+    def reset(self) -> None:
+        """Drop the HTTP aggregates (in-flight counts are kept so they stay balanced)"""
+        with self._lock:
+            self._routes.clear()
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+def route_template(scope) -> str:
+    """Template of the route that served a request, e.g. /api/recruitment/roles/{role_id}"""
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return UNMATCHED_ROUTE
+    if ":path}" in template:
+        return template
+    # Newer FastAPI versions report routes of an included router relative to its
+    # prefix; the prefix is then the leading segments of the request path
+    path_segments = [part for part in scope["path"].split("/") if part]
+    extra = len(path_segments) - len([part for part in template.split("/") if part])
+    if extra <= 0:
+        return template
+    return "/" + "/".join(path_segments[:extra]) + template
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no response buffering) recording per-route HTTP metrics"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = get_metrics()
+        method = scope["method"]
+        registry.request_started(method)
+        started = time.perf_counter()
+        response = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        exception = False
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            exception = True
+            raise
+        finally:
+            # Routing stores the matched route in the (shared) scope
+            registry.request_finished(
+                method, route_template(scope), response["status"],
+                (time.perf_counter() - started) * 1000, response["size"], exception,
+            )
+
+
+# ============================================================================
+# SUBSYSTEM COLLECTORS
+# ============================================================================
+# Each reads an existing singleton only; scraping never creates a subsystem.
+
+def _collect_response_cache() -> List[MetricFamily]:
+    from ai import response_cache
+
+    cache = response_cache._response_cache
+    if cache is None:
+        return []
+    stats = cache.stats()
+    hits = MetricFamily("llm_cache_hits_total", "counter", "LLM response cache hits")
+    misses = MetricFamily("llm_cache_misses_total", "counter", "LLM response cache misses")
+    ratio = MetricFamily("llm_cache_hit_ratio", "gauge", "LLM response cache hits / lookups")
+    saved = MetricFamily("llm_cache_latency_saved_seconds_total", "counter", "Model latency avoided by cache hits")
+    for endpoint, s in sorted(stats["endpoints"].items()):
+        hits.add(s["hits"], endpoint=endpoint)
+        misses.add(s["misses"], endpoint=endpoint)
+        ratio.add(s["hit_rate"], endpoint=endpoint)
+        saved.add(s["latency_saved_ms"] / 1000, endpoint=endpoint)
+    return [
+        hits, misses, ratio, saved,
+        MetricFamily("llm_cache_entries", "gauge", "Entries in the LLM response cache").add(stats["entries"]),
+        MetricFamily("llm_cache_bytes", "gauge", "Bytes stored in the LLM response cache").add(stats["bytes"]),
+        MetricFamily("llm_cache_evictions_total", "counter", "LLM response cache evictions").add(stats["evictions"]),
+    ]
+
+
+def _collect_model_gate() -> List[MetricFamily]:
+    from ai import concurrency
+
+    gate = concurrency._model_gate
+    if gate is None:
+        return []
+    stats = gate.stats()
+    limit = MetricFamily("model_slots_limit", "gauge", "Concurrent model serving calls allowed")
+    active = MetricFamily("model_slots_active", "gauge", "Model serving calls in progress")
+    utilization = MetricFamily("model_slot_utilization", "gauge", "Model serving slots in use / limit")
+    waiting = MetricFamily("model_callers_waiting", "gauge", "Callers queued for a model serving slot")
+    for endpoint, s in sorted(stats["endpoints"].items()):
+        limit.add(s["limit"], endpoint=endpoint)
+        active.add(s["active"], endpoint=endpoint)
+        utilization.add(s["active"] / s["limit"] if s["limit"] else None, endpoint=endpoint)
+        for priority, count in s["waiting"].items():
+            waiting.add(count, endpoint=endpoint, priority=priority)
+    return [
+        limit, active, utilization, waiting,
+        MetricFamily("model_calls_coalesced_total", "counter", "Identical model calls served by another in-flight call")
+        .add(stats["coalesced"]),
+    ]
+
+
+def _collect_resilience() -> List[MetricFamily]:
+    from ai import resilience
+
+    registry = resilience._resilience
+    if registry is None:
+        return []
+    circuit_open = MetricFamily("model_circuit_open", "gauge", "1 while the endpoint's circuit breaker is open")
+    events = MetricFamily("model_resilience_events_total", "counter", "Retries, hedges, fallbacks and deadline expiries")
+    breaker = MetricFamily("model_breaker_events_total", "counter", "Circuit breaker outcomes")
+    for endpoint, s in sorted(registry.stats().items()):
+        circuit_open.add(s["breaker"]["state"] == resilience.OPEN, endpoint=endpoint)
+        for event in ("calls", "retries", "hedged", "hedge_wins", "fallbacks", "deadline_exceeded"):
+            events.add(s[event], endpoint=endpoint, event=event)
+        for event in ("successes", "failures", "rejected", "opened"):
+            breaker.add(s["breaker"][event], endpoint=endpoint, event=event)
+    return [circuit_open, events, breaker]
+
+
+def _collect_model_telemetry() -> List[MetricFamily]:
+    from ai import telemetry
+
+    if telemetry._telemetry is None:
+        return []
+    calls = MetricFamily("model_calls_total", "counter", "Model calls by outcome")
+    tokens = MetricFamily("model_tokens_total", "counter", "Prompt and completion tokens")
+    cost = MetricFamily("model_cost_total", "counter", "Estimated model cost (MODEL_TOKEN_PRICES units)")
+    latency = MetricFamily("model_call_duration_seconds", "histogram", "Model call latency as seen by the caller")
+    ttfb = MetricFamily("model_call_ttfb_seconds", "histogram", "Model call time to first byte")
+    queue_wait = MetricFamily("model_call_queue_wait_seconds", "histogram", "Time waiting for a model serving slot")
+    for s in telemetry._telemetry.series():
+        labels = {"endpoint": s["endpoint"], "feature": s["feature"]}
+        for outcome in ("calls", "errors", "fallbacks", "cache_hits"):
+            calls.add(s[outcome], outcome=outcome, **labels)
+        tokens.add(s["prompt_tokens"], kind="prompt", **labels)
+        tokens.add(s["completion_tokens"], kind="completion", **labels)
+        cost.add(s["cost"], **labels)
+        latency.add_histogram(s["latency_ms"], scale=0.001, **labels)
+        if s["ttfb_ms"]["count"]:
+            ttfb.add_histogram(s["ttfb_ms"], scale=0.001, **labels)
+        if s["queue_wait_ms"]["count"]:
+            queue_wait.add_histogram(s["queue_wait_ms"], scale=0.001, **labels)
+    return [calls, tokens, cost, latency, ttfb, queue_wait]
+
+
+def _collect_jobs() -> List[MetricFamily]:
+    from backend.services import jobs
+
+    queue = jobs._job_queue
+    if queue is None:
+        return []
+    stats = queue.stats()
+    by_status = MetricFamily("jobs", "gauge", "Background jobs in the job table by status")
+    for status in (jobs.QUEUED, jobs.RUNNING, jobs.RETRYING, jobs.SUCCEEDED, jobs.FAILED):
+        by_status.add(stats["by_status"].get(status, 0), status=status)
+    running = stats["by_status"].get(jobs.RUNNING, 0)
+    return [
+        by_status,
+        MetricFamily("job_queue_depth", "gauge", "Jobs queued or waiting to retry")
+        .add(stats["by_status"].get(jobs.QUEUED, 0) + stats["by_status"].get(jobs.RETRYING, 0)),
+        MetricFamily("job_workers", "gauge", "Job worker threads in this process").add(stats["workers"]),
+        MetricFamily("job_worker_utilization", "gauge", "Running jobs / worker threads (all processes sharing the table)")
+        .add(running / stats["workers"] if stats["workers"] else None),
+    ]
+
+
+def _collect_interaction_summaries() -> List[MetricFamily]:
+    from backend.services import interaction_summaries
+
+    service = interaction_summaries._summary_service
+    if service is None:
+        return []
+    stats = service.stats()
+    refreshes = MetricFamily("interaction_summary_refreshes_total", "counter", "Summary refreshes by mode (unchanged = reused)")
+    for mode in ("full", "incremental", "unchanged"):
+        refreshes.add(stats[mode], mode=mode)
+    return [refreshes]
+
+
+DEFAULT_COLLECTORS = {
+    "llm-cache": _collect_response_cache,
+    "model-gate": _collect_model_gate,
+    "model-resilience": _collect_resilience,
+    "model-telemetry": _collect_model_telemetry,
+    "jobs": _collect_jobs,
+    "interaction-summaries": _collect_interaction_summaries,
+}
+
+
+# Singleton instance
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get or create the metrics registry singleton"""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                registry = MetricsRegistry()
+                for name, collector in DEFAULT_COLLECTORS.items():
+                    registry.register_collector(name, collector)
+                _metrics = registry
+    return _metrics
@@ -0,0 +1,267 @@
+"""
+Sampling Profiler
+Low-overhead, opt-in profiling for production: a background thread samples the
+Python call stacks of every thread at a fixed rate, so nothing is instrumented
+and requests that are not being profiled pay nothing.
+
+Two ways in:
+- per request: send "X-Profile: 1" (or add ?profile=1); the response carries an
+  X-Profile-Id header and the profile is fetched from /api/system/profiles/{id}
+- for a time window: POST /api/system/profile?seconds=10 samples all requests
+
+Profiles export as collapsed stacks (flamegraph.pl, speedscope, inferno) or as
+speedscope JSON. A request profile covers every busy thread while the request
+runs, so concurrent requests show up in it too; stacks are grouped per thread.
+"""
+
+import os
+import sys
+import time
+import uuid
+import sysconfig
+import threading
+from collections import Counter, deque
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+# Sampling intervals: fine for single requests, coarser for long windows
+REQUEST_INTERVAL_SECONDS = 0.001
+DEFAULT_INTERVAL_SECONDS = 0.01
+MAX_STACK_DEPTH = 200
+
+# Leaf frames of threads that are blocked waiting for work (dropped unless include_idle)
+IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),  # concurrent.futures worker blocked on its work queue
+}
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_STDLIB = sysconfig.get_paths()["stdlib"]
+
+CodeKey = Tuple[str, str, int]  # (filename, function, first line)
+
+
+def _short_path(filename: str) -> str:
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    if filename.startswith(_ROOT + os.sep):
+        return os.path.relpath(filename, _ROOT)
+    if filename.startswith(_STDLIB + os.sep):
+        return os.path.relpath(filename, _STDLIB)
+    return filename
+
+
+class Profile:
+    """Aggregated stack samples: {(thread name, root-to-leaf code keys): count}"""
+
+    def __init__(self, label: str, interval: float):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.interval = interval
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.samples = 0  # sampling ticks; each tick records one stack per busy thread
+        self.stacks: Counter = Counter()
+        self._names: Dict[CodeKey, str] = {}
+
+    @property
+    def tick_seconds(self) -> float:
+        """Measured time per tick; longer than the interval when the sampler waits for the GIL"""
+        return self.duration / self.samples if self.samples and self.duration else self.interval
+
+    def frame_name(self, code: CodeKey) -> str:
+        name = self._names.get(code)
+        if name is None:
+            filename, function, line = code
+            name = self._names[code] = f"{function} ({_short_path(filename)}:{line})"
+        return name
+
+    def collapsed(self) -> str:
+        """One "thread;root;...;leaf count" line per distinct stack (Brendan Gregg's folded format)"""
+        lines = [
+            ";".join([thread, *(self.frame_name(code) for code in stack)]) + f" {count}"
+            for (thread, stack), count in self.stacks.most_common()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> Dict[str, Any]:
+        """speedscope file format: one sampled profile per thread, weights in seconds"""
+        frames: List[Dict[str, Any]] = []
+        frame_index: Dict[CodeKey, int] = {}
+        by_thread: Dict[str, Dict[str, list]] = {}
+        for (thread, stack), count in self.stacks.items():
+            indexes = []
+            for code in stack:
+                if code not in frame_index:
+                    frame_index[code] = len(frames)
+                    frames.append({"name": code[1], "file": _short_path(code[0]), "line": code[2]})
+                indexes.append(frame_index[code])
+            profile = by_thread.setdefault(thread, {"samples": [], "weights": []})
+            profile["samples"].append(indexes)
+            profile["weights"].append(round(count * self.tick_seconds, 6))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.label,
+            "exporter": "talent-hub-profiler",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": round(sum(profile["weights"]), 6),
+                    "samples": profile["samples"],
+                    "weights": profile["weights"],
+                }
+                for thread, profile in sorted(by_thread.items())
+            ],
+        }
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """Metadata plus the functions with the most samples at the top of the stack"""
+        self_counts: Counter = Counter()
+        for (_, stack), count in self.stacks.items():
+            if stack:
+                self_counts[stack[-1]] += count
+        total = sum(self_counts.values())
+        return {
+            "id": self.id,
+            "label": self.label,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 1),
+            "interval_ms": self.interval * 1000,
+            "tick_ms": round(self.tick_seconds * 1000, 2),
+            "ticks": self.samples,
+            "thread_samples": total,
+            "distinct_stacks": len(self.stacks),
+            "top_self": [
+                {"frame": self.frame_name(code), "samples": count, "share": round(count / total, 3)}
+                for code, count in self_counts.most_common(top)
+            ],
+        }
+
+
+class SamplingProfiler:
+    """Samples all threads' stacks from a daemon thread until stopped"""
+
+    def __init__(self, label: str, interval: float = DEFAULT_INTERVAL_SECONDS, include_idle: bool = False):
+        self.profile = Profile(label, interval)
+        self.include_idle = include_idle
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.profile.id}", daemon=True)
+
+    def start(self) -> "SamplingProfiler":
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        self._thread.join()
+        self.profile.duration = time.perf_counter() - self._started
+        return self.profile
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.profile.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, str(ident))
+                if ident == own or name.startswith("profiler-"):
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_name, code.co_firstlineno))
+                    frame = frame.f_back
+                if not self.include_idle and (os.path.basename(stack[0][0]), stack[0][1]) in IDLE_LEAVES:
+                    continue
+                stack.reverse()
+                self.profile.stacks[(name, tuple(stack))] += 1
+            self.profile.samples += 1
+
+
+class ProfileStore:
+    """The most recent profiles, kept in memory for retrieval by id"""
+
+    def __init__(self, max_profiles: int = 20):
+        self._profiles: deque = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            profiles = list(self._profiles)
+        return [p.summary(top=3) for p in reversed(profiles)]
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+def _profiling_requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value.lower() in (b"1", b"true", b"yes")
+    query = scope.get("query_string", b"")
+    if b"profile=" in query:
+        return parse_qs(query.decode("latin-1")).get("profile", [""])[0].lower() in ("1", "true", "yes")
+    return False
+
+
+class ProfilingMiddleware:
+    """Profiles requests flagged with "X-Profile: 1" or ?profile=1 and tags the response with X-Profile-Id"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _profiling_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope['method']} {scope['path']}"
+        profiler = SamplingProfiler(label, interval=REQUEST_INTERVAL_SECONDS).start()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profiler.profile.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            get_profile_store().add(profiler.stop())
+
+
+# Only one profiling window at a time
+profile_window_lock = threading.Lock()
+
+# Singleton instance
+_profile_store = None
+
+
+def get_profile_store() -> ProfileStore:
+    """Get or create the profile store singleton"""
+    global _profile_store
+    if _profile_store is None:
+        _profile_store = ProfileStore(max_profiles=int(os.getenv("PROFILE_HISTORY", "20")))
+    return _profile_store
+
+
+def profiling_enabled() -> bool:
+    return os.getenv("PROFILING_ENABLED", "false").lower() == "true"
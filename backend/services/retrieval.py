@@ -0,0 +1,433 @@
+"""
+Ask Thom Retrieval
+Chunks interaction notes, referral CVs and the Thomas product documentation,
+embeds them and keeps them in an in-process vector index for top-k search.
+Embeddings come from the configured embedding endpoint, or offline from a
+deterministic hashing embedder. New interaction notes are indexed as they arrive.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+import urllib.request
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SOURCES = ("interaction_note", "cv", "thomas_docs")
+
+# Hashing-embedder matches below this cosine similarity are mostly noise
+# (unrelated notes score about 0.10-0.12 on short questions)
+DEFAULT_MIN_SCORE = 0.15
+
+
+# ============================================================================
+# CHUNKING
+# ============================================================================
+
+def chunk_text(text: str, max_chars: int = 600, overlap: int = 1) -> List[str]:
+    """
+    Pack sentences (or lines) into chunks of at most max_chars, repeating the last
+    `overlap` sentences at the start of the next chunk so context is not cut mid-thought.
+    """
+    text = (text or "").strip()
+    if not text:
+        return []
+    units = [u.strip() for u in re.split(r"(?<=[.!?])\s+|\n\s*\n|\n(?=[A-Z ]{4,}\n)", text) if u and u.strip()]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    for unit in units:
+        if current and len(" ".join(current + [unit])) > max_chars:
+            chunks.append(" ".join(current))
+            current = current[-overlap:] if overlap else []
+            if current and len(" ".join(current + [unit])) > max_chars:
+                current = []
+        current.append(unit[:max_chars])
+    if current:
+        chunk = " ".join(current)
+        if not chunks or chunk != chunks[-1]:
+            chunks.append(chunk)
+    return chunks
+
+
+@dataclass
+class Chunk:
+    chunk_id: str
+    source: str
+    ref_id: str
+    text: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def chunk_subject(chunk: Chunk) -> Optional[str]:
+    """The candidate or referral a chunk is about; None for shared documentation"""
+    if chunk.source == "interaction_note":
+        return str(chunk.metadata.get("candidate_id"))
+    if chunk.source == "cv":
+        return chunk.ref_id
+    return None
+
+
+def interaction_chunks(logs: pd.DataFrame) -> List[Chunk]:
+    chunks = []
+    for row in logs.itertuples(index=False):
+        notes = getattr(row, "notes", None)
+        if not isinstance(notes, str) or not notes.strip():
+            continue
+        header = f"{row.stage} ({row.interaction_type}) with {row.interviewer_name}, score {row.score}: "
+        for i, piece in enumerate(chunk_text(notes)):
+            chunks.append(Chunk(
+                chunk_id=f"{row.interaction_id}#{i}",
+                source="interaction_note",
+                ref_id=str(row.interaction_id),
+                text=header + piece,
+                metadata={
+                    "candidate_id": row.candidate_id,
+                    "role_id": row.role_id,
+                    "stage": row.stage,
+                    "date": str(row.date),
+                },
+            ))
+    return chunks
+
+
+def cv_chunks(referrals: Sequence[Dict[str, Any]]) -> List[Chunk]:
+    from backend.services.cv_text import build_cv_text
+
+    chunks = []
+    for referral in referrals:
+        for i, piece in enumerate(chunk_text(build_cv_text(referral))):
+            chunks.append(Chunk(
+                chunk_id=f"{referral['referral_id']}#{i}",
+                source="cv",
+                ref_id=referral["referral_id"],
+                text=f"CV of {referral['name']}: {piece}",
+                metadata={"name": referral["name"], "role_title": referral.get("role_title")},
+            ))
+    return chunks
+
+
+def documentation_chunks() -> List[Chunk]:
+    from backend.services.databricks_ai import THOMAS_CONTEXT
+
+    chunks = []
+    # One ref per heading, so a record reads "[thomas_docs Core Products]"
+    for section in re.split(r"\n(?=#{2,3} )", THOMAS_CONTEXT.strip()):
+        heading, _, body = section.partition("\n")
+        title = heading.lstrip("#").strip(" :")
+        for piece in chunk_text(body, max_chars=300, overlap=0):
+            if not re.search(r"[A-Za-z]{3}", piece):
+                continue  # A list number split off a long item
+            chunks.append(Chunk(
+                chunk_id=f"thomas_docs#{len(chunks)}",
+                source="thomas_docs",
+                ref_id=title,
+                text=piece,
+            ))
+    return chunks
+
+
+# ============================================================================
+# EMBEDDERS
+# ============================================================================
+
+class HashingEmbedder:
+    """
+    Deterministic offline embedder: word unigrams and bigrams hashed into a fixed
+    number of signed buckets, log term frequency, L2-normalised.
+    Stable across processes (uses blake2b, not Python's salted hash).
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+
+    STOPWORDS = frozenset({
+        "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "at", "by", "is", "are",
+        "was", "were", "be", "it", "this", "that", "what", "how", "why", "who", "does", "do", "did",
+        "about", "as", "from", "has", "have", "their", "they", "he", "she", "his", "her", "you", "your",
+    })
+
+    def _features(self, text: str) -> List[str]:
+        words = [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in self.STOPWORDS]
+        return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype="float32")
+        for row, text in enumerate(texts):
+            counts: Dict[Tuple[int, float], int] = {}
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                key = (value % self.dim, 1.0 if (value >> 63) & 1 else -1.0)
+                counts[key] = counts.get(key, 0) + 1
+            for (bucket, sign), count in counts.items():
+                vectors[row, bucket] += sign * (1.0 + np.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+
+class EndpointEmbedder:
+    """Embeddings from a model serving embedding endpoint (OpenAI-compatible input/data payload)"""
+
+    name = "endpoint"
+
+    def __init__(self, endpoint: str, target_resolver, batch_size: int = 16, timeout: float = 30):
+        self.endpoint = endpoint
+        self._resolve = target_resolver
+        self.batch_size = batch_size
+        self.timeout = timeout
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        from ai.telemetry import track
+
+        target = self._resolve(self.endpoint)
+        if not target:
+            raise RuntimeError("No serving target for embedding endpoint")
+        url, headers = target
+        batches = []
+        for start in range(0, len(texts), self.batch_size):
+            body = json.dumps({"input": list(texts[start:start + self.batch_size])}).encode("utf-8")
+            request = urllib.request.Request(
+                url, data=body, headers={**headers, "Content-Type": "application/json"}, method="POST"
+            )
+            with track(self.endpoint, "embeddings") as call:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    call.first_byte()
+                    payload = json.loads(response.read())
+                batch_text = "".join(texts[start:start + self.batch_size])
+                call.usage((payload.get("usage") or {}).get("prompt_tokens"), 0, batch_text)
+            data = sorted(payload["data"], key=lambda d: d.get("index", 0))
+            batches.append(np.asarray([d["embedding"] for d in data], dtype="float32"))
+        vectors = np.vstack(batches) if batches else np.zeros((0, 0), dtype="float32")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def get_embedder():
+    """Endpoint embedder when serving is reachable, otherwise the local hashing embedder"""
+    from config import is_local_mode, DatabricksConfig
+
+    if os.getenv("RETRIEVAL_EMBEDDER", "").lower() == "hashing":
+        return HashingEmbedder()
+    if is_local_mode() and not os.getenv("DATABRICKS_SERVING_URL"):
+        return HashingEmbedder()
+
+    from backend.services.databricks_ai import get_databricks_ai_service
+
+    embedder = EndpointEmbedder(
+        DatabricksConfig.from_env().embedding_endpoint,
+        get_databricks_ai_service()._serving_invocation_target,
+    )
+    try:
+        embedder.embed(["warmup"])
+        return embedder
+    except Exception as e:
+        logger.warning(f"Embedding endpoint unavailable, using hashing embedder: {e}")
+        return HashingEmbedder()
+
+
+# ============================================================================
+# VECTOR INDEX
+# ============================================================================
+
+class VectorIndex:
+    """Append-friendly in-memory index of unit vectors with brute-force cosine top-k"""
+
+    def __init__(self):
+        self._vectors: Optional[np.ndarray] = None
+        self._size = 0
+        self.chunks: List[Chunk] = []
+        self._positions: Dict[str, int] = {}
+        self._sources = np.array([], dtype=object)
+        self._subjects = np.array([], dtype=object)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, chunks: Sequence[Chunk], vectors: np.ndarray) -> int:
+        """Add or replace chunks; capacity grows geometrically so appends are amortised O(1)"""
+        added = 0
+        for chunk, vector in zip(chunks, vectors):
+            if self._vectors is None:
+                self._vectors = np.zeros((max(64, len(chunks)), vectors.shape[1]), dtype="float32")
+            position = self._positions.get(chunk.chunk_id)
+            if position is None:
+                if self._size == len(self._vectors):
+                    grown = np.zeros((len(self._vectors) * 2, self._vectors.shape[1]), dtype="float32")
+                    grown[:self._size] = self._vectors[:self._size]
+                    self._vectors = grown
+                position = self._size
+                self._size += 1
+                self.chunks.append(chunk)
+                self._positions[chunk.chunk_id] = position
+                added += 1
+            else:
+                self.chunks[position] = chunk
+            self._vectors[position] = vector
+        self._sources = np.array([c.source for c in self.chunks], dtype=object)
+        self._subjects = np.array([chunk_subject(c) for c in self.chunks], dtype=object)
+        return added
+
+    def export(self) -> Tuple[List[Chunk], np.ndarray]:
+        return list(self.chunks), (self._vectors[:self._size] if self._vectors is not None else np.zeros((0, 0), dtype="float32"))
+
+    def restore(self, chunks: List[Chunk], vectors: np.ndarray) -> None:
+        """Replace the contents with exported chunks/vectors (the array may be a read-mostly memory map)"""
+        self._vectors = vectors if len(chunks) else None
+        self._size = len(chunks)
+        self.chunks = list(chunks)
+        self._positions = {chunk.chunk_id: i for i, chunk in enumerate(self.chunks)}
+        self._sources = np.array([c.source for c in self.chunks], dtype=object)
+        self._subjects = np.array([chunk_subject(c) for c in self.chunks], dtype=object)
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int = 5,
+        sources: Optional[Sequence[str]] = None,
+        subjects: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[Chunk, float]]:
+        """Top-k by cosine; `subjects` keeps only records about those candidates/referrals (plus documentation)"""
+        if self._size == 0:
+            return []
+        scores = self._vectors[:self._size] @ vector
+        if sources:
+            scores = np.where(np.isin(self._sources, list(sources)), scores, -np.inf)
+        if subjects is not None:
+            allowed = np.equal(self._subjects, None) | np.isin(self._subjects, list(subjects))
+            scores = np.where(allowed, scores, -np.inf)
+        k = min(k, self._size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.chunks[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+
+# ============================================================================
+# RETRIEVAL SERVICE
+# ============================================================================
+
+class RetrievalService:
+    """Builds and maintains the index over notes, CVs and documentation"""
+
+    def __init__(self, data_access, embedder=None):
+        self.data_access = data_access
+        self.embedder = embedder
+        self.index = VectorIndex()
+        self._built = False
+        self._lock = threading.RLock()
+        data_access.subscribe("interaction_logs", self._on_interaction_rows)
+        data_access.on_invalidate(self._on_invalidate)
+
+    def _ensure_embedder(self):
+        if self.embedder is None:
+            self.embedder = get_embedder()
+        return self.embedder
+
+    def _add_chunks(self, chunks: List[Chunk]) -> int:
+        if not chunks:
+            return 0
+        vectors = self._ensure_embedder().embed([c.text for c in chunks])
+        return self.index.add(chunks, vectors)
+
+    def build(self) -> "RetrievalService":
+        """Index every source once; later notes arrive incrementally"""
+        with self._lock:
+            if self._built:
+                return self
+            from data.mock_data import get_mock_data_generator
+            from data.snapshot import restore_state
+
+            if restore_state("retrieval_index", self):
+                return self
+
+            self._add_chunks(documentation_chunks())
+            self._add_chunks(interaction_chunks(self.data_access.get_interaction_logs()))
+            self._add_chunks(cv_chunks(get_mock_data_generator().generate_referrals()))
+            self._built = True
+            logger.info(f"Retrieval index built: {len(self.index)} chunks ({self.embedder.name} embedder)")
+            return self
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        with self._lock:
+            chunks, vectors = self.index.export()
+            return {"embedder": self._ensure_embedder().name, "chunks": chunks, "vectors": vectors}
+
+    def restore_snapshot_state(self, state: Dict[str, Any]) -> bool:
+        """Adopt a prebuilt index if it was embedded with the embedder this process uses"""
+        with self._lock:
+            if state["embedder"] != self._ensure_embedder().name:
+                return False
+            self.index.restore(state["chunks"], state["vectors"])
+            self._built = True
+            logger.info(f"Retrieval index restored from snapshot: {len(self.index)} chunks")
+            return True
+
+    def _on_invalidate(self, version: int) -> None:
+        """The whole dataset changed: start over on the next search"""
+        with self._lock:
+            self.index = VectorIndex()
+            self._built = False
+
+    def _on_interaction_rows(self, rows: pd.DataFrame, version: int) -> None:
+        with self._lock:
+            if self._built:
+                self._add_chunks(interaction_chunks(rows))
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        sources: Optional[Sequence[str]] = None,
+        min_score: float = DEFAULT_MIN_SCORE,
+        subjects: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        self.build()
+        vector = self._ensure_embedder().embed([query])[0]
+        hits = self.index.search(vector, k, sources, subjects)
+        return [
+            {
+                "chunk_id": chunk.chunk_id,
+                "source": chunk.source,
+                "ref_id": chunk.ref_id,
+                "score": round(score, 4),
+                "text": chunk.text,
+                "metadata": chunk.metadata,
+            }
+            for chunk, score in hits
+            # Records about the requested subjects only need to share a term with the query
+            if score >= min_score or (subjects and score > 0 and chunk_subject(chunk) in subjects)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {source: 0 for source in SOURCES}
+        for chunk in self.index.chunks:
+            counts[chunk.source] = counts.get(chunk.source, 0) + 1
+        return {
+            "built": self._built,
+            "embedder": getattr(self.embedder, "name", None),
+            "chunks": len(self.index),
+            "by_source": counts,
+        }
+
+
+# Singleton instance
+_retrieval_service = None
+
+
+def get_retrieval_service() -> RetrievalService:
+    """Get or create the retrieval service singleton"""
+    global _retrieval_service
+    if _retrieval_service is None:
+        from data.data_access import get_data_access
+        _retrieval_service = RetrievalService(get_data_access())
+    return _retrieval_service
@@ -0,0 +1,260 @@
+"""
+Traffic Capture
+Optional middleware that records anonymized request traces of real traffic, so
+cache and index changes can be checked against the production access pattern
+(a few managers and roles get most requests) by replaying it locally:
+
+    TRAFFIC_CAPTURE=true uvicorn backend.main:app ...
+    python -m benchmarks.replay /tmp/talent_hub_traffic/capture-*.jsonl --speed 4
+
+Each worker process appends to its own JSON Lines file. The first line is a
+header; every other line is one request:
+
+    {"t": 1760860000.123, "m": "GET", "r": "/api/performance/managers/{manager_id}/team",
+     "p": {"manager_id": "~3f9a1c0b7e"}, "q": {"department": "Engineering"},
+     "st": 200, "ms": 41.7, "in": 0, "out": 5231}
+
+Identifiers (path and query parameters and JSON body fields named *_id, *_ids or
+role_title) are replaced by keyed HMAC pseudonyms. The same id always gets the
+same pseudonym, so access skew survives. Free text (search queries, questions)
+and other string body fields are dropped. Only payload sizes are kept, never
+payloads or headers.
+"""
+
+import os
+import hmac
+import json
+import time
+import random
+import hashlib
+import secrets
+import tempfile
+import threading
+from typing import Dict, Any, Optional
+from urllib.parse import parse_qsl
+
+DEFAULT_CAPTURE_DIR = os.path.join(tempfile.gettempdir(), "talent_hub_traffic")
+FORMAT_VERSION = 1
+PSEUDONYM_PREFIX = "~"
+MAX_PARSED_BODY_BYTES = 64 * 1024
+FLUSH_INTERVAL_SECONDS = 1.0
+
+# Parameters that are free text: dropped from the trace
+FREE_TEXT_PARAMS = {"q", "question", "full_path"}
+
+
+def is_identifier(name: str) -> bool:
+    return name.endswith("_id") or name.endswith("_ids") or name == "role_title"
+
+
+def _load_key(directory: str) -> bytes:
+    """TRAFFIC_CAPTURE_SECRET, else a random key shared by all workers via the capture directory"""
+    secret = os.getenv("TRAFFIC_CAPTURE_SECRET")
+    if secret:
+        return secret.encode()
+    path = os.path.join(directory, ".key")
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+    except FileExistsError:
+        pass
+    # Another worker may have just created it; wait for its write
+    for _ in range(50):
+        with open(path) as f:
+            key = f.read().strip()
+        if key:
+            return key.encode()
+        time.sleep(0.01)
+    raise RuntimeError(f"Empty traffic capture key at {path}")
+
+
+class TrafficRecorder:
+    """Appends anonymized request records to this process's capture file"""
+
+    def __init__(self, directory: str, sample_rate: float = 1.0, max_bytes: int = 256 * 1024 * 1024):
+        os.makedirs(directory, exist_ok=True)
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.path = os.path.join(directory, f"capture-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl")
+        self._key = _load_key(directory)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", buffering=64 * 1024)
+        self._last_flush = time.monotonic()
+        self.records = 0
+        self.dropped = 0
+        self.bytes = 0
+        self._write({
+            "v": FORMAT_VERSION,
+            "started_at": time.time(),
+            "pid": os.getpid(),
+            "sample_rate": sample_rate,
+            # Files whose key ids match share pseudonyms and can be replayed together
+            "key_id": hashlib.sha256(self._key).hexdigest()[:8],
+        })
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def pseudonym(self, value: Any) -> str:
+        digest = hmac.new(self._key, str(value).encode(), hashlib.sha256).hexdigest()
+        return PSEUDONYM_PREFIX + digest[:10]
+
+    def anonymize(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Identifiers pseudonymized, free text dropped, everything else (enums, numbers, flags) kept"""
+        clean = {}
+        for name, value in params.items():
+            if name in FREE_TEXT_PARAMS:
+                continue
+            if is_identifier(name):
+                clean[name] = [self.pseudonym(v) for v in value] if isinstance(value, list) else self.pseudonym(value)
+            else:
+                clean[name] = value
+        return clean
+
+    def anonymize_body(self, body: Any) -> Optional[Dict[str, Any]]:
+        """Identifier fields pseudonymized, numbers and flags kept, other strings and nested objects dropped"""
+        if not isinstance(body, dict):
+            return None
+        fields = {}
+        for name, value in body.items():
+            if is_identifier(name) and isinstance(value, (str, int, list)):
+                fields[name] = [self.pseudonym(v) for v in value] if isinstance(value, list) else self.pseudonym(value)
+            elif isinstance(value, (bool, int, float)) and name not in FREE_TEXT_PARAMS:
+                fields[name] = value
+        return fields
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        if self.bytes >= self.max_bytes or self._file.closed:
+            self.dropped += 1
+            return
+        self._write(entry)
+        self.records += 1
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self.bytes += len(line)
+            now = time.monotonic()
+            if now - self._last_flush >= FLUSH_INTERVAL_SECONDS:
+                self._file.flush()
+                self._last_flush = now
+
+    def flush(self) -> None:
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "sample_rate": self.sample_rate,
+            "records": self.records,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "dropped_over_limit": self.dropped,
+        }
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+class TrafficCaptureMiddleware:
+    """Records one anonymized trace per sampled /api request (route, params, timing, payload sizes)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+        recorder = get_traffic_recorder()
+        if not recorder.sampled():
+            await self.app(scope, receive, send)
+            return
+
+        from backend.services.metrics import route_template
+
+        wall_started = time.time()
+        started = time.perf_counter()
+        request = {"size": 0, "chunks": []}
+        response = {"status": 500, "size": 0}
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                request["size"] += len(body)
+                if request["size"] <= MAX_PARSED_BODY_BYTES:
+                    request["chunks"].append(body)
+            return message
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            entry = {
+                "t": round(wall_started, 3),
+                "m": scope["method"],
+                "r": route_template(scope),
+                "st": response["status"],
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+                "in": request["size"],
+                "out": response["size"],
+            }
+            # Routing stores the matched path parameters in the (shared) scope
+            if scope.get("path_params"):
+                entry["p"] = recorder.anonymize(scope["path_params"])
+            if scope.get("query_string"):
+                query = recorder.anonymize(dict(parse_qsl(scope["query_string"].decode("latin-1"))))
+                if query:
+                    entry["q"] = query
+            if request["chunks"] and request["size"] <= MAX_PARSED_BODY_BYTES:
+                try:
+                    body = recorder.anonymize_body(json.loads(b"".join(request["chunks"])))
+                except ValueError:
+                    body = None
+                if body:
+                    entry["b"] = body
+            recorder.record(entry)
+
+
+# Singleton instance
+_traffic_recorder = None
+_traffic_recorder_lock = threading.Lock()
+
+
+def get_traffic_recorder() -> TrafficRecorder:
+    """Get or create the traffic recorder singleton"""
+    global _traffic_recorder
+    if _traffic_recorder is None:
+        with _traffic_recorder_lock:
+            if _traffic_recorder is None:
+                _traffic_recorder = TrafficRecorder(
+                    directory=os.getenv("TRAFFIC_CAPTURE_DIR", DEFAULT_CAPTURE_DIR),
+                    sample_rate=float(os.getenv("TRAFFIC_CAPTURE_SAMPLE_RATE", "1.0")),
+                    max_bytes=int(float(os.getenv("TRAFFIC_CAPTURE_MAX_MB", "256")) * 1024 * 1024),
+                )
+    return _traffic_recorder
+
+
+def close_traffic_recorder() -> None:
+    if _traffic_recorder is not None:
+        _traffic_recorder.close()
+
+
+def traffic_capture_enabled() -> bool:
+    return os.getenv("TRAFFIC_CAPTURE", "false").lower() == "true"
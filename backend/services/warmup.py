@@ -0,0 +1,299 @@
+"""
+Startup Warmup
+Runs the cold-start work in the background as soon as the app starts: table
+preloads, derived aggregates and indexes, SQL warehouse and model endpoint
+priming, and opening the hot caches. Independent tasks run concurrently;
+progress backs the /api/ready readiness probe so traffic is only routed to
+an instance once the first user request no longer pays these costs.
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+# Table getters preloaded at startup (memoized by the mock generator locally; primes the warehouse otherwise)
+TABLE_GETTERS = (
+    "get_employees",
+    "get_thomas_assessments",
+    "get_open_roles",
+    "get_candidates",
+    "get_interaction_logs",
+    "get_performance_metrics",
+    "get_analytics_defaults",
+    "get_manager_overrides",
+    "get_ideal_profiles",
+)
+
+
+@dataclass
+class WarmupTask:
+    """One unit of warmup work; `after` only orders tasks, a failed dependency does not cancel it"""
+    name: str
+    run: Callable[[], Any]
+    after: Tuple[str, ...] = ()
+    enabled: bool = True
+
+
+class WarmupOrchestrator:
+    """Runs warmup tasks concurrently in dependency order and reports readiness"""
+
+    def __init__(self, tasks: Sequence[WarmupTask] = (), workers: int = 4, timeout_seconds: float = 120.0):
+        self.workers = max(1, workers)
+        self.timeout_seconds = timeout_seconds
+        self._tasks: Dict[str, WarmupTask] = {}
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self._finished_at: Optional[float] = None
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task: WarmupTask) -> None:
+        with self._lock:
+            self._tasks[task.name] = task
+            self._state[task.name] = {"status": PENDING, "elapsed_ms": None, "error": None, "detail": None}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "WarmupOrchestrator":
+        """Run all tasks in a background thread (no-op while a run is in progress)"""
+        with self._lock:
+            if self.running:
+                return self
+            self._done.clear()
+            self._started_at = time.time()
+            self._finished_at = None
+            for state in self._state.values():
+                state.update(status=PENDING, elapsed_ms=None, error=None, detail=None)
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _execute(self, task: WarmupTask) -> None:
+        started = time.perf_counter()
+        self._set(task.name, status=RUNNING)
+        try:
+            detail = task.run()
+        except Exception as e:
+            logger.warning(f"Warmup task {task.name} failed: {e}")
+            self._set(task.name, status=FAILED, error=str(e), elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+            return
+        if not isinstance(detail, (dict, list, str, int, float, bool, type(None))):
+            detail = None
+        self._set(task.name, status=SUCCEEDED, detail=detail, elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+
+    def _set(self, name: str, **fields) -> None:
+        with self._lock:
+            self._state[name].update(fields)
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        with self._lock:
+            tasks = dict(self._tasks)
+        for task in tasks.values():
+            if not task.enabled:
+                self._set(task.name, status=SKIPPED)
+        pending = {name: task for name, task in tasks.items() if task.enabled}
+        finished = {name for name, task in tasks.items() if not task.enabled}
+        # Dependencies on tasks that are not registered are ignored
+        finished |= {dep for task in pending.values() for dep in task.after if dep not in tasks}
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="warmup") as pool:
+            in_flight = {}
+            while pending or in_flight:
+                ready = [task for task in pending.values() if all(dep in finished for dep in task.after)]
+                for task in ready:
+                    del pending[task.name]
+                    in_flight[pool.submit(self._execute, task)] = task.name
+                if not in_flight:
+                    # Dependency cycle: nothing can start, report the rest as failed
+                    for name in pending:
+                        self._set(name, status=FAILED, error="unsatisfiable dependencies")
+                    break
+                completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    finished.add(in_flight.pop(future))
+
+        self._finished_at = time.time()
+        self._done.set()
+        summary = self.status()
+        logger.info(
+            f"Warmup {summary['state']} in {(time.perf_counter() - started) * 1000:.0f}ms: "
+            + ", ".join(f"{t['name']}={t['status']}" for t in summary["tasks"])
+        )
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            tasks = [{"name": name, **state} for name, state in self._state.items()]
+            started_at, finished_at = self._started_at, self._finished_at
+        done = sum(t["status"] in (SUCCEEDED, FAILED, SKIPPED) for t in tasks)
+
+        if started_at is None:
+            state, ready = "not_started", False
+        elif finished_at is not None:
+            state = "degraded" if any(t["status"] == FAILED for t in tasks) else "ready"
+            ready = True
+        elif time.time() - started_at > self.timeout_seconds:
+            # Do not hold traffic back forever; the remaining work finishes in the background
+            state, ready = "timed_out", True
+        else:
+            state, ready = "warming", False
+
+        return {
+            "ready": ready,
+            "state": state,
+            "progress": {"done": done, "total": len(tasks)},
+            "elapsed_ms": round(((finished_at or time.time()) - started_at) * 1000, 1) if started_at else None,
+            "tasks": tasks,
+        }
+
+
+# ============================================================================
+# DEFAULT TASKS
+# ============================================================================
+
+def _create_data_access() -> Dict[str, Any]:
+    from data.data_access import get_data_access
+    data_access = get_data_access()
+    return {"source": "mock" if data_access.is_local else "sql"}
+
+
+def _preload_tables() -> Dict[str, int]:
+    # Sequential on purpose: the mock generator draws from one seeded RNG and the
+    # warehouse path shares a single connection
+    from data.data_access import get_data_access
+    data_access = get_data_access()
+    rows = {getter[len("get_"):]: len(getattr(data_access, getter)()) for getter in TABLE_GETTERS}
+    if data_access.is_local:
+        rows["referrals"] = len(data_access.mock_gen.generate_referrals())
+    return rows
+
+
+def _create_ai_service() -> None:
+    from backend.services.databricks_ai import get_databricks_ai_service
+    get_databricks_ai_service()
+
+
+def _prime_sql_warehouse() -> None:
+    from backend.services.databricks_ai import get_databricks_ai_service
+    if not get_databricks_ai_service().warmup():
+        raise RuntimeError("SQL warehouse did not answer")
+
+
+def _prime_model_endpoint() -> Dict[str, Any]:
+    from backend.services.databricks_ai import get_databricks_ai_service
+    from ai.concurrency import call_priority, Priority
+    with call_priority(Priority.BACKGROUND):
+        response = get_databricks_ai_service().ask_thom("Hello, this is a warmup test. Reply with 'Ready!'", use_cache=False)
+    return {"response_chars": len(response)}
+
+
+def _build_analytics_cube() -> None:
+    from data.analytics_cube import get_analytics_cube
+    get_analytics_cube()
+
+
+def _build_norms() -> None:
+    from data.norms import get_norm_engine
+    get_norm_engine()
+
+
+def _build_succession() -> None:
+    from data.succession import get_succession_engine
+    get_succession_engine()
+
+
+def _build_churn_scores() -> None:
+    from data.churn_scoring import get_churn_engine
+    get_churn_engine()
+
+
+def _build_retrieval_index() -> Dict[str, Any]:
+    from backend.services.retrieval import get_retrieval_service
+    return get_retrieval_service().build().stats()
+
+
+def _build_keyword_engine() -> None:
+    from backend.services.keyword_engine import get_keyword_engine
+    get_keyword_engine()
+
+
+def _open_caches() -> None:
+    from ai.response_cache import get_response_cache
+    from backend.services.context_assembler import get_context_assembler
+    get_response_cache()
+    get_context_assembler()
+
+
+def _watch_published_snapshot() -> None:
+    from data.snapshot import start_snapshot_watcher
+    start_snapshot_watcher()
+
+
+def default_tasks() -> List[WarmupTask]:
+    from config import is_local_mode
+
+    remote = not is_local_mode()
+    return [
+        WarmupTask("data-access", _create_data_access),
+        WarmupTask("tables", _preload_tables, after=("data-access",)),
+        WarmupTask("ai-service", _create_ai_service, enabled=remote),
+        WarmupTask("sql-warehouse", _prime_sql_warehouse, after=("ai-service",), enabled=remote),
+        WarmupTask(
+            "model-endpoint", _prime_model_endpoint, after=("ai-service",),
+            enabled=remote and os.getenv("WARMUP_MODEL", "true").lower() == "true",
+        ),
+        WarmupTask("analytics-cube", _build_analytics_cube, after=("tables",)),
+        WarmupTask("norms", _build_norms, after=("tables",)),
+        WarmupTask("succession", _build_succession, after=("tables",)),
+        WarmupTask("churn-scores", _build_churn_scores, after=("tables",)),
+        WarmupTask("retrieval-index", _build_retrieval_index, after=("tables",)),
+        WarmupTask("keyword-engine", _build_keyword_engine),
+        WarmupTask("caches", _open_caches),
+        WarmupTask(
+            "dataset-watcher", _watch_published_snapshot, after=("data-access",),
+            enabled=float(os.getenv("DATA_SNAPSHOT_WATCH_SECONDS", "0")) > 0,
+        ),
+    ]
+
+
+# Singleton instance
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def get_warmup_orchestrator() -> WarmupOrchestrator:
+    """Get or create the warmup orchestrator singleton"""
+    global _warmup
+    if _warmup is None:
+        with _warmup_lock:
+            if _warmup is None:
+                _warmup = WarmupOrchestrator(
+                    default_tasks(),
+                    workers=int(os.getenv("WARMUP_WORKERS", "4")),
+                    timeout_seconds=float(os.getenv("WARMUP_TIMEOUT_SECONDS", "120")),
+                )
+    return _warmup
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
@@ -0,0 +1,121 @@
+"""
+Scaled Benchmark Fixtures
+Demo datasets at several sizes, built once with the mock data generator and
+stored as dataset snapshots (data/snapshot.py), so benchmarks and load tests
+start from the same data without paying generation time:
+
+    python -m benchmarks.fixtures build --scale medium
+    python -m benchmarks.fixtures info
+
+Fixtures live under benchmarks/.fixtures/<scale> and are rebuilt when the
+generator source changes. A server started with DATA_SNAPSHOT_PATH pointing at
+one serves that dataset.
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+from typing import Dict, Any, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.getenv("BENCHMARK_FIXTURES_DIR", os.path.join(ROOT, "benchmarks", ".fixtures"))
+
+# (employees, candidates) per scale; small is the default demo dataset
+SCALES = {
+    "small": (50, 60),
+    "medium": (7000, 10000),
+    "large": (70000, 100000),
+}
+
+
+def fixture_path(scale: str) -> str:
+    return os.path.join(FIXTURES_DIR, scale)
+
+
+def fixture_is_current(scale: str) -> bool:
+    """Built for this scale and from the current generator source"""
+    sys.path.insert(0, ROOT)
+    from data.snapshot import DatasetSnapshot
+
+    snapshot = DatasetSnapshot(fixture_path(scale))
+    if not snapshot.is_fresh():
+        return False
+    employees, candidates = SCALES[scale]
+    tables = snapshot.manifest["tables"]
+    return tables["employees"]["rows"] == employees and tables["candidates"]["rows"] == candidates
+
+
+def _build_in_process(scale: str) -> Dict[str, Any]:
+    """Generate the scaled tables into a fresh generator and write them as a snapshot"""
+    from data.mock_data import MockDataGenerator, swap_mock_data_generator
+    from data.snapshot import build_snapshot
+
+    employees, candidates = SCALES[scale]
+    generator = MockDataGenerator()
+    # The other tables derive from these two (memoized on the generator)
+    generator.generate_employees(employees)
+    generator.generate_candidates(candidates)
+    swap_mock_data_generator(generator)
+    return build_snapshot(fixture_path(scale))
+
+
+def ensure_fixture(scale: str, rebuild: bool = False) -> str:
+    """Path of an up-to-date fixture, building it in a fresh process when needed"""
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale {scale!r}; expected one of {', '.join(SCALES)}")
+    if rebuild or not fixture_is_current(scale):
+        employees, candidates = SCALES[scale]
+        print(f"[FIXTURES] Building {scale} fixture ({employees} employees, {candidates} candidates)...", file=sys.stderr)
+        started = time.perf_counter()
+        # A fresh process with snapshots off, so nothing is restored into the generator
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.fixtures", "build", "--scale", scale, "--in-process"],
+            cwd=ROOT, env={**os.environ, "DATA_SNAPSHOT": "off", "USE_REAL_SQL": "false"}, check=True,
+        )
+        print(f"[FIXTURES] Built {scale} in {time.perf_counter() - started:.0f}s", file=sys.stderr)
+    return fixture_path(scale)
+
+
+def load_generator(scale: str):
+    """A MockDataGenerator holding the fixture's tables (for in-process benchmarks)"""
+    from data.mock_data import MockDataGenerator
+    from data.snapshot import DatasetSnapshot, MOCK_TABLES
+
+    generator = MockDataGenerator()
+    for name, table in DatasetSnapshot(ensure_fixture(scale)).read_tables().items():
+        setattr(generator, MOCK_TABLES[name], table)
+    return generator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect scaled benchmark fixtures")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--scale", default="all", help=f"One of {', '.join(SCALES)} or all")
+    parser.add_argument("--rebuild", action="store_true")
+    parser.add_argument("--in-process", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    scales = list(SCALES) if args.scale == "all" else [args.scale]
+
+    if args.command == "build":
+        if args.in_process:
+            _build_in_process(args.scale)
+            return
+        for scale in scales:
+            print(f"{scale}: {ensure_fixture(scale, rebuild=args.rebuild)}")
+        return
+
+    from data.snapshot import DatasetSnapshot
+    for scale in scales:
+        manifest: Optional[Dict[str, Any]] = DatasetSnapshot(fixture_path(scale)).manifest
+        if manifest is None:
+            print(f"{scale}: not built")
+            continue
+        state = "current" if fixture_is_current(scale) else "stale"
+        rows = ", ".join(f"{name}={table['rows']}" for name, table in manifest["tables"].items())
+        print(f"{scale}: {state}, built {manifest['created_at']}: {rows}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+"""
+HTTP Load Test
+Drives concurrent requests at every API route against a server running on a
+scaled fixture, one route at a time, so each route's throughput and latency
+percentiles are measured in isolation:
+
+    python -m benchmarks.load                                   # medium fixture, mock data, offline model fallback
+    python -m benchmarks.load --backend emulator --profile realistic   # SQL + model serving via the emulator
+    python -m benchmarks.load --scale large --concurrency 16 --requests 200 --routes /api/recruitment
+    python -m benchmarks.load --baseline benchmarks/results/load-<earlier>.json
+
+Routes are read from the server's OpenAPI schema. Path parameters and request
+bodies are filled with ids from the fixture, plus a job and a request profile
+created on the server first. DELETE routes and admin routes that would disturb
+the run are reported as skipped.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+import http.client
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_QUESTION = "Who are the top performers in Engineering and what is their PPA profile?"
+
+# Admin routes that would disturb the server under test
+EXCLUDED_ROUTES = {
+    ("POST", "/api/system/warmup"): "re-runs startup warmup",
+    ("POST", "/api/system/profile"): "holds a profiling window open",
+}
+
+# Fixed values for parameters that are not ids
+STATIC_VALUES = {
+    "cube_name": "performance",
+    "column": "performance_score",
+    "value": 75,
+    "q": "leadership",
+    "question": SAMPLE_QUESTION,
+    "proposed_tc": 120000,
+    "chunk_size": 5,
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(url: str, timeout: float, process: subprocess.Popen) -> None:
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args[2]} exited with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready within {timeout:.0f}s")
+
+
+# ============================================================================
+# REQUEST PLAN
+# ============================================================================
+
+def id_pools(fixture: str) -> Dict[str, List[str]]:
+    """Every id in the fixture, per parameter name"""
+    sys.path.insert(0, ROOT)
+    from data.snapshot import DatasetSnapshot
+
+    tables = DatasetSnapshot(fixture).read_tables()
+    employees = tables["employees"]
+    interactions = tables["interaction_logs"]
+    return {
+        # Individual contributors first so single-id loads do not hit a whole team
+        "employee_id": employees.sort_values("is_manager", kind="stable")["employee_id"].astype(str).tolist(),
+        "manager_id": employees[employees["is_manager"]]["employee_id"].astype(str).tolist(),
+        "candidate_id": tables["candidates"]["candidate_id"].astype(str).tolist(),
+        "role_id": tables["open_roles"]["role_id"].astype(str).tolist(),
+        "role_title": tables["open_roles"]["title"].astype(str).drop_duplicates().tolist(),
+        "interaction_id": interactions["interaction_id"].astype(str).tolist(),
+        "interviewer_id": interactions["interviewer_id"].astype(str).drop_duplicates().tolist(),
+        "referral_id": [str(r["referral_id"]) for r in tables["referrals"]],
+    }
+
+
+def fixture_ids(fixture: str) -> Dict[str, Any]:
+    """One real id per parameter name, taken from the fixture tables"""
+    return {name: (pool[0] if pool else None) for name, pool in id_pools(fixture).items()}
+
+
+def server_ids(host: str, port: int, ids: Dict[str, Any]) -> Dict[str, Any]:
+    """Ids that only exist on the running server: one queued job and one request profile"""
+    ids = dict(ids)
+    connection = http.client.HTTPConnection(host, port, timeout=120)
+    try:
+        if ids.get("referral_id"):
+            connection.request("POST", f"/api/recruitment/referrals/{ids['referral_id']}/extract-insights/jobs")
+            response = connection.getresponse()
+            body = response.read()
+            if 200 <= response.status < 300:
+                ids["job_id"] = json.loads(body)["job_id"]
+        connection.request("GET", "/api/health", headers={"X-Profile": "1"})
+        response = connection.getresponse()
+        response.read()
+        ids["profile_id"] = response.getheader("X-Profile-Id")
+    except (OSError, http.client.HTTPException, ValueError, KeyError):
+        pass
+    finally:
+        connection.close()
+    return ids
+
+
+def param_value(name: str, schema: Dict[str, Any], ids: Dict[str, Any]):
+    if name in ids:
+        return ids[name]
+    if name in STATIC_VALUES:
+        return STATIC_VALUES[name]
+    if name.endswith("_ids") and ids.get(name[:-1]):
+        return [ids[name[:-1]]]
+    if "weight" in name:
+        return 0.2
+    if "default" in schema:
+        return schema["default"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    return {"integer": 1, "number": 1.0, "boolean": False, "array": [], "object": {}}.get(schema.get("type"), "benchmark")
+
+
+def request_body(schema: Dict[str, Any], components: Dict[str, Any], ids: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Required fields of a request body schema filled with fixture ids and plausible values"""
+    for option in schema.get("anyOf", [schema]):
+        if "$ref" in option:
+            schema = components[option["$ref"].rsplit("/", 1)[1]]
+            break
+    properties = schema.get("properties", {})
+    return {
+        name: param_value(name, properties[name], ids)
+        for name in schema.get("required", [])
+    }
+
+
+def build_plan(openapi: Dict[str, Any], ids: Dict[str, Any], prefixes: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    components = openapi.get("components", {}).get("schemas", {})
+    plan = []
+    for template, operations in sorted(openapi["paths"].items()):
+        if not template.startswith("/api") or (prefixes and not any(template.startswith(p) for p in prefixes)):
+            continue
+        for method, operation in operations.items():
+            method = method.upper()
+            entry = {"name": f"{method} {template}", "method": method, "route": template}
+            if method == "DELETE":
+                plan.append({**entry, "skipped": "resets server state"})
+                continue
+            if (method, template) in EXCLUDED_ROUTES:
+                plan.append({**entry, "skipped": EXCLUDED_ROUTES[(method, template)]})
+                continue
+
+            path_values, query = {}, {}
+            missing = []
+            for parameter in operation.get("parameters", []):
+                if parameter["in"] not in ("path", "query") or (parameter["in"] == "query" and not parameter.get("required")):
+                    continue
+                value = param_value(parameter["name"], parameter.get("schema", {}), ids)
+                if value in (None, "benchmark") and parameter["in"] == "path":
+                    missing.append(parameter["name"])
+                (path_values if parameter["in"] == "path" else query)[parameter["name"]] = value
+            if missing:
+                plan.append({**entry, "skipped": f"no fixture value for {', '.join(missing)}"})
+                continue
+
+            path = re.sub(r"{(\w+)}", lambda m: urllib.request.quote(str(path_values[m.group(1)]), safe=""), template)
+            if query:
+                path += "?" + "&".join(f"{k}={urllib.request.quote(str(v))}" for k, v in query.items())
+            body = None
+            if "requestBody" in operation:
+                body = request_body(operation["requestBody"]["content"]["application/json"]["schema"], components, ids)
+            plan.append({**entry, "path": path, "body": body})
+    return plan
+
+
+# ============================================================================
+# LOAD
+# ============================================================================
+
+def _worker(host: str, port: int, entry: Dict[str, Any], count: int, headers: Dict[str, str]) -> List[Tuple[float, int]]:
+    """Send count requests over one keep-alive connection; (latency ms, status) per request, status 0 on connection errors"""
+    body = json.dumps(entry["body"]).encode() if entry.get("body") is not None else None
+    connection = http.client.HTTPConnection(host, port, timeout=120)
+    samples = []
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            connection.request(entry["method"], entry["path"], body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=120)
+            status = 0
+        samples.append(((time.perf_counter() - started) * 1000, status))
+    connection.close()
+    return samples
+
+
+def load_route(host: str, port: int, entry: Dict[str, Any], requests: int, concurrency: int,
+               headers: Dict[str, str]) -> Dict[str, Any]:
+    from benchmarks.report import latency_summary
+
+    workers = max(1, min(concurrency, requests))
+    shares = [requests // workers + (1 if i < requests % workers else 0) for i in range(workers)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        batches = list(pool.map(lambda share: _worker(host, port, entry, share, headers), shares))
+    elapsed = time.perf_counter() - started
+
+    samples = [sample for batch in batches for sample in batch]
+    statuses: Dict[str, int] = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(count for status, count in statuses.items() if not 200 <= int(status) < 400)
+    return {
+        "name": entry["name"],
+        "method": entry["method"],
+        "route": entry["route"],
+        "path": entry["path"],
+        "concurrency": workers,
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 3),
+        "status_counts": statuses,
+        **latency_summary([latency for latency, _ in samples], elapsed),
+    }
+
+
+# ============================================================================
+# SERVERS
+# ============================================================================
+
+def start_servers(fixture: str, backend: str, profile: str, workdir: str) -> Tuple[int, List[subprocess.Popen]]:
+    """Start the emulator (if requested) and the app on the fixture; returns the app port and processes"""
+    processes = []
+    env = {
+        **os.environ,
+        "DATA_SNAPSHOT": "auto",
+        "DATA_SNAPSHOT_PATH": fixture,
+        "LAZY_ROUTERS": "false",
+        "PROFILING_ENABLED": "true",
+        "PYTHONDONTWRITEBYTECODE": "1",
+        # Keep the run's state out of the developer's caches and job table
+        "JOBS_DB_PATH": os.path.join(workdir, "jobs.sqlite3"),
+        "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.sqlite3"),
+        "INTERACTION_SUMMARIES_PATH": os.path.join(workdir, "summaries.sqlite3"),
+        "TRANSCRIPT_STORE_DIR": os.path.join(workdir, "transcripts"),
+    }
+    if backend == "emulator":
+        emulator_port = _free_port()
+        emulator = subprocess.Popen(
+            [sys.executable, "-m", "emulator", "--port", str(emulator_port), "--profile", profile],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        processes.append(emulator)
+        _wait_for(f"http://127.0.0.1:{emulator_port}/emulator/stats", 60, emulator)
+        env.update(
+            DATABRICKS_HOST=f"http://127.0.0.1:{emulator_port}", DATABRICKS_TOKEN="emulator",
+            APP_MODE="databricks", USE_REAL_SQL="true",
+        )
+    else:
+        env.update(APP_MODE="local", USE_REAL_SQL="false")
+
+    port = _free_port()
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=open(os.path.join(workdir, "server.log"), "w"),
+    )
+    processes.append(app)
+    # Warmup has built every aggregate and index once /api/ready answers 200
+    _wait_for(f"http://127.0.0.1:{port}/api/ready", 600, app)
+    return port, processes
+
+
+def stop_servers(processes: List[subprocess.Popen]) -> None:
+    for process in reversed(processes):
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent HTTP load against every API route")
+    parser.add_argument("--scale", default="medium", help="Fixture scale: small, medium, large")
+    parser.add_argument("--backend", choices=["local", "emulator"], default="local",
+                        help="local: mock data and offline model fallback; emulator: SQL warehouse and model serving emulator")
+    parser.add_argument("--profile", default="instant", help="Emulator profile with --backend emulator")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent connections per route")
+    parser.add_argument("--routes", default=None, help="Comma-separated path prefixes to include")
+    parser.add_argument("--bypass-llm-cache", action="store_true", help="Send X-LLM-Cache: bypass so model calls are not cached")
+    parser.add_argument("--url", default=None, help="Load an already running server instead (its data, not the fixture's)")
+    parser.add_argument("--output", default=None, help="Results file (default benchmarks/results/load-<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help="Earlier results file to compare p95 against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p95 slowdown vs the baseline")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from benchmarks.fixtures import ensure_fixture
+    from benchmarks.report import write_results, compare, print_regressions
+
+    fixture = ensure_fixture(args.scale)
+    processes = []
+    workdir = tempfile.mkdtemp(prefix="talent-hub-load-")
+    try:
+        if args.url:
+            host, _, port = args.url.split("://", 1)[-1].rstrip("/").partition(":")
+            port = int(port or 80)
+        else:
+            print(f"Starting server on the {args.scale} fixture ({args.backend})...", file=sys.stderr)
+            host, (port, processes) = "127.0.0.1", start_servers(fixture, args.backend, args.profile, workdir)
+
+        with urllib.request.urlopen(f"http://{host}:{port}/openapi.json", timeout=60) as response:
+            openapi = json.load(response)
+        prefixes = [p.strip() for p in args.routes.split(",")] if args.routes else None
+        plan = build_plan(openapi, server_ids(host, port, fixture_ids(fixture)), prefixes)
+
+        headers = {"Content-Type": "application/json"}
+        if args.bypass_llm_cache:
+            headers["X-LLM-Cache"] = "bypass"
+        results = []
+        for entry in plan:
+            if "skipped" in entry:
+                results.append(entry)
+                print(f"{entry['name']:<70} skipped: {entry['skipped']}", file=sys.stderr)
+                continue
+            result = load_route(host, port, entry, args.requests, args.concurrency, headers)
+            results.append(result)
+            print(
+                f"{result['name']:<70} {result['throughput_per_s']:>8.1f} req/s  p50 {result['p50_ms']:>8.1f}ms  "
+                f"p95 {result['p95_ms']:>8.1f}ms  p99 {result['p99_ms']:>8.1f}ms  errors {result['errors']}",
+                file=sys.stderr,
+            )
+    finally:
+        stop_servers(processes)
+
+    settings = {
+        "scale": args.scale, "backend": args.backend, "profile": args.profile if args.backend == "emulator" else None,
+        "requests": args.requests, "concurrency": args.concurrency, "url": args.url,
+    }
+    path = write_results("load", results, settings, args.output)
+    measured = [r for r in results if "skipped" not in r]
+    print(f"{len(measured)} routes measured, {len(results) - len(measured)} skipped. Results written to {path}")
+
+    if args.baseline:
+        regressions = compare(args.baseline, measured, threshold=args.threshold)
+        print_regressions(regressions, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
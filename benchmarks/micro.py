@@ -0,0 +1,168 @@
+"""
+Hot-Path Microbenchmarks
+Times the functions behind the heaviest dashboard and Ask Thom paths against the
+scaled fixtures (benchmarks/fixtures.py), in-process and without HTTP:
+
+    python -m benchmarks.micro                            # small and medium fixtures
+    python -m benchmarks.micro --scales large --only clean_nan_values
+    python -m benchmarks.micro --baseline benchmarks/results/micro-<earlier>.json
+
+Each function runs repeatedly for a time budget. Per-call latency percentiles and
+calls per second go to a JSON results file.
+"""
+
+import os
+import sys
+import time
+import argparse
+import itertools
+from typing import Callable, Dict, Any, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A representative Ask Thom answer for keyword highlighting
+SAMPLE_ANSWER = (
+    "Based on the PPA, this candidate shows high Dominance and Influence with lower Steadiness, "
+    "so they are likely to drive results quickly and communicate persuasively. Their GIA score "
+    "suggests strong learning agility, and the HPTI profile points to high Ambiguity Acceptance. "
+    "In IFS Cloud terms they would suit the Field Service Management rollout. Team chemistry with "
+    "the hiring manager is good; consider pairing them with a high-Compliance analyst. "
+) * 8
+
+
+# ============================================================================
+# BENCHMARKS
+# ============================================================================
+# Each setup receives the fixture's generator and data access layer and returns
+# the callable to time (cycling through inputs so caches do not flatter it).
+
+def _setup_chemistry(generator, data_access) -> Callable[[], Any]:
+    assessments = generator.generate_thomas_assessments()
+    profiles = [
+        {"dominance": row.ppa_dominance, "influence": row.ppa_influence,
+         "steadiness": row.ppa_steadiness, "compliance": row.ppa_compliance}
+        for row in assessments.head(200).itertuples()
+    ]
+    pairs = itertools.cycle(list(zip(profiles, profiles[1:] + profiles[:1])))
+    return lambda: generator.calculate_chemistry_score(*next(pairs))
+
+
+def _setup_team_collaboration(generator, data_access) -> Callable[[], Any]:
+    employee_ids = itertools.cycle(generator.generate_employees()["employee_id"].head(100).tolist())
+    return lambda: generator.generate_team_collaboration_for_employee(next(employee_ids))
+
+
+def _setup_clean_nan_values(generator, data_access) -> Callable[[], Any]:
+    from backend.routers.recruitment import clean_nan_values
+    # The whole candidates table as the list endpoints serialize it
+    records = data_access.get_candidates().to_dict(orient="records")
+    return lambda: clean_nan_values(records)
+
+
+def _setup_highlight_keywords(generator, data_access) -> Callable[[], Any]:
+    from backend.routers.ai_insights import highlight_keywords
+    highlight_keywords(SAMPLE_ANSWER)  # Build the keyword automaton outside the timing
+    return lambda: highlight_keywords(SAMPLE_ANSWER)
+
+
+def _setup_team_metrics(generator, data_access) -> Callable[[], Any]:
+    employees = data_access.get_employees()
+    managers = itertools.cycle(employees[employees["is_manager"]]["employee_id"].tolist())
+    return lambda: data_access.get_team_metrics(next(managers))
+
+
+def _setup_ideal_profiles(generator, data_access) -> Callable[[], Any]:
+    return generator.generate_ideal_profiles
+
+
+BENCHMARKS: Dict[str, Callable[[Any, Any], Callable[[], Any]]] = {
+    "calculate_chemistry_score": _setup_chemistry,
+    "generate_team_collaboration_for_employee": _setup_team_collaboration,
+    "clean_nan_values": _setup_clean_nan_values,
+    "highlight_keywords": _setup_highlight_keywords,
+    "get_team_metrics": _setup_team_metrics,
+    "generate_ideal_profiles": _setup_ideal_profiles,
+}
+
+
+def measure(fn: Callable[[], Any], seconds: float = 1.0, max_iterations: int = 10000, warmup: int = 1,
+            min_iterations: int = 3) -> Dict[str, Any]:
+    """Call fn until the time budget or iteration cap is reached; per-call latency summary"""
+    from benchmarks.report import latency_summary
+
+    for _ in range(warmup):
+        fn()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < min_iterations or (len(samples) < max_iterations and time.perf_counter() - started < seconds):
+        call_started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - call_started) * 1000)
+    return latency_summary(samples, time.perf_counter() - started)
+
+
+def run(scales: List[str], seconds: float = 1.0, max_iterations: int = 10000, only: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    from benchmarks.fixtures import load_generator
+    from data.mock_data import swap_mock_data_generator
+    from data.data_access import get_data_access
+
+    results = []
+    for scale in scales:
+        generator = load_generator(scale)
+        swap_mock_data_generator(generator)
+        data_access = get_data_access()
+        data_access.invalidate()  # Derived aggregates belong to the previous scale
+        rows = {"employees": len(data_access.get_employees()), "candidates": len(data_access.get_candidates())}
+        for name, setup in BENCHMARKS.items():
+            if only and name not in only:
+                continue
+            result = {"name": f"{scale}/{name}", "scale": scale, "function": name, **rows}
+            try:
+                result.update(measure(setup(generator, data_access), seconds, max_iterations))
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+            results.append(result)
+            print(_format_row(result), file=sys.stderr)
+    return results
+
+
+def _format_row(result: Dict[str, Any]) -> str:
+    if "error" in result:
+        return f"{result['name']:<52} ERROR {result['error']}"
+    return (
+        f"{result['name']:<52} {result['count']:>6} calls  p50 {result['p50_ms']:>9.3f}ms  "
+        f"p95 {result['p95_ms']:>9.3f}ms  p99 {result['p99_ms']:>9.3f}ms  {result['throughput_per_s']:>9.1f}/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks of hot functions on scaled fixtures")
+    parser.add_argument("--scales", default="small,medium", help="Comma-separated: small, medium, large")
+    parser.add_argument("--only", default=None, help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time budget per function and scale")
+    parser.add_argument("--max-iterations", type=int, default=10000)
+    parser.add_argument("--output", default=None, help="Results file (default benchmarks/results/micro-<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help="Earlier results file to compare p95 against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p95 slowdown vs the baseline")
+    args = parser.parse_args()
+
+    # In-process benchmarks always run on the fixtures' mock data
+    os.environ.update(USE_REAL_SQL="false", DATA_SNAPSHOT="off")
+    sys.path.insert(0, ROOT)
+    from benchmarks.report import write_results, compare, print_regressions
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    only = [s.strip() for s in args.only.split(",")] if args.only else None
+    results = run(scales, args.seconds, args.max_iterations, only)
+    path = write_results("micro", results, {"scales": scales, "seconds": args.seconds, "max_iterations": args.max_iterations}, args.output)
+    print(f"Results written to {path}")
+
+    if args.baseline:
+        regressions = compare(args.baseline, results, threshold=args.threshold)
+        print_regressions(regressions, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+"""
+Traffic Replay
+Re-issues request traces captured with TRAFFIC_CAPTURE=true
+(backend/services/traffic.py) against a local server, keeping the captured
+routes, access skew, timing and concurrency, and reports latency per route
+against the captured latency:
+
+    python -m benchmarks.replay /tmp/talent_hub_traffic/capture-*.jsonl               # 1x, medium fixture
+    python -m benchmarks.replay capture.jsonl --speed 4x                             # 4x faster
+    python -m benchmarks.replay capture.jsonl --speed max                            # back to back at the captured peak concurrency
+    python -m benchmarks.replay capture.jsonl --backend emulator --profile realistic
+    python -m benchmarks.replay capture.jsonl --baseline benchmarks/results/replay-<before>.json
+
+Captured ids are pseudonyms. Each parameter's pseudonyms are mapped to fixture
+ids by frequency rank: the most requested manager becomes the fixture's first
+manager, and so on. The hot set stays hot even though the ids differ. At 1x
+and Nx requests start at their captured offsets (open loop), so concurrency
+follows the capture. At max speed, the captured peak number of requests in
+flight run back to back.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import http.client
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ============================================================================
+# CAPTURE
+# ============================================================================
+
+def load_capture(paths: List[str]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Headers and records of one or more capture files, records ordered by start time"""
+    headers, records = [], []
+    for path in paths:
+        with open(path) as f:
+            lines = [line for line in f if line.strip()]
+        if not lines:
+            continue
+        headers.append({**json.loads(lines[0]), "path": path})
+        for line in lines[1:]:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                pass  # A worker killed mid-write leaves a partial last line
+    if len({h["key_id"] for h in headers}) > 1:
+        print("[REPLAY] Warning: captures use different keys, so the same id has different pseudonyms across them",
+              file=sys.stderr)
+    records.sort(key=lambda r: r["t"])
+    return headers, records
+
+
+def peak_concurrency(records: List[Dict[str, Any]]) -> int:
+    """Most requests in flight at once in the capture"""
+    events = sorted([(r["t"], 1) for r in records] + [(r["t"] + r["ms"] / 1000, -1) for r in records])
+    peak = current = 0
+    for _, change in events:
+        current += change
+        peak = max(peak, current)
+    return peak
+
+
+def _pseudonyms(record: Dict[str, Any]):
+    """(parameter name, pseudonym) for every identifier in a record"""
+    from backend.services.traffic import PSEUDONYM_PREFIX
+
+    for section in ("p", "q", "b"):
+        for name, value in record.get(section, {}).items():
+            base = name[:-1] if name.endswith("_ids") else name
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, str) and item.startswith(PSEUDONYM_PREFIX):
+                    yield base, item
+
+
+def map_ids(records: List[Dict[str, Any]], pools: Dict[str, List[str]]) -> Tuple[Dict[Tuple[str, str], str], Dict[str, Any]]:
+    """Pseudonym -> fixture id by frequency rank per parameter, plus the capture's skew per parameter"""
+    counts: Dict[str, Counter] = {}
+    for record in records:
+        for name, pseudonym in _pseudonyms(record):
+            counts.setdefault(name, Counter())[pseudonym] += 1
+
+    mapping, skew = {}, {}
+    for name, counter in counts.items():
+        ranked = sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+        pool = pools.get(name) or []
+        for rank, (pseudonym, _) in enumerate(ranked):
+            if pool:
+                # Wraps around when the capture saw more distinct ids than the fixture has
+                mapping[(name, pseudonym)] = pool[rank % len(pool)]
+        total = sum(counter.values())
+        top = max(1, len(ranked) // 10)
+        skew[name] = {
+            "requests": total,
+            "distinct": len(ranked),
+            "fixture_ids": len(pool),
+            "top_10pct_share": round(sum(count for _, count in ranked[:top]) / total, 3),
+        }
+    return mapping, skew
+
+
+# ============================================================================
+# REQUEST PLAN
+# ============================================================================
+
+def build_requests(records: List[Dict[str, Any]], openapi: Dict[str, Any], mapping: Dict[Tuple[str, str], str],
+                   ids: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Counter]:
+    """HTTP requests for the replayable records, and the skip reasons for the rest"""
+    from benchmarks.load import EXCLUDED_ROUTES, param_value, request_body
+    from backend.services.traffic import PSEUDONYM_PREFIX
+
+    components = openapi.get("components", {}).get("schemas", {})
+    skipped: Counter = Counter()
+    requests = []
+
+    def resolve(name: str, value):
+        if isinstance(value, list):
+            return [resolve(name[:-1] if name.endswith("_ids") else name, item) for item in value]
+        if isinstance(value, str) and value.startswith(PSEUDONYM_PREFIX):
+            # Server-side ids (jobs, profiles) fall back to one created for the run
+            return mapping.get((name, value), ids.get(name))
+        return value
+
+    for record in records:
+        method, route = record["m"], record["r"]
+        operation = openapi["paths"].get(route, {}).get(method.lower())
+        if operation is None:
+            skipped["route not in this server's schema"] += 1
+            continue
+        if method == "DELETE" or (method, route) in EXCLUDED_ROUTES:
+            skipped["admin route"] += 1
+            continue
+
+        path_values = {name: resolve(name, value) for name, value in record.get("p", {}).items()}
+        query = {name: resolve(name, value) for name, value in record.get("q", {}).items()}
+        # Free text was not captured; required parameters get the load test's stand-ins
+        for parameter in operation.get("parameters", []):
+            name = parameter["name"]
+            if parameter["in"] == "path" and name not in path_values:
+                path_values[name] = param_value(name, parameter.get("schema", {}), ids)
+            elif parameter["in"] == "query" and parameter.get("required") and name not in query:
+                query[name] = param_value(name, parameter.get("schema", {}), ids)
+        if any(value is None for value in path_values.values()):
+            skipped["no fixture id"] += 1
+            continue
+
+        path = route
+        for name, value in path_values.items():
+            path = path.replace("{" + name + "}", urllib.request.quote(str(value), safe=""))
+        query = {name: value for name, value in query.items() if value is not None}
+        if query:
+            path += "?" + "&".join(f"{name}={urllib.request.quote(str(value))}" for name, value in query.items())
+
+        body = None
+        if "requestBody" in operation:
+            body = request_body(operation["requestBody"]["content"]["application/json"]["schema"], components, ids)
+            body.update({name: resolve(name, value) for name, value in record.get("b", {}).items()})
+        requests.append({
+            "name": f"{method} {route}", "method": method, "path": path,
+            "body": json.dumps(body).encode() if body is not None else None,
+            "offset": record["t"] - records[0]["t"], "captured_ms": record["ms"], "captured_status": record["st"],
+        })
+    return requests, skipped
+
+
+# ============================================================================
+# REPLAY
+# ============================================================================
+
+class Replayer:
+    """Sends planned requests over per-thread keep-alive connections and records latency and status"""
+
+    def __init__(self, host: str, port: int, headers: Dict[str, str]):
+        self.host = host
+        self.port = port
+        self.headers = headers
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if getattr(self._local, "connection", None) is None:
+            self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=300)
+        return self._local.connection
+
+    def send(self, request: Dict[str, Any], due: Optional[float] = None) -> Dict[str, Any]:
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            connection = self._connection()
+            connection.request(request["method"], request["path"], body=request["body"], headers=self.headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self._local.connection.close()
+            self._local.connection = None
+            status = 0
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        return {
+            "latency_ms": (time.perf_counter() - started) * 1000,
+            "status": status,
+            "lag_ms": (started - due) * 1000 if due is not None else 0.0,
+        }
+
+
+def replay(replayer: Replayer, requests: List[Dict[str, Any]], speed: Optional[float], workers: int) -> Tuple[List[Dict[str, Any]], float]:
+    """Outcomes in request order and the wall time; speed None runs back to back with `workers` in flight"""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        if speed is None:
+            outcomes = list(pool.map(replayer.send, requests))
+        else:
+            futures = []
+            for request in requests:
+                due = started + request["offset"] / speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(pool.submit(replayer.send, request, due))
+            outcomes = [future.result() for future in futures]
+    return outcomes, time.perf_counter() - started
+
+
+def summarize(requests: List[Dict[str, Any]], outcomes: List[Dict[str, Any]], elapsed: float) -> List[Dict[str, Any]]:
+    """Per route and overall: replay vs captured latency percentiles, errors and status changes"""
+    from benchmarks.report import latency_summary
+
+    groups: Dict[str, List[int]] = {}
+    for index, request in enumerate(requests):
+        groups.setdefault(request["name"], []).append(index)
+    groups = {"ALL": list(range(len(requests))), **dict(sorted(groups.items(), key=lambda g: -len(g[1])))}
+
+    results = []
+    for name, indexes in groups.items():
+        replayed = latency_summary([outcomes[i]["latency_ms"] for i in indexes], elapsed)
+        captured = latency_summary([requests[i]["captured_ms"] for i in indexes])
+        statuses = Counter(str(outcomes[i]["status"]) for i in indexes)
+        result = {
+            "name": name,
+            **replayed,
+            "errors": sum(count for status, count in statuses.items() if not 200 <= int(status) < 400),
+            # A request that succeeded when captured but not now (or the reverse)
+            "status_changes": sum(
+                1 for i in indexes
+                if (200 <= outcomes[i]["status"] < 400) != (200 <= requests[i]["captured_status"] < 400)
+            ),
+            "status_counts": dict(statuses),
+            "captured": captured,
+        }
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            result[f"delta_{metric}"] = round(replayed[metric] - captured[metric], 3)
+        results.append(result)
+    return results
+
+
+def _parse_speed(value: str) -> Optional[float]:
+    value = value.lower()
+    if value == "max":
+        return None
+    speed = float(value.rstrip("x"))
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be positive or max")
+    return speed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured request traces against a local server")
+    parser.add_argument("captures", nargs="+", help="Capture files (one per worker process)")
+    parser.add_argument("--speed", type=_parse_speed, default=1.0, help="1x (captured timing), Nx, or max")
+    parser.add_argument("--scale", default="medium", help="Fixture to serve and map ids onto: small, medium, large")
+    parser.add_argument("--backend", choices=["local", "emulator"], default="local")
+    parser.add_argument("--profile", default="instant", help="Emulator profile with --backend emulator")
+    parser.add_argument("--url", default=None, help="Replay against an already running server instead")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Connection threads (default: the captured peak concurrency, x speed when timed)")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N captured requests")
+    parser.add_argument("--bypass-llm-cache", action="store_true", help="Send X-LLM-Cache: bypass")
+    parser.add_argument("--output", default=None, help="Results file (default benchmarks/results/replay-<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help="Earlier replay results to compare p95 against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p95 slowdown vs the baseline")
+    parser.add_argument("--min-count", type=int, default=20, help="Only compare routes with at least this many requests")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from benchmarks.fixtures import ensure_fixture
+    from benchmarks.load import id_pools, server_ids, start_servers, stop_servers
+    from benchmarks.report import write_results, compare, print_regressions
+
+    headers, records = load_capture(args.captures)
+    records = [r for r in records if r["r"].startswith("/api")][:args.limit]
+    if not records:
+        sys.exit("No replayable requests in the capture")
+    peak = peak_concurrency(records)
+    workers = args.workers or (peak if args.speed is None else max(4, int(peak * args.speed * 2)))
+
+    fixture = ensure_fixture(args.scale)
+    pools = id_pools(fixture)
+    mapping, skew = map_ids(records, pools)
+
+    processes = []
+    workdir = tempfile.mkdtemp(prefix="talent-hub-replay-")
+    try:
+        if args.url:
+            host, _, port = args.url.split("://", 1)[-1].rstrip("/").partition(":")
+            port = int(port or 80)
+        else:
+            print(f"Starting server on the {args.scale} fixture ({args.backend})...", file=sys.stderr)
+            host, (port, processes) = "127.0.0.1", start_servers(fixture, args.backend, args.profile, workdir)
+
+        with urllib.request.urlopen(f"http://{host}:{port}/openapi.json", timeout=60) as response:
+            openapi = json.load(response)
+        ids = server_ids(host, port, {name: (pool[0] if pool else None) for name, pool in pools.items()})
+        requests, skipped = build_requests(records, openapi, mapping, ids)
+
+        request_headers = {"Content-Type": "application/json"}
+        if args.bypass_llm_cache:
+            request_headers["X-LLM-Cache"] = "bypass"
+        replayer = Replayer(host, port, request_headers)
+        span = records[-1]["t"] - records[0]["t"]
+        speed_label = "max" if args.speed is None else f"{args.speed:g}x"
+        print(f"Replaying {len(requests)} requests spanning {span:.1f}s at {speed_label} "
+              f"(captured peak concurrency {peak}, {workers} workers)...", file=sys.stderr)
+        outcomes, elapsed = replay(replayer, requests, args.speed, workers)
+    finally:
+        stop_servers(processes)
+
+    results = summarize(requests, outcomes, elapsed)
+    for result in results:
+        print(
+            f"{result['name']:<66} {result['count']:>6}  p50 {result['p50_ms']:>8.1f}ms ({result['delta_p50_ms']:>+8.1f})  "
+            f"p95 {result['p95_ms']:>8.1f}ms ({result['delta_p95_ms']:>+8.1f})  errors {result['errors']}",
+            file=sys.stderr,
+        )
+    lags = sorted(outcome["lag_ms"] for outcome in outcomes)
+    settings = {
+        "captures": [{key: h.get(key) for key in ("path", "pid", "started_at", "sample_rate", "key_id")} for h in headers],
+        "speed": speed_label, "scale": args.scale, "backend": args.backend, "url": args.url,
+        "workers": workers, "captured_requests": len(records), "captured_span_s": round(span, 3),
+        "captured_peak_concurrency": peak, "replay_peak_concurrency": replayer.peak_in_flight,
+        "schedule_lag_p95_ms": round(lags[int(0.95 * (len(lags) - 1))], 3) if lags else None,
+        "skipped": dict(skipped), "id_skew": skew,
+    }
+    path = write_results("replay", results, settings, args.output)
+    print(f"{len(requests)} requests replayed in {elapsed:.1f}s, {sum(skipped.values())} skipped. Results written to {path}")
+
+    if args.baseline:
+        comparable = [r for r in results if r["count"] >= args.min_count]
+        regressions = compare(args.baseline, comparable, threshold=args.threshold)
+        print_regressions(regressions, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark Results
+Latency summaries, machine-readable result files and baseline comparison shared
+by the micro and load benchmarks. Every result is a dict with a unique "name";
+a run is written as JSON with the environment it ran in:
+
+    benchmarks/results/<kind>-<timestamp>.json
+
+Comparing against an earlier file flags results whose p95 (by default) got
+worse by more than the threshold, so a CI job can fail on regressions.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import platform
+import subprocess
+from typing import Dict, Any, List, Optional, Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def _percentile(ordered: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+def latency_summary(samples_ms: Sequence[float], elapsed_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Count, mean and p50/p95/p99/max in ms; throughput per second when the wall time is given"""
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {"count": 0}
+    summary = {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": round(_percentile(ordered, 0.50), 3),
+        "p95_ms": round(_percentile(ordered, 0.95), 3),
+        "p99_ms": round(_percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+    if elapsed_seconds:
+        summary["throughput_per_s"] = round(len(ordered) / elapsed_seconds, 2)
+    return summary
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def write_results(kind: str, results: List[Dict[str, Any]], settings: Dict[str, Any], output: Optional[str] = None) -> str:
+    """Write a run to output (default benchmarks/results/<kind>-<timestamp>.json); returns the path"""
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    elif os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"kind": kind, "environment": environment(), "settings": settings, "results": results}, f, indent=2)
+    return output
+
+
+def compare(baseline_path: str, results: List[Dict[str, Any]], metric: str = "p95_ms", threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """Results whose metric exceeds the baseline's by more than threshold (0.2 = 20%)"""
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        before = baseline.get(result["name"], {}).get(metric)
+        after = result.get(metric)
+        if before and after is not None and after > before * (1 + threshold):
+            regressions.append({"name": result["name"], "metric": metric, "baseline": before, "current": after,
+                                "change": round(after / before - 1, 3)})
+    return regressions
+
+
+def print_regressions(regressions: List[Dict[str, Any]], threshold: float) -> None:
+    if not regressions:
+        print(f"No regressions beyond {threshold:.0%}")
+        return
+    print(f"{len(regressions)} regression(s) beyond {threshold:.0%}:", file=sys.stderr)
+    for r in regressions:
+        print(f"  {r['name']}: {r['metric']} {r['baseline']} -> {r['current']} (+{r['change']:.0%})", file=sys.stderr)
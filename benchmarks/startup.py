@@ -0,0 +1,172 @@
+"""
+Startup Benchmark
+Measures how quickly a fresh process can serve traffic, the way a Databricks Apps
+cold start sees it:
+
+    python -m benchmarks.startup                 # eager vs lazy routers, 3 runs each
+    python -m benchmarks.startup --importtime    # -X importtime profile of backend.main
+    python -m benchmarks.startup --budget-ms 3000 --modes lazy   # exit 1 when over budget
+
+For each mode a uvicorn process is started and polled until /api/health answers;
+the first request to a data-backed endpoint is timed separately since lazy mode
+moves the router/data import cost there.
+"""
+
+import os
+import sys
+import time
+import json
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+import urllib.error
+from typing import Dict, Any, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(url: str, timeout: float = 60.0) -> Optional[int]:
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None
+
+
+# ============================================================================
+# IMPORT-TIME PROFILE
+# ============================================================================
+
+def import_profile(module: str = "backend.main", top: int = 20, env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Run `python -X importtime -c "import <module>"` and rank modules by cumulative and self time"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env={**os.environ, **(env or {})}, capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        if self_us.isdigit():
+            rows.append({"module": name, "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    total = next((r["cumulative_ms"] for r in rows if r["module"] == module), None)
+    return {
+        "module": module,
+        "total_ms": total,
+        "modules_imported": len(rows),
+        "by_cumulative": sorted(rows, key=lambda r: -r["cumulative_ms"])[:top],
+        "by_self": sorted(rows, key=lambda r: -r["self_ms"])[:top],
+    }
+
+
+# ============================================================================
+# TIME TO FIRST RESPONSE
+# ============================================================================
+
+def measure_startup(lazy: bool, first_path: str = "/api/recruitment/roles", timeout: float = 60.0) -> Dict[str, Any]:
+    """Start uvicorn with LAZY_ROUTERS set accordingly and time /api/health and a first real request"""
+    port = _free_port()
+    env = {**os.environ, "LAZY_ROUTERS": "true" if lazy else "false", "PYTHONDONTWRITEBYTECODE": "1"}
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        health_ms = None
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+            if _get(base + "/api/health", timeout=1.0) == 200:
+                health_ms = (time.perf_counter() - started) * 1000
+                break
+            time.sleep(0.01)
+        if health_ms is None:
+            raise RuntimeError(f"/api/health did not answer within {timeout}s")
+
+        request_started = time.perf_counter()
+        status = _get(base + first_path, timeout=timeout)
+        first_request_ms = (time.perf_counter() - request_started) * 1000
+        return {
+            "mode": "lazy" if lazy else "eager",
+            "health_ms": round(health_ms, 1),
+            "first_request_path": first_path,
+            "first_request_status": status,
+            "first_request_ms": round(first_request_ms, 1),
+            "ready_ms": round(health_ms + first_request_ms, 1),
+        }
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        key: {"median": round(statistics.median(r[key] for r in runs), 1), "max": round(max(r[key] for r in runs), 1)}
+        for key in ("health_ms", "first_request_ms", "ready_ms")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend startup benchmark")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", default="eager,lazy", help="Comma-separated: eager, lazy")
+    parser.add_argument("--path", default="/api/recruitment/roles", help="First data-backed request to time")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail when the slowest /api/health exceeds this")
+    parser.add_argument("--importtime", action="store_true", help="Print the import-time profile instead")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--lazy-imports", action="store_true", help="With --importtime, profile with LAZY_ROUTERS=true")
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args()
+
+    if args.importtime:
+        profile = import_profile(top=args.top, env={"LAZY_ROUTERS": "true" if args.lazy_imports else "false"})
+        if args.json:
+            print(json.dumps(profile, indent=2))
+            return
+        print(f"import {profile['module']}: {profile['total_ms']:.0f}ms, {profile['modules_imported']} modules")
+        print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for row in profile["by_cumulative"]:
+            print(f"{row['cumulative_ms']:>14.1f} {row['self_ms']:>9.1f}  {row['module']}")
+        return
+
+    report, over_budget = {}, False
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        runs = [measure_startup(mode == "lazy", args.path) for _ in range(args.runs)]
+        report[mode] = {"runs": runs, "summary": summarize(runs)}
+        if args.budget_ms is not None and report[mode]["summary"]["health_ms"]["max"] > args.budget_ms:
+            over_budget = True
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'mode':<6} {'health ms':>10} {'first request ms':>17} {'ready ms':>9}   (median of {args.runs}, max in brackets)")
+        for mode, result in report.items():
+            s = result["summary"]
+            print(
+                f"{mode:<6} {s['health_ms']['median']:>10.0f} {s['first_request_ms']['median']:>17.0f} {s['ready_ms']['median']:>9.0f}"
+                f"   [{s['health_ms']['max']:.0f} / {s['first_request_ms']['max']:.0f} / {s['ready_ms']['max']:.0f}]"
+            )
+    if over_budget:
+        print(f"FAIL: /api/health exceeded the {args.budget_ms:.0f}ms budget", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ from .databricks_config import (
     is_databricks_app,
     get_sql_connection,
     get_databricks_client,
+    get_emulator_url,
 )
 
 __all__ = [
@@ -16,4 +17,5 @@ __all__ = [
     "is_databricks_app",
     "get_sql_connection",
     "get_databricks_client",
+    "get_emulator_url",
 ]
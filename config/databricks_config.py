@@ -6,6 +6,7 @@ Handles connection to Databricks SQL Warehouse and AI endpoints
 import os
 from dataclasses import dataclass
 from typing import Optional
+from urllib.parse import urlparse
 
 
 def _is_databricks_environment() -> bool:
@@ -105,6 +106,22 @@ def is_local_mode() -> bool:
     return mode == "local"
 
 
+def get_emulator_url() -> Optional[str]:
+    """
+    Base URL of the local Databricks emulator when DATABRICKS_HOST points at
+    this machine (e.g. http://127.0.0.1:8900), otherwise None
+    """
+    host = os.getenv("DATABRICKS_HOST", "").strip().rstrip("/")
+    if not host:
+        return None
+    if "://" not in host:
+        host = f"http://{host}"
+    hostname = urlparse(host).hostname or ""
+    if hostname in ("localhost", "127.0.0.1", "::1", "0.0.0.0"):
+        return host
+    return None
+
+
 def get_sql_connection():
     """
     Get Databricks SQL connection
@@ -113,10 +130,16 @@ def get_sql_connection():
     if is_local_mode():
         return None
     
-    from databricks import sql
-    
     config = DatabricksConfig.from_env()
     
+    # DATABRICKS_HOST on localhost: SQLite-backed warehouse emulator (see emulator/)
+    emulator_url = get_emulator_url()
+    if emulator_url:
+        from emulator.warehouse import connect
+        return connect(serving_url=emulator_url, access_token=config.token)
+    
+    from databricks import sql
+    
     return sql.connect(
         server_hostname=config.host.replace("https://", ""),
         http_path=f"/sql/1.0/warehouses/{config.warehouse_id}",
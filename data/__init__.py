@@ -1,11 +1,41 @@
 """Data package for mock data and data access layer"""
 
-from .mock_data import MockDataGenerator, get_mock_data_generator
-from .data_access import DataAccessLayer, get_data_access
-
-__all__ = [
-    "MockDataGenerator",
-    "get_mock_data_generator",
-    "DataAccessLayer",
-    "get_data_access",
-]
+import importlib
+
+# Exports are resolved on first access (PEP 562) so that importing one submodule,
+# e.g. data.currency, does not pull in pandas, Faker and every engine at startup
+_EXPORTS = {
+    "MockDataGenerator": ".mock_data",
+    "get_mock_data_generator": ".mock_data",
+    "DataAccessLayer": ".data_access",
+    "get_data_access": ".data_access",
+    "AnalyticsCube": ".analytics_cube",
+    "FactCube": ".analytics_cube",
+    "Moments": ".analytics_cube",
+    "get_analytics_cube": ".analytics_cube",
+    "NormEngine": ".norms",
+    "SortedSample": ".norms",
+    "get_norm_engine": ".norms",
+    "SuccessionEngine": ".succession",
+    "ReadinessWeights": ".succession",
+    "get_succession_engine": ".succession",
+    "ChurnScoringEngine": ".churn_scoring",
+    "RuleBasedChurnModel": ".churn_scoring",
+    "LogisticChurnModel": ".churn_scoring",
+    "get_churn_engine": ".churn_scoring",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,345 @@
+"""
+Analytics Cube
+Pre-aggregated, mergeable moments (count, sum, sum of squares, min, max) along
+department, level, location and quarter. Built in one grouped pass per data
+version and kept up to date incrementally as rows are appended.
+"""
+
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .data_access import DataAccessLayer, get_data_access
+
+
+# Dimensions and measures for each fact cube
+PERFORMANCE_DIMENSIONS = ("department", "level", "location", "quarter")
+PERFORMANCE_MEASURES = (
+    "performance_score", "goal_completion_rate", "morale_score", "slack_sentiment",
+    "leadership_readiness", "revenue", "jira_velocity", "manager_rating",
+    "peer_feedback_score", "churn_risk_score",
+)
+
+ASSESSMENT_DIMENSIONS = ("department", "level", "location")
+ASSESSMENT_MEASURES = (
+    "ppa_dominance", "ppa_influence", "ppa_steadiness", "ppa_compliance",
+    "gia_overall", "gia_perceptual_speed", "gia_reasoning", "gia_number_speed",
+    "gia_word_meaning", "gia_spatial",
+    "hpti_conscientiousness", "hpti_adjustment", "hpti_curiosity",
+    "hpti_risk_approach", "hpti_ambiguity_acceptance", "hpti_competitiveness",
+)
+
+PIPELINE_DIMENSIONS = ("current_stage", "role_title", "city")
+PIPELINE_MEASURES = ("match_score", "candidate_confidence", "gia_score", "expected_salary_gbp")
+
+EMPLOYEE_DIMENSIONS = ["employee_id", "department", "level", "location"]
+
+ROWS_COLUMN = "_rows"
+ADDITIVE_STATS = ("count", "sum", "sumsq")
+
+
+@dataclass
+class Moments:
+    """Mergeable summary statistics for one measure"""
+    count: int = 0
+    sum: float = 0.0
+    sumsq: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+
+    def merge(self, other: "Moments") -> "Moments":
+        """Combine two sets of moments (associative and commutative)"""
+        return Moments(
+            count=self.count + other.count,
+            sum=self.sum + other.sum,
+            sumsq=self.sumsq + other.sumsq,
+            min=min(self.min, other.min),
+            max=max(self.max, other.max),
+        )
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    @property
+    def std(self) -> Optional[float]:
+        """Sample standard deviation (ddof=1, matching pandas)"""
+        if self.count < 2:
+            return None
+        variance = (self.sumsq - self.sum * self.sum / self.count) / (self.count - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        has_values = self.count > 0
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min if has_values else None,
+            "max": self.max if has_values else None,
+        }
+
+
+class FactCube:
+    """
+    Moments for a set of measures, stored per cell of the dimension cross-product.
+    Any slice/dice query is answered by merging cells - the raw rows are never rescanned.
+    """
+
+    def __init__(self, name: str, dimensions: Sequence[str], measures: Sequence[str]):
+        self.name = name
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self._cells: Optional[pd.DataFrame] = None
+
+    @property
+    def is_built(self) -> bool:
+        return self._cells is not None
+
+    @property
+    def cell_count(self) -> int:
+        return 0 if self._cells is None else len(self._cells)
+
+    def _aggregate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Compute moments for every cell in a single grouped pass"""
+        measures = [m for m in self.measures if m in df.columns]
+        values = df[measures].apply(pd.to_numeric, errors="coerce").astype("float64")
+        squares = values.pow(2).add_suffix("__sq")
+        wide = pd.concat([df[self.dimensions], values, squares], axis=1)
+        wide[ROWS_COLUMN] = 1
+
+        spec: Dict[str, Any] = {ROWS_COLUMN: "sum"}
+        for m in measures:
+            spec[m] = ["count", "sum", "min", "max"]
+            spec[f"{m}__sq"] = "sum"
+
+        grouped = wide.groupby(self.dimensions, dropna=False, sort=True).agg(spec)
+
+        cells = pd.DataFrame(index=grouped.index)
+        cells[ROWS_COLUMN] = grouped[(ROWS_COLUMN, "sum")]
+        for m in self.measures:
+            if m in measures:
+                cells[f"{m}__count"] = grouped[(m, "count")]
+                cells[f"{m}__sum"] = grouped[(m, "sum")]
+                cells[f"{m}__sumsq"] = grouped[(f"{m}__sq", "sum")]
+                cells[f"{m}__min"] = grouped[(m, "min")]
+                cells[f"{m}__max"] = grouped[(m, "max")]
+            else:
+                for stat in ADDITIVE_STATS:
+                    cells[f"{m}__{stat}"] = 0.0
+                cells[f"{m}__min"] = np.nan
+                cells[f"{m}__max"] = np.nan
+        return cells
+
+    @staticmethod
+    def _merge_cells(left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+        """Merge two cell tables: additive stats are summed, min/max combined"""
+        index = left.index.union(right.index)
+        left = left.reindex(index)
+        right = right.reindex(index)
+
+        merged = pd.DataFrame(index=index)
+        for column in left.columns:
+            stat = column.rsplit("__", 1)[-1]
+            if stat == "min":
+                merged[column] = np.fmin(left[column], right[column])
+            elif stat == "max":
+                merged[column] = np.fmax(left[column], right[column])
+            else:
+                merged[column] = left[column].fillna(0) + right[column].fillna(0)
+        return merged
+
+    def build(self, df: pd.DataFrame) -> None:
+        """Rebuild all cells from the full fact table"""
+        self._cells = self._aggregate(df)
+
+    def add_rows(self, df: pd.DataFrame) -> None:
+        """Fold newly arrived rows into the existing cells"""
+        if df.empty:
+            return
+        delta = self._aggregate(df)
+        self._cells = delta if self._cells is None else self._merge_cells(self._cells, delta)
+
+    def query(
+        self,
+        by: Sequence[str] = (),
+        filters: Optional[Dict[str, Union[Any, List[Any]]]] = None,
+        measures: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Slice (filters) and roll up (by) the cube.
+        Returns one record per group with the row count and a Moments object per measure.
+        """
+        if self._cells is None:
+            raise ValueError(f"Cube '{self.name}' has not been built")
+
+        by = list(by)
+        unknown = [d for d in by + list((filters or {}).keys()) if d not in self.dimensions]
+        if unknown:
+            raise ValueError(f"Unknown dimensions for cube '{self.name}': {unknown}")
+        measures = list(measures) if measures else self.measures
+        unknown = [m for m in measures if m not in self.measures]
+        if unknown:
+            raise ValueError(f"Unknown measures for cube '{self.name}': {unknown}")
+
+        cells = self._cells
+        for dim, value in (filters or {}).items():
+            allowed = value if isinstance(value, (list, tuple, set)) else [value]
+            cells = cells[cells.index.get_level_values(dim).isin(allowed)]
+
+        columns = [ROWS_COLUMN] + [f"{m}__{s}" for m in measures for s in ("count", "sum", "sumsq", "min", "max")]
+        cells = cells[columns]
+        spec = {c: c.rsplit("__", 1)[-1] if c.endswith(("__min", "__max")) else "sum" for c in columns}
+
+        if by:
+            rolled = cells.groupby(level=by, dropna=False, sort=True).agg(spec)
+        else:
+            rolled = cells.agg(spec).to_frame().T
+
+        records = []
+        for key, row in rolled.iterrows():
+            record: Dict[str, Any] = {}
+            if by:
+                key = key if isinstance(key, tuple) else (key,)
+                record.update({dim: (None if pd.isna(v) else v) for dim, v in zip(by, key)})
+            record["rows"] = int(row[ROWS_COLUMN]) if not pd.isna(row[ROWS_COLUMN]) else 0
+            record["measures"] = {
+                m: Moments(
+                    count=int(row[f"{m}__count"]),
+                    sum=float(row[f"{m}__sum"]),
+                    sumsq=float(row[f"{m}__sumsq"]),
+                    min=float(row[f"{m}__min"]) if not pd.isna(row[f"{m}__min"]) else math.inf,
+                    max=float(row[f"{m}__max"]) if not pd.isna(row[f"{m}__max"]) else -math.inf,
+                )
+                for m in measures
+            }
+            records.append(record)
+        return records
+
+    def total(self, measure: str, filters: Optional[Dict[str, Any]] = None) -> Moments:
+        """Moments for a single measure over a slice"""
+        records = self.query(filters=filters, measures=[measure])
+        return records[0]["measures"][measure] if records else Moments()
+
+
+class AnalyticsCube:
+    """
+    Performance, assessment and pipeline cubes for the whole organisation.
+    Rebuilt when the data version changes; appended rows are merged incrementally.
+    """
+
+    def __init__(self, data_access: DataAccessLayer):
+        self.data_access = data_access
+        self.version: Optional[int] = None
+        self.cubes: Dict[str, FactCube] = {
+            "performance": FactCube("performance", PERFORMANCE_DIMENSIONS, PERFORMANCE_MEASURES),
+            "assessments": FactCube("assessments", ASSESSMENT_DIMENSIONS, ASSESSMENT_MEASURES),
+            "pipeline": FactCube("pipeline", PIPELINE_DIMENSIONS, PIPELINE_MEASURES),
+        }
+        self._lock = threading.RLock()
+
+        data_access.subscribe("performance_metrics", self._on_performance_rows)
+        data_access.subscribe("thomas_assessments", self._on_assessment_rows)
+        data_access.subscribe("candidates", self._on_candidate_rows)
+
+    @property
+    def performance(self) -> FactCube:
+        return self.cubes["performance"]
+
+    @property
+    def assessments(self) -> FactCube:
+        return self.cubes["assessments"]
+
+    @property
+    def pipeline(self) -> FactCube:
+        return self.cubes["pipeline"]
+
+    def _with_employee_dimensions(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """Attach department/level/location from the employee table"""
+        employees = self.data_access.get_employees()[EMPLOYEE_DIMENSIONS]
+        return rows.merge(employees, on="employee_id", how="left", suffixes=("_fact", ""))
+
+    def refresh(self) -> "AnalyticsCube":
+        """Rebuild every cube if the underlying data version has moved on"""
+        with self._lock:
+            version = self.data_access.data_version
+            if self.version == version:
+                return self
+
+            self.performance.build(self._with_employee_dimensions(self.data_access.get_performance_metrics()))
+            self.assessments.build(self._with_employee_dimensions(self.data_access.get_thomas_assessments()))
+            self.pipeline.build(self.data_access.get_candidates())
+            self.version = version
+            return self
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"cubes": self.cubes}
+
+    def restore_snapshot_state(self, state: Dict[str, Any]) -> None:
+        """Adopt prebuilt cubes for the current data version (see data/snapshot.py)"""
+        with self._lock:
+            self.cubes = state["cubes"]
+            self.version = self.data_access.data_version
+
+    def _apply_delta(self, cube: FactCube, rows: pd.DataFrame, version: int) -> None:
+        with self._lock:
+            # Only fold in deltas when we are in sync; otherwise the next refresh rebuilds
+            if self.version is not None and self.version == version - 1:
+                cube.add_rows(rows)
+                self.version = version
+
+    def _on_performance_rows(self, rows: pd.DataFrame, version: int) -> None:
+        self._apply_delta(self.performance, self._with_employee_dimensions(rows), version)
+
+    def _on_assessment_rows(self, rows: pd.DataFrame, version: int) -> None:
+        self._apply_delta(self.assessments, self._with_employee_dimensions(rows), version)
+
+    def _on_candidate_rows(self, rows: pd.DataFrame, version: int) -> None:
+        self._apply_delta(self.pipeline, rows, version)
+
+    def query(
+        self,
+        cube: str,
+        by: Sequence[str] = (),
+        filters: Optional[Dict[str, Any]] = None,
+        measures: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Slice/dice query against a named cube"""
+        if cube not in self.cubes:
+            raise ValueError(f"Unknown cube: {cube}")
+        self.refresh()
+        return self.cubes[cube].query(by=by, filters=filters, measures=measures)
+
+    def describe(self) -> Dict[str, Any]:
+        """Cube metadata for discovery endpoints"""
+        self.refresh()
+        return {
+            "data_version": self.version,
+            "cubes": {
+                name: {
+                    "dimensions": cube.dimensions,
+                    "measures": cube.measures,
+                    "cells": cube.cell_count,
+                }
+                for name, cube in self.cubes.items()
+            },
+        }
+
+
+# Singleton instance
+_analytics_cube = None
+
+
+def get_analytics_cube() -> AnalyticsCube:
+    """Get or create the analytics cube singleton, refreshed to the current data version"""
+    global _analytics_cube
+    from .snapshot import restore_state
+    if _analytics_cube is None:
+        _analytics_cube = AnalyticsCube(get_data_access())
+    restore_state("analytics_cube", _analytics_cube)
+    return _analytics_cube.refresh()
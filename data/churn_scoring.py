@@ -0,0 +1,326 @@
+"""
+Churn Scoring Engine
+Vectorized churn risk scoring for the whole organisation. Indicators (morale,
+tenure, velocity, Slack sentiment, morale trend) are held as NumPy arrays aligned
+to the employee table, scored in one pass by a pluggable model, rescored row by
+row as metrics change, and ranked across any org subtree.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_access import DataAccessLayer, get_data_access
+
+
+FEATURES = ("morale_score", "tenure_months", "jira_velocity", "slack_sentiment", "morale_delta")
+RISK_LABELS = np.array(["Low", "Medium", "High"], dtype=object)
+RISK_ORDER = {"Low": 0, "Medium": 1, "High": 2}
+
+
+@dataclass
+class RuleBasedChurnModel:
+    """
+    Weighted indicator count. The defaults reproduce the churn_risk label and
+    churn_risk_score stored with the performance metrics; the trend weight is 0
+    so it can be switched on without changing historical labels.
+    """
+    morale_weight: float = 2
+    tenure_weight: float = 1
+    velocity_weight: float = 1
+    sentiment_weight: float = 1
+    trend_weight: float = 0
+    morale_threshold: float = 60
+    tenure_threshold: float = 12
+    velocity_threshold: float = 20
+    sentiment_threshold: float = 0.5
+    trend_threshold: float = -10
+    points_scale: float = 20
+    high_points: float = 3
+    medium_points: float = 2
+
+    def indicators(self, features: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        # NaN comparisons are False, so missing metrics never raise risk
+        with np.errstate(invalid="ignore"):
+            return {
+                "low_morale": features["morale_score"] < self.morale_threshold,
+                "short_tenure": features["tenure_months"] < self.tenure_threshold,
+                "low_velocity": features["jira_velocity"] < self.velocity_threshold,
+                "negative_sentiment": features["slack_sentiment"] < self.sentiment_threshold,
+                "declining_morale": features["morale_delta"] <= self.trend_threshold,
+            }
+
+    def points(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        flags = self.indicators(features)
+        return (
+            self.morale_weight * flags["low_morale"]
+            + self.tenure_weight * flags["short_tenure"]
+            + self.velocity_weight * flags["low_velocity"]
+            + self.sentiment_weight * flags["negative_sentiment"]
+            + self.trend_weight * flags["declining_morale"]
+        ).astype("float64")
+
+    def score(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        """Risk score on a 0-100 scale"""
+        return np.clip(self.points(features) * self.points_scale, 0, 100)
+
+    def label(self, scores: np.ndarray) -> np.ndarray:
+        points = scores / self.points_scale
+        return RISK_LABELS[(points >= self.medium_points).astype(int) + (points >= self.high_points).astype(int)]
+
+
+@dataclass
+class LogisticChurnModel:
+    """
+    Logistic model over standardised continuous features.
+    Coefficients are per standard deviation; missing features contribute nothing.
+    """
+    intercept: float = -1.2
+    morale_coef: float = -1.1
+    tenure_coef: float = -0.5
+    velocity_coef: float = -0.3
+    sentiment_coef: float = -0.9
+    trend_coef: float = -0.6
+    high_probability: float = 0.6
+    medium_probability: float = 0.35
+
+    @staticmethod
+    def _standardise(values: np.ndarray) -> np.ndarray:
+        mean = np.nanmean(values) if np.any(~np.isnan(values)) else 0.0
+        std = np.nanstd(values) if np.any(~np.isnan(values)) else 1.0
+        z = (values - mean) / (std if std > 0 else 1.0)
+        return np.nan_to_num(z, nan=0.0)
+
+    def score(self, features: Dict[str, np.ndarray]) -> np.ndarray:
+        logit = (
+            self.intercept
+            + self.morale_coef * self._standardise(features["morale_score"])
+            + self.tenure_coef * self._standardise(features["tenure_months"])
+            + self.velocity_coef * self._standardise(features["jira_velocity"])
+            + self.sentiment_coef * self._standardise(features["slack_sentiment"])
+            + self.trend_coef * self._standardise(features["morale_delta"])
+        )
+        return 100.0 / (1.0 + np.exp(-logit))
+
+    def label(self, scores: np.ndarray) -> np.ndarray:
+        probability = scores / 100.0
+        return RISK_LABELS[(probability >= self.medium_probability).astype(int) + (probability >= self.high_probability).astype(int)]
+
+
+CHURN_MODELS = {
+    "rules": RuleBasedChurnModel(),
+    "logistic": LogisticChurnModel(),
+}
+
+
+class ChurnScoringEngine:
+    """Org-wide churn scores held as arrays aligned to the employee table"""
+
+    def __init__(self, data_access: DataAccessLayer, models: Optional[Dict[str, Any]] = None):
+        self.data_access = data_access
+        self.models = dict(models or CHURN_MODELS)
+        self.version: Optional[int] = None
+        self.quarter: Optional[str] = None
+        self.employee_ids = np.array([], dtype=object)
+        self.manager_ids = np.array([], dtype=object)
+        self.features: Dict[str, np.ndarray] = {}
+        self.scores: Dict[str, np.ndarray] = {}
+        self._index: Dict[str, int] = {}
+        self._children: Dict[str, List[int]] = {}
+        self._lock = threading.RLock()
+
+        data_access.subscribe("performance_metrics", self._on_performance_rows)
+
+    def refresh(self) -> "ChurnScoringEngine":
+        """Rebuild feature arrays and scores if the data version has changed"""
+        with self._lock:
+            version = self.data_access.data_version
+            if self.version == version:
+                return self
+
+            employees = self.data_access.get_employees()
+            metrics = self.data_access.get_performance_metrics()
+            quarters = sorted(metrics["quarter"].dropna().unique())
+            self.quarter = quarters[-1] if quarters else None
+
+            ids = pd.Index(employees["employee_id"])
+            self.employee_ids = ids.to_numpy(dtype=object)
+            self.manager_ids = employees["manager_id"].to_numpy(dtype=object)
+            self._index = {emp_id: i for i, emp_id in enumerate(self.employee_ids)}
+
+            self._children = {}
+            for i, manager_id in enumerate(self.manager_ids):
+                if manager_id is not None and not pd.isna(manager_id):
+                    self._children.setdefault(manager_id, []).append(i)
+
+            latest = self._quarter_frame(metrics, ids, self.quarter)
+            previous = self._quarter_frame(metrics, ids, quarters[-2] if len(quarters) > 1 else None)
+
+            self.features = {
+                "morale_score": latest["morale_score"],
+                "tenure_months": pd.to_numeric(employees["tenure_months"], errors="coerce").to_numpy(dtype="float64", copy=True),
+                "jira_velocity": latest["jira_velocity"],
+                "slack_sentiment": latest["slack_sentiment"],
+                "morale_delta": latest["morale_score"] - previous["morale_score"],
+            }
+            self._rescore_all()
+            self.version = version
+            return self
+
+    @staticmethod
+    def _quarter_frame(metrics: pd.DataFrame, ids: pd.Index, quarter: Optional[str]) -> Dict[str, np.ndarray]:
+        """Metric columns for one quarter, aligned to the employee index (NaN where missing)"""
+        columns = ["morale_score", "jira_velocity", "slack_sentiment"]
+        if quarter is None:
+            return {c: np.full(len(ids), np.nan) for c in columns}
+        rows = metrics[metrics["quarter"] == quarter].drop_duplicates("employee_id", keep="last")
+        aligned = rows.set_index("employee_id").reindex(ids)
+        return {c: pd.to_numeric(aligned[c], errors="coerce").to_numpy(dtype="float64", copy=True) for c in columns}
+
+    def _rescore_all(self) -> None:
+        self.scores = {name: model.score(self.features) for name, model in self.models.items()}
+
+    def _rescore_rows(self, rows: np.ndarray) -> None:
+        """Rescore only the given rows. Models that normalise across the org are rescored in full."""
+        subset = {k: v[rows] for k, v in self.features.items()}
+        for name, model in self.models.items():
+            if isinstance(model, LogisticChurnModel):
+                self.scores[name] = model.score(self.features)
+            else:
+                self.scores[name][rows] = model.score(subset)
+
+    def set_model(self, name: str, model: Any) -> None:
+        """Register or replace a scoring model and score the whole org with it"""
+        with self._lock:
+            self.refresh()
+            self.models[name] = model
+            self.scores[name] = model.score(self.features)
+
+    def update_metrics(self, employee_id: str, **values: float) -> Dict[str, Any]:
+        """Apply changed metric values for one employee and rescore just that row"""
+        with self._lock:
+            self.refresh()
+            if employee_id not in self._index:
+                raise KeyError(employee_id)
+            i = self._index[employee_id]
+            if "morale_score" in values:
+                previous = self.features["morale_score"][i] - self.features["morale_delta"][i]
+                self.features["morale_score"][i] = values["morale_score"]
+                if not np.isnan(previous):
+                    self.features["morale_delta"][i] = values["morale_score"] - previous
+            for feature in ("tenure_months", "jira_velocity", "slack_sentiment"):
+                if feature in values:
+                    self.features[feature][i] = np.nan if values[feature] is None else values[feature]
+            self._rescore_rows(np.array([i]))
+            return self.explain(employee_id)
+
+    def _on_performance_rows(self, rows: pd.DataFrame, version: int) -> None:
+        with self._lock:
+            if self.version is None or self.version != version - 1:
+                return  # Out of sync - the next refresh rebuilds everything
+            if "quarter" in rows.columns and self.quarter is not None and (rows["quarter"] > self.quarter).any():
+                return  # A new quarter arrived - leave it to a full rebuild
+            touched = []
+            for _, row in rows[rows["quarter"] == self.quarter].iterrows():
+                i = self._index.get(row["employee_id"])
+                if i is None:
+                    continue
+                previous = self.features["morale_score"][i] - self.features["morale_delta"][i]
+                for feature in ("morale_score", "jira_velocity", "slack_sentiment"):
+                    self.features[feature][i] = pd.to_numeric(row.get(feature), errors="coerce")
+                self.features["morale_delta"][i] = self.features["morale_score"][i] - previous
+                touched.append(i)
+            if touched:
+                self._rescore_rows(np.array(touched))
+            self.version = version
+
+    def subtree(self, manager_id: Optional[str], direct_only: bool = False) -> np.ndarray:
+        """Row indices of everyone reporting (directly or indirectly) to a manager; whole org if None"""
+        self.refresh()
+        if manager_id is None:
+            return np.arange(len(self.employee_ids))
+        if direct_only:
+            return np.array(self._children.get(manager_id, []), dtype=int)
+
+        rows: List[int] = []
+        frontier = [manager_id]
+        seen = {manager_id}
+        while frontier:
+            next_frontier = []
+            for boss in frontier:
+                for i in self._children.get(boss, []):
+                    emp_id = self.employee_ids[i]
+                    if emp_id in seen:
+                        continue
+                    seen.add(emp_id)
+                    rows.append(i)
+                    next_frontier.append(emp_id)
+            frontier = next_frontier
+        return np.array(rows, dtype=int)
+
+    def top_at_risk(
+        self,
+        manager_id: Optional[str] = None,
+        n: int = 10,
+        model: str = "rules",
+        direct_only: bool = False,
+        min_risk: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Highest churn scores within an org subtree, best-first"""
+        with self._lock:
+            self.refresh()
+            if model not in self.scores:
+                raise ValueError(f"Unknown churn model: {model}")
+            rows = self.subtree(manager_id, direct_only)
+            if len(rows) == 0:
+                return []
+
+            scores = self.scores[model][rows]
+            labels = self.models[model].label(scores)
+            if min_risk:
+                keep = np.array([RISK_ORDER.get(label, 0) >= RISK_ORDER[min_risk] for label in labels], dtype=bool)
+                rows, scores, labels = rows[keep], scores[keep], labels[keep]
+
+            n = min(n, len(rows))
+            if n == 0:
+                return []
+            top = np.argpartition(-scores, n - 1)[:n]
+            top = top[np.lexsort((self.employee_ids[rows[top]], -scores[top]))]
+            return [self._row_summary(rows[t], model, scores[t], labels[t]) for t in top]
+
+    def _row_summary(self, i: int, model: str, score: float, label: str) -> Dict[str, Any]:
+        indicators = RuleBasedChurnModel().indicators({k: v[i:i + 1] for k, v in self.features.items()})
+        return {
+            "employee_id": self.employee_ids[i],
+            "manager_id": None if pd.isna(self.manager_ids[i]) else self.manager_ids[i],
+            "churn_score": round(float(score), 1),
+            "churn_risk": label,
+            "model": model,
+            "indicators": [name for name, flag in indicators.items() if bool(flag[0])],
+            "features": {k: (None if np.isnan(v[i]) else float(v[i])) for k, v in self.features.items()},
+        }
+
+    def explain(self, employee_id: str, model: str = "rules") -> Dict[str, Any]:
+        """Score, label and firing indicators for one employee"""
+        with self._lock:
+            self.refresh()
+            if employee_id not in self._index:
+                raise KeyError(employee_id)
+            i = self._index[employee_id]
+            score = self.scores[model][i]
+            return self._row_summary(i, model, score, self.models[model].label(np.array([score]))[0])
+
+
+# Singleton instance
+_churn_engine = None
+
+
+def get_churn_engine() -> ChurnScoringEngine:
+    """Get or create the churn scoring engine singleton, refreshed to the current data version"""
+    global _churn_engine
+    if _churn_engine is None:
+        _churn_engine = ChurnScoringEngine(get_data_access())
+    return _churn_engine.refresh()
@@ -3,10 +3,10 @@ Data Access Layer
 Abstraction layer that switches between mock data (local) and Databricks (production)
 """
 
-from typing import Dict, List, Any, Optional
+import threading
+from typing import Callable, Dict, List, Any, Optional
 import pandas as pd
 from config import is_local_mode, get_sql_connection, DatabricksConfig
-from .mock_data import get_mock_data_generator
 
 
 class DataAccessLayer:
@@ -20,10 +20,13 @@ class DataAccessLayer:
         # For this demo, always use mock data since SQL tables aren't deployed
         # To use real SQL, set USE_REAL_SQL=true
         import os
+        # Deferred: the mock generator pulls in Faker, which only local/demo mode needs
+        from .mock_data import get_mock_data_generator
         use_mock = os.getenv("USE_REAL_SQL", "false").lower() != "true"
         
         self.is_local = use_mock  # Use mock data unless explicitly using real SQL
-        self.mock_gen = get_mock_data_generator() if self.is_local else None
+        if self.is_local:
+            get_mock_data_generator()  # Generate, or restore from a snapshot, up front
         self.connection = None
         if not self.is_local:
             try:
@@ -32,8 +35,25 @@ class DataAccessLayer:
                 import logging
                 logging.warning(f"Failed to get SQL connection, falling back to mock data: {e}")
                 self.is_local = True
-                self.mock_gen = get_mock_data_generator()
+                get_mock_data_generator()
         self.config = DatabricksConfig.from_env()
+        
+        # Data version - derived aggregates (analytics cube, etc.) are keyed on this
+        self._data_version = 0
+        self._listeners: Dict[str, List[Callable[[pd.DataFrame, int], None]]] = {}
+        self._invalidate_listeners: List[Callable[[int], None]] = []
+        self._append_lock = threading.Lock()
+    
+    @property
+    def mock_gen(self):
+        """
+        The mock data generator singleton, looked up on every use so that swapping in a
+        newly published dataset (data/snapshot.py) is a single reference change.
+        """
+        if not self.is_local:
+            return None
+        from .mock_data import get_mock_data_generator
+        return get_mock_data_generator()
     
     def _execute_query(self, query: str) -> pd.DataFrame:
         """Execute SQL query against Databricks"""
@@ -48,6 +68,83 @@ class DataAccessLayer:
         
         return pd.DataFrame(data, columns=columns)
     
+    # ========================================
+    # DATA VERSIONING
+    # ========================================
+    
+    # Mock generator attributes backing each appendable table
+    APPENDABLE_TABLES = {
+        "employees": ("_employees", "get_employees"),
+        "thomas_assessments": ("_thomas_assessments", "get_thomas_assessments"),
+        "candidates": ("_candidates", "get_candidates"),
+        "interaction_logs": ("_interaction_logs", "get_interaction_logs"),
+        "performance_metrics": ("_performance_metrics", "get_performance_metrics"),
+    }
+    
+    @property
+    def data_version(self) -> int:
+        """Monotonic version of the underlying tables"""
+        return self._data_version
+    
+    def invalidate(self) -> int:
+        """Mark all tables as changed so derived aggregates are rebuilt"""
+        self._data_version += 1
+        for callback in self._invalidate_listeners:
+            callback(self._data_version)
+        return self._data_version
+    
+    def on_invalidate(self, callback: Callable[[int], None]) -> None:
+        """Register a callback(new_version) for whole-dataset changes (aggregates not keyed on data_version)"""
+        self._invalidate_listeners.append(callback)
+    
+    def subscribe(self, table: str, callback: Callable[[pd.DataFrame, int], None]) -> None:
+        """Register a callback(rows, new_version) fired when rows are appended to a table"""
+        self._listeners.setdefault(table, []).append(callback)
+    
+    def append_rows(self, table: str, rows: pd.DataFrame) -> int:
+        """
+        Record newly arrived rows for a table and notify subscribers.
+        In local mode the rows are appended to the mock data; in production the rows
+        are assumed to already be written upstream (e.g. by Lakeflow Connect).
+        """
+        if table not in self.APPENDABLE_TABLES:
+            raise ValueError(f"Table {table} does not support appends")
+        
+        with self._append_lock:
+            if self.is_local:
+                attr, getter = self.APPENDABLE_TABLES[table]
+                getattr(self, getter)()  # Ensure the table is generated before appending
+                current = getattr(self.mock_gen, attr)
+                setattr(self.mock_gen, attr, pd.concat([current, rows], ignore_index=True))
+            
+            self._data_version += 1
+            for callback in self._listeners.get(table, []):
+                callback(rows, self._data_version)
+            return self._data_version
+    
+    def rows_from_records(self, table: str, records: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Build an append_rows frame from JSON records: date fields parsed, and locally
+        the columns checked against the table and cast to its dtypes.
+        """
+        if table not in self.APPENDABLE_TABLES:
+            raise ValueError(f"Table {table} does not support appends")
+        if not records:
+            raise ValueError("No rows given")
+        rows = pd.DataFrame.from_records(records)
+        for column in rows.columns:
+            if column == "date" or column.endswith("_date"):
+                rows[column] = pd.to_datetime(rows[column]).dt.date
+        
+        if self.is_local:
+            current = getattr(self, self.APPENDABLE_TABLES[table][1])()
+            unknown = [c for c in rows.columns if c not in current.columns]
+            missing = [c for c in current.columns if c not in rows.columns]
+            if unknown or missing:
+                raise ValueError(f"Columns do not match {table}: unknown {unknown}, missing {missing}")
+            rows = rows[list(current.columns)].astype(current.dtypes.to_dict())
+        return rows
+    
     # ========================================
     # EMPLOYEE DATA
     # ========================================
@@ -759,6 +759,8 @@ class MockDataGenerator:
                 else:
                     morale_score = random.randint(50, 95)
                     slack_sentiment = random.uniform(0.3, 0.9)
+                # Label from the stored (rounded) value so the churn engine reproduces it
+                slack_sentiment = round(slack_sentiment, 2)
                 
                 # Churn risk calculation
                 churn_indicators = 0
@@ -785,7 +787,7 @@ class MockDataGenerator:
                     "code_reviews": code_reviews,
                     "pr_merged": pr_merged,
                     "morale_score": morale_score,
-                    "slack_sentiment": round(slack_sentiment, 2),
+                    "slack_sentiment": slack_sentiment,
                     "manager_rating": random.randint(3, 5),
                     "peer_feedback_score": random.randint(60, 100),
                     "leadership_readiness": random.randint(20, 95),
@@ -1807,4 +1809,18 @@ def get_mock_data_generator() -> MockDataGenerator:
     global _mock_data_generator
     if _mock_data_generator is None:
         _mock_data_generator = MockDataGenerator()
+        # Start from the prebuilt snapshot when it matches this generator (see data/snapshot.py)
+        from data.snapshot import restore_tables
+        restore_tables(_mock_data_generator)
     return _mock_data_generator
+
+
+def swap_mock_data_generator(generator: MockDataGenerator) -> MockDataGenerator:
+    """Replace the singleton in one step (e.g. with a newly published dataset); returns the previous one"""
+    global _mock_data_generator
+    previous = _mock_data_generator
+    if previous is not None:
+        # Insights extracted in this process are not part of the dataset; carry them over
+        generator._referral_insights.update(previous._referral_insights)
+    _mock_data_generator = generator
+    return previous
@@ -0,0 +1,314 @@
+"""
+Norm Engine
+Org-wide percentile norms for Thomas assessment and performance columns.
+Keeps sorted samples per department and level so percentile ranks, quantiles
+and histograms are answered with binary search, and folds in new assessments
+incrementally as they arrive.
+"""
+
+import threading
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data_access import DataAccessLayer, get_data_access
+
+
+ASSESSMENT_NORM_COLUMNS = (
+    "ppa_dominance", "ppa_influence", "ppa_steadiness", "ppa_compliance",
+    "gia_overall", "gia_perceptual_speed", "gia_reasoning", "gia_number_speed",
+    "gia_word_meaning", "gia_spatial",
+    "hpti_conscientiousness", "hpti_adjustment", "hpti_curiosity",
+    "hpti_risk_approach", "hpti_ambiguity_acceptance", "hpti_competitiveness",
+)
+
+PERFORMANCE_NORM_COLUMNS = (
+    "performance_score", "goal_completion_rate", "morale_score", "slack_sentiment",
+    "leadership_readiness", "jira_velocity", "revenue", "manager_rating",
+    "peer_feedback_score",
+)
+
+# Performance norms are taken over the latest quarter only
+NORM_QUARTER = "2024-Q4"
+
+# Fall back to a broader norm group when a group has fewer samples than this
+MIN_NORM_SAMPLE = 5
+
+DEFAULT_QUANTILES = (0.10, 0.25, 0.50, 0.75, 0.90)
+
+GroupKey = Tuple[str, ...]
+
+
+class SortedSample:
+    """
+    Sorted array of observations with a small append buffer.
+    Appends are O(1); the buffer is merged on the next read so queries stay O(log n).
+    Two samples merge exactly, so per-group samples can be combined into broader norms.
+    """
+
+    def __init__(self, values: Optional[np.ndarray] = None):
+        values = np.asarray(values if values is not None else [], dtype="float64")
+        self._sorted = np.sort(values[~np.isnan(values)])
+        self._pending: List[float] = []
+
+    def add(self, values: Sequence[float]) -> None:
+        self._pending.extend(float(v) for v in values if v is not None and not np.isnan(v))
+
+    def _flush(self) -> np.ndarray:
+        if self._pending:
+            self._sorted = np.sort(np.concatenate([self._sorted, np.asarray(self._pending)]), kind="mergesort")
+            self._pending = []
+        return self._sorted
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._flush()
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._pending)
+
+    def merge(self, other: "SortedSample") -> "SortedSample":
+        merged = SortedSample()
+        merged._sorted = np.sort(np.concatenate([self.values, other.values]), kind="mergesort")
+        return merged
+
+    def percentile_rank(self, value: float) -> Optional[float]:
+        """Mid-rank percentile (ties count half), 0-100"""
+        values = self._flush()
+        if len(values) == 0:
+            return None
+        below = np.searchsorted(values, value, side="left")
+        at_or_below = np.searchsorted(values, value, side="right")
+        return float(100.0 * (below + at_or_below) / (2 * len(values)))
+
+    def quantiles(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, Optional[float]]:
+        values = self._flush()
+        if len(values) == 0:
+            return {f"p{int(round(q * 100))}": None for q in qs}
+        return {f"p{int(round(q * 100))}": float(v) for q, v in zip(qs, np.quantile(values, qs))}
+
+    def histogram(self, bins: int = 10, value_range: Optional[Tuple[float, float]] = None) -> Dict[str, List[float]]:
+        """Equal-width histogram computed with one searchsorted over the bin edges"""
+        values = self._flush()
+        if len(values) == 0:
+            return {"edges": [], "counts": []}
+        low, high = value_range if value_range else (values[0], values[-1])
+        if high <= low:
+            high = low + 1
+        edges = np.linspace(low, high, bins + 1)
+        positions = np.searchsorted(values, edges, side="left")
+        positions[-1] = np.searchsorted(values, edges[-1], side="right")
+        counts = np.diff(positions)
+        return {"edges": edges.tolist(), "counts": counts.astype(int).tolist()}
+
+
+class NormEngine:
+    """
+    Percentile norms for every assessment and performance column, held per
+    org / department / level / department+level group.
+    """
+
+    def __init__(self, data_access: DataAccessLayer):
+        self.data_access = data_access
+        self.version: Optional[int] = None
+        self._samples: Dict[str, Dict[GroupKey, SortedSample]] = {}
+        self._lock = threading.RLock()
+
+        data_access.subscribe("thomas_assessments", self._on_assessment_rows)
+        data_access.subscribe("performance_metrics", self._on_performance_rows)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(ASSESSMENT_NORM_COLUMNS) + list(PERFORMANCE_NORM_COLUMNS)
+
+    def _with_employee_groups(self, rows: pd.DataFrame) -> pd.DataFrame:
+        employees = self.data_access.get_employees()[["employee_id", "department", "level"]]
+        return rows.merge(employees, on="employee_id", how="left", suffixes=("_fact", ""))
+
+    @staticmethod
+    def _group_keys(department: Any, level: Any) -> List[GroupKey]:
+        keys: List[GroupKey] = [("org",)]
+        if not pd.isna(department):
+            keys.append(("department", str(department)))
+        if not pd.isna(level):
+            keys.append(("level", str(level)))
+        if not pd.isna(department) and not pd.isna(level):
+            keys.append(("department_level", str(department), str(level)))
+        return keys
+
+    def _build_columns(self, frame: pd.DataFrame, columns: Sequence[str]) -> None:
+        """Sort each column once per group"""
+        groupings: List[Tuple[str, List[str]]] = [
+            ("department", ["department"]),
+            ("level", ["level"]),
+            ("department_level", ["department", "level"]),
+        ]
+        for column in columns:
+            if column not in frame.columns:
+                continue
+            values = pd.to_numeric(frame[column], errors="coerce")
+            samples: Dict[GroupKey, SortedSample] = {("org",): SortedSample(values.to_numpy())}
+            for scope, keys in groupings:
+                for group, group_values in values.groupby([frame[k] for k in keys], dropna=True):
+                    group = group if isinstance(group, tuple) else (group,)
+                    samples[(scope,) + tuple(str(g) for g in group)] = SortedSample(group_values.to_numpy())
+            self._samples[column] = samples
+
+    def refresh(self) -> "NormEngine":
+        """Rebuild all norms if the data version has changed"""
+        with self._lock:
+            version = self.data_access.data_version
+            if self.version == version:
+                return self
+
+            self._samples = {}
+            assessments = self._with_employee_groups(self.data_access.get_thomas_assessments())
+            self._build_columns(assessments, ASSESSMENT_NORM_COLUMNS)
+
+            performance = self.data_access.get_performance_metrics(quarter=NORM_QUARTER)
+            self._build_columns(self._with_employee_groups(performance), PERFORMANCE_NORM_COLUMNS)
+            self.version = version
+            return self
+
+    def _add_rows(self, rows: pd.DataFrame, columns: Sequence[str], version: int) -> None:
+        with self._lock:
+            if self.version is None or self.version != version - 1:
+                return  # Out of sync - the next refresh rebuilds everything
+            for _, row in rows.iterrows():
+                keys = self._group_keys(row.get("department"), row.get("level"))
+                for column in columns:
+                    value = pd.to_numeric(row.get(column), errors="coerce")
+                    if pd.isna(value):
+                        continue
+                    for key in keys:
+                        self._samples.setdefault(column, {}).setdefault(key, SortedSample()).add([value])
+            self.version = version
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"samples": self._samples}
+
+    def restore_snapshot_state(self, state: Dict[str, Any]) -> None:
+        """Adopt prebuilt norms for the current data version (see data/snapshot.py)"""
+        with self._lock:
+            self._samples = state["samples"]
+            self.version = self.data_access.data_version
+
+    def _on_assessment_rows(self, rows: pd.DataFrame, version: int) -> None:
+        self._add_rows(self._with_employee_groups(rows), ASSESSMENT_NORM_COLUMNS, version)
+
+    def _on_performance_rows(self, rows: pd.DataFrame, version: int) -> None:
+        latest = rows[rows["quarter"] == NORM_QUARTER] if "quarter" in rows.columns else rows
+        self._add_rows(self._with_employee_groups(latest), PERFORMANCE_NORM_COLUMNS, version)
+
+    def norm_group(
+        self,
+        column: str,
+        department: Optional[str] = None,
+        level: Optional[str] = None,
+    ) -> Tuple[GroupKey, SortedSample]:
+        """Most specific group with enough samples, falling back towards the whole org"""
+        self.refresh()
+        if column not in self._samples:
+            raise ValueError(f"No norms for column: {column}")
+        samples = self._samples[column]
+
+        candidates: List[GroupKey] = []
+        if department and level:
+            candidates.append(("department_level", department, level))
+        if department:
+            candidates.append(("department", department))
+        if level:
+            candidates.append(("level", level))
+        candidates.append(("org",))
+
+        for key in candidates:
+            sample = samples.get(key)
+            if sample is not None and len(sample) >= MIN_NORM_SAMPLE:
+                return key, sample
+        return ("org",), samples[("org",)]
+
+    @staticmethod
+    def describe_group(key: GroupKey) -> str:
+        if key[0] == "org":
+            return "organisation"
+        return " / ".join(key[1:])
+
+    def percentile_rank(
+        self,
+        column: str,
+        value: float,
+        department: Optional[str] = None,
+        level: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Percentile rank of a value against the closest norm group"""
+        key, sample = self.norm_group(column, department, level)
+        return {
+            "column": column,
+            "value": value,
+            "percentile": sample.percentile_rank(value),
+            "norm_group": self.describe_group(key),
+            "sample_size": len(sample),
+        }
+
+    def quantiles(
+        self,
+        column: str,
+        department: Optional[str] = None,
+        level: Optional[str] = None,
+        qs: Sequence[float] = DEFAULT_QUANTILES,
+    ) -> Dict[str, Optional[float]]:
+        _, sample = self.norm_group(column, department, level)
+        return sample.quantiles(qs)
+
+    def histogram(
+        self,
+        column: str,
+        bins: int = 10,
+        department: Optional[str] = None,
+        level: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        key, sample = self.norm_group(column, department, level)
+        return {
+            "column": column,
+            "norm_group": self.describe_group(key),
+            "sample_size": len(sample),
+            **sample.histogram(bins),
+        }
+
+
+def percentile_band(percentile: Optional[float]) -> str:
+    """Plain-language band for a percentile rank"""
+    if percentile is None:
+        return "Unknown"
+    if percentile >= 75:
+        return "High"
+    if percentile >= 25:
+        return "Moderate"
+    return "Low"
+
+
+def ordinal(n: Optional[int]) -> str:
+    """1 -> 1st, 22 -> 22nd, 13 -> 13th; None (no norm data) -> n/a"""
+    if n is None:
+        return "n/a"
+    if 10 <= n % 100 <= 20:
+        suffix = "th"
+    else:
+        suffix = {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+# Singleton instance
+_norm_engine = None
+
+
+def get_norm_engine() -> NormEngine:
+    """Get or create the norm engine singleton, refreshed to the current data version"""
+    global _norm_engine
+    from .snapshot import restore_state
+    if _norm_engine is None:
+        _norm_engine = NormEngine(get_data_access())
+    restore_state("norms", _norm_engine)
+    return _norm_engine.refresh()
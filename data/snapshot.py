@@ -0,0 +1,437 @@
+"""
+Dataset Snapshots
+Serializes the mock/demo tables and the derived aggregates and indexes at build
+time, so a process starts by mapping a prebuilt snapshot instead of running the
+Faker generators and rebuilding every engine.
+
+Tables are written as Arrow IPC files and memory-mapped on load when pyarrow is
+installed (tables that do not round-trip exactly, and every table without
+pyarrow, fall back to pickle). Engine state arrays are stored as .npy files
+mapped copy-on-write, so processes on one host share the page cache.
+
+A manifest stamps the snapshot with a fingerprint of the generator source, and
+each engine state with a fingerprint of its module; anything stale is ignored
+and rebuilt as usual.
+
+    python -m data.snapshot build     # writes DATA_SNAPSHOT_PATH (default data/snapshot)
+    python -m data.snapshot publish   # new version under /dev/shm, atomically made current
+    python -m data.snapshot info
+
+Published snapshots back the multi-worker mode (backend/serve.py): every worker
+maps the same files, so the dataset is held once per host rather than per worker.
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import hashlib
+import shutil
+import inspect
+import logging
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshot")
+
+# Mock generator attributes holding each table
+MOCK_TABLES = {
+    "employees": "_employees",
+    "thomas_assessments": "_thomas_assessments",
+    "open_roles": "_open_roles",
+    "candidates": "_candidates",
+    "interaction_logs": "_interaction_logs",
+    "performance_metrics": "_performance_metrics",
+    "analytics_defaults": "_analytics_defaults",
+    "manager_overrides": "_manager_overrides",
+    "referrals": "_referrals",
+}
+
+# Source files whose content determines the generated tables
+_GENERATOR_SOURCES = ("mock_data.py", "currency.py")
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    HAS_ARROW = True
+except ImportError:
+    HAS_ARROW = False
+
+
+def _file_digest(paths) -> str:
+    digest = hashlib.sha256(f"snapshot-v{SNAPSHOT_FORMAT_VERSION}".encode("utf-8"))
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def generator_fingerprint() -> str:
+    """Changes whenever the mock data generator (and so the generated tables) changes"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    return _file_digest(os.path.join(here, name) for name in _GENERATOR_SOURCES)
+
+
+def engine_fingerprint(engine: Any) -> str:
+    """Changes whenever the module defining the engine changes"""
+    return _file_digest([inspect.getsourcefile(type(engine))])
+
+
+class DatasetSnapshot:
+    """A snapshot directory: manifest.json, tables/ and state/"""
+
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH):
+        self.path = path
+        self._manifest: Optional[Dict[str, Any]] = None
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.path, "manifest.json")
+
+    @property
+    def manifest(self) -> Optional[Dict[str, Any]]:
+        if self._manifest is None and os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self._manifest = json.load(f)
+        return self._manifest
+
+    def is_fresh(self) -> bool:
+        manifest = self.manifest
+        return (
+            manifest is not None
+            and manifest.get("format_version") == SNAPSHOT_FORMAT_VERSION
+            and manifest.get("fingerprint") == generator_fingerprint()
+        )
+
+    # ========================================
+    # WRITING
+    # ========================================
+
+    def _write_table(self, name: str, table: Any) -> Dict[str, Any]:
+        os.makedirs(os.path.join(self.path, "tables"), exist_ok=True)
+        rows = len(table)
+        if HAS_ARROW and isinstance(table, pd.DataFrame):
+            relative = os.path.join("tables", f"{name}.arrow")
+            try:
+                arrow_table = pa.Table.from_pandas(table)
+                with pa.OSFile(os.path.join(self.path, relative), "wb") as sink:
+                    with pa_ipc.new_file(sink, arrow_table.schema) as writer:
+                        writer.write_table(arrow_table)
+                restored = self._read_arrow(relative)
+                if restored.equals(table) and list(restored.dtypes) == list(table.dtypes):
+                    return {"file": relative, "format": "arrow", "rows": rows}
+                logger.info(f"Snapshot table {name} does not round-trip through Arrow, using pickle")
+            except (pa.ArrowException, TypeError, ValueError) as e:
+                logger.info(f"Snapshot table {name} not Arrow-serializable ({e}), using pickle")
+            if os.path.exists(os.path.join(self.path, relative)):
+                os.remove(os.path.join(self.path, relative))
+
+        relative = os.path.join("tables", f"{name}.pkl")
+        with open(os.path.join(self.path, relative), "wb") as f:
+            pickle.dump(table, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return {"file": relative, "format": "pickle", "rows": rows}
+
+    def _write_state(self, name: str, engine: Any) -> Dict[str, Any]:
+        os.makedirs(os.path.join(self.path, "state"), exist_ok=True)
+        state = dict(engine.snapshot_state())
+        arrays = {}
+        for key, value in list(state.items()):
+            if isinstance(value, np.ndarray) and value.dtype != object:
+                relative = os.path.join("state", f"{name}.{key}.npy")
+                np.save(os.path.join(self.path, relative), np.ascontiguousarray(value))
+                arrays[key] = relative
+                del state[key]
+        relative = os.path.join("state", f"{name}.pkl")
+        with open(os.path.join(self.path, relative), "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return {"file": relative, "arrays": arrays, "fingerprint": engine_fingerprint(engine)}
+
+    def write(self, tables: Dict[str, Any], engines: Dict[str, Any]) -> Dict[str, Any]:
+        """Write tables and engine states, then the manifest (last, so a partial write is never picked up)"""
+        os.makedirs(self.path, exist_ok=True)
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+        manifest = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "fingerprint": generator_fingerprint(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "arrow": HAS_ARROW,
+            "tables": {name: self._write_table(name, table) for name, table in tables.items()},
+            "state": {name: self._write_state(name, engine) for name, engine in engines.items()},
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+        self._manifest = manifest
+        return manifest
+
+    # ========================================
+    # READING
+    # ========================================
+
+    def _read_arrow(self, relative: str) -> pd.DataFrame:
+        # split_blocks keeps numeric columns as zero-copy views of the mapped file (read-only,
+        # shared between processes); the mapping stays open while the frame references it
+        source = pa.memory_map(os.path.join(self.path, relative), "r")
+        return pa_ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+
+    def read_table(self, name: str) -> Any:
+        entry = self.manifest["tables"][name]
+        if entry["format"] == "arrow":
+            if not HAS_ARROW:
+                raise RuntimeError(f"Snapshot table {name} needs pyarrow")
+            return self._read_arrow(entry["file"])
+        with open(os.path.join(self.path, entry["file"]), "rb") as f:
+            return pickle.load(f)
+
+    def read_tables(self) -> Dict[str, Any]:
+        return {name: self.read_table(name) for name in self.manifest["tables"] if name in MOCK_TABLES}
+
+    def read_state(self, name: str) -> Dict[str, Any]:
+        entry = self.manifest["state"][name]
+        with open(os.path.join(self.path, entry["file"]), "rb") as f:
+            state = pickle.load(f)
+        for key, relative in entry["arrays"].items():
+            # Copy-on-write: shared pages until an engine writes to the array
+            state[key] = np.load(os.path.join(self.path, relative), mmap_mode="c")
+        return state
+
+
+# ============================================================================
+# RESTORE HOOKS
+# ============================================================================
+
+# The snapshot whose tables back the mock generator in this process, and the
+# data version at which they were installed (engine state applies only then)
+_active_snapshot: Optional[DatasetSnapshot] = None
+_active_data_version = 0
+_swap_lock = threading.Lock()
+
+
+def snapshot_enabled() -> bool:
+    return os.getenv("DATA_SNAPSHOT", "auto").lower() not in ("off", "false", "0")
+
+
+def _open_configured() -> Optional[DatasetSnapshot]:
+    """The configured snapshot, with symlinks (a published `current`) resolved to one version"""
+    snapshot = DatasetSnapshot(os.path.realpath(os.getenv("DATA_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)))
+    if snapshot.manifest is None:
+        return None
+    if not snapshot.is_fresh():
+        logger.warning(f"Dataset snapshot at {snapshot.path} is stale (generator changed); ignoring it")
+        return None
+    return snapshot
+
+
+def restore_tables(mock_gen) -> bool:
+    """Fill the mock generator's tables from the snapshot if one matches the generator source"""
+    global _active_snapshot, _active_data_version
+    if not snapshot_enabled():
+        return False
+    snapshot = _open_configured()
+    if snapshot is None:
+        return False
+
+    started = time.perf_counter()
+    try:
+        tables = snapshot.read_tables()
+    except Exception as e:
+        logger.warning(f"Could not load dataset snapshot at {snapshot.path}: {e}")
+        return False
+    for name, table in tables.items():
+        setattr(mock_gen, MOCK_TABLES[name], table)
+    _active_snapshot, _active_data_version = snapshot, 0
+    logger.info(f"Loaded dataset snapshot ({len(tables)} tables, {snapshot.manifest['created_at']}) in {(time.perf_counter() - started) * 1000:.0f}ms")
+    return True
+
+
+def restore_state(name: str, engine: Any) -> bool:
+    """
+    Restore an engine's derived state from the active snapshot. Only applies while the
+    data is exactly what the snapshot was built from (no rows appended since), the
+    engine is not already current, and the engine's module is unchanged.
+    """
+    snapshot = _active_snapshot
+    if snapshot is None or name not in snapshot.manifest.get("state", {}):
+        return False
+    data_access = engine.data_access
+    if not data_access.is_local or data_access.data_version != _active_data_version:
+        return False
+    if getattr(engine, "version", None) == data_access.data_version:
+        return False
+    if snapshot.manifest["state"][name]["fingerprint"] != engine_fingerprint(engine):
+        logger.info(f"Snapshot state for {name} is stale; rebuilding")
+        return False
+    try:
+        return engine.restore_snapshot_state(snapshot.read_state(name)) is not False
+    except Exception as e:
+        logger.warning(f"Could not restore {name} from snapshot: {e}")
+        return False
+
+
+def swap_to_published() -> bool:
+    """
+    Switch this process to the currently published snapshot if it differs from the
+    active one. The new tables are loaded aside and installed by replacing the mock
+    generator in one step, so a request sees either the old or the new dataset.
+    """
+    global _active_snapshot, _active_data_version
+    with _swap_lock:
+        current = _active_snapshot
+        if current is None or os.path.realpath(os.getenv("DATA_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)) == current.path:
+            return False
+        snapshot = _open_configured()
+        if snapshot is None:
+            return False
+
+        from .mock_data import MockDataGenerator, swap_mock_data_generator
+        from .data_access import get_data_access
+
+        generator = MockDataGenerator()
+        for name, table in snapshot.read_tables().items():
+            setattr(generator, MOCK_TABLES[name], table)
+        swap_mock_data_generator(generator)
+
+        _active_snapshot = snapshot
+        _active_data_version = get_data_access().invalidate()
+        logger.info(f"Switched to published dataset snapshot {snapshot.path} ({snapshot.manifest['created_at']})")
+        return True
+
+
+_watcher: Optional[threading.Thread] = None
+
+
+def start_snapshot_watcher(interval_seconds: Optional[float] = None) -> bool:
+    """Poll for newly published snapshots (DATA_SNAPSHOT_WATCH_SECONDS, 0 = off) in a daemon thread"""
+    global _watcher
+    if interval_seconds is None:
+        interval_seconds = float(os.getenv("DATA_SNAPSHOT_WATCH_SECONDS", "0"))
+    if interval_seconds <= 0 or _active_snapshot is None or (_watcher is not None and _watcher.is_alive()):
+        return False
+
+    def watch():
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                swap_to_published()
+            except Exception as e:
+                logger.warning(f"Dataset snapshot swap failed: {e}")
+
+    _watcher = threading.Thread(target=watch, name="snapshot-watcher", daemon=True)
+    _watcher.start()
+    return True
+
+
+# ============================================================================
+# BUILD
+# ============================================================================
+
+def build_snapshot(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Generate every table, build the aggregates and indexes, and write them out.
+    Run in a fresh process (the CLI does) so nothing is restored from an older snapshot.
+    """
+    if _active_snapshot is not None:
+        raise RuntimeError("A snapshot is already loaded in this process; build with DATA_SNAPSHOT=off")
+
+    from .data_access import get_data_access
+    from .analytics_cube import get_analytics_cube
+    from .norms import get_norm_engine
+    from backend.services.retrieval import get_retrieval_service
+
+    data_access = get_data_access()
+    if not data_access.is_local:
+        raise RuntimeError("Snapshots cover mock/demo data; unset USE_REAL_SQL to build one")
+    if not HAS_ARROW:
+        logger.warning("pyarrow is not installed: snapshot tables will be pickled and loaded into every process, not memory-mapped")
+
+    mock_gen = data_access.mock_gen
+    generators = {name: getattr(mock_gen, f"generate_{name}") for name in MOCK_TABLES}
+    tables = {name: generate() for name, generate in generators.items()}
+    engines = {
+        "analytics_cube": get_analytics_cube(),
+        "norms": get_norm_engine(),
+        "retrieval_index": get_retrieval_service().build(),
+    }
+    return DatasetSnapshot(path or os.getenv("DATA_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)).write(tables, engines)
+
+
+def default_shared_root() -> str:
+    """Shared-memory filesystem when there is one, so published snapshots live in RAM"""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.getenv("SHARED_DATASET_ROOT", os.path.join(base, "talent-hub-dataset"))
+
+
+def publish_snapshot(root: Optional[str] = None, keep: int = 2) -> str:
+    """
+    Build a new snapshot version under root and atomically repoint root/current at it.
+    Processes with DATA_SNAPSHOT_PATH=root/current load it at startup and, with the
+    watcher running, switch over on their next poll. Older versions beyond `keep` are
+    removed; processes still mapping them keep their pages until they switch.
+    """
+    root = root or default_shared_root()
+    os.makedirs(root, exist_ok=True)
+    version = f"v{time.strftime('%Y%m%d%H%M%S')}-{os.getpid()}"
+    build_snapshot(os.path.join(root, version))
+
+    link = os.path.join(root, "current")
+    tmp_link = f"{link}.{os.getpid()}.tmp"
+    os.symlink(version, tmp_link)
+    os.replace(tmp_link, link)
+
+    versions = sorted(
+        (name for name in os.listdir(root) if name.startswith("v") and os.path.isdir(os.path.join(root, name))),
+        key=lambda name: os.path.getmtime(os.path.join(root, name)),
+    )
+    for name in versions[:-keep] if keep > 0 else []:
+        if name != version:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return link
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build, publish or inspect the dataset snapshot")
+    parser.add_argument("command", choices=["build", "publish", "info"])
+    parser.add_argument("--path", default=os.getenv("DATA_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH))
+    parser.add_argument("--root", default=None, help="publish: shared directory (default SHARED_DATASET_ROOT or /dev/shm)")
+    parser.add_argument("--keep", type=int, default=2, help="publish: versions to keep")
+    args = parser.parse_args()
+
+    if args.command == "publish":
+        link = publish_snapshot(args.root, args.keep)
+        print(f"Published {os.path.realpath(link)} as {link}")
+        return
+
+    if args.command == "build":
+        started = time.perf_counter()
+        manifest = build_snapshot(args.path)
+        print(f"Snapshot written to {args.path} in {(time.perf_counter() - started):.1f}s (arrow={manifest['arrow']})")
+        for name, entry in manifest["tables"].items():
+            print(f"  table {name:<22} {entry['rows']:>6} rows  {entry['format']}")
+        for name, entry in manifest["state"].items():
+            print(f"  state {name:<22} {len(entry['arrays'])} mapped arrays")
+        return
+
+    snapshot = DatasetSnapshot(args.path)
+    if snapshot.manifest is None:
+        print(f"No snapshot at {args.path}")
+        sys.exit(1)
+    print(json.dumps({**snapshot.manifest, "fresh": snapshot.is_fresh()}, indent=2))
+
+
+if __name__ == "__main__":
+    # Building must start from freshly generated data, never from the snapshot being replaced
+    os.environ["DATA_SNAPSHOT"] = "off"
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    main()
@@ -0,0 +1,236 @@
+"""
+Succession Scoring
+Leadership readiness for every employee in one vectorized pass over HPTI traits,
+performance history (level and trend) and tenure. Scores are cached per data
+version and ranked into successor lists for any manager.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from .data_access import DataAccessLayer, get_data_access
+
+
+# Relative weight of each HPTI trait in the leadership composite
+HPTI_WEIGHTS = {
+    "hpti_conscientiousness": 0.25,
+    "hpti_adjustment": 0.25,
+    "hpti_ambiguity_acceptance": 0.20,
+    "hpti_curiosity": 0.15,
+    "hpti_risk_approach": 0.10,
+    "hpti_competitiveness": 0.05,
+}
+
+
+@dataclass
+class ReadinessWeights:
+    """Blend of the readiness components (each on a 0-100 scale)"""
+    hpti: float = 0.45
+    performance: float = 0.35
+    trend: float = 0.10
+    tenure: float = 0.10
+    # Tenure counts fully after this many months
+    tenure_saturation_months: float = 36
+    # Trend component moves this many points per 0.01 performance change per quarter
+    trend_points_per_hundredth: float = 5
+    hpti_weights: Dict[str, float] = field(default_factory=lambda: dict(HPTI_WEIGHTS))
+
+
+def readiness_timeline(score: Optional[float]) -> str:
+    """Promotion timeline for a readiness score (same bands as the LLM mock)"""
+    if score is None:
+        return "Unknown"
+    if score >= 75:
+        return "3-6 months"
+    if score >= 60:
+        return "6-12 months"
+    return "12-18 months"
+
+
+class SuccessionEngine:
+    """Org-wide leadership readiness held as arrays aligned to the employee table"""
+
+    def __init__(self, data_access: DataAccessLayer, weights: Optional[ReadinessWeights] = None):
+        self.data_access = data_access
+        self.weights = weights or ReadinessWeights()
+        self.version: Optional[int] = None
+        self.employees = pd.DataFrame()
+        self.components: Dict[str, np.ndarray] = {}
+        self.readiness = np.array([], dtype="float64")
+        self._index: Dict[str, int] = {}
+        self._children: Dict[str, List[int]] = {}
+        self._lock = threading.RLock()
+
+    def refresh(self) -> "SuccessionEngine":
+        """Rescore the whole org if the data version has changed"""
+        with self._lock:
+            version = self.data_access.data_version
+            if self.version == version:
+                return self
+
+            employees = self.data_access.get_employees().reset_index(drop=True)
+            ids = pd.Index(employees["employee_id"])
+            w = self.weights
+
+            # HPTI composite from the latest assessment per employee
+            assessments = self.data_access.get_thomas_assessments()
+            if "assessment_date" in assessments.columns:
+                assessments = assessments.sort_values("assessment_date")
+            hpti = assessments.drop_duplicates("employee_id", keep="last").set_index("employee_id").reindex(ids)
+            traits = np.column_stack([
+                pd.to_numeric(hpti[c], errors="coerce").to_numpy(dtype="float64") if c in hpti.columns else np.full(len(ids), np.nan)
+                for c in w.hpti_weights
+            ])
+            trait_weights = np.array(list(w.hpti_weights.values()))
+            present = ~np.isnan(traits)
+            weight_sum = (present * trait_weights).sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                hpti_score = np.where(weight_sum > 0, np.nansum(traits * trait_weights, axis=1) / weight_sum, np.nan)
+
+            # Performance history as an employee x quarter matrix
+            metrics = self.data_access.get_performance_metrics()
+            history = (
+                metrics.pivot_table(index="employee_id", columns="quarter", values="performance_score", aggfunc="last")
+                .reindex(ids)
+                .sort_index(axis=1)
+            )
+            scores = history.to_numpy(dtype="float64")
+            observed = ~np.isnan(scores)
+            counts = observed.sum(axis=1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                perf_mean = np.where(counts > 0, np.nansum(scores, axis=1) / counts, np.nan)
+                # Least-squares slope per quarter, ignoring missing quarters
+                x = np.broadcast_to(np.arange(scores.shape[1], dtype="float64"), scores.shape)
+                x_mean = np.where(counts > 0, (x * observed).sum(axis=1) / counts, 0.0)
+                dx = np.where(observed, x - x_mean[:, None], 0.0)
+                dy = np.where(observed, scores - perf_mean[:, None], 0.0)
+                sxx = (dx * dx).sum(axis=1)
+                slope = np.where(sxx > 0, (dx * dy).sum(axis=1) / sxx, 0.0)
+
+            tenure = pd.to_numeric(employees["tenure_months"], errors="coerce").to_numpy(dtype="float64")
+
+            self.components = {
+                "hpti": hpti_score,
+                "performance": perf_mean * 100,
+                "trend": np.clip(50 + slope * 100 * w.trend_points_per_hundredth, 0, 100),
+                "tenure": np.clip(np.nan_to_num(tenure) / w.tenure_saturation_months, 0, 1) * 100,
+                "performance_slope": slope,
+            }
+            blend = {"hpti": w.hpti, "performance": w.performance, "trend": w.trend, "tenure": w.tenure}
+            # Missing components drop out and the remaining weights are renormalised
+            total = np.zeros(len(ids))
+            weight_total = np.zeros(len(ids))
+            for name, weight in blend.items():
+                values = self.components[name]
+                known = ~np.isnan(values)
+                total += np.where(known, values, 0.0) * weight
+                weight_total += known * weight
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.readiness = np.where(weight_total > 0, total / weight_total, np.nan)
+
+            self.employees = employees
+            self._index = {emp_id: i for i, emp_id in enumerate(ids)}
+            self._children = {}
+            for i, manager_id in enumerate(employees["manager_id"].to_numpy(dtype=object)):
+                if manager_id is not None and not pd.isna(manager_id):
+                    self._children.setdefault(manager_id, []).append(i)
+            self.version = version
+            return self
+
+    def _summary(self, i: int, rank: Optional[int] = None) -> Dict[str, Any]:
+        emp = self.employees.iloc[i]
+        score = self.readiness[i]
+        readiness = None if np.isnan(score) else round(float(score), 1)
+        summary = {
+            "employee_id": emp["employee_id"],
+            "name": emp["name"],
+            "title": emp["title"],
+            "department": emp["department"],
+            "level": emp["level"],
+            "readiness_score": readiness,
+            "timeline": readiness_timeline(readiness),
+            "components": {
+                name: (None if np.isnan(values[i]) else round(float(values[i]), 3 if name == "performance_slope" else 1))
+                for name, values in self.components.items()
+            },
+        }
+        if rank is not None:
+            summary["rank"] = rank
+        return summary
+
+    def score(self, employee_id: str) -> Optional[Dict[str, Any]]:
+        """Readiness score and components for one employee"""
+        with self._lock:
+            self.refresh()
+            i = self._index.get(employee_id)
+            return None if i is None else self._summary(i)
+
+    def _reports(self, manager_id: str) -> np.ndarray:
+        rows: List[int] = []
+        frontier = [manager_id]
+        seen = {manager_id}
+        while frontier:
+            next_frontier = []
+            for boss in frontier:
+                for i in self._children.get(boss, []):
+                    emp_id = self.employees.iat[i, self.employees.columns.get_loc("employee_id")]
+                    if emp_id not in seen:
+                        seen.add(emp_id)
+                        rows.append(i)
+                        next_frontier.append(emp_id)
+            frontier = next_frontier
+        return np.array(rows, dtype=int)
+
+    def _rank(self, rows: np.ndarray, n: int) -> List[Dict[str, Any]]:
+        if len(rows) == 0:
+            return []
+        scores = np.nan_to_num(self.readiness[rows], nan=-1.0)
+        ids = self.employees["employee_id"].to_numpy(dtype=object)[rows]
+        order = np.lexsort((ids, -scores))[:n]
+        return [self._summary(rows[j], rank=r + 1) for r, j in enumerate(order)]
+
+    def ranking(self, n: int = 20, department: Optional[str] = None, level: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Org-wide readiness ranking, optionally within a department and/or level"""
+        with self._lock:
+            self.refresh()
+            mask = np.ones(len(self.employees), dtype=bool)
+            if department:
+                mask &= (self.employees["department"] == department).to_numpy()
+            if level:
+                mask &= (self.employees["level"] == level).to_numpy()
+            return self._rank(np.flatnonzero(mask), n)
+
+    def successors(self, manager_id: str, n: int = 5, pool: str = "reports") -> List[Dict[str, Any]]:
+        """
+        Ranked successor candidates for a manager.
+        pool="reports" draws from everyone below them; pool="department" from the whole department.
+        """
+        with self._lock:
+            self.refresh()
+            if manager_id not in self._index:
+                raise KeyError(manager_id)
+            if pool == "reports":
+                rows = self._reports(manager_id)
+            elif pool == "department":
+                department = self.employees.iloc[self._index[manager_id]]["department"]
+                rows = np.flatnonzero((self.employees["department"] == department).to_numpy())
+                rows = rows[rows != self._index[manager_id]]
+            else:
+                raise ValueError(f"Unknown successor pool: {pool}")
+            return self._rank(rows, n)
+
+
+# Singleton instance
+_succession_engine = None
+
+
+def get_succession_engine() -> SuccessionEngine:
+    """Get or create the succession engine singleton, refreshed to the current data version"""
+    global _succession_engine
+    if _succession_engine is None:
+        _succession_engine = SuccessionEngine(get_data_access())
+    return _succession_engine.refresh()
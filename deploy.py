@@ -5,6 +5,7 @@ Deploy Thomas Talent Hub to Databricks Apps
 import os
 import sys
 import time
+import subprocess
 from databricks.sdk import WorkspaceClient
 from databricks.sdk.service.apps import App, AppDeployment
 
@@ -12,6 +13,18 @@ from databricks.sdk.service.apps import App, AppDeployment
 DATABRICKS_HOST = os.getenv("DATABRICKS_HOST", "https://your-workspace.cloud.databricks.com")
 DATABRICKS_TOKEN = os.getenv("DATABRICKS_TOKEN", "")
 APP_NAME = "thomas-talent-hub"
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def build_dataset_snapshot() -> bool:
+    """Prebuild the demo dataset snapshot so app processes map it instead of generating data"""
+    print("Building dataset snapshot...")
+    result = subprocess.run([sys.executable, "-m", "data.snapshot", "build"], cwd=PROJECT_DIR)
+    if result.returncode != 0:
+        print("⚠ Snapshot build failed - the app will generate demo data at startup")
+        return False
+    print("✓ Dataset snapshot built (data/snapshot/)")
+    return True
 
 def main():
     print("=" * 60)
@@ -23,6 +36,8 @@ def main():
         print("Please set: export DATABRICKS_TOKEN=your-token")
         sys.exit(1)
     
+    build_dataset_snapshot()
+    
     try:
         w = WorkspaceClient()
         print(f"✓ Connected to {DATABRICKS_HOST}")
@@ -76,13 +91,14 @@ def main():
     print("3. Create a new app named 'thomas-talent-hub' or update existing")
     print()
     print("4. Upload the project files from this directory:")
-    print(f"   {os.path.dirname(os.path.abspath(__file__))}")
+    print(f"   {PROJECT_DIR}")
     print()
     print("5. Key files to include:")
     print("   - app.yaml (app configuration)")
     print("   - backend/ (FastAPI backend)")
     print("   - frontend/dist/ (built React frontend)")
     print("   - data/ (mock data generators)")
+    print("   - data/snapshot/ (prebuilt dataset snapshot)")
     print("   - config.py (configuration)")
     print("   - requirements.txt (Python dependencies)")
     print()
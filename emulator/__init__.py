@@ -0,0 +1,22 @@
+"""
+Local Databricks Emulator
+Model serving endpoint and SQL warehouse stand-ins for offline load testing.
+"""
+
+from .profiles import EmulatorProfile, ServingProfile, WarehouseProfile, LatencyDistribution, load_profile, PRESETS
+from .serving import ServingEmulator, ServingEmulatorServer
+from .warehouse import EmulatedWarehouse, connect, get_emulated_warehouse
+
+__all__ = [
+    "EmulatorProfile",
+    "ServingProfile",
+    "WarehouseProfile",
+    "LatencyDistribution",
+    "load_profile",
+    "PRESETS",
+    "ServingEmulator",
+    "ServingEmulatorServer",
+    "EmulatedWarehouse",
+    "connect",
+    "get_emulated_warehouse",
+]
@@ -0,0 +1,43 @@
+"""
+Run the serving emulator:
+
+    python -m emulator --port 8900 --profile realistic
+
+then start the backend against it:
+
+    DATABRICKS_HOST=http://127.0.0.1:8900 DATABRICKS_TOKEN=emulator APP_MODE=databricks USE_REAL_SQL=true ./start.sh
+"""
+
+import json
+import argparse
+
+from .profiles import load_profile, PRESETS
+from .serving import ServingEmulatorServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local model serving emulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--profile", default=None, help=f"Preset ({', '.join(PRESETS)}) or JSON file; default EMULATOR_PROFILE")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--set", action="append", default=[], metavar="JSON",
+                        help='Profile overrides, e.g. --set \'{"serving": {"error_rate": 0.05}}\'')
+    args = parser.parse_args()
+
+    profile = load_profile(args.profile)
+    if args.seed is not None:
+        profile.seed = args.seed
+    for override in args.set:
+        profile.update(json.loads(override))
+
+    server = ServingEmulatorServer(args.host, args.port, profile)
+    print(f"Serving emulator ({profile.name}) on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Emulator Profiles
+Latency distributions, token rates, error injection and cold-start settings
+for the local serving endpoint and SQL warehouse emulators.
+"""
+
+import os
+import json
+import math
+import random
+from dataclasses import dataclass, field, asdict, fields
+from typing import Dict, Any, Optional
+
+# z-score of the 99th percentile of a standard normal
+_Z99 = 2.3263
+
+
+@dataclass
+class LatencyDistribution:
+    """Log-normal latency described by its median and p99 (equal values give a constant)"""
+    median: float
+    p99: float
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median <= 0:
+            return 0.0
+        if self.p99 <= self.median:
+            return self.median
+        sigma = math.log(self.p99 / self.median) / _Z99
+        return rng.lognormvariate(math.log(self.median), sigma)
+
+
+@dataclass
+class ServingProfile:
+    """How an emulated model serving endpoint behaves"""
+    time_to_first_token: LatencyDistribution = field(default_factory=lambda: LatencyDistribution(0.35, 1.5))
+    tokens_per_second: float = 60.0
+    output_tokens: LatencyDistribution = field(default_factory=lambda: LatencyDistribution(180, 600))
+    embedding_latency: LatencyDistribution = field(default_factory=lambda: LatencyDistribution(0.04, 0.2))
+    error_rate: float = 0.0
+    error_statuses: tuple = (500, 503)
+    max_concurrency: int = 8                 # further requests get 429 REQUEST_LIMIT_EXCEEDED
+    cold_start_seconds: float = 0.0          # paid by the first request after scale-to-zero
+    scale_to_zero_after: float = 900.0       # idle seconds before the endpoint scales to zero
+
+
+@dataclass
+class WarehouseProfile:
+    """How the emulated SQL warehouse behaves"""
+    statement_latency: LatencyDistribution = field(default_factory=lambda: LatencyDistribution(0.08, 0.6))
+    error_rate: float = 0.0
+    cold_start_seconds: float = 0.0          # warehouse start after auto-stop
+    auto_stop_after: float = 600.0
+
+
+@dataclass
+class EmulatorProfile:
+    """Serving and warehouse behaviour, plus the seed for reproducible runs"""
+    name: str = "realistic"
+    serving: ServingProfile = field(default_factory=ServingProfile)
+    warehouse: WarehouseProfile = field(default_factory=WarehouseProfile)
+    seed: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def update(self, changes: Dict[str, Any]) -> None:
+        """Apply a (possibly partial) nested dict of changes, e.g. {"serving": {"error_rate": 0.2}}"""
+        _apply(self, changes)
+
+
+def _apply(target, changes: Dict[str, Any]) -> None:
+    names = {f.name for f in fields(target)}
+    for key, value in changes.items():
+        if key not in names:
+            raise ValueError(f"Unknown emulator setting: {key}")
+        current = getattr(target, key)
+        if hasattr(current, "__dataclass_fields__") and isinstance(value, dict):
+            _apply(current, value)
+        elif isinstance(current, tuple):
+            setattr(target, key, tuple(value))
+        else:
+            setattr(target, key, value)
+
+
+def _preset(name: str) -> EmulatorProfile:
+    profile = EmulatorProfile(name=name)
+    if name == "instant":
+        # No waiting at all - for functional runs of the SQL/serving code paths
+        profile.update({
+            "serving": {
+                "time_to_first_token": {"median": 0, "p99": 0},
+                "tokens_per_second": 0,
+                "embedding_latency": {"median": 0, "p99": 0},
+            },
+            "warehouse": {"statement_latency": {"median": 0, "p99": 0}},
+        })
+    elif name == "cold":
+        profile.update({
+            "serving": {"cold_start_seconds": 20.0, "scale_to_zero_after": 60.0},
+            "warehouse": {"cold_start_seconds": 8.0, "auto_stop_after": 60.0},
+        })
+    elif name == "degraded":
+        profile.update({
+            "serving": {
+                "time_to_first_token": {"median": 1.2, "p99": 8.0},
+                "tokens_per_second": 25.0,
+                "error_rate": 0.1,
+                "max_concurrency": 4,
+            },
+            "warehouse": {"statement_latency": {"median": 0.4, "p99": 3.0}, "error_rate": 0.02},
+        })
+    elif name != "realistic":
+        raise ValueError(f"Unknown emulator profile: {name}")
+    return profile
+
+
+PRESETS = ("instant", "realistic", "cold", "degraded")
+
+
+def load_profile(spec: Optional[str] = None) -> EmulatorProfile:
+    """
+    Profile from a preset name or a JSON file (a preset named by its "base" key,
+    with the remaining keys applied on top). Defaults to EMULATOR_PROFILE or "realistic".
+    """
+    spec = spec or os.getenv("EMULATOR_PROFILE", "realistic")
+    if spec in PRESETS:
+        return _preset(spec)
+    with open(spec, "r", encoding="utf-8") as f:
+        overrides = json.load(f)
+    profile = _preset(overrides.pop("base", "realistic"))
+    profile.update(overrides)
+    return profile
@@ -0,0 +1,292 @@
+"""
+Model Serving Emulator
+HTTP server speaking the serving-endpoint invocation protocol used by the app:
+chat completions (JSON or SSE when "stream" is set) and embeddings
+(`{"input": [...]}`). Latency, token rate, errors, concurrency limits and
+scale-to-zero cold starts follow the active EmulatorProfile.
+"""
+
+import re
+import json
+import time
+import uuid
+import random
+import hashlib
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+
+from .profiles import EmulatorProfile, load_profile
+
+logger = logging.getLogger(__name__)
+
+_INVOCATION_PATH = re.compile(r"^/serving-endpoints/([^/]+)/invocations/?$")
+
+_VOCABULARY = (
+    "candidate team role PPA GIA HPTI profile dominance influence steadiness compliance "
+    "leadership potential interview stage feedback strengths risk engagement manager "
+    "IFS Cloud delivery collaboration chemistry fit recommendation evidence growth"
+).split()
+
+EMBEDDING_DIMENSIONS = 1024
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def completion_text(prompt: str, max_tokens: int, rng: random.Random, target_tokens: int) -> str:
+    """
+    Deterministic-shaped model output. CV extraction prompts get the JSON the
+    app asks for; everything else gets prose of roughly target_tokens words.
+    """
+    if "CV Content:" in prompt:
+        from backend.services.cv_extraction import LocalCVExtractor
+
+        cv_text = prompt.split("CV Content:", 1)[1].split("Return ONLY valid JSON", 1)[0]
+        name = re.search(r"for ([A-Z][\w' -]+)\.", prompt)
+        try:
+            return LocalCVExtractor().extract(name.group(1) if name else "The candidate", cv_text)
+        except ValueError:
+            return json.dumps({"skills": [], "years_experience": None, "education": [], "certifications": [], "summary": ""})
+
+    words = [rng.choice(_VOCABULARY) for _ in range(max(1, min(max_tokens, target_tokens)))]
+    sentences = [" ".join(words[i:i + 12]).capitalize() + "." for i in range(0, len(words), 12)]
+    return " ".join(sentences)
+
+
+def embedding_vector(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> List[float]:
+    """Stable pseudo-embedding derived from the text hash"""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    return [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+
+
+class EmulatorError(Exception):
+    """An injected or limit-driven serving error"""
+
+    def __init__(self, status: int, error_code: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.error_code = error_code
+
+
+class ServingEmulator:
+    """Serving endpoint behaviour, independent of the HTTP transport"""
+
+    def __init__(self, profile: Optional[EmulatorProfile] = None):
+        self.profile = profile or load_profile()
+        self._random = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, float]] = {}
+        self._counts = {
+            "requests": 0, "streamed": 0, "embeddings": 0, "errors": 0,
+            "throttled": 0, "cold_starts": 0, "completion_tokens": 0,
+        }
+
+    def record(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def rng(self) -> random.Random:
+        """Per-request generator seeded from the shared one (reproducible with a profile seed)"""
+        with self._lock:
+            return random.Random(self._random.random())
+
+    def admit(self, endpoint: str) -> float:
+        """
+        Register an incoming request. Returns the cold-start wait it must sit out,
+        or raises EmulatorError for throttling and injected failures.
+        """
+        serving = self.profile.serving
+        now = time.monotonic()
+        with self._lock:
+            self._counts["requests"] += 1
+            state = self._endpoints.setdefault(endpoint, {"in_flight": 0, "last_seen": None, "ready_at": 0.0})
+            if state["in_flight"] >= serving.max_concurrency:
+                self._counts["throttled"] += 1
+                raise EmulatorError(429, "REQUEST_LIMIT_EXCEEDED", f"Exceeded max concurrency of {serving.max_concurrency} for {endpoint}")
+            if self._random.random() < serving.error_rate:
+                self._counts["errors"] += 1
+                status = self._random.choice(serving.error_statuses)
+                raise EmulatorError(status, "TEMPORARILY_UNAVAILABLE", "Injected serving failure")
+
+            idle = state["last_seen"] is None or now - state["last_seen"] > serving.scale_to_zero_after
+            if idle and serving.cold_start_seconds > 0 and state["ready_at"] <= now:
+                state["ready_at"] = now + serving.cold_start_seconds
+                self._counts["cold_starts"] += 1
+            state["last_seen"] = now
+            state["in_flight"] += 1
+            return max(0.0, state["ready_at"] - now)
+
+    def release(self, endpoint: str) -> None:
+        with self._lock:
+            state = self._endpoints[endpoint]
+            state["in_flight"] -= 1
+            state["last_seen"] = time.monotonic()
+
+    def plan_completion(self, payload: Dict[str, Any]) -> Tuple[float, List[str], int]:
+        """Time to first token, output token pieces and prompt token count for a chat request"""
+        serving = self.profile.serving
+        rng = self.rng()
+        messages = payload.get("messages") or [{"role": "user", "content": payload.get("prompt", "")}]
+        prompt = str(messages[-1].get("content", ""))
+        prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+        max_tokens = int(payload.get("max_tokens") or 500)
+
+        text = completion_text(prompt, max_tokens, rng, int(serving.output_tokens.sample(rng)))
+        pieces = re.findall(r"\S+\s*", text)
+        return serving.time_to_first_token.sample(rng), pieces, prompt_tokens
+
+    def token_delay(self) -> float:
+        rate = self.profile.serving.tokens_per_second
+        return 1.0 / rate if rate > 0 else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            endpoints = {name: {"in_flight": s["in_flight"]} for name, s in self._endpoints.items()}
+        return {"profile": self.profile.name, **counts, "endpoints": endpoints}
+
+
+class ServingEmulatorServer:
+    """ServingEmulator behind a threaded HTTP server"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, profile: Optional[EmulatorProfile] = None):
+        self.emulator = ServingEmulator(profile)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        emulator = self.emulator
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_json(self) -> Dict[str, Any]:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/emulator/stats":
+                    self._send_json(200, emulator.stats())
+                elif self.path.rstrip("/") == "/emulator/profile":
+                    self._send_json(200, emulator.profile.to_dict())
+                else:
+                    self._send_json(404, {"error_code": "RESOURCE_DOES_NOT_EXIST", "message": self.path})
+
+            def do_POST(self):
+                try:
+                    payload = self._read_json()
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error_code": "MALFORMED_REQUEST", "message": "Body is not JSON"})
+                    return
+
+                if self.path.rstrip("/") == "/emulator/profile":
+                    try:
+                        emulator.profile.update(payload)
+                    except ValueError as e:
+                        self._send_json(400, {"error_code": "INVALID_PARAMETER_VALUE", "message": str(e)})
+                        return
+                    self._send_json(200, emulator.profile.to_dict())
+                    return
+
+                match = _INVOCATION_PATH.match(self.path)
+                if not match:
+                    self._send_json(404, {"error_code": "RESOURCE_DOES_NOT_EXIST", "message": self.path})
+                    return
+                endpoint = match.group(1)
+
+                try:
+                    cold_wait = emulator.admit(endpoint)
+                except EmulatorError as e:
+                    self._send_json(e.status, {"error_code": e.error_code, "message": str(e)})
+                    return
+                try:
+                    time.sleep(cold_wait)
+                    if "input" in payload:
+                        self._embeddings(endpoint, payload)
+                    elif payload.get("stream"):
+                        self._stream(endpoint, payload)
+                    else:
+                        self._complete(endpoint, payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    emulator.release(endpoint)
+
+            def _embeddings(self, endpoint: str, payload: Dict[str, Any]) -> None:
+                texts = payload["input"] if isinstance(payload["input"], list) else [payload["input"]]
+                time.sleep(emulator.profile.serving.embedding_latency.sample(emulator.rng()))
+                emulator.record("embeddings")
+                self._send_json(200, {
+                    "object": "list",
+                    "model": endpoint,
+                    "data": [{"object": "embedding", "index": i, "embedding": embedding_vector(str(t))} for i, t in enumerate(texts)],
+                    "usage": {"prompt_tokens": sum(estimate_tokens(str(t)) for t in texts)},
+                })
+
+            def _complete(self, endpoint: str, payload: Dict[str, Any]) -> None:
+                ttft, pieces, prompt_tokens = emulator.plan_completion(payload)
+                time.sleep(ttft + len(pieces) * emulator.token_delay())
+                emulator.record("completion_tokens", len(pieces))
+                self._send_json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": endpoint,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(pieces)}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(pieces), "total_tokens": prompt_tokens + len(pieces)},
+                })
+
+            def _stream(self, endpoint: str, payload: Dict[str, Any]) -> None:
+                ttft, pieces, _ = emulator.plan_completion(payload)
+                emulator.record("streamed")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                time.sleep(ttft)
+                delay = emulator.token_delay()
+                for piece in pieces:
+                    chunk = {"object": "chat.completion.chunk", "model": endpoint, "choices": [{"index": 0, "delta": {"content": piece}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    if delay:
+                        time.sleep(delay)
+                emulator.record("completion_tokens", len(pieces))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "ServingEmulatorServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="serving-emulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,428 @@
+"""
+SQL Warehouse Emulator
+A DB-API 2.0 stand-in for the Databricks SQL connector backed by SQLite. The
+schema comes from databricks/delta_tables.sql (translated to SQLite), the tables
+are seeded from the mock data generator, and AI_QUERY calls the serving
+emulator so set-based CV extraction behaves like it would on a warehouse.
+"""
+
+import os
+import re
+import json
+import time
+import random
+import sqlite3
+import logging
+import threading
+import urllib.request
+from datetime import date, datetime
+from typing import Dict, Any, List, Optional, Sequence
+
+from .profiles import EmulatorProfile, load_profile
+
+logger = logging.getLogger(__name__)
+
+DDL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "databricks", "delta_tables.sql")
+
+# Mock generator methods seeding each table (ideal_profiles is a dict keyed by role title)
+SEED_SOURCES = {
+    "employees": "generate_employees",
+    "thomas_assessments": "generate_thomas_assessments",
+    "recruitment_pipeline": "generate_open_roles",
+    "candidates": "generate_candidates",
+    "interaction_logs": "generate_interaction_logs",
+    "performance_metrics": "generate_performance_metrics",
+    "analytics_defaults": "generate_analytics_defaults",
+    "manager_overrides": "generate_manager_overrides",
+    "employee_events": "generate_upcoming_events",
+    "ideal_profiles": "generate_ideal_profiles",
+}
+
+# Python-side types for declared column types (sqlite3 PARSE_DECLTYPES uses the first word)
+sqlite3.register_converter("DATE", lambda b: date.fromisoformat(b.decode()[:10]))
+sqlite3.register_converter("TIMESTAMP", lambda b: datetime.fromisoformat(b.decode()))
+sqlite3.register_converter("BOOLEAN", lambda b: b not in (b"0", b""))
+sqlite3.register_converter("JSON", lambda b: json.loads(b))
+
+
+class Error(Exception):
+    """DB-API base error"""
+
+
+class DatabaseError(Error):
+    """Statement failed on the emulated warehouse"""
+
+
+class OperationalError(DatabaseError):
+    """Warehouse-side failure (injected errors, AI_QUERY failures)"""
+
+
+# ============================================================================
+# SQL TRANSLATION
+# ============================================================================
+
+_TYPE_MAP = [
+    (re.compile(r"\bSTRING\b", re.IGNORECASE), "TEXT"),
+    (re.compile(r"\bDECIMAL\s*\(\s*\d+\s*,\s*\d+\s*\)", re.IGNORECASE), "REAL"),
+]
+_COMMENT_CLAUSE = re.compile(r"\s+COMMENT\s+'(?:[^']|'')*'", re.IGNORECASE)
+_TABLE_OPTIONS = re.compile(r"\)\s*USING\s+DELTA.*$", re.IGNORECASE | re.DOTALL)
+_QUALIFIED = re.compile(r"\b([A-Za-z_]\w*)\.([A-Za-z_]\w*)\.([A-Za-z_]\w*)\b")
+_FROM_VALUES = re.compile(r"FROM\s+VALUES\s+(.*?)\s+AS\s+(\w+)\s*\(([^)]*)\)", re.IGNORECASE | re.DOTALL)
+_NAMED_ARG = re.compile(r"\bfailOnError\s*=>\s*(true|false)\b", re.IGNORECASE)
+_STRUCT_FIELD = re.compile(r"\b([A-Za-z_]\w*)\.(result|errorMessage)\b")
+
+_JAVA_DATE_FORMAT = [("yyyy", "%Y"), ("MM", "%m"), ("dd", "%d"), ("HH", "%H"), ("mm", "%M"), ("ss", "%S")]
+
+
+def translate_ddl(statement: str) -> Optional[str]:
+    """SQLite version of a CREATE TABLE / VIEW / INSERT from the Delta DDL, or None to skip it"""
+    head = statement.lstrip().upper()
+    if head.startswith("CREATE TABLE"):
+        statement = _TABLE_OPTIONS.sub(")", statement)
+        statement = _COMMENT_CLAUSE.sub("", statement)
+        statement = re.sub(r"\bNOT NULL\b", "", statement, flags=re.IGNORECASE)
+        for pattern, replacement in _TYPE_MAP:
+            statement = pattern.sub(replacement, statement)
+        return translate_query(statement)
+    if head.startswith("CREATE OR REPLACE VIEW"):
+        view = re.match(r"\s*CREATE OR REPLACE VIEW\s+(\w+)", statement, re.IGNORECASE).group(1)
+        return translate_query(re.sub(r"CREATE OR REPLACE VIEW", f"DROP VIEW IF EXISTS {view}; CREATE VIEW", statement, count=1, flags=re.IGNORECASE))
+    if head.startswith("INSERT INTO"):
+        return translate_query(statement)
+    # USE / ALTER ... SET MASK / FUNCTION / GRANT have no SQLite counterpart
+    return None
+
+
+def translate_query(query: str, tables: Sequence[str] = ()) -> str:
+    """Rewrite the Databricks SQL the app issues into SQLite"""
+    if tables:
+        known = set(tables)
+        query = _QUALIFIED.sub(lambda m: m.group(3) if m.group(3) in known else m.group(0), query)
+    query = re.sub(r"\bCURRENT_DATE\s*\(\s*\)", "date('now')", query, flags=re.IGNORECASE)
+    query = re.sub(r"\bCURRENT_TIMESTAMP\s*\(\s*\)", "CURRENT_TIMESTAMP", query, flags=re.IGNORECASE)
+    query = _FROM_VALUES.sub(_values_subquery, query)
+    query = _NAMED_ARG.sub(lambda m: "1" if m.group(1).lower() == "true" else "0", query)
+    query = _STRUCT_FIELD.sub(lambda m: f"json_extract({m.group(1)}, '$.{m.group(2)}')", query)
+    return query
+
+
+def _values_subquery(match: re.Match) -> str:
+    """`FROM VALUES (...) AS t(a, b)` -> a subquery naming SQLite's column1..N"""
+    columns = [c.strip() for c in match.group(3).split(",")]
+    aliases = ", ".join(f"column{i + 1} AS {c}" for i, c in enumerate(columns))
+    return f"FROM (SELECT {aliases} FROM (VALUES {match.group(1)})) AS {match.group(2)}"
+
+
+def _split_statements(sql: str) -> List[str]:
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [s.strip() for s in "\n".join(lines).split(";") if s.strip()]
+
+
+# ============================================================================
+# WAREHOUSE
+# ============================================================================
+
+def _sql_value(value: Any) -> Any:
+    if value is None:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, dict, tuple)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def _declared_type(values: Sequence[Any]) -> str:
+    sample = next((v for v in values if v is not None and v == v), None)
+    if hasattr(sample, "item"):
+        sample = sample.item()
+    if isinstance(sample, bool):
+        return "BOOLEAN"
+    if isinstance(sample, int):
+        return "INTEGER"
+    if isinstance(sample, float):
+        return "REAL"
+    if isinstance(sample, datetime):
+        return "TIMESTAMP"
+    if isinstance(sample, date):
+        return "DATE"
+    if isinstance(sample, (list, dict, tuple)):
+        return "JSON"
+    return "TEXT"
+
+
+class EmulatedWarehouse:
+    """
+    The shared in-memory database plus warehouse behaviour (statement latency,
+    auto-stop cold starts, injected errors). Connections are cheap views onto it.
+    """
+
+    def __init__(self, profile: Optional[EmulatorProfile] = None, serving_url: Optional[str] = None,
+                 token: Optional[str] = None, seed_data: bool = True):
+        self.profile = profile or load_profile()
+        self.serving_url = serving_url.rstrip("/") if serving_url else None
+        self.token = token
+        self._uri = f"file:talent_hub_warehouse_{id(self)}?mode=memory&cache=shared"
+        self._random = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+        self._last_statement: Optional[float] = None
+        self._ready_at = 0.0
+        self._counts = {"statements": 0, "errors": 0, "cold_starts": 0, "ai_query_calls": 0, "ai_query_errors": 0}
+        self._local_serving = None
+        # Keeps the shared in-memory database alive for the warehouse's lifetime
+        self._anchor = self.open_connection()
+        self.tables = self._load_schema()
+        if seed_data:
+            self._seed()
+
+    def open_connection(self) -> sqlite3.Connection:
+        """New SQLite connection onto the shared database with the Databricks SQL functions registered"""
+        conn = sqlite3.connect(
+            self._uri, uri=True, check_same_thread=False, isolation_level=None,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+        )
+        conn.create_function("concat", -1, lambda *parts: None if None in parts else "".join(str(p) for p in parts))
+        conn.create_function("datediff", 2, lambda end, start: (date.fromisoformat(str(end)[:10]) - date.fromisoformat(str(start)[:10])).days)
+        conn.create_function("quarter", 1, lambda d: (int(str(d)[5:7]) - 1) // 3 + 1)
+        conn.create_function("date_format", 2, self._date_format)
+        conn.create_function("ai_query", -1, self._ai_query)
+        return conn
+
+    @staticmethod
+    def _date_format(value: Any, fmt: str) -> str:
+        for java, strftime in _JAVA_DATE_FORMAT:
+            fmt = fmt.replace(java, strftime)
+        return datetime.fromisoformat(str(value)).strftime(fmt)
+
+    def _load_schema(self) -> List[str]:
+        with open(DDL_PATH, "r", encoding="utf-8") as f:
+            statements = _split_statements(f.read())
+        tables = []
+        for statement in statements:
+            translated = translate_ddl(statement)
+            if translated is None:
+                continue
+            try:
+                self._anchor.executescript(translated)
+            except sqlite3.Error as e:
+                logger.warning(f"Emulated warehouse skipped DDL statement ({e}): {statement[:60]}...")
+                continue
+            match = re.match(r"\s*CREATE TABLE IF NOT EXISTS\s+(\w+)", statement, re.IGNORECASE)
+            if match:
+                tables.append(match.group(1))
+        return tables
+
+    def _columns(self, table: str) -> List[str]:
+        return [row[1] for row in self._anchor.execute(f"PRAGMA table_info({table})")]
+
+    def _seed(self) -> None:
+        """Fill empty tables from the mock generator, adding any columns the app uses beyond the DDL"""
+        from data.mock_data import get_mock_data_generator
+        import pandas as pd
+
+        mock_gen = get_mock_data_generator()
+        for table, method in SEED_SOURCES.items():
+            if table not in self.tables or self._anchor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]:
+                continue
+            data = getattr(mock_gen, method)()
+            if isinstance(data, dict):
+                data = pd.DataFrame([{"role_title": title, **profile} for title, profile in data.items()])
+
+            existing = set(self._columns(table))
+            for column in data.columns:
+                if column not in existing:
+                    self._anchor.execute(f'ALTER TABLE {table} ADD COLUMN "{column}" {_declared_type(data[column].tolist())}')
+            columns = list(data.columns)
+            rows = [tuple(_sql_value(v) for v in row) for row in data.itertuples(index=False, name=None)]
+            placeholders = ", ".join("?" for _ in columns)
+            quoted = ", ".join(f'"{c}"' for c in columns)
+            self._anchor.execute("BEGIN")
+            self._anchor.executemany(f"INSERT INTO {table} ({quoted}) VALUES ({placeholders})", rows)
+            self._anchor.execute("COMMIT")
+        logger.info(f"Emulated warehouse seeded {len(self.tables)} tables")
+
+    # ------------------------------------------------------------------
+    # Warehouse behaviour
+    # ------------------------------------------------------------------
+
+    def before_statement(self) -> None:
+        """Pay cold start / statement latency and roll for an injected failure"""
+        warehouse = self.profile.warehouse
+        now = time.monotonic()
+        with self._lock:
+            self._counts["statements"] += 1
+            stopped = self._last_statement is not None and now - self._last_statement > warehouse.auto_stop_after
+            if (stopped or self._last_statement is None) and warehouse.cold_start_seconds > 0 and self._ready_at <= now:
+                self._ready_at = now + warehouse.cold_start_seconds
+                self._counts["cold_starts"] += 1
+            self._last_statement = now
+            wait = max(0.0, self._ready_at - now) + warehouse.statement_latency.sample(self._random)
+            failed = self._random.random() < warehouse.error_rate
+            if failed:
+                self._counts["errors"] += 1
+        time.sleep(wait)
+        if failed:
+            raise OperationalError("[EMULATED] Injected warehouse failure")
+
+    def _ai_query(self, endpoint: str, prompt: str, fail_on_error: int = 1) -> Optional[str]:
+        """AI_QUERY(endpoint, prompt[, failOnError]) through the serving emulator"""
+        with self._lock:
+            self._counts["ai_query_calls"] += 1
+        try:
+            result = self._invoke(endpoint, str(prompt))
+            error = None
+        except Exception as e:
+            with self._lock:
+                self._counts["ai_query_errors"] += 1
+            if fail_on_error:
+                raise
+            result, error = None, str(e)
+        if fail_on_error:
+            return result
+        return json.dumps({"result": result, "errorMessage": error})
+
+    def _invoke(self, endpoint: str, prompt: str) -> str:
+        if not self.serving_url:
+            # No serving emulator running: answer in-process with its response shapes and token rate
+            from .serving import ServingEmulator
+
+            if self._local_serving is None:
+                self._local_serving = ServingEmulator(self.profile)
+            emulator = self._local_serving
+            ttft, pieces, _ = emulator.plan_completion({"messages": [{"role": "user", "content": prompt}]})
+            time.sleep(ttft + len(pieces) * emulator.token_delay())
+            return "".join(pieces)
+
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(
+            f"{self.serving_url}/serving-endpoints/{endpoint}/invocations",
+            data=json.dumps({"messages": [{"role": "user", "content": prompt}], "max_tokens": 1000}).encode("utf-8"),
+            headers=headers,
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=120) as response:
+            return json.loads(response.read())["choices"][0]["message"]["content"]
+
+    def connect(self) -> "Connection":
+        return Connection(self)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"profile": self.profile.name, "tables": len(self.tables), **self._counts}
+
+
+# ============================================================================
+# DB-API OBJECTS
+# ============================================================================
+
+class Cursor:
+    """DB-API cursor; named (:name) and positional parameters are passed through to SQLite"""
+
+    arraysize = 1
+
+    def __init__(self, connection: "Connection"):
+        self.connection = connection
+        self.description = None
+        self.rowcount = -1
+        self._rows: List[tuple] = []
+        self._position = 0
+
+    def execute(self, operation: str, parameters: Optional[Any] = None) -> "Cursor":
+        warehouse = self.connection.warehouse
+        warehouse.before_statement()
+        query = translate_query(operation, warehouse.tables)
+        try:
+            with self.connection._lock:
+                cursor = self.connection._conn.execute(query, parameters or ())
+                self._rows = cursor.fetchall()
+                self.description = cursor.description
+                self.rowcount = cursor.rowcount if cursor.description is None else len(self._rows)
+        except sqlite3.Error as e:
+            raise DatabaseError(f"[EMULATED] {e}") from e
+        self._position = 0
+        return self
+
+    def executemany(self, operation: str, seq_of_parameters: Sequence[Any]) -> "Cursor":
+        for parameters in seq_of_parameters:
+            self.execute(operation, parameters)
+        return self
+
+    def fetchone(self) -> Optional[tuple]:
+        if self._position >= len(self._rows):
+            return None
+        row = self._rows[self._position]
+        self._position += 1
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> List[tuple]:
+        size = size or self.arraysize
+        rows = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self) -> List[tuple]:
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def close(self) -> None:
+        self._rows = []
+
+    def __enter__(self) -> "Cursor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class Connection:
+    """DB-API connection onto the shared emulated warehouse"""
+
+    def __init__(self, warehouse: EmulatedWarehouse):
+        self.warehouse = warehouse
+        self._conn = warehouse.open_connection()
+        self._lock = threading.Lock()
+
+    def cursor(self) -> Cursor:
+        return Cursor(self)
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "Connection":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Singleton instance
+_warehouse = None
+_warehouse_lock = threading.Lock()
+
+
+def get_emulated_warehouse(serving_url: Optional[str] = None, token: Optional[str] = None) -> EmulatedWarehouse:
+    """Get or create the process-wide emulated warehouse"""
+    global _warehouse
+    with _warehouse_lock:
+        if _warehouse is None:
+            _warehouse = EmulatedWarehouse(serving_url=serving_url, token=token)
+        return _warehouse
+
+
+def connect(serving_url: Optional[str] = None, access_token: Optional[str] = None, **kwargs) -> Connection:
+    """Drop-in for databricks.sql.connect(); extra connector arguments are accepted and ignored"""
+    return get_emulated_warehouse(serving_url, access_token).connect()
@@ -29,6 +29,40 @@ import { CVViewer } from '../components/CVViewer'
 import { usePageContext } from '../contexts/PageContext'
 import clsx from 'clsx'
 
+// API base URL - check if we're in development mode
+const isDev = typeof window !== 'undefined' && window.location.hostname === 'localhost'
+const API_BASE = isDev ? 'http://localhost:8000' : ''
+const JOB_POLL_MS = 1500
+
+interface EnrichmentResult {
+  referral: Referral
+  insights: ReferralAIInsights
+}
+
+// Queue CV extraction as a background job and poll it, instead of holding a request open
+async function enrichReferral(referralId: string): Promise<EnrichmentResult> {
+  const submitted = await fetch(`${API_BASE}/api/recruitment/referrals/${referralId}/extract-insights/jobs`, { method: 'POST' })
+  if (!submitted.ok) throw new Error(`Failed to queue enrichment: ${submitted.status}`)
+  let job = await submitted.json()
+  
+  while (job.status === 'queued' || job.status === 'running' || job.status === 'retrying') {
+    await new Promise(resolve => setTimeout(resolve, JOB_POLL_MS))
+    const polled = await fetch(`${API_BASE}${job.status_url}`)
+    if (!polled.ok) throw new Error(`Failed to poll enrichment job: ${polled.status}`)
+    job = { ...job, ...(await polled.json()) }
+  }
+  if (job.status !== 'succeeded') throw new Error(`Enrichment job ${job.job_id} ${job.status}`)
+  
+  if (job.kind === 'referral_enrichment') {
+    const result = await fetch(`${API_BASE}${job.result_url}`)
+    if (!result.ok) throw new Error(`Failed to fetch enrichment result: ${result.status}`)
+    return result.json()
+  }
+  // Enriched as part of a batch job: read the stored insights
+  const details = await recruitmentApi.getReferralDetails(referralId)
+  return { referral: details.referral, insights: details.ai_insights }
+}
+
 export default function Referrals() {
   const { setPageContext } = usePageContext()
   const [referrals, setReferrals] = useState<Referral[]>([])
@@ -46,6 +80,7 @@ export default function Referrals() {
       // KEY: This tells AskThom who we're currently viewing
       currentlyViewingReferral: selectedReferral?.name || null,
       currentlyViewingCandidate: selectedReferral?.name || null,  // Also set this for compatibility
+      referralId: selectedReferral?.referral_id || null,  // Scopes AskThom record retrieval to this referral
       totalReferrals: referrals.length,
       pendingReferrals: referrals.filter(r => r.status === 'New').length,
       enrichedReferrals: referrals.filter(r => r.ai_enriched).length,
@@ -106,9 +141,9 @@ export default function Referrals() {
           setAiInsights(details.ai_insights)
         }
       } else {
-        // Auto-extract insights for new referrals (runs in background)
+        // Auto-extract insights for new referrals (queued as a job and polled)
         setExtracting(true)
-        const response = await recruitmentApi.extractReferralInsights(referral.referral_id)
+        const response = await enrichReferral(referral.referral_id)
         setAiInsights(response.insights)
         setSelectedReferral(response.referral)
         setReferrals(prev => prev.map(r => 
@@ -127,7 +162,7 @@ export default function Referrals() {
     
     setExtracting(true)
     try {
-      const response = await recruitmentApi.extractReferralInsights(selectedReferral.referral_id)
+      const response = await enrichReferral(selectedReferral.referral_id)
       setAiInsights(response.insights)
       setSelectedReferral(response.referral)
       
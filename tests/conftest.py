@@ -0,0 +1,66 @@
+"""
+Shared fixtures: a fault-injecting serving stub, a fresh circuit breaker per test,
+and the app's on-disk state (jobs, caches, transcripts) kept in a temporary directory.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Before any app module creates its singletons
+_state_dir = tempfile.mkdtemp(prefix="talent_hub_tests_")
+os.environ.setdefault("JOBS_DB_PATH", os.path.join(_state_dir, "jobs.sqlite3"))
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(_state_dir, "llm_cache.sqlite3"))
+os.environ.setdefault("INTERACTION_SUMMARIES_PATH", os.path.join(_state_dir, "summaries.sqlite3"))
+os.environ.setdefault("TRANSCRIPT_STORE_DIR", os.path.join(_state_dir, "transcripts"))
+os.environ.setdefault("DATA_SNAPSHOT", "off")
+os.environ.setdefault("WARMUP_ON_STARTUP", "false")
+os.environ.setdefault("LAZY_ROUTERS", "false")
+# Keep the serving stub for chat calls only
+os.environ.setdefault("RETRIEVAL_EMBEDDER", "hashing")
+
+from ai.fault_injection import FaultInjectingServer, FaultConfig  # noqa: E402
+
+BREAKER_RESET_SECONDS = 0.2
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Serving stub with no faults; tests change stub.faults as they go"""
+    server = FaultInjectingServer(faults=FaultConfig(latency=0.0), seed=7).start()
+    monkeypatch.setenv("DATABRICKS_SERVING_URL", server.url)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def resilience(monkeypatch):
+    """Registry whose breaker opens on the first failure and half-opens after BREAKER_RESET_SECONDS"""
+    import ai.resilience
+    registry = ai.resilience.ResilienceRegistry(
+        failure_threshold=1,
+        reset_timeout=BREAKER_RESET_SECONDS,
+        max_attempts=1,
+        deadline_seconds=5.0,
+        retry_base_seconds=0.01,
+        hedge=False,
+        hedge_min_samples=20,
+    )
+    monkeypatch.setattr(ai.resilience, "_resilience", registry)
+    return registry
+
+
+@pytest.fixture
+def service(stub, resilience):
+    from backend.services.databricks_ai import get_databricks_ai_service
+    return get_databricks_ai_service()
+
+
+@pytest.fixture
+def breaker(service, resilience):
+    return resilience.caller(service.model_endpoint).breaker
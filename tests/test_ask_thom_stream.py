@@ -0,0 +1,73 @@
+"""
+Event order of POST /api/ai/ask-thom/stream with the model served by the fault-injecting stub.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai.fault_injection import ANSWER
+
+
+@pytest.fixture
+def client(service):
+    from backend.main import app
+    # No context manager: the lifespan (warmup, snapshot) is not needed here
+    return TestClient(app)
+
+
+def parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def ask(client, question):
+    response = client.post(
+        "/api/ai/ask-thom/stream",
+        json={"question": question, "use_cache": False},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return parse_sse(response.text)
+
+
+def test_stream_event_order(stub, client):
+    events = ask(client, "What does a PPA profile show for IFS Cloud roles?")
+    names = [name for name, _ in events]
+
+    assert names[0] == "token"
+    assert names[-1] == "done"
+    assert names.count("done") == 1
+    assert "error" not in names
+    assert set(names) <= {"token", "keywords", "sources", "done"}
+    # Keyword and source events are emitted right after the token that revealed them
+    for previous, name in zip(names, names[1:]):
+        if name in ("keywords", "sources"):
+            assert previous in ("token", "keywords")
+    assert "keywords" in names
+
+    tokens = [data["text"] for name, data in events if name == "token"]
+    done = events[-1][1]
+    assert "".join(tokens) == done["answer"]
+    assert done["answer"].strip() == ANSWER
+    assert done["debug_info"]["token_events"] == len(tokens)
+    assert done["debug_info"]["used_fallback"] is False
+    assert stub.counts["requests"] == 1
+
+
+def test_stream_with_open_circuit_still_ends_with_done(stub, client, breaker):
+    stub.faults.update({"error_rate": 1.0})
+    ask(client, "What does a PPA profile show?")
+    assert breaker.state == "open"
+
+    requests = stub.counts["requests"]
+    events = ask(client, "What does a PPA profile show?")
+    names = [name for name, _ in events]
+    assert names[0] == "token"
+    assert names[-1] == "done"
+    assert events[-1][1]["debug_info"]["used_fallback"] is True
+    assert stub.counts["requests"] == requests
@@ -0,0 +1,24 @@
+"""
+Ask Thom context assembly: reference knowledge only when relevant, and never twice.
+"""
+
+from backend.services.context_assembler import ContextAssembler
+
+
+def test_small_talk_adds_no_reference_knowledge():
+    assembled = ContextAssembler(retrieval_k=4).assemble("hi")
+    assert assembled.text == ""
+    assert assembled.tokens == 0
+
+
+def test_reference_sections_are_ranked_by_the_question():
+    assembled = ContextAssembler(retrieval_k=0).assemble("What are the key metrics explained?")
+    assert "application:key_metrics_explained" in assembled.included
+    assert "ifs:ifs_global_offices" not in assembled.included
+
+
+def test_retrieved_docs_do_not_repeat_reference_sections():
+    assembled = ContextAssembler(retrieval_k=4).assemble("What does HPTI measure for leadership potential?")
+    assert "thomas:core_products" in assembled.included
+    assert assembled.text.count("Conscientiousness: Drive for achievement") == 1
+    assert not any(name.startswith("retrieved:thomas_docs") for name in assembled.included + assembled.truncated)
@@ -0,0 +1,122 @@
+"""
+BatchCVExtractor chunking and bisection, with LocalCVExtractor standing in for AI_QUERY.
+"""
+
+import json
+
+from backend.services.cv_extraction import BatchCVExtractor, CVItem, LocalCVExtractor, is_row_error
+
+
+class ServerOperationError(Exception):
+    """Named like the connector's error for a statement rejected by one of its rows"""
+
+
+class RequestError(Exception):
+    """Named like the connector's error for a failed HTTP request"""
+
+
+def make_cv(name, years, skills):
+    return "\n".join([
+        name,
+        "PROFESSIONAL SUMMARY",
+        f"{name} delivers IFS Cloud projects.",
+        f"Years of Experience: {years}",
+        "SKILLS",
+        f"Technical: {', '.join(skills)}",
+        "EDUCATION",
+        "BSc Computer Science",
+        "CERTIFICATIONS",
+        "- IFS Cloud Certified",
+    ])
+
+
+def make_items(count):
+    return [
+        CVItem(f"REF-{i:04d}", f"Candidate {i}", make_cv(f"Candidate {i}", i % 15 + 1, ["Python", "SQL"]))
+        for i in range(count)
+    ]
+
+
+class PoisonedExtractor(LocalCVExtractor):
+    """Rejects a whole statement whenever it contains one of the poisoned referrals"""
+
+    def __init__(self, poisoned, error=ServerOperationError):
+        self.poisoned = set(poisoned)
+        self.error = error
+        self.calls = []
+
+    def run(self, items):
+        self.calls.append(len(items))
+        if self.poisoned & {item.referral_id for item in items}:
+            raise self.error("AI_QUERY failed for a row")
+        return super().run(items)
+
+
+def test_local_extractor_reads_sections():
+    insights = json.loads(LocalCVExtractor().extract("Ada", make_cv("Ada", 7, ["Python", "Spark"])))
+    assert insights["skills"] == ["Python", "Spark"]
+    assert insights["years_experience"] == 7
+    assert insights["education"] == ["BSc Computer Science"]
+    assert insights["certifications"] == ["IFS Cloud Certified"]
+
+
+def test_clean_batch_runs_one_statement_per_chunk():
+    items = make_items(10)
+    result = BatchCVExtractor(LocalCVExtractor(), chunk_size=4).extract(items)
+    assert result.chunks == 3
+    assert result.statements == 3
+    assert not result.errors
+    assert set(result.insights) == {item.referral_id for item in items}
+
+
+def test_row_error_is_returned_without_bisection():
+    items = make_items(4)
+    items[2] = CVItem(items[2].referral_id, items[2].name, "   ")
+    result = BatchCVExtractor(LocalCVExtractor(), chunk_size=4).extract(items)
+    assert result.statements == 1
+    assert result.errors == {items[2].referral_id: "empty CV"}
+    assert len(result.insights) == 3
+
+
+def test_rejected_statement_is_bisected_to_the_bad_row():
+    items = make_items(8)
+    bad = items[5].referral_id
+    executor = PoisonedExtractor({bad})
+    result = BatchCVExtractor(executor, chunk_size=8).extract(items)
+
+    assert set(result.errors) == {bad}
+    assert result.errors[bad].startswith("statement failed")
+    expected = BatchCVExtractor(LocalCVExtractor(), chunk_size=8).extract(items[:5] + items[6:])
+    assert result.insights == expected.insights
+    # Depth first: 8, then 4 + 4, the failing 4 as 2 + 2, the failing 2 as 1 + 1
+    assert result.chunks == 1
+    assert result.statements == 7
+    assert executor.calls == [8, 4, 4, 2, 1, 1, 2]
+
+
+def test_bisection_stays_within_its_chunk():
+    items = make_items(12)
+    bad = items[1].referral_id
+    result = BatchCVExtractor(PoisonedExtractor({bad}), chunk_size=4).extract(items)
+    assert set(result.errors) == {bad}
+    assert len(result.insights) == 11
+    # First chunk: 4 -> 2 + 2 -> 1 + 1; the other two chunks run once each
+    assert result.statements == 5 + 2
+
+
+def test_connection_error_fails_the_chunk_at_once():
+    items = make_items(8)
+    executor = PoisonedExtractor({items[0].referral_id}, error=RequestError)
+    result = BatchCVExtractor(executor, chunk_size=8).extract(items)
+    assert result.statements == 1
+    assert executor.calls == [8]
+    assert not result.insights
+    assert set(result.errors) == {item.referral_id for item in items}
+
+
+def test_is_row_error():
+    assert is_row_error(ServerOperationError("bad row"))
+    assert is_row_error(ValueError("bad row"))
+    assert not is_row_error(RequestError("reset"))
+    assert not is_row_error(ConnectionResetError())
+    assert not is_row_error(TimeoutError())
@@ -0,0 +1,51 @@
+"""
+One-shot keyword scans must agree with the streaming scanner they replace for complete texts.
+"""
+
+import random
+
+import pytest
+
+from backend.services.keyword_engine import get_keyword_engine
+
+ANSWER = (
+    "Based on the PPA, this candidate shows high Dominance and Influence with lower Steadiness, "
+    "so they are likely to drive results quickly. Their GIA score suggests strong learning agility, "
+    "and the HPTI profile points to high Ambiguity Acceptance. In IFS Cloud terms they would suit "
+    "the Field Service Management rollout in Linköping. Team chemistry is good; consider pairing "
+    "them with a high-Compliance analyst. Low influence on churn and retention."
+)
+
+WORDS = [
+    "PPA", "ppa", "apparent", "Dominance", "dominance", "Influence", "influence", "IFS", "IFS Cloud",
+    "ifscloud", "Cloud", "teamwork", "Team", "ERP", "erp_x", "Risk Approach", "risk", "Linköping",
+    "İstanbul", "Field Service Management", "Service", "GIA", "giant", "the", "and", "-", ",", ".",
+]
+
+
+def streamed(engine, text, size):
+    scanner = engine.scanner()
+    for i in range(0, len(text), size):
+        scanner.feed(text[i:i + size])
+    scanner.finish()
+    return scanner.result()
+
+
+def random_texts(count, seed=11):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 40))).replace(" ,", ",")
+
+
+@pytest.mark.parametrize("text", [ANSWER, "", "hello", *random_texts(200)])
+def test_scan_matches_scanner(text):
+    engine = get_keyword_engine()
+    expected = streamed(engine, text, 7)
+    assert engine.scan(text) == expected
+
+
+def test_traits_are_case_sensitive():
+    found = get_keyword_engine().scan("low influence, high Dominance")
+    assert found["thomas_keywords"] == ["Dominance"]
+    assert found["sources"] == ["Thomas PPA Assessment"]
+    assert [span["keyword"] for span in found["spans"]] == ["Dominance"]
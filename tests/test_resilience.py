@@ -0,0 +1,137 @@
+"""
+Circuit breaker behaviour against the fault-injecting serving stub: opening on
+failures, short-circuiting while open, half-open probes, and a cancelled stream.
+"""
+
+import time
+
+from ai.fault_injection import ANSWER
+from conftest import BREAKER_RESET_SECONDS
+
+
+def drain(service, question="What does a PPA profile show?"):
+    events = list(service.stream_thom(question, use_cache=False))
+    text = "".join(e["text"] for e in events if e["type"] == "token")
+    return text, events[-1]
+
+
+def wait_for_half_open(breaker):
+    time.sleep(BREAKER_RESET_SECONDS + 0.05)
+    assert breaker.state == "half_open"
+
+
+def test_breaker_opens_on_failure_and_short_circuits(stub, service, breaker):
+    stub.faults.update({"error_rate": 1.0})
+
+    _, done = drain(service)
+    assert done["used_fallback"] is True
+    assert breaker.state == "open"
+
+    requests = stub.counts["requests"]
+    _, done = drain(service)
+    assert done["used_fallback"] is True
+    assert done.get("circuit_open") is True
+    assert stub.counts["requests"] == requests, "an open circuit must not reach the endpoint"
+
+
+def test_half_open_probe_success_closes(stub, service, breaker):
+    stub.faults.update({"error_rate": 1.0})
+    drain(service)
+    assert breaker.state == "open"
+
+    stub.faults.update({"error_rate": 0.0})
+    wait_for_half_open(breaker)
+    text, done = drain(service)
+    assert done["used_fallback"] is False
+    assert text.strip() == ANSWER
+    assert breaker.state == "closed"
+
+
+def test_half_open_probe_failure_reopens(stub, service, breaker):
+    stub.faults.update({"error_rate": 1.0})
+    drain(service)
+    wait_for_half_open(breaker)
+
+    _, done = drain(service)
+    assert done["used_fallback"] is True
+    assert breaker.state == "open"
+    assert breaker.stats()["opened"] == 2
+
+
+def test_half_open_admits_one_probe_at_a_time(stub, service, breaker):
+    stub.faults.update({"error_rate": 1.0})
+    drain(service)
+    wait_for_half_open(breaker)
+
+    assert breaker.allow() is True
+    assert breaker.allow() is False
+    breaker.release()
+    assert breaker.allow() is True
+    breaker.release()
+
+
+def test_cancelled_stream_releases_probe(stub, service, breaker):
+    stub.faults.update({"error_rate": 1.0})
+    drain(service)
+    stub.faults.update({"error_rate": 0.0})
+    wait_for_half_open(breaker)
+
+    # The client goes away after the first token, with neither outcome recorded
+    stream = service.stream_thom("What does a PPA profile show?", use_cache=False)
+    first = next(stream)
+    assert first["type"] == "token"
+    assert breaker.allow() is False, "the open stream holds the only probe slot"
+    stream.close()
+
+    assert breaker.state == "half_open"
+    assert breaker._probes == 0
+
+    # Without waiting another reset_timeout, the next request probes and closes the circuit
+    _, done = drain(service)
+    assert done["used_fallback"] is False
+    assert breaker.state == "closed"
+
+
+def test_non_streaming_call_recovers(stub, service, breaker):
+    stub.faults.update({"error_rate": 1.0})
+    service.ask_thom("What does a PPA profile show?", use_cache=False)
+    assert breaker.state == "open"
+
+    stub.faults.update({"error_rate": 0.0})
+    wait_for_half_open(breaker)
+    assert service.ask_thom("What does a PPA profile show?", use_cache=False) == ANSWER
+    assert breaker.state == "closed"
+
+
+def test_slow_drip_stream_stops_at_the_deadline(stub, service, breaker, resilience):
+    resilience.caller(service.model_endpoint).deadline_seconds = 0.3
+    stub.faults.update({"stream_interval": 0.05})
+
+    started = time.monotonic()
+    text, done = drain(service)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.3 + 0.2, "the stream must not run far past the deadline"
+    assert done["truncated"] is True
+    assert done["used_fallback"] is False
+    assert 0 < len(text.split()) < len(ANSWER.split())
+    assert breaker.state == "open"
+
+
+def test_stream_slot_wait_is_bounded_by_the_deadline(stub, service, breaker, resilience, monkeypatch):
+    import ai.concurrency
+    gate = ai.concurrency.ModelCallGate(default_limit=1)
+    monkeypatch.setattr(ai.concurrency, "_model_gate", gate)
+    resilience.caller(service.model_endpoint).deadline_seconds = 0.2
+
+    assert gate.semaphore(service.model_endpoint).acquire()
+    try:
+        started = time.monotonic()
+        _, done = drain(service)
+        elapsed = time.monotonic() - started
+    finally:
+        gate.semaphore(service.model_endpoint).release()
+
+    assert elapsed < 0.2 + 0.2
+    assert done["used_fallback"] is True
+    assert stub.counts["requests"] == 0